@@ -3,6 +3,7 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from .authentication import revoke_user_tokens
 from .models import User, UserActivity
 
 
@@ -51,15 +52,26 @@ class UserAdmin(BaseUserAdmin):
 
     actions = ['activate_users', 'deactivate_users', 'reset_sessions']
 
+    def _set_active(self, queryset, is_active):
+        """
+        update() ne passe pas par post_save : les tokens des utilisateurs dont
+        l'activation change sont révoqués ici (claim is_active périmé)
+        """
+        changed = list(queryset.exclude(is_active=is_active).values_list('pk', flat=True))
+        updated = queryset.update(is_active=is_active)
+        for user_id in changed:
+            revoke_user_tokens(user_id)
+        return updated
+
     def activate_users(self, request, queryset):
         """Active les utilisateurs sélectionnés"""
-        updated = queryset.update(is_active=True)
+        updated = self._set_active(queryset, True)
         self.message_user(request, f'{updated} utilisateur(s) activé(s).')
     activate_users.short_description = "Activer les utilisateurs sélectionnés"
 
     def deactivate_users(self, request, queryset):
         """Désactive les utilisateurs sélectionnés"""
-        updated = queryset.update(is_active=False)
+        updated = self._set_active(queryset, False)
         self.message_user(request, f'{updated} utilisateur(s) désactivé(s).')
     deactivate_users.short_description = "Désactiver les utilisateurs sélectionnés"
 
@@ -0,0 +1,143 @@
+"""
+Journal d'activité (UserActivity) à écriture différée
+
+`log_activity()` remplace les `UserActivity.objects.create()` des vues.
+Une activité ordinaire (connexion, déconnexion, profil, préférences) est
+mise en mémoire et la requête répond sans attendre d'INSERT. Les activités
+en attente sont écrites en un `bulk_create` par un thread du process :
+    - toutes les AUDIT_FLUSH_INTERVAL secondes ;
+    - dès que AUDIT_BUFFER_SIZE activités attendent (prise de service :
+      des dizaines de connexions en même temps) ;
+    - à l'arrêt du worker (atexit).
+
+Une activité sensible (`critical=True` : mots de passe, comptes,
+permissions) est écrite tout de suite, dans la requête.
+
+L'activité est mise en attente après le commit de la transaction en cours
+(rien n'est journalisé pour une requête annulée). L'horodatage est celui
+de l'appel, pas celui de l'écriture.
+
+Si le lot échoue (utilisateur supprimé entre-temps...), les activités sont
+réécrites une par une : seules les lignes fautives sont perdues.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BUFFER_SIZE = getattr(settings, 'AUDIT_BUFFER_SIZE', 100)
+AUDIT_FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 2.0)
+
+
+class ActivityBuffer:
+    """Activités en attente d'écriture, vidées par un thread du process"""
+
+    def __init__(self, max_size=AUDIT_BUFFER_SIZE, interval=AUDIT_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._pid = None
+
+    def add(self, activity):
+        with self._lock:
+            self._ensure_worker()
+            self._pending.append(activity)
+            full = len(self._pending) >= self.max_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Écrit les activités en attente. Retourne le nombre d'activités écrites."""
+        from .models import UserActivity
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            try:
+                UserActivity.objects.bulk_create(pending, batch_size=self.max_size)
+            except Exception:
+                logger.exception(
+                    "Journal d'activité : échec du lot de %d activité(s), écriture une par une", len(pending)
+                )
+                return self._write_one_by_one(pending)
+            return len(pending)
+
+    def _write_one_by_one(self, pending):
+        from .models import User
+
+        # Activités d'un utilisateur supprimé depuis : écartées sans essai
+        existing = set(User.objects.filter(
+            pk__in={activity.user_id for activity in pending}
+        ).values_list('pk', flat=True))
+        written = 0
+        for activity in pending:
+            if activity.user_id not in existing:
+                continue
+            try:
+                with transaction.atomic():
+                    activity.save(force_insert=True)
+                written += 1
+            except Exception:
+                logger.exception(
+                    "Journal d'activité : activité non écrite (%s, utilisateur %s)", activity.action, activity.user_id
+                )
+        if written < len(pending):
+            logger.error("Journal d'activité : %d activité(s) non écrite(s)", len(pending) - written)
+        return written
+
+    def _ensure_worker(self):
+        # Après un fork (gunicorn --preload), le thread du parent n'existe pas dans l'enfant
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._pending = []
+        threading.Thread(target=self._run, name='activity-log', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._pending:
+                self.flush()
+                # Connexion propre au thread : fermée selon CONN_MAX_AGE
+                close_old_connections()
+
+
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)
+
+
+def log_activity(user, action, description, request=None, critical=False):
+    """
+    Journalise une activité de `user`. `request` fournit l'adresse IP et le
+    User-Agent ; `critical` écrit l'activité immédiatement.
+    """
+    from .models import UserActivity
+
+    activity = UserActivity(
+        user=user,
+        action=action,
+        description=description,
+        timestamp=timezone.now(),
+    )
+    if request is not None:
+        activity.ip_address = request.META.get('REMOTE_ADDR')
+        activity.user_agent = request.META.get('HTTP_USER_AGENT')
+
+    if critical:
+        activity.save()
+    else:
+        transaction.on_commit(lambda: activity_buffer.add(activity))
+    return activity
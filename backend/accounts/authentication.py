@@ -0,0 +1,238 @@
+"""
+Authentification JWT sans lecture de l'utilisateur à chaque requête
+
+Les tokens émis par `ClaimsRefreshToken` portent l'identité utile aux
+contrôles d'accès (id, username, rôle, is_active) et une version de token.
+`ClaimsJWTAuthentication` construit alors un `ClaimsUser` à partir de ces
+claims :
+    - `role`, `is_admin`, `has_permission()`... ne font aucune requête
+      (permissions via accounts/permission_cache.py) ;
+    - tout autre accès (champ, méthode, affectation en clé étrangère) charge
+      l'utilisateur complet, gardé USER_CACHE_TTL secondes en mémoire du process.
+
+Révocation : la version portée par le token est comparée à `TokenVersion`
+(mise en cache TOKEN_VERSION_CACHE_TIMEOUT secondes). Elle est incrémentée
+quand le rôle, l'activation ou le mot de passe changent (voir accounts/signals.py).
+Un refresh token révoqué ne peut plus émettre d'access token
+(`ClaimsTokenRefreshSerializer`).
+
+Les tokens sans claim de version (émis avant ce mécanisme) passent par
+l'authentification simplejwt classique.
+"""
+
+import copy
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import TokenVersion, User
+from .permission_cache import get_cached_permissions
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+# Court : le cache par défaut est local au process, une révocation faite
+# par un autre worker est donc vue au plus tard après ce délai
+TOKEN_VERSION_CACHE_TIMEOUT = 60
+
+# Durée de vie des utilisateurs complets gardés en mémoire du process
+USER_CACHE_TTL = 30
+
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+
+def _token_version_key(user_id):
+    return f'accounts:token_version:{user_id}'
+
+
+def get_token_version(user_id):
+    """Version courante des tokens d'un utilisateur (None si aucune)"""
+    key = _token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = TokenVersion.objects.filter(user_id=user_id).values_list(
+            'version', flat=True
+        ).first()
+        # 0 = aucune version enregistrée (utilisateur supprimé par ex.)
+        cache.set(key, version or 0, TOKEN_VERSION_CACHE_TIMEOUT)
+    return version or None
+
+
+def ensure_token_version(user):
+    """Version à inscrire dans les nouveaux tokens de l'utilisateur"""
+    token_version, _created = TokenVersion.objects.get_or_create(user=user)
+    return token_version.version
+
+
+def revoke_user_tokens(user_id):
+    """Invalide tous les tokens déjà émis pour cet utilisateur"""
+    updated = TokenVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1
+    )
+    if not updated:
+        TokenVersion.objects.get_or_create(user_id=user_id, defaults={'version': 2})
+    forget_token_version(user_id)
+
+
+def forget_token_version(user_id):
+    """Oublie la version en cache (et l'utilisateur) : relue en base à la prochaine requête"""
+    cache.delete(_token_version_key(user_id))
+    forget_cached_user(user_id)
+
+
+def get_cached_user(user_id, token_version):
+    """Utilisateur complet, depuis la mémoire du process si encore frais"""
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+    if entry and entry[0] > now and entry[1] == token_version:
+        user = entry[2]
+    else:
+        user = User.objects.get(pk=user_id)
+        with _user_cache_lock:
+            _user_cache[user_id] = (now + USER_CACHE_TTL, token_version, user)
+    # Copie : une vue peut modifier request.user sans toucher au cache partagé
+    return copy.copy(user)
+
+
+def forget_cached_user(user_id):
+    """Retire un utilisateur du cache mémoire de ce process"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Utilisateur construit depuis les claims du token.
+    Se comporte comme un `User` : l'objet complet est chargé au premier accès
+    à un attribut qui n'est pas dans les claims.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        token_version = token[TOKEN_VERSION_CLAIM]
+        super().__init__(lambda: get_cached_user(user_id, token_version))
+        # LazyObject redirige __setattr__ vers l'objet chargé
+        self.__dict__['_claims'] = {
+            'id': user_id,
+            'username': token.get('username', ''),
+            'role': token.get('role'),
+            'is_active': token.get('is_active', True),
+        }
+
+    @property
+    def id(self):
+        return self._claims['id']
+
+    @property
+    def pk(self):
+        return self._claims['id']
+
+    @property
+    def username(self):
+        return self._claims['username']
+
+    @property
+    def role(self):
+        return self._claims['role']
+
+    @property
+    def is_active(self):
+        return self._claims['is_active']
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_manager(self):
+        return self.role == 'manager'
+
+    @property
+    def is_server(self):
+        return self.role == 'server'
+
+    @property
+    def is_cashier(self):
+        return self.role == 'cashier'
+
+    def has_permission(self, permission_code):
+        """Même règle que User.has_permission, sans charger l'utilisateur"""
+        if self.role == 'admin':
+            return True
+        return permission_code in self.get_permission_codes()
+
+    def get_permission_codes(self):
+        return get_cached_permissions(self)['codes']
+
+    def get_permissions_by_category(self):
+        return get_cached_permissions(self)['by_category']
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token portant les claims d'identité (copiés dans l'access token)"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = ensure_token_version(user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Rafraîchissement refusé pour un refresh token révoqué ou un utilisateur inactif"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if TOKEN_VERSION_CLAIM in refresh:
+            user_id = refresh[api_settings.USER_ID_CLAIM]
+            if refresh[TOKEN_VERSION_CLAIM] != get_token_version(user_id):
+                raise AuthenticationFailed('Token révoqué', code='token_revoked')
+            if not refresh.get('is_active', True):
+                raise AuthenticationFailed('Utilisateur inactif', code='user_inactive')
+        return super().validate(attrs)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT basée sur les claims, sans requête utilisateur
+    """
+
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            # Ancien token : lecture classique de l'utilisateur
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                'Token sans identifiant utilisateur', code='token_not_valid'
+            )
+
+        if validated_token[TOKEN_VERSION_CLAIM] != get_token_version(user_id):
+            raise AuthenticationFailed('Token révoqué', code='token_revoked')
+
+        if not validated_token.get('is_active', True):
+            raise AuthenticationFailed('Utilisateur inactif', code='user_inactive')
+
+        return ClaimsUser(validated_token)
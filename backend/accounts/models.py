@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 class User(AbstractUser):
     """
@@ -71,6 +72,19 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
 
+    # Champs repris dans les claims JWT : leur modification révoque les tokens
+    TOKEN_CLAIM_FIELDS = ('role', 'is_active', 'password')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_claims_state = instance.get_token_claims_state()
+        return instance
+
+    def get_token_claims_state(self):
+        """Valeurs chargées des champs repris dans les tokens (None si différé)"""
+        return tuple(self.__dict__.get(field) for field in self.TOKEN_CLAIM_FIELDS)
+
     @property
     def is_admin(self):
         """Vérifie si l'utilisateur est admin"""
@@ -151,12 +165,15 @@ class User(AbstractUser):
         if self.role == 'admin':
             return True
 
-        # Vérifier les permissions personnalisées
-        return self.custom_permissions.filter(
-            permission__code=permission_code,
-            permission__is_active=True,
-            is_active=True
-        ).exists()
+        # Permissions personnalisées (en cache, voir permission_cache.py)
+        return permission_code in self.get_permission_codes()
+
+    def get_permission_codes(self):
+        """
+        Retourne les codes des permissions actives de l'utilisateur (frozenset)
+        """
+        from .permission_cache import get_cached_permissions
+        return get_cached_permissions(self)['codes']
 
     def get_permissions(self):
         """
@@ -181,20 +198,8 @@ class User(AbstractUser):
         """
         Retourne les permissions groupées par catégorie
         """
-        permissions = self.get_permissions()
-        grouped = {}
-
-        for permission in permissions:
-            category = permission.category
-            if category not in grouped:
-                grouped[category] = []
-            grouped[category].append({
-                'code': permission.code,
-                'name': permission.name,
-                'description': permission.description
-            })
-
-        return grouped
+        from .permission_cache import get_cached_permissions
+        return get_cached_permissions(self)['by_category']
 
 
 class UserActivity(models.Model):
@@ -243,8 +248,9 @@ class UserActivity(models.Model):
         verbose_name='User Agent'
     )
 
+    # Heure de l'action (le journal écrit en différé, voir accounts/audit.py)
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
         verbose_name='Horodatage'
     )
 
@@ -365,3 +371,35 @@ class UserPermission(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.permission.name}"
+
+
+class TokenVersion(models.Model):
+    """
+    Version des tokens JWT d'un utilisateur.
+    Incrémentée pour révoquer tous les tokens émis (changement de rôle,
+    désactivation, nouveau mot de passe).
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='token_version',
+        verbose_name='Utilisateur'
+    )
+
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Version'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Date de modification'
+    )
+
+    class Meta:
+        verbose_name = 'Version de token'
+        verbose_name_plural = 'Versions de tokens'
+
+    def __str__(self):
+        return f"{self.user.username} - v{self.version}"
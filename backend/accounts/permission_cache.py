@@ -0,0 +1,91 @@
+"""
+Cache des permissions par utilisateur
+
+Les permissions d'un utilisateur sont chargées en une seule requête puis
+stockées dans le cache partagé :
+    - `codes` : frozenset des codes, pour `User.has_permission`
+    - `by_category` : permissions groupées, pour les profils
+
+La clé contient un numéro de version global (incrémenté à chaque modification
+d'une `Permission`) ainsi que l'id et le rôle de l'utilisateur : un changement
+de rôle utilise donc une nouvelle entrée. Une modification de `UserPermission`
+supprime seulement l'entrée de l'utilisateur concerné (voir accounts/signals.py).
+"""
+
+import time
+
+from django.core.cache import cache
+
+PERMISSIONS_VERSION_KEY = 'accounts:permissions:version'
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60  # 1 heure
+
+
+def _new_version():
+    # Basée sur l'heure pour ne jamais retomber sur une ancienne version
+    # si la clé a été évincée du cache
+    return int(time.time() * 1000)
+
+
+def get_permissions_version():
+    """Version courante du cache des permissions"""
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        cache.add(PERMISSIONS_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def _cache_key(user):
+    version = get_permissions_version()
+    return f'accounts:permissions:v{version}:{user.pk}:{user.role}'
+
+
+def _load_permissions(user):
+    """Charge les permissions actives de l'utilisateur (une requête)"""
+    from .models import Permission
+
+    if user.role == 'admin':
+        # Les admins ont toutes les permissions
+        queryset = Permission.objects.filter(is_active=True)
+    else:
+        queryset = Permission.objects.filter(
+            user_assignments__user_id=user.pk,
+            user_assignments__is_active=True,
+            is_active=True
+        ).distinct()
+
+    by_category = {}
+    codes = set()
+    for permission in queryset.values('code', 'name', 'description', 'category'):
+        codes.add(permission['code'])
+        by_category.setdefault(permission['category'], []).append({
+            'code': permission['code'],
+            'name': permission['name'],
+            'description': permission['description']
+        })
+
+    return {'codes': frozenset(codes), 'by_category': by_category}
+
+
+def get_cached_permissions(user):
+    """Retourne {'codes': frozenset, 'by_category': dict} depuis le cache"""
+    key = _cache_key(user)
+    data = cache.get(key)
+    if data is None:
+        data = _load_permissions(user)
+        cache.set(key, data, PERMISSIONS_CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_user_permissions(user):
+    """Supprime l'entrée en cache d'un utilisateur"""
+    cache.delete(_cache_key(user))
+
+
+def invalidate_all_permissions():
+    """Invalide le cache de tous les utilisateurs (changement d'une Permission)"""
+    try:
+        cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        # Clé absente (cache vidé ou évincé)
+        cache.set(PERMISSIONS_VERSION_KEY, _new_version(), timeout=None)
@@ -4,19 +4,20 @@ from django.http import JsonResponse
 from rest_framework.response import Response
 from rest_framework import status
 
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
+
 class IsAuthenticated(permissions.BasePermission):
     """
     Permission pour les utilisateurs authentifiés
     """
     def has_permission(self, request, view):
-        # Debug logs
-        print(f"🔐 IsAuthenticated Check:")
-        print(f"  - User: {request.user}")
-        print(f"  - Is authenticated: {request.user.is_authenticated if request.user else False}")
-        print(f"  - Auth header: {request.META.get('HTTP_AUTHORIZATION', 'NO AUTH HEADER')}")
-        
         is_auth = request.user and request.user.is_authenticated
-        print(f"  - Result: {is_auth}")
+        events.debug(
+            'accounts.permission.is_authenticated', user=request.user, path=request.path,
+            has_auth_header='HTTP_AUTHORIZATION' in request.META, granted=bool(is_auth)
+        )
         return is_auth
 
 class IsAdminOrGerant(permissions.BasePermission):
@@ -125,7 +126,7 @@ class CanViewSales(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
-            print(f"❌ CanViewSales: User not authenticated")
+            events.debug('accounts.permission.can_view_sales', user=None, granted=False)
             return False
         
         has_perm = (
@@ -133,7 +134,10 @@ class CanViewSales(permissions.BasePermission):
             hasattr(request.user, 'has_permission') and request.user.has_permission('sales_view')
         )
         
-        print(f"🔐 CanViewSales: User {request.user.username}, Role: {request.user.role}, Has permission: {has_perm}")
+        events.debug(
+            'accounts.permission.can_view_sales', user=request.user.username,
+            role=request.user.role, granted=has_perm
+        )
         return has_perm
 
 
@@ -143,7 +147,7 @@ class CanCreateSales(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
-            print(f"❌ CanCreateSales: User not authenticated")
+            events.debug('accounts.permission.can_create_sales', user=None, granted=False)
             return False
         
         has_perm = (
@@ -151,7 +155,10 @@ class CanCreateSales(permissions.BasePermission):
             hasattr(request.user, 'has_permission') and request.user.has_permission('sales_create')
         )
         
-        print(f"🔐 CanCreateSales: User {request.user.username}, Role: {request.user.role}, Has permission: {has_perm}")
+        events.debug(
+            'accounts.permission.can_create_sales', user=request.user.username,
+            role=request.user.role, granted=has_perm
+        )
         return has_perm
 
 
@@ -1,7 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from barstock_api.events import get_event_logger
 from .models import User, UserActivity, Permission, UserPermission
 
+events = get_event_logger(__name__)
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer pour le modèle User
@@ -298,10 +301,6 @@ class CreateUserSerializer(serializers.ModelSerializer):
         if not permissions_codes and user_role in default_permissions_by_role:
             permissions_codes = default_permissions_by_role[user_role]
 
-        print(f"🔍 Création utilisateur avec permissions:")
-        print(f"   - Rôle: {user_role}")
-        print(f"   - Permissions: {len(permissions_codes)} attribuées")
-
         # Normaliser le nom d'utilisateur en minuscules pour cohérence avec le frontend
         if 'username' in validated_data:
             validated_data['username'] = validated_data['username'].lower()
@@ -312,10 +311,10 @@ class CreateUserSerializer(serializers.ModelSerializer):
         user.save()
 
         # Assigner les permissions
+        assigned_count = 0
         if permissions_codes:
             from .models import Permission, UserPermission
 
-            assigned_count = 0
             for perm_code in permissions_codes:
                 try:
                     permission = Permission.objects.get(code=perm_code, is_active=True)
@@ -326,11 +325,12 @@ class CreateUserSerializer(serializers.ModelSerializer):
                     )
                     assigned_count += 1
                 except Permission.DoesNotExist:
-                    print(f"⚠️ Permission non trouvée: {perm_code}")
-                except Exception as e:
-                    print(f"⚠️ Erreur assignation {perm_code}: {e}")
-
-            print(f"   - {assigned_count}/{len(permissions_codes)} permissions assignées")
-
-        print(f"   - Utilisateur créé: {user.username} (ID: {user.id})")
+                    events.warning('accounts.user.permission_not_found', user=user.username, permission=perm_code)
+                except Exception:
+                    events.exception('accounts.user.permission_failed', user=user.username, permission=perm_code)
+
+        events.info(
+            'accounts.user.created', user=user.username, id=user.id, role=user_role,
+            permissions=assigned_count, requested_permissions=len(permissions_codes)
+        )
         return user
@@ -0,0 +1,45 @@
+"""
+Signaux pour invalider le cache des permissions et révoquer les tokens
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import forget_cached_user, forget_token_version, revoke_user_tokens
+from .models import Permission, User, UserPermission
+from .permission_cache import invalidate_all_permissions, invalidate_user_permissions
+
+
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+def invalidate_on_user_permission_change(sender, instance, **kwargs):
+    """Une attribution modifiée n'invalide que l'utilisateur concerné"""
+    invalidate_user_permissions(instance.user)
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_on_permission_change(sender, instance, **kwargs):
+    """Une permission modifiée (nom, catégorie, activation) concerne tout le monde"""
+    invalidate_all_permissions()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_claims_change(sender, instance, created, **kwargs):
+    """Rôle, activation ou mot de passe modifiés : les tokens émis sont révoqués"""
+    state = instance.get_token_claims_state()
+    previous = getattr(instance, '_token_claims_state', None) or ()
+    changed = any(
+        old is not None and old != new for old, new in zip(previous, state)
+    )
+    if not created and changed:
+        revoke_user_tokens(instance.pk)
+    else:
+        forget_cached_user(instance.pk)
+    instance._token_claims_state = state
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    # La version est supprimée avec l'utilisateur (cascade) : aucun token ne
+    # correspond plus, la recréer pointerait vers un utilisateur absent
+    forget_token_version(instance.pk)
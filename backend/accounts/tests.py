@@ -1,3 +1,156 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .audit import activity_buffer
+from .authentication import ClaimsJWTAuthentication, ClaimsRefreshToken, get_token_version
+from .models import Permission, TokenVersion, User, UserActivity, UserPermission
+
+
+class PermissionCacheTest(TestCase):
+    """Tests du cache des permissions utilisateur"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='caissier',
+            password='testpass123',
+            role='cashier'
+        )
+        self.permission = Permission.objects.create(
+            code='sales_view',
+            name='Voir ventes',
+            category='sales'
+        )
+        UserPermission.objects.create(user=self.user, permission=self.permission)
+
+    def test_checks_cost_no_query_after_first(self):
+        self.assertTrue(self.user.has_permission('sales_view'))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.user.has_permission('sales_view'))
+            self.assertFalse(self.user.has_permission('sales_create'))
+            self.assertIn('sales', self.user.get_permissions_by_category())
+
+    def test_user_permission_change_invalidates_cache(self):
+        self.assertTrue(self.user.has_permission('sales_view'))
+
+        UserPermission.objects.filter(user=self.user).delete()
+
+        self.assertFalse(self.user.has_permission('sales_view'))
+
+    def test_permission_deactivation_invalidates_cache(self):
+        """Désactiver une permission la retire à tous les utilisateurs"""
+        self.assertTrue(self.user.has_permission('sales_view'))
+
+        self.permission.is_active = False
+        self.permission.save()
+
+        self.assertFalse(self.user.has_permission('sales_view'))
+
+
+class ClaimsAuthenticationTest(TestCase):
+    """Tests de l'authentification JWT basée sur les claims"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='serveur',
+            password='testpass123',
+            role='server'
+        )
+        self.token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.auth = ClaimsJWTAuthentication()
+
+    def test_authenticates_without_user_query(self):
+        get_token_version(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = self.auth.get_user(self.auth.get_validated_token(str(self.token)))
+            self.assertEqual((user.pk, user.role), (self.user.pk, 'server'))
+            self.assertFalse(user.is_admin)
+
+        # Accès à un champ hors claims : chargement de l'utilisateur complet
+        self.assertEqual(user.first_name, self.user.first_name)
+        self.assertIsInstance(user, User)
+
+    def test_role_change_revokes_tokens(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.role = 'cashier'
+        user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.auth.get_validated_token(str(self.token)))
+
+    def test_admin_deactivation_revokes_tokens(self):
+        """L'action d'admin (update() sans signal) révoque aussi access et refresh tokens"""
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {refresh.access_token}'}
+        self.assertEqual(self.client.get('/api/accounts/profile/', **headers).status_code, 200)
+
+        admin = User.objects.create_superuser(username='admin', password='x', email='admin@example.com')
+        self.client.force_login(admin)
+        self.client.post('/admin/accounts/user/', {
+            'action': 'deactivate_users', '_selected_action': [self.user.pk]
+        })
+        self.client.logout()
+
+        self.assertEqual(self.client.get('/api/accounts/profile/', **headers).status_code, 401)
+        response = self.client.post('/api/accounts/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_tokens_are_revoked(self):
+        get_token_version(self.user.pk)
+        self.user.delete()
+
+        self.assertFalse(TokenVersion.objects.exists())
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(self.auth.get_validated_token(str(self.token)))
+
+
+class ActivityLogTest(TestCase):
+    """Tests du journal d'activité différé"""
+
+    def setUp(self):
+        activity_buffer.flush()
+        self.user = User.objects.create_user(username='caissier', password='testpass123', role='cashier')
+
+    def test_login_is_buffered_then_bulk_written(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/accounts/login/', {
+                'username': 'caissier', 'password': 'testpass123'
+            }, HTTP_USER_AGENT='Caisse/1.0')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(UserActivity.objects.exists())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(activity_buffer.flush(), 1)
+        activity = UserActivity.objects.get()
+        self.assertEqual((activity.action, activity.user_agent), ('login', 'Caisse/1.0'))
+
+    def test_failed_batch_keeps_valid_activities(self):
+        """Un lot en échec (utilisateur supprimé entre-temps) est réécrit ligne à ligne"""
+        removed = User.objects.create_user(username='ancien', password='x', role='server')
+        for user in (self.user, removed):
+            activity_buffer.add(UserActivity(
+                user=user, action='login', description='Connexion', timestamp=timezone.now()
+            ))
+        removed.delete()
+
+        failure = IntegrityError('FOREIGN KEY constraint failed')
+        with mock.patch.object(UserActivity.objects, 'bulk_create', side_effect=failure), \
+                self.assertLogs('accounts.audit', 'ERROR'):
+            self.assertEqual(activity_buffer.flush(), 1)
+        self.assertEqual(list(UserActivity.objects.values_list('user_id', flat=True)), [self.user.pk])
 
-# Create your tests here.
+    def test_password_change_is_written_immediately(self):
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        response = self.client.post('/api/accounts/change-password/', {
+            'old_password': 'testpass123', 'new_password': 'N0uveau-pass!', 'confirm_password': 'N0uveau-pass!'
+        }, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(UserActivity.objects.get().description, 'Changement de mot de passe')
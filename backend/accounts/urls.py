@@ -1,6 +1,7 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
+from .authentication import ClaimsTokenRefreshSerializer
 from .activity_views import UserActivityView
 
 app_name = 'accounts'
@@ -9,7 +10,7 @@ urlpatterns = [
     # Authentification
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', TokenRefreshView.as_view(serializer_class=ClaimsTokenRefreshSerializer), name='token_refresh'),
     
     # Profil utilisateur
     path('profile/', views.profile_view, name='profile'),
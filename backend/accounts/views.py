@@ -2,7 +2,6 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
 from django.utils import timezone
 from django.contrib.auth.tokens import default_token_generator
@@ -22,6 +21,15 @@ from .permissions import (
     IsAuthenticated, IsAdminOrGerant, IsAdmin, IsOwnerOrAdminOrGerant,
     CanManageUsers, require_permission, require_role, admin_required
 )
+from .audit import activity_buffer, log_activity
+from .authentication import ClaimsRefreshToken
+from .permission_cache import invalidate_all_permissions, invalidate_user_permissions
+from barstock_api.conditional import ConditionalResource, conditional_get
+from barstock_api.events import get_event_logger, request_headers
+
+events = get_event_logger(__name__)
+
+SERVERS_RESOURCE = ConditionalResource('servers', [User])
 
 class UserListCreateView(generics.ListCreateAPIView):
     """
@@ -52,22 +60,16 @@ class UserListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         queryset = User.objects.all()
         
-        # Debug logs
-        print(f"👤 UserListCreateView - User: {self.request.user} (role: {self.request.user.role})")
-        print(f"👤 Query params: {dict(self.request.query_params)}")
-        
         # Filtrer par statut actif si demandé
         is_active = self.request.query_params.get('is_active')
         if is_active is not None:
             is_active_bool = is_active.lower() in ['true', '1', 'yes']
             queryset = queryset.filter(is_active=is_active_bool)
-            print(f"👤 Filtré par is_active={is_active_bool}")
         
         # Filtrer par rôle si demandé
         role = self.request.query_params.get('role')
         if role:
             queryset = queryset.filter(role=role)
-            print(f"👤 Filtré par role={role}")
         
         # Permissions d'accès selon le rôle de l'utilisateur connecté
         if self.request.user.is_admin:
@@ -89,9 +91,10 @@ class UserListCreateView(generics.ListCreateAPIView):
             # Autres rôles ne voient que leur propre profil
             queryset = queryset.filter(id=self.request.user.id)
         
-        print(f"👤 Queryset final: {queryset.count()} utilisateurs")
-        [print(f"  - {u.username} ({u.role})") for u in queryset[:5]]
-        
+        events.debug(
+            'accounts.users.list', user=self.request.user.username, role=self.request.user.role,
+            params=lambda: dict(self.request.query_params), count=queryset.count
+        )
         return queryset
 
     def perform_create(self, serializer):
@@ -102,10 +105,8 @@ class UserListCreateView(generics.ListCreateAPIView):
         user = serializer.save()
 
         # Enregistrer l'activité
-        UserActivity.objects.create(
-            user=self.request.user,
-            action='create',
-            description=f"Création de l'utilisateur {user.username}"
+        log_activity(
+            self.request.user, 'create', f"Création de l'utilisateur {user.username}", critical=True
         )
 
 
@@ -128,10 +129,8 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         user = serializer.save()
 
         # Enregistrer l'activité
-        UserActivity.objects.create(
-            user=self.request.user,
-            action='update',
-            description=f"Modification de l'utilisateur {user.username}"
+        log_activity(
+            self.request.user, 'update', f"Modification de l'utilisateur {user.username}", critical=True
         )
 
     def perform_destroy(self, instance):
@@ -140,10 +139,8 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Seuls les admins peuvent supprimer des utilisateurs.")
 
         # Enregistrer l'activité avant suppression
-        UserActivity.objects.create(
-            user=self.request.user,
-            action='delete',
-            description=f"Suppression de l'utilisateur {instance.username}"
+        log_activity(
+            self.request.user, 'delete', f"Suppression de l'utilisateur {instance.username}", critical=True
         )
 
         instance.delete()
@@ -155,19 +152,19 @@ def login_view(request):
     """
     Endpoint de connexion pour les utilisateurs
     """
-    # DEBUG: Log de la requête reçue
-    print(f"🔐 LOGIN REQUEST - Method: {request.method}")
-    print(f"🔐 LOGIN REQUEST - Headers: {dict(request.headers)}")
-    print(f"🔐 LOGIN REQUEST - Data: {request.data}")
-    print(f"🔐 LOGIN REQUEST - Content-Type: {request.content_type}")
-    
+    # Jamais le mot de passe dans le journal
+    events.debug(
+        'accounts.login.request', username=lambda: request.data.get('username'),
+        content_type=request.content_type, headers=lambda: request_headers(request)
+    )
+
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
-        print(f"✅ LOGIN SUCCESS - User: {user.username}, Role: {user.role}")
+        events.info('accounts.login.succeeded', user=user.username, role=user.role)
 
         # Générer les tokens JWT
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         access_token = refresh.access_token
 
         # Mettre à jour le statut de session et last_login
@@ -177,13 +174,7 @@ def login_view(request):
         user.save()
 
         # Enregistrer l'activité de connexion
-        UserActivity.objects.create(
-            user=user,
-            action='login',
-            description='Connexion réussie',
-            ip_address=request.META.get('REMOTE_ADDR'),
-            user_agent=request.META.get('HTTP_USER_AGENT')
-        )
+        log_activity(user, 'login', 'Connexion réussie', request)
 
         return Response({
             'message': 'Connexion réussie',
@@ -194,7 +185,10 @@ def login_view(request):
             }
         }, status=status.HTTP_200_OK)
     else:
-        print(f"❌ LOGIN FAILED - Serializer errors: {serializer.errors}")
+        events.info(
+            'accounts.login.failed', username=lambda: request.data.get('username'),
+            errors=serializer.errors
+        )
         return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
 
 
@@ -209,13 +203,7 @@ def logout_view(request):
     user.save()
 
     # Enregistrer l'activité de déconnexion
-    UserActivity.objects.create(
-        user=user,
-        action='logout',
-        description='Déconnexion',
-        ip_address=request.META.get('REMOTE_ADDR'),
-        user_agent=request.META.get('HTTP_USER_AGENT')
-    )
+    log_activity(user, 'logout', 'Déconnexion', request)
 
     return Response({'message': 'Déconnexion réussie'}, status=status.HTTP_200_OK)
 
@@ -231,26 +219,24 @@ def profile_view(request):
         return Response(serializer.data)
     
     elif request.method == 'PATCH':
-        print(f"🔍 Profile update request: {request.data}")
-        print(f"🔍 Files: {request.FILES}")
-        
+        events.debug(
+            'accounts.profile.update_request', user=request.user.username,
+            fields=lambda: sorted(request.data), files=lambda: sorted(request.FILES)
+        )
+
         serializer = UserProfileSerializer(request.user, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             user = serializer.save()
-            print(f"✅ Profile updated successfully. Avatar: {user.avatar}")
+            events.info('accounts.profile.updated', user=user.username, avatar=user.avatar)
             
             # Enregistrer l'activité
-            UserActivity.objects.create(
-                user=request.user,
-                action='update',
-                description='Mise à jour du profil'
-            )
+            log_activity(request.user, 'update', 'Mise à jour du profil')
             
             # Retourner les données avec le contexte pour les URLs complètes
             response_serializer = UserProfileSerializer(user, context={'request': request})
             return Response(response_serializer.data)
         else:
-            print(f"❌ Serializer errors: {serializer.errors}")
+            events.info('accounts.profile.invalid', user=request.user.username, errors=serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -277,11 +263,7 @@ def preferences_view(request):
         # Dans une implémentation complète, on sauvegarderait dans un modèle UserPreferences
         
         # Enregistrer l'activité
-        UserActivity.objects.create(
-            user=request.user,
-            action='update',
-            description='Mise à jour des préférences'
-        )
+        log_activity(request.user, 'update', 'Mise à jour des préférences')
         
         updated_preferences = {
             'language': language or 'fr',
@@ -304,13 +286,18 @@ def change_password_view(request):
         user.save()
 
         # Enregistrer l'activité
-        UserActivity.objects.create(
-            user=user,
-            action='update',
-            description='Changement de mot de passe'
-        )
+        log_activity(user, 'update', 'Changement de mot de passe', critical=True)
 
-        return Response({'message': 'Mot de passe changé avec succès'}, status=status.HTTP_200_OK)
+        # Le changement de mot de passe révoque les tokens existants
+        refresh = ClaimsRefreshToken.for_user(user)
+
+        return Response({
+            'message': 'Mot de passe changé avec succès',
+            'tokens': {
+                'access': str(refresh.access_token),
+                'refresh': str(refresh)
+            }
+        }, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -323,6 +310,8 @@ class UserActivityListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        # Activités encore en attente dans ce process : visibles tout de suite
+        activity_buffer.flush()
         # Les admins voient toutes les activités, les autres seulement les leurs
         if self.request.user.is_admin:
             return UserActivity.objects.all()
@@ -338,8 +327,7 @@ def check_permissions_view(request):
     """
     user = request.user
     # Créer un dictionnaire de permissions pour un accès rapide
-    user_permissions = user.get_permissions()
-    permissions_dict = {perm.code: True for perm in user_permissions}
+    permissions_dict = {code: True for code in user.get_permission_codes()}
 
     # Ajouter les permissions spécifiques pour les menus
     if user.can_manage_users():
@@ -433,11 +421,12 @@ def assign_permissions_view(request, user_id):
         )
         created_permissions.append(user_permission)
 
+    invalidate_user_permissions(user)
+
     # Enregistrer l'activité
-    UserActivity.objects.create(
-        user=request.user,
-        action='update',
-        description=f"Attribution de {len(created_permissions)} permissions à {user.username}"
+    log_activity(
+        request.user, 'update',
+        f"Attribution de {len(created_permissions)} permissions à {user.username}", critical=True
     )
 
     return Response({
@@ -477,6 +466,7 @@ def user_permissions_view(request, user_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@conditional_get(SERVERS_RESOURCE)
 def servers_list_view(request):
     """
     Vue pour récupérer la liste des serveurs (accessible aux utilisateurs authentifiés)
@@ -530,12 +520,10 @@ def reset_password_view(request, pk):
     user.save()
 
     # Enregistrer l'activité avec le mot de passe temporaire pour référence admin
-    UserActivity.objects.create(
-        user=request.user,
-        action='reset_password',
-        description=f'Mot de passe réinitialisé pour {user.get_full_name()} - Mot de passe temporaire: {temp_password}',
-        ip_address=request.META.get('REMOTE_ADDR'),
-        user_agent=request.META.get('HTTP_USER_AGENT', '')
+    log_activity(
+        request.user, 'reset_password',
+        f'Mot de passe réinitialisé pour {user.get_full_name()} - Mot de passe temporaire: {temp_password}',
+        request, critical=True
     )
 
     return Response({
@@ -652,6 +640,7 @@ def initialize_permissions_view(request):
                         is_active=True
                     )
                 
+                invalidate_user_permissions(user)
                 users_updated += 1
                 users_details.append({
                     'username': user.username,
@@ -659,6 +648,8 @@ def initialize_permissions_view(request):
                     'permissions_count': permissions.count()
                 })
 
+        invalidate_all_permissions()
+
         return Response({
             'success': True,
             'message': 'Permissions initialisées avec succès',
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date de modification'),
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['updated_at', 'id'], name='alert_updated_idx'),
+        ),
+    ]
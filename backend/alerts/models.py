@@ -85,6 +85,11 @@ class Alert(models.Model):
         blank=True,
         verbose_name='Date de résolution'
     )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Date de modification'
+    )
     
     # Champs optionnels pour lier à d'autres objets
     related_product = models.ForeignKey(
@@ -107,6 +112,10 @@ class Alert(models.Model):
         verbose_name = 'Alerte'
         verbose_name_plural = 'Alertes'
         ordering = ['-created_at']
+        indexes = [
+            # Synchronisation incrémentale (api/sync/)
+            models.Index(fields=['updated_at', 'id'], name='alert_updated_idx'),
+        ]
         
     def __str__(self):
         return f"{self.get_priority_display()} - {self.title}"
@@ -2,10 +2,16 @@ from django.shortcuts import render
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import permissions
+from django.db import OperationalError
 from django.db.models import Sum, Count
 from django.utils import timezone
 from datetime import timedelta
+from barstock_api.db_router import use_reports_database
+from barstock_api.events import get_event_logger
 
+events = get_event_logger(__name__)
+
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Temporairement public pour tests
 def sales_chart(request):
@@ -47,6 +53,9 @@ def sales_chart(request):
             'sales_data': [],
             'message': 'Module sales non disponible'
         })
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
         return Response({
             'error': str(e),
@@ -54,6 +63,7 @@ def sales_chart(request):
         }, status=500)
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Temporairement public pour tests
 def analytics_data(request):
@@ -79,8 +89,6 @@ def analytics_data(request):
         else:
             start_date = today - timedelta(days=30)
         
-        print(f"📊 ANALYTICS DEBUG - Période: {period}, Date début: {start_date}")
-        
         # Statistiques générales
         total_sales = Sale.objects.filter(
             created_at__date__gte=start_date,
@@ -124,11 +132,10 @@ def analytics_data(request):
         # Inverser pour avoir l'ordre chronologique
         daily_sales.reverse()
         
-        print(f"📊 Statistiques calculées:")
-        print(f"  - Total ventes: {total_sales}")
-        print(f"  - Revenus totaux: {total_revenue}")
-        print(f"  - Top produits: {len(top_products)}")
-        print(f"  - Données quotidiennes: {len(daily_sales)}")
+        events.debug(
+            'analytics.sales.stats', period=period, start_date=start_date, total_sales=total_sales,
+            total_revenue=total_revenue, daily_sales=len(daily_sales)
+        )
         
         return Response({
             'period': period,
@@ -143,8 +150,11 @@ def analytics_data(request):
             'message': 'Données analytics récupérées avec succès'
         })
         
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
-        print(f"❌ Erreur analytics: {e}")
+        events.exception('analytics.sales.failed', period=request.GET.get('period'))
         return Response({
             'error': str(e),
             'message': 'Erreur lors de la récupération des données analytics'
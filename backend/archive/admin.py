@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from .models import ArchivedRecord, ArchiveRun, OpeningBalance
+
+
+@admin.register(ArchiveRun)
+class ArchiveRunAdmin(admin.ModelAdmin):
+    list_display = ['cutoff', 'started_at', 'finished_at', 'created_by']
+    readonly_fields = ['cutoff', 'counts', 'created_by', 'started_at', 'finished_at']
+
+
+@admin.register(ArchivedRecord)
+class ArchivedRecordAdmin(admin.ModelAdmin):
+    list_display = ['source', 'record_id', 'occurred_at', 'run']
+    list_filter = ['source']
+    search_fields = ['=record_id']
+    readonly_fields = ['source', 'record_id', 'occurred_at', 'data', 'run']
+
+
+@admin.register(OpeningBalance)
+class OpeningBalanceAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'cutoff', 'quantity', 'amount']
+    list_filter = ['kind', 'cutoff']
+    readonly_fields = ['run', 'kind', 'object_id', 'cutoff', 'quantity', 'amount']
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.services import ARCHIVE_AFTER_MONTHS, archive_closed_periods, default_cutoff
+
+
+class Command(BaseCommand):
+    help = "Archive les ventes closes et les mouvements antérieurs à la bascule (mois entiers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=ARCHIVE_AFTER_MONTHS,
+            help=f"Mois gardés dans les tables chaudes (défaut : {ARCHIVE_AFTER_MONTHS})"
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Affiche la date de bascule sans rien archiver"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = default_cutoff(options['months'])
+        self.stdout.write(f"Bascule : {cutoff:%d/%m/%Y %H:%M}")
+        if options['dry_run']:
+            return
+
+        try:
+            run = archive_closed_periods(cutoff)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for source, count in sorted(run.counts.items()):
+            self.stdout.write(f"  {source}: {count}")
+        self.stdout.write(self.style.SUCCESS('Archivage terminé'))
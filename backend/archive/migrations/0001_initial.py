@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:58
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoff', models.DateTimeField(verbose_name='Date de bascule')),
+                ('counts', models.JSONField(default=dict, verbose_name='Lignes archivées par table')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Début')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Lancé par')),
+            ],
+            options={
+                'verbose_name': "Passage d'archivage",
+                'verbose_name_plural': "Passages d'archivage",
+                'ordering': ['-cutoff'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpeningBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('product', 'Stock produit'), ('ingredient', 'Stock ingrédient'), ('credit_account', 'Compte crédit')], max_length=20, verbose_name='Type')),
+                ('object_id', models.BigIntegerField(verbose_name='Produit, ingrédient ou compte')),
+                ('cutoff', models.DateTimeField(verbose_name='Date de bascule')),
+                ('quantity', models.DecimalField(decimal_places=3, default=0, max_digits=14, verbose_name='Quantité en stock')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant (valeur ou solde, BIF)')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_balances', to='archive.archiverun', verbose_name='Passage')),
+            ],
+            options={
+                'verbose_name': "Solde d'ouverture",
+                'verbose_name_plural': "Soldes d'ouverture",
+                'ordering': ['-cutoff'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, verbose_name='Table source')),
+                ('record_id', models.BigIntegerField(verbose_name="Identifiant d'origine")),
+                ('occurred_at', models.DateTimeField(verbose_name='Date de la ligne')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Données')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='records', to='archive.archiverun', verbose_name='Passage')),
+            ],
+            options={
+                'verbose_name': 'Ligne archivée',
+                'verbose_name_plural': 'Lignes archivées',
+                'ordering': ['-occurred_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='openingbalance',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id', 'cutoff'), name='opening_balance_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrecord',
+            index=models.Index(fields=['source', 'occurred_at'], name='archived_source_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='archivedrecord',
+            constraint=models.UniqueConstraint(fields=('source', 'record_id'), name='archived_record_unique'),
+        ),
+    ]
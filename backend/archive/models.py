@@ -0,0 +1,153 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ArchiveRun(models.Model):
+    """
+    Passage d'archivage : tout ce qui est antérieur à `cutoff` (périodes
+    closes) a quitté les tables chaudes (voir archive/services.py)
+    """
+
+    cutoff = models.DateTimeField(
+        verbose_name='Date de bascule'
+    )
+
+    counts = models.JSONField(
+        default=dict,
+        verbose_name='Lignes archivées par table'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Lancé par'
+    )
+
+    started_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Début'
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fin'
+    )
+
+    class Meta:
+        verbose_name = "Passage d'archivage"
+        verbose_name_plural = "Passages d'archivage"
+        ordering = ['-cutoff']
+
+    def __str__(self):
+        return f"Archivage avant le {self.cutoff:%d/%m/%Y}"
+
+
+class ArchivedRecord(models.Model):
+    """
+    Ligne froide : copie d'une ligne supprimée d'une table chaude, colonnes
+    en JSON (clés étrangères par leur `<champ>_id`)
+    """
+
+    source = models.CharField(
+        max_length=50,
+        verbose_name='Table source'
+    )
+
+    record_id = models.BigIntegerField(
+        verbose_name='Identifiant d\'origine'
+    )
+
+    occurred_at = models.DateTimeField(
+        verbose_name='Date de la ligne'
+    )
+
+    data = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name='Données'
+    )
+
+    run = models.ForeignKey(
+        ArchiveRun,
+        on_delete=models.PROTECT,
+        related_name='records',
+        verbose_name='Passage'
+    )
+
+    class Meta:
+        verbose_name = 'Ligne archivée'
+        verbose_name_plural = 'Lignes archivées'
+        ordering = ['-occurred_at']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'record_id'], name='archived_record_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'occurred_at'], name='archived_source_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.record_id}"
+
+
+class OpeningBalance(models.Model):
+    """
+    Solde d'ouverture à la bascule : stock d'un produit ou d'un ingrédient,
+    solde d'un compte crédit. Avec les lignes chaudes postérieures, il
+    remplace l'historique archivé dans les calculs.
+    """
+
+    KIND_CHOICES = [
+        ('product', 'Stock produit'),
+        ('ingredient', 'Stock ingrédient'),
+        ('credit_account', 'Compte crédit'),
+    ]
+
+    run = models.ForeignKey(
+        ArchiveRun,
+        on_delete=models.CASCADE,
+        related_name='opening_balances',
+        verbose_name='Passage'
+    )
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        verbose_name='Type'
+    )
+
+    object_id = models.BigIntegerField(
+        verbose_name='Produit, ingrédient ou compte'
+    )
+
+    cutoff = models.DateTimeField(
+        verbose_name='Date de bascule'
+    )
+
+    quantity = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        default=0,
+        verbose_name='Quantité en stock'
+    )
+
+    amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name='Montant (valeur ou solde, BIF)'
+    )
+
+    class Meta:
+        verbose_name = "Solde d'ouverture"
+        verbose_name_plural = "Soldes d'ouverture"
+        ordering = ['-cutoff']
+        constraints = [
+            # Sert aussi d'index pour opening_balance()
+            models.UniqueConstraint(fields=['kind', 'object_id', 'cutoff'], name='opening_balance_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} au {self.cutoff:%d/%m/%Y}"
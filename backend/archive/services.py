@@ -0,0 +1,415 @@
+"""
+Archivage chaud / froid des périodes closes
+
+Les ventes closes (payées ou annulées), mouvements de stock, mouvements
+d'ingrédients et transactions crédit antérieurs à la bascule (par défaut
+le début du mois commercial d'il y a ARCHIVE_AFTER_MONTHS mois) quittent
+leurs tables pour ArchivedRecord, une table froide unique (colonnes en
+JSON, indexée par table source et date). Une vente emporte ses lignes, son
+ticket cuisine et ses alertes ; une vente encore liée à une transaction
+crédit non archivée reste en place.
+
+À la bascule, un solde d'ouverture est écrit pour chaque produit, chaque
+ingrédient (stock) et chaque compte crédit (solde). Les calculs partent de
+ce solde et des seules lignes chaudes. Les lectures historiques qui
+remontent avant la bascule ajoutent les lignes archivées : `with_archive()`
+pour une période, `HotThenArchived` pour une liste paginée. Les rapports
+encore agrégés en SQL sur les seules tables chaudes répondent une erreur
+explicite pour une telle période (`archived_period_response()`) plutôt que
+des totaux à zéro.
+
+Les tables chaudes ne gardent ainsi qu'environ ARCHIVE_AFTER_MONTHS mois :
+leurs index et le temps de VACUUM restent bornés.
+
+Les lignes sont déplacées par lots de BATCH_SIZE, un lot par transaction,
+sans signaux (suppression directe : les dépendances sont archivées
+explicitement).
+"""
+
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from barstock_api.business_day import business_day_bounds, current_business_day
+
+from .models import ArchivedRecord, ArchiveRun, OpeningBalance
+
+ARCHIVE_AFTER_MONTHS = getattr(settings, 'ARCHIVE_AFTER_MONTHS', 13)
+BATCH_SIZE = 500
+
+CLOSED_SALE_STATUSES = ('paid', 'cancelled')
+
+
+def default_cutoff(months=None, today=None):
+    """Début du mois commercial d'il y a `months` mois : seuls des mois entiers sont archivés"""
+    months = ARCHIVE_AFTER_MONTHS if months is None else months
+    today = today or current_business_day()
+    index = today.year * 12 + today.month - 1 - months
+    start, _end = business_day_bounds(date(index // 12, index % 12 + 1, 1))
+    return start
+
+
+def latest_cutoff():
+    """Date de la dernière bascule, None si rien n'est archivé"""
+    return ArchiveRun.objects.filter(finished_at__isnull=False).values_list('cutoff', flat=True).first()
+
+
+# ---------------------------------------------------------------------------
+# Copie et suppression
+# ---------------------------------------------------------------------------
+
+def _archive(run, model, queryset, date_path='created_at'):
+    """Copie les lignes de `queryset` dans la table froide puis les supprime"""
+    fields = [field.attname for field in model._meta.concrete_fields]
+    rows = list(queryset.order_by().values(*fields, archived_at=F(date_path)))
+    if not rows:
+        return 0
+
+    source = model._meta.label_lower
+    records = []
+    for row in rows:
+        occurred_at = row.pop('archived_at')
+        records.append(ArchivedRecord(
+            source=source, record_id=row['id'], occurred_at=occurred_at, data=row, run=run
+        ))
+    ArchivedRecord.objects.bulk_create(records, batch_size=BATCH_SIZE)
+
+    # Suppression directe : ni signaux ni collecte des cascades, déjà traitées
+    model.objects.filter(pk__in=[row['id'] for row in rows])._raw_delete(queryset.db)
+    return len(rows)
+
+
+def _count(counts, model, number):
+    if number:
+        label = model._meta.label_lower
+        counts[label] = counts.get(label, 0) + number
+
+
+def _archive_in_batches(run, counts, model, queryset, date_path='created_at'):
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        with transaction.atomic():
+            _count(counts, model, _archive(run, model, model.objects.filter(pk__in=ids), date_path))
+
+
+def _archive_sales(run, counts, cutoff):
+    from alerts.models import Alert
+    from orders.models import Order, OrderItem
+    from sales.models import Sale, SaleItem
+    from sync.models import OfflineSale
+
+    sales = Sale.objects.filter(created_at__lt=cutoff, status__in=CLOSED_SALE_STATUSES).exclude(
+        credit_transactions__transaction_date__gte=cutoff
+    )
+    while True:
+        ids = list(sales.order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        with transaction.atomic():
+            orders = Order.objects.filter(sale_id__in=ids)
+            _count(counts, OrderItem, _archive(
+                run, OrderItem, OrderItem.objects.filter(order__in=orders), 'order__created_at'
+            ))
+            _count(counts, Order, _archive(run, Order, orders))
+            _count(counts, Alert, _archive(run, Alert, Alert.objects.filter(related_sale_id__in=ids)))
+            _count(counts, SaleItem, _archive(run, SaleItem, SaleItem.objects.filter(sale_id__in=ids)))
+            # La clé d'idempotence reste connue (SET_NULL, comme une suppression)
+            OfflineSale.objects.filter(sale_id__in=ids).update(sale=None)
+            _count(counts, Sale, _archive(run, Sale, Sale.objects.filter(pk__in=ids)))
+
+
+# ---------------------------------------------------------------------------
+# Soldes d'ouverture
+# ---------------------------------------------------------------------------
+
+def _previous_balances(kind):
+    """Soldes de la bascule précédente, reportés s'il n'y a rien de nouveau"""
+    previous = latest_cutoff()
+    if previous is None:
+        return {}
+    return {
+        object_id: (quantity, amount)
+        for object_id, quantity, amount in OpeningBalance.objects.filter(
+            kind=kind, cutoff=previous
+        ).values_list('object_id', 'quantity', 'amount')
+    }
+
+
+def _last_stock_before(owner_model, movement_model, owner_field, cutoff):
+    """{id: stock après le dernier mouvement antérieur à la bascule} (une requête)"""
+    last = movement_model.objects.filter(
+        **{owner_field: OuterRef('pk')}, created_at__lt=cutoff
+    ).order_by('-created_at', '-pk').values('stock_after')[:1]
+    return dict(
+        owner_model.objects.annotate(opening=Subquery(last)).filter(
+            opening__isnull=False
+        ).values_list('pk', 'opening')
+    )
+
+
+def snapshot_opening_balances(run):
+    """Écrit les soldes d'ouverture de tous les produits, ingrédients et comptes à `run.cutoff`"""
+    from credits.models import CreditAccount, CreditTransaction
+    from inventory.models import StockMovement
+    from kitchen.models import Ingredient, IngredientMovement
+    from products.models import Product
+
+    cutoff = run.cutoff
+    balances = []
+
+    def add(kind, values):
+        balances.extend(
+            OpeningBalance(run=run, kind=kind, object_id=object_id, cutoff=cutoff,
+                           quantity=quantity, amount=amount)
+            for object_id, (quantity, amount) in values.items()
+        )
+
+    # Stocks : dernier niveau connu avant la bascule, valorisé au coût moyen
+    for kind, owner, movement, owner_field in (
+        ('product', Product, StockMovement, 'product'),
+        ('ingredient', Ingredient, IngredientMovement, 'ingredient'),
+    ):
+        values = _previous_balances(kind)
+        stocks = _last_stock_before(owner, movement, owner_field, cutoff)
+        costs = {obj.pk: obj.unit_cost for obj in owner.objects.filter(pk__in=stocks)}
+        for pk, quantity in stocks.items():
+            values[pk] = (Decimal(quantity), (Decimal(quantity) * costs[pk]).quantize(Decimal('0.01')))
+        add(kind, values)
+
+    # Comptes crédit : solde reporté + transactions antérieures à la bascule
+    values = _previous_balances('credit_account')
+    signed = Case(
+        When(transaction_type='payment', then=-F('amount')),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+    movements = CreditTransaction.objects.filter(transaction_date__lt=cutoff).values(
+        'credit_account_id'
+    ).annotate(total=Sum(signed)).values_list('credit_account_id', 'total')
+    for account_id, total in movements:
+        _quantity, amount = values.get(account_id, (Decimal('0'), Decimal('0')))
+        values[account_id] = (Decimal('0'), amount + total)
+    existing = set(CreditAccount.objects.filter(pk__in=values).values_list('pk', flat=True))
+    add('credit_account', {pk: value for pk, value in values.items() if pk in existing})
+
+    OpeningBalance.objects.bulk_create(balances, batch_size=BATCH_SIZE)
+    return len(balances)
+
+
+# ---------------------------------------------------------------------------
+# Passage d'archivage
+# ---------------------------------------------------------------------------
+
+def archive_closed_periods(cutoff=None, user=None):
+    """
+    Archive tout ce qui est clos avant `cutoff` (défaut : default_cutoff()).
+    Retourne le passage, avec le nombre de lignes déplacées par table.
+    """
+    from credits.models import CreditTransaction
+    from inventory.models import StockMovement
+    from kitchen.models import IngredientMovement
+
+    cutoff = cutoff or default_cutoff()
+    previous = latest_cutoff()
+    if previous is not None and cutoff <= previous:
+        raise ValueError(f"Déjà archivé jusqu'au {previous:%d/%m/%Y}")
+
+    # Passage interrompu à la même date : on reprend, ses soldes sont déjà écrits
+    run = ArchiveRun.objects.filter(cutoff=cutoff, finished_at__isnull=True).first()
+    if run is None:
+        # Soldes d'abord : ils se calculent sur les lignes encore chaudes
+        with transaction.atomic():
+            run = ArchiveRun.objects.create(cutoff=cutoff, created_by=user)
+            run.counts = {'opening_balances': snapshot_opening_balances(run)}
+    counts = dict(run.counts)
+
+    _archive_in_batches(
+        run, counts, CreditTransaction,
+        CreditTransaction.objects.filter(transaction_date__lt=cutoff), 'transaction_date'
+    )
+    _archive_sales(run, counts, cutoff)
+    _archive_in_batches(run, counts, StockMovement, StockMovement.objects.filter(created_at__lt=cutoff))
+    _archive_in_batches(
+        run, counts, IngredientMovement, IngredientMovement.objects.filter(created_at__lt=cutoff)
+    )
+
+    run.counts = counts
+    run.finished_at = timezone.now()
+    run.save(update_fields=['counts', 'finished_at'])
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Lecture
+# ---------------------------------------------------------------------------
+
+def opening_balance(kind, object_id, at=None):
+    """Dernier solde d'ouverture de l'objet (à la date `at` si fournie), ou None"""
+    balances = OpeningBalance.objects.filter(kind=kind, object_id=object_id)
+    if at is not None:
+        balances = balances.filter(cutoff__lte=at)
+    return balances.order_by('-cutoff').first()
+
+
+def reaches_archive(start):
+    """Vrai si une période commençant à `start` (None : sans borne) remonte avant la dernière bascule"""
+    cutoff = latest_cutoff()
+    return cutoff is not None and (start is None or start < cutoff)
+
+
+def _on_data(condition):
+    """Q exprimé sur les colonnes du modèle -> même Q sur les colonnes JSON archivées"""
+    children = [
+        _on_data(child) if isinstance(child, Q) else (f'data__{child[0]}', child[1])
+        for child in condition.children
+    ]
+    return Q(*children, _connector=condition.connector, _negated=condition.negated)
+
+
+def archived_records(model, start=None, end=None, *conditions, **filters):
+    """
+    Enregistrements archivés de `model`, les plus récents d'abord.
+    `conditions` (Q) et `filters` portent sur les colonnes du modèle
+    (ex: product_id=3, status__in=[...]).
+    """
+    records = ArchivedRecord.objects.filter(source=model._meta.label_lower)
+    if start is not None:
+        records = records.filter(occurred_at__gte=start)
+    if end is not None:
+        records = records.filter(occurred_at__lt=end)
+    for condition in conditions:
+        records = records.filter(_on_data(condition))
+    if filters:
+        records = records.filter(_on_data(Q(**filters)))
+    return records.order_by('-occurred_at', '-record_id')
+
+
+def _instance(model, data):
+    values = {
+        field.attname: field.to_python(data[field.attname])
+        for field in model._meta.concrete_fields if field.attname in data
+    }
+    instance = model(**values)
+    instance._state.adding = False
+    instance.is_archived = True
+    return instance
+
+
+def archived(model, start=None, end=None, *conditions, **filters):
+    """
+    Lignes archivées de `model` (instances non modifiables, `is_archived`),
+    les plus récentes d'abord. Filtres comme archived_records().
+    """
+    records = archived_records(model, start, end, *conditions, **filters)
+    return [_instance(model, data) for data in records.values_list('data', flat=True)]
+
+
+def with_archive(queryset, date_field, start=None, end=None, *conditions, **filters):
+    """
+    Lignes chaudes de `queryset` et lignes archivées du même modèle entre
+    `start` et `end`, triées de la plus récente à la plus ancienne. La table
+    froide n'est lue que si la période commence avant la dernière bascule.
+    """
+    hot = queryset.filter(*conditions, **filters)
+    if start is not None:
+        hot = hot.filter(**{f'{date_field}__gte': start})
+    if end is not None:
+        hot = hot.filter(**{f'{date_field}__lt': end})
+    rows = list(hot)
+
+    if reaches_archive(start):
+        rows += archived(queryset.model, start, end, *conditions, **filters)
+        rows.sort(key=lambda row: getattr(row, date_field), reverse=True)
+    return rows
+
+
+class HotThenArchived(Sequence):
+    """
+    Lignes chaudes (queryset déjà filtré et trié) suivies des enregistrements
+    archivés, pour la pagination : une page ne lit que ses propres lignes.
+    Les archives étant antérieures à la bascule, l'ordre « plus récent
+    d'abord » est respecté, sauf pour les rares lignes anciennes restées
+    chaudes (ventes ouvertes) qui précèdent les archives.
+    """
+
+    def __init__(self, queryset, records):
+        self.queryset = queryset
+        self.records = records
+        self._hot_count = None
+
+    def _hot(self):
+        if self._hot_count is None:
+            self._hot_count = self.queryset.count()
+        return self._hot_count
+
+    def __len__(self):
+        return self._hot() + self.records.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _step = index.indices(len(self))
+        hot = self._hot()
+        rows = list(self.queryset[start:stop]) if start < hot else []
+        if stop > hot:
+            model = self.queryset.model
+            rows += [
+                _instance(model, data)
+                for data in self.records[max(start - hot, 0):stop - hot].values_list('data', flat=True)
+            ]
+        return rows
+
+
+def attach_archived_children(instances, model, fk_attname, related_name):
+    """
+    Rattache aux instances archivées leurs lignes archivées de `model` :
+    `instance.<related_name>.all()` les renvoie sans lire la table chaude.
+    """
+    parents = {instance.pk: instance for instance in instances if getattr(instance, 'is_archived', False)}
+    if not parents:
+        return []
+    children = archived(model, **{f'{fk_attname}__in': list(parents)})
+    by_parent = defaultdict(list)
+    for child in sorted(children, key=lambda child: child.pk):
+        by_parent[getattr(child, fk_attname)].append(child)
+    for pk, parent in parents.items():
+        # Comme prefetch_related : queryset dont le résultat est déjà chargé
+        rows = model.objects.all()
+        rows._result_cache = by_parent[pk]
+        rows._prefetch_done = True
+        parent._prefetched_objects_cache = {related_name: rows}
+    return children
+
+
+def archived_period_response(start):
+    """
+    Réponse 400 si la période commençant à `start` (date commerciale ou
+    datetime) remonte avant la dernière bascule, sinon None.
+    """
+    cutoff = latest_cutoff()
+    if cutoff is None:
+        return None
+    if not isinstance(start, datetime):
+        start, _end = business_day_bounds(start)
+    if start >= cutoff:
+        return None
+    archived_until = timezone.localtime(cutoff).date()
+    return Response({
+        'error': f"Période archivée : les données antérieures au {archived_until:%d/%m/%Y} "
+                 f"ne sont plus dans les rapports.",
+        'code': 'period_archived',
+        'archived_until': archived_until,
+    }, status=status.HTTP_400_BAD_REQUEST)
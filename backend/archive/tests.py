@@ -0,0 +1,113 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from credits.models import CreditAccount, CreditTransaction
+from inventory.models import StockMovement
+from products.models import Category, Product
+from sales.models import Sale, SaleItem
+
+from .models import ArchivedRecord, OpeningBalance
+from .services import archive_closed_periods, with_archive
+
+User = get_user_model()
+
+
+class ArchiveClosedPeriodsTest(TestCase):
+    """Tests de l'archivage des périodes closes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gerant', password='x', role='manager')
+        category = Category.objects.create(name='Boissons', type='boissons')
+        self.product = Product.objects.create(
+            name='Primus', category=category, purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'), current_stock=40
+        )
+        self.cutoff = timezone.now() - timedelta(days=30)
+        old = self.cutoff - timedelta(days=10)
+
+        self.old_sale = Sale.objects.create(server=self.user, created_by=self.user, status='paid')
+        SaleItem.objects.create(sale=self.old_sale, product=self.product, quantity=2, unit_price=Decimal('2500.00'))
+        self.open_sale = Sale.objects.create(server=self.user, created_by=self.user, status='pending')
+        Sale.objects.filter(pk__in=[self.old_sale.pk, self.open_sale.pk]).update(created_at=old)
+
+        for stock_before, stock_after, created_at in ((50, 48, old), (48, 40, timezone.now())):
+            movement = StockMovement.objects.create(
+                product=self.product, movement_type='out', reason='sale', quantity=stock_before - stock_after,
+                stock_before=stock_before, stock_after=stock_after, user=self.user
+            )
+            StockMovement.objects.filter(pk=movement.pk).update(created_at=created_at)
+
+        self.account = CreditAccount.objects.create(customer_name='Jean', credit_limit=Decimal('100000'))
+        for transaction_type, amount in (('debt', '30000'), ('payment', '10000')):
+            CreditTransaction.objects.create(
+                credit_account=self.account, transaction_type=transaction_type, amount=Decimal(amount)
+            )
+        CreditTransaction.objects.update(transaction_date=old)
+
+    def test_closed_rows_move_to_archive_with_opening_balances(self):
+        run = archive_closed_periods(self.cutoff, user=self.user)
+
+        # Vente close archivée avec ses lignes ; vente ouverte gardée
+        self.assertEqual(list(Sale.objects.values_list('pk', flat=True)), [self.open_sale.pk])
+        self.assertFalse(SaleItem.objects.exists())
+        self.assertEqual(run.counts['sales.sale'], 1)
+        self.assertEqual(run.counts['sales.saleitem'], 1)
+        self.assertEqual(run.counts['credits.credittransaction'], 2)
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+        product_balance = OpeningBalance.objects.get(kind='product', object_id=self.product.pk)
+        self.assertEqual(product_balance.quantity, 48)
+        account_balance = OpeningBalance.objects.get(kind='credit_account', object_id=self.account.pk)
+        self.assertEqual(account_balance.amount, Decimal('20000.00'))
+
+        # Historique à la demande : lignes chaudes + archivées
+        movements = with_archive(StockMovement.objects.all(), 'created_at', product_id=self.product.pk)
+        self.assertEqual([m.stock_after for m in movements], [40, 48])
+        self.assertTrue(movements[1].is_archived)
+        self.assertEqual(movements[1].quantity, 2)
+
+        with self.assertRaises(ValueError):
+            archive_closed_periods(self.cutoff)
+        self.assertEqual(ArchivedRecord.objects.filter(source='sales.sale').count(), 1)
+
+    def test_archived_periods_are_read_from_archive_or_refused(self):
+        old_total = Sale.objects.get(pk=self.old_sale.pk).total_amount
+        archive_closed_periods(self.cutoff, user=self.user)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        old_day = f'{timezone.localtime(self.cutoff - timedelta(days=10)).date():%Y-%m-%d}'
+
+        # Liste des ventes : ventes chaudes puis archivées, avec leurs lignes
+        for params in ({}, {'date_from': old_day}, {'ordering': 'created_at'}, {'search': 'gerant'}):
+            response = client.get('/api/sales/', params)
+            results = response.json()['results']
+            self.assertEqual(response.json()['count'], 2, params)
+            self.assertEqual({sale['id'] for sale in results}, {self.open_sale.pk, self.old_sale.pk})
+        archived_sale = next(sale for sale in results if sale['id'] == self.old_sale.pk)
+        self.assertEqual([item['product_name'] for item in archived_sale['items']], ['Primus'])
+        self.assertEqual(archived_sale['items_count'], 1)
+        self.assertEqual(client.get('/api/sales/', {'status': 'pending'}).json()['count'], 1)
+
+        # Rapport quotidien : ventes archivées comprises
+        stats = client.get('/api/sales/daily-report/', {'date': old_day}).json()['stats']
+        self.assertEqual((stats['total_sales'], stats['paid_sales'], stats['pending_sales']), (2, 1, 1))
+        self.assertEqual(Decimal(str(stats['total_revenue'])), old_total)
+
+        # Rapport crédits : transactions archivées comprises
+        summary = client.get('/api/reports/credits/', {'start_date': old_day, 'end_date': old_day}).json()['summary']
+        self.assertEqual(summary['transactions']['total_count'], 2)
+        self.assertEqual([row['transaction_type'] for row in summary['transactions']['by_type']], ['debt', 'payment'])
+
+        # Rapport détaillé, encore agrégé en SQL : erreur explicite plutôt que des totaux à zéro
+        response = client.get(f'/api/reports/daily-detailed/{old_day}/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['code'], 'period_archived')
+
+        # Historique du compte crédit : transactions archivées comprises
+        response = client.get(f'/api/credits/accounts/{self.account.pk}/')
+        self.assertEqual(sorted(t['transaction_type'] for t in response.json()['transactions']), ['debt', 'payment'])
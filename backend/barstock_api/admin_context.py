@@ -16,6 +16,10 @@ from accounts.models import User
 from products.models import Product
 from sales.models import Sale
 
+from .events import get_event_logger
+
+events = get_event_logger(__name__)
+
 
 class BarStockWiseAdminSite(AdminSite):
     """Site d'administration personnalisé pour BarStockWise"""
@@ -52,14 +56,14 @@ class BarStockWiseAdminSite(AdminSite):
                 'sales_today': sales_today,
             }
             
-        except Exception as e:
+        except Exception:
             # En cas d'erreur, utiliser des valeurs par défaut
             stats = {
                 'users_count': 0,
                 'products_count': 0,
                 'sales_today': 0,
             }
-            print(f"Erreur lors du calcul des statistiques admin: {e}")
+            events.exception('admin.index.stats_failed')
         
         extra_context['stats'] = stats
         
@@ -103,8 +107,8 @@ class BarStockWiseAdminSite(AdminSite):
                 'top_products': top_products,
             })
             
-        except Exception as e:
-            print(f"Erreur dashboard admin: {e}")
+        except Exception:
+            events.exception('admin.dashboard.failed')
         
         return TemplateResponse(request, 'admin/dashboard.html', context)
 
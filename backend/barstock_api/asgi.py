@@ -7,6 +7,7 @@ from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
+import orders.routing
 import reports.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'barstock_api.settings')
@@ -17,6 +18,7 @@ application = ProtocolTypeRouter({
         AuthMiddlewareStack(
             URLRouter(
                 reports.routing.websocket_urlpatterns
+                + orders.routing.websocket_urlpatterns
             )
         )
     ),
@@ -0,0 +1,223 @@
+"""
+Endpoint groupé : plusieurs appels API en un seul aller-retour
+
+    POST /api/batch/
+    {
+        "atomic": true,
+        "operations": [
+            {"id": "sale", "method": "POST", "path": "/api/sales/",
+             "body": {"payment_method": "cash", "table": 4, "items": [...]}},
+            {"method": "POST", "path": "/api/sales/tables/4/occupy/"},
+            {"method": "GET", "path": "/api/sales/${sale.id}/invoice/"}
+        ]
+    }
+
+Chaque opération est exécutée dans le process par la vue DRF de son chemin,
+avec l'utilisateur déjà authentifié par la requête groupée (pas de nouveau
+décodage JWT, pas de middleware).
+
+Références : `${<id>.<champ>.<sous-champ>}` est remplacé par la valeur lue
+dans la réponse d'une opération précédente. Une chaîne qui n'est qu'une
+référence garde le type de la valeur (entier, liste...).
+
+Mode `atomic` : tout s'exécute dans une transaction ; à la première
+opération en erreur (statut >= 400) tout est annulé et les opérations
+suivantes ne sont pas exécutées. Sinon chaque opération est indépendante ;
+une opération dont une référence ne peut être résolue reçoit un 424.
+Une exception sortie de la vue d'une opération lui donne un 500 (404 pour
+Http404), comme toute autre opération en erreur.
+"""
+
+import json
+import re
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
+
+BATCH_PATH = '/api/batch/'
+MAX_OPERATIONS = 20
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+_REFERENCE = re.compile(r'\$\{([A-Za-z0-9_-]+)((?:\.[A-Za-z0-9_-]+)*)\}')
+
+# En-têtes de la requête groupée à ne pas transmettre aux opérations
+_SKIPPED_META = ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_CONTENT_TYPE', 'HTTP_CONTENT_LENGTH')
+
+
+class UnresolvedReference(Exception):
+    """Référence vers une opération absente, en erreur ou un champ inconnu"""
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _lookup(results, op_id, dotted):
+    result = results.get(op_id)
+    if result is None or result['status'] >= 400:
+        raise UnresolvedReference(f'${{{op_id}{dotted}}}')
+    value = result['body']
+    for part in filter(None, dotted.split('.')):
+        try:
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise UnresolvedReference(f'${{{op_id}{dotted}}}')
+    return value
+
+
+def resolve_references(value, results):
+    """Remplace les `${id.champ}` par les valeurs des réponses précédentes"""
+    if isinstance(value, dict):
+        return {key: resolve_references(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_references(item, results) for item in value]
+    if not isinstance(value, str) or '${' not in value:
+        return value
+
+    whole = _REFERENCE.fullmatch(value)
+    if whole:
+        return _lookup(results, whole.group(1), whole.group(2))
+    return _REFERENCE.sub(lambda m: str(_lookup(results, m.group(1), m.group(2))), value)
+
+
+def _build_request(request, method, path, body):
+    """Requête Django équivalente à un appel HTTP de l'opération"""
+    path, _sep, query_string = path.partition('?')
+    content = json.dumps(body).encode() if body is not None else b''
+
+    environ = {
+        key: value for key, value in request.META.items()
+        if key not in _SKIPPED_META
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+    })
+
+    sub_request = WSGIRequest(environ)
+    # DRF réutilise l'utilisateur de la requête groupée (ForcedAuthentication)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    sub_request._dont_enforce_csrf_checks = True
+    sub_request.user = request.user
+    return sub_request, path
+
+
+def _response_body(response):
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    if getattr(response, 'streaming', False):
+        return None
+
+    content_type = response.get('Content-Type', '')
+    if not response.content:
+        return None
+    if 'json' in content_type:
+        return json.loads(response.content)
+    if content_type.startswith('text/'):
+        return response.content.decode(response.charset or 'utf-8', 'replace')
+    # Contenu binaire (PDF, Excel...) : à télécharger par un appel direct
+    return None
+
+
+def execute_operation(request, operation, results):
+    """Exécute une opération et retourne {'status', 'body', 'headers'}"""
+    method = str(operation.get('method', 'GET')).upper()
+    if method not in ALLOWED_METHODS:
+        return {'status': status.HTTP_405_METHOD_NOT_ALLOWED, 'body': {'error': f'Méthode non supportée: {method}'}}
+
+    try:
+        path = resolve_references(operation.get('path', ''), results)
+        body = resolve_references(operation.get('body'), results)
+    except UnresolvedReference as e:
+        return {'status': status.HTTP_424_FAILED_DEPENDENCY, 'body': {'error': f'Référence non résolue: {e}'}}
+
+    if not isinstance(path, str) or not path.startswith('/api/') or path.startswith(BATCH_PATH):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': f'Chemin non autorisé: {path}'}}
+
+    sub_request, path_info = _build_request(request, method, path, body)
+    try:
+        match = resolve(path_info)
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'error': f'Chemin inconnu: {path_info}'}}
+
+    # Point de sauvegarde : une opération en erreur ne casse pas la transaction
+    try:
+        with transaction.atomic():
+            response = match.func(sub_request, *match.args, **match.kwargs)
+    except Http404 as e:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'error': str(e) or 'Introuvable'}}
+    except Exception as e:
+        events.exception('batch.operation.failed', method=method, path=path_info)
+        return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'error': str(e)}}
+
+    result = {'status': response.status_code, 'body': _response_body(response)}
+    location = response.get('Location')
+    if location:
+        result['headers'] = {'Location': location}
+    return result
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def batch_view(request):
+    """Exécute une liste ordonnée d'appels API (voir le docstring du module)"""
+    operations = request.data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return Response({'error': 'Aucune opération'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(operations) > MAX_OPERATIONS:
+        return Response(
+            {'error': f'Maximum {MAX_OPERATIONS} opérations par lot'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not all(isinstance(operation, dict) for operation in operations):
+        return Response({'error': 'Chaque opération doit être un objet'}, status=status.HTTP_400_BAD_REQUEST)
+
+    atomic = bool(request.data.get('atomic', False))
+    results = {}
+    responses = []
+
+    def run():
+        for index, operation in enumerate(operations):
+            result = execute_operation(request, operation, results)
+            result = {'id': operation.get('id', str(index)), **result}
+            results[result['id']] = result
+            responses.append(result)
+            if atomic and result['status'] >= 400:
+                raise _Rollback()
+
+    if atomic:
+        try:
+            with transaction.atomic():
+                run()
+        except _Rollback:
+            # Les opérations suivantes ne sont pas exécutées
+            for index, operation in enumerate(operations[len(responses):], start=len(responses)):
+                responses.append({
+                    'id': operation.get('id', str(index)),
+                    'status': status.HTTP_424_FAILED_DEPENDENCY,
+                    'body': {'error': 'Non exécutée : lot annulé'}
+                })
+            return Response(
+                {'atomic': True, 'committed': False, 'results': responses},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        run()
+
+    return Response({'atomic': atomic, 'committed': True, 'results': responses})
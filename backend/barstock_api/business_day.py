@@ -0,0 +1,79 @@
+"""
+Journée commerciale locale et filtres de dates compatibles avec les index
+
+Les filtres `created_at__date=...` obligent PostgreSQL à convertir chaque
+ligne (cast / AT TIME ZONE), ce qui empêche l'utilisation d'un index btree
+sur `created_at`. Ce module transforme une journée commerciale locale
+(Africa/Bujumbura) en intervalle `[début, fin)` d'instants, utilisable
+directement avec `created_at__gte` / `created_at__lt`.
+
+Un bar qui ferme après minuit peut régler BUSINESS_DAY_CUTOFF_HOUR
+(ex: 4 => la journée du 12 va du 12 à 04:00 au 13 à 04:00).
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def get_cutoff_hour():
+    """Heure locale de bascule d'une journée commerciale à la suivante"""
+    return getattr(settings, 'BUSINESS_DAY_CUTOFF_HOUR', 0)
+
+
+def current_business_day(now=None):
+    """Date de la journée commerciale en cours (heure locale)"""
+    now = timezone.localtime(now or timezone.now())
+    return (now - timedelta(hours=get_cutoff_hour())).date()
+
+
+def business_day_bounds(day=None):
+    """
+    Retourne (début, fin) en datetimes aware pour la journée commerciale `day`.
+    La fin est exclusive.
+    """
+    if day is None:
+        day = current_business_day()
+    elif isinstance(day, datetime):
+        day = day.date()
+
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time(hour=get_cutoff_hour())), tz)
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), time(hour=get_cutoff_hour())), tz
+    )
+    return start, end
+
+
+def business_day_filter(day=None, field='created_at'):
+    """
+    Kwargs de filtre pour une journée commerciale, ex:
+        Sale.objects.filter(**business_day_filter(today))
+        SaleItem.objects.filter(**business_day_filter(today, field='sale__created_at'))
+    """
+    start, end = business_day_bounds(day)
+    return {f'{field}__gte': start, f'{field}__lt': end}
+
+
+def business_period_filter(date_from=None, date_to=None, field='created_at'):
+    """
+    Kwargs de filtre pour une période de journées commerciales.
+    Chaque borne est optionnelle (filtre ouvert de ce côté).
+    """
+    filters = {}
+    if date_from is not None:
+        filters[f'{field}__gte'] = business_day_bounds(date_from)[0]
+    if date_to is not None:
+        filters[f'{field}__lt'] = business_day_bounds(date_to)[1]
+    return filters
+
+
+def parse_date(value, default=None):
+    """Convertit 'YYYY-MM-DD' en date, ou retourne `default`"""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return default
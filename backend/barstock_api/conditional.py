@@ -0,0 +1,166 @@
+"""
+Réponses conditionnelles (ETag / Last-Modified) pour les données de référence
+
+Une ressource regroupe les modèles dont dépend une réponse :
+
+    TABLES_RESOURCE = ConditionalResource('tables', [Table, TableReservation, Sale])
+
+    class TableListView(ConditionalGetMixin, generics.ListAPIView):
+        conditional_resource = TABLES_RESOURCE
+
+    @api_view(['GET'])
+    @permission_classes([IsAuthenticated])
+    @conditional_get(SERVERS_RESOURCE)
+    def servers_list_view(request): ...
+
+Les validateurs viennent de `count()` + `max(updated_at)` de chaque modèle,
+calculés en une requête par modèle puis gardés en cache. Les signaux
+post_save / post_delete des modèles vident ce cache (après commit) ; le délai
+VALIDATORS_CACHE_TIMEOUT borne le retard pour les écritures faites hors
+signaux (update() en masse, autre process).
+
+Une requête dont If-None-Match / If-Modified-Since est à jour reçoit un 304
+avant toute sérialisation ; l'authentification et les permissions DRF sont
+vérifiées avant.
+"""
+
+import functools
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe
+
+VALIDATORS_CACHE_TIMEOUT = 5 * 60
+
+# Ressources par modèle, pour les écritures qui ne passent pas par les signaux
+_resources_by_model = {}
+
+
+class ConditionalResource:
+    """Ensemble de modèles dont l'état sert de validateur HTTP"""
+
+    def __init__(self, name, models, timestamp_field='updated_at'):
+        self.name = name
+        self.models = list(models)
+        self.timestamp_field = timestamp_field
+        self.cache_key = f'conditional:{name}'
+        self.deleted_key = f'conditional:{name}:deleted_at'
+
+        for model in self.models:
+            _resources_by_model.setdefault(model, []).append(self)
+            uid = f'conditional_{name}_{model._meta.label_lower}'
+            post_save.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+            post_delete.connect(self._on_delete, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+
+    def _on_change(self, sender, **kwargs):
+        transaction.on_commit(self.invalidate)
+
+    def _on_delete(self, sender, **kwargs):
+        # Une suppression ne fait pas avancer max(updated_at)
+        cache.set(self.deleted_key, timezone.now(), None)
+        transaction.on_commit(self.invalidate)
+
+    def invalidate(self):
+        cache.delete(self.cache_key)
+
+    def get_validators(self):
+        """
+        Retourne (state, last_modified) : `state` change à chaque écriture,
+        `last_modified` est la date de la dernière modification connue.
+        """
+        validators = cache.get(self.cache_key)
+        if validators is None:
+            parts = []
+            last_modified = cache.get(self.deleted_key)
+            for model in self.models:
+                row = model._default_manager.aggregate(
+                    count=Count('pk'), last=Max(self.timestamp_field)
+                )
+                parts.append(f"{model._meta.label_lower}:{row['count']}:{row['last']}")
+                if row['last'] and (last_modified is None or row['last'] > last_modified):
+                    last_modified = row['last']
+            validators = ('|'.join(parts), last_modified)
+            cache.set(self.cache_key, validators, VALIDATORS_CACHE_TIMEOUT)
+        return validators
+
+
+def invalidate_model(model):
+    """
+    À appeler après une écriture en masse (bulk_update, update()) sur
+    `model` : invalide les ressources qui en dépendent, après commit
+    """
+    for resource in _resources_by_model.get(model, []):
+        transaction.on_commit(resource.invalidate)
+
+
+def _etag(resource, state, request):
+    # La réponse dépend aussi des paramètres de la requête et de l'utilisateur
+    user = getattr(request, 'user', None)
+    key = f"{resource.name}|{state}|{request.get_full_path()}|{getattr(user, 'pk', None)}"
+    return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        # If-None-Match prime sur If-Modified-Since
+        return etag in if_none_match or if_none_match.strip() == '*'
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since and last_modified:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def conditional_response(request, resource, get_response):
+    """
+    Répond 304 si le client est à jour, sinon appelle `get_response()`
+    et ajoute ETag / Last-Modified à la réponse.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return get_response()
+
+    state, last_modified = resource.get_validators()
+    etag = _etag(resource, state, request)
+
+    if _not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    else:
+        response = get_response()
+        if response.status_code != 200:
+            return response
+
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def conditional_get(resource):
+    """Décorateur pour les vues fonction (à placer sous @api_view)"""
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return conditional_response(
+                request, resource, lambda: view_func(request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Rend l'action `list` conditionnelle (ListAPIView, ViewSet)"""
+
+    conditional_resource = None
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.conditional_resource,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
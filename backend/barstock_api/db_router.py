@@ -0,0 +1,161 @@
+"""
+Routage des lectures lourdes (rapports, analytics, exports) vers la base `reports`
+
+La base `reports` est un réplica en lecture (ou, en local, une seconde base
+SQLite/PostgreSQL) déclarée via REPORTS_DATABASE_URL. Seules les vues et
+tâches explicitement marquées y lisent :
+
+    @use_reports_database
+    @api_view(['GET'])
+    def dashboard_stats(request): ...
+
+    class ExportView(ReportsDatabaseMixin, APIView): ...
+
+    with reports_database():
+        ...  # tâche de fond
+
+Toutes les écritures restent sur `default`. Si l'alias n'est pas configuré,
+s'il est injoignable ou si son retard de réplication dépasse
+REPORTS_DATABASE_MAX_LAG secondes, les lectures retombent sur `default`.
+
+Test en local : REPORTS_DATABASE_URL=sqlite:///reports.sqlite3 puis
+`python manage.py migrate --database=reports` pour créer le schéma.
+"""
+
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DB_ALIAS = 'reports'
+
+# Durée (secondes) pendant laquelle un diagnostic de santé du réplica est réutilisé
+HEALTH_CHECK_TTL = 10
+
+_use_reports_db = contextvars.ContextVar('use_reports_db', default=False)
+_health = {'checked_at': 0.0, 'healthy': False}
+
+
+def reports_database_configured():
+    """Vérifie que l'alias `reports` est déclaré dans DATABASES"""
+    return REPORTS_DB_ALIAS in settings.DATABASES
+
+
+def _replication_lag(connection):
+    """Retard de réplication en secondes (0 si non applicable)"""
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        # NULL sur un primaire ou une base autonome : pas de retard
+        cursor.execute(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0)"
+        )
+        return float(cursor.fetchone()[0] or 0)
+
+
+def mark_reports_database_unhealthy():
+    """Force le repli sur `default` jusqu'au prochain diagnostic"""
+    _health['checked_at'] = time.monotonic()
+    _health['healthy'] = False
+
+
+def reports_database_available():
+    """
+    Indique si les lectures peuvent aller sur `reports`.
+    Le diagnostic (connexion + retard) est mis en cache HEALTH_CHECK_TTL secondes.
+    """
+    if not reports_database_configured():
+        return False
+
+    now = time.monotonic()
+    if now - _health['checked_at'] < HEALTH_CHECK_TTL:
+        return _health['healthy']
+
+    max_lag = getattr(settings, 'REPORTS_DATABASE_MAX_LAG', 30)
+    try:
+        lag = _replication_lag(connections[REPORTS_DB_ALIAS])
+        healthy = lag <= max_lag
+        if not healthy:
+            logger.warning("Base reports en retard de %.1fs (max %ss), repli sur default", lag, max_lag)
+    except Exception as e:
+        logger.warning("Base reports indisponible, repli sur default: %s", e)
+        healthy = False
+
+    _health['checked_at'] = now
+    _health['healthy'] = healthy
+    return healthy
+
+
+@contextmanager
+def reports_database():
+    """Contexte dans lequel les lectures sont routées vers `reports`"""
+    token = _use_reports_db.set(True)
+    try:
+        yield
+    finally:
+        _use_reports_db.reset(token)
+
+
+@contextmanager
+def primary_database():
+    """Contexte forçant les lectures sur `default` (ex: repli après erreur)"""
+    token = _use_reports_db.set(False)
+    try:
+        yield
+    finally:
+        _use_reports_db.reset(token)
+
+
+def use_reports_database(view_func):
+    """
+    Décorateur de vue en lecture seule : lit sur `reports`, et rejoue la vue
+    sur `default` si le réplica tombe en cours de requête.
+    """
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        # Décidé à l'entrée : passé HEALTH_CHECK_TTL, un nouveau diagnostic
+        # verrait le réplica tombé et l'erreur ne serait plus rejouée
+        routed = reports_database_available()
+        with reports_database():
+            try:
+                return view_func(*args, **kwargs)
+            except OperationalError as e:
+                if not routed:
+                    raise
+                logger.warning("Erreur sur la base reports, requête rejouée sur default: %s", e)
+                mark_reports_database_unhealthy()
+        with primary_database():
+            return view_func(*args, **kwargs)
+    return wrapper
+
+
+class ReportsDatabaseMixin:
+    """Équivalent de @use_reports_database pour les vues basées sur des classes"""
+
+    def dispatch(self, request, *args, **kwargs):
+        return use_reports_database(super().dispatch)(request, *args, **kwargs)
+
+
+class ReportsRouter:
+    """
+    Routeur Django : lectures marquées -> `reports`, tout le reste -> `default`
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_reports_db.get() and reports_database_available():
+            return REPORTS_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Même pour un objet lu sur le réplica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les deux alias contiennent les mêmes données
+        return True
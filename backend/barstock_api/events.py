@@ -0,0 +1,181 @@
+"""
+Journal d'événements structuré
+
+Remplace les `print()` de diagnostic des chemins chauds (vues, signaux,
+serializers). Un `print()` écrit sur stdout dans la requête, sous le
+verrou du worker ; un événement ne coûte rien s'il n'est pas retenu et
+n'est jamais écrit par le thread de la requête :
+
+    events = get_event_logger(__name__)
+
+    events.debug('sales.create.request', user=request.user.pk, data=lambda: request.data)
+    events.info('sales.created', reference=sale.reference, total=sale.total_amount)
+    events.exception('sales.invoice.failed', reference=sale.reference)
+
+    -> INFO 2026-10-19 12:00:00,000 events.sales.views sales.created reference=V-0042 total=12000
+
+- Niveau : les événements sous EVENT_LOG_LEVEL (INFO par défaut) sont
+  écartés avant tout calcul.
+- Échantillonnage : `sample=0.1` garde un événement sur dix ;
+  EVENT_LOG_SAMPLING ({'événement': taux}) règle un taux par événement
+  sans toucher au code. Un événement échantillonné porte `sample_rate`.
+- Formatage différé : un champ peut être une fonction sans argument,
+  appelée seulement si l'événement est retenu (`data=lambda: request.data`).
+  La ligne est construite et écrite par le thread d'EventQueueHandler.
+- File non bloquante : si la file (EVENT_LOG_QUEUE_SIZE) est pleine,
+  l'événement est perdu et compté (`EventQueueHandler.dropped`) plutôt
+  que de ralentir la requête.
+
+Les loggers d'événements sont sous `events.` (`events.sales.views`...),
+configurés dans LOGGING. Chaque enregistrement porte aussi `event` et
+`fields` pour un formateur JSON.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+EVENT_LOG_QUEUE_SIZE = getattr(settings, 'EVENT_LOG_QUEUE_SIZE', 10000)
+EVENT_LOG_SAMPLING = getattr(settings, 'EVENT_LOG_SAMPLING', {})
+
+EVENT_LOGGER_PREFIX = 'events.'
+EVENT_FORMAT = '{levelname} {asctime} {name} {message}'
+
+_PLAIN_TYPES = (str, int, float, bool, type(None))
+SENSITIVE_HEADERS = {'authorization', 'cookie', 'x-csrftoken'}
+
+
+def _plain(value):
+    """Valeur sans référence à la requête ni aux modèles, lisible depuis un autre thread"""
+    if callable(value) and not isinstance(value, type):
+        value = value()
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(item) for item in value]
+    return str(value)
+
+
+def _render(value):
+    if isinstance(value, str) and value and not any(char in value for char in ' ="\n'):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def request_headers(request):
+    """En-têtes de la requête, jetons et cookies masqués"""
+    return {
+        name: '***' if name.lower() in SENSITIVE_HEADERS else value
+        for name, value in request.headers.items()
+    }
+
+
+class EventMessage:
+    """Message d'un événement : `événement clé=valeur ...`, construit à l'écriture"""
+
+    def __init__(self, event, fields):
+        self.event = event
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join([self.event] + [f'{key}={_render(value)}' for key, value in self.fields.items()])
+
+
+class EventLogger:
+    """Émet des événements nommés avec des champs, filtrés par niveau et échantillonnés"""
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(EVENT_LOGGER_PREFIX + name)
+
+    def log(self, level, event, sample=1.0, exc_info=False, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        rate = EVENT_LOG_SAMPLING.get(event, sample)
+        if rate < 1 and random.random() >= rate:
+            return
+        fields = {key: _plain(value) for key, value in fields.items()}
+        if rate < 1:
+            fields['sample_rate'] = rate
+        self.logger.log(
+            level, EventMessage(event, fields), exc_info=exc_info,
+            extra={'event': event, 'fields': fields}, stacklevel=3
+        )
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event, **fields):
+        """Erreur avec la trace de l'exception en cours"""
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_event_logger(name):
+    return EventLogger(name)
+
+
+class EventQueueHandler(QueueHandler):
+    """
+    Met les enregistrements en file sans attendre ; un thread du process
+    les formate et les écrit sur `stream` (stderr par défaut).
+    """
+
+    def __init__(self, maxsize=EVENT_LOG_QUEUE_SIZE, stream=None):
+        super().__init__(queue.Queue(maxsize))
+        target = logging.StreamHandler(stream or sys.stderr)
+        target.setFormatter(logging.Formatter(EVENT_FORMAT, style='{'))
+        self.listener = QueueListener(self.queue, target)
+        self.dropped = 0
+        self._pid = None
+
+    def prepare(self, record):
+        # Le message reste un EventMessage (champs déjà simples) : la ligne
+        # est construite par le thread d'écriture. Seule la trace d'une
+        # exception est mise en texte ici, tant qu'elle existe.
+        record = logging.makeLogRecord(record.__dict__)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_listener(self):
+        # Après un fork (gunicorn --preload), le thread du parent n'existe pas dans l'enfant
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.listener._thread = None
+        self.listener.start()
+        atexit.register(self.flush_and_stop)
+
+    def flush_and_stop(self):
+        """Écrit les événements en attente et arrête le thread (arrêt du worker)"""
+        if self._pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+            self._pid = None
@@ -0,0 +1,57 @@
+"""
+Import différé des modules lourds
+
+Les générateurs de rapports (reportlab, openpyxl) et psutil coûtent
+plusieurs centaines de millisecondes et quelques dizaines de Mo à chaque
+démarrage de worker, alors que les exports sont rares. Importés au niveau
+module d'une vue, ils sont chargés avec l'URLconf :
+
+    PDFReportGenerator = lazy_import('reports.pdf_generator', 'PDFReportGenerator')
+    psutil = lazy_import('psutil')
+
+Le module n'est importé qu'au premier usage (appel ou attribut) ; le
+reste du code ne change pas. `python manage.py import_profile` mesure le
+coût des imports au démarrage.
+"""
+
+import importlib
+import threading
+
+
+class LazyImport:
+    """Module (ou attribut d'un module) importé au premier usage"""
+
+    def __init__(self, module, attribute=None):
+        self._module = module
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    target = importlib.import_module(self._module)
+                    if self._attribute is not None:
+                        target = getattr(target, self._attribute)
+                    self._target = target
+        return self._target
+
+    @property
+    def loaded(self):
+        return self._target is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f'{self._module}.{self._attribute}' if self._attribute else self._module
+        return f"<LazyImport {name}{'' if self.loaded else ' (non chargé)'}>"
+
+
+def lazy_import(module, attribute=None):
+    """`module` (ou `module.attribute`), importé seulement au premier usage"""
+    return LazyImport(module, attribute)
@@ -64,6 +64,8 @@ INSTALLED_APPS = [
     'monitoring',
     'help',
     'credits',
+    'sync',
+    'archive',
 ]
 
 MIDDLEWARE = [
@@ -75,6 +77,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.sql_tracing.SQLTracingMiddleware',
+    'monitoring.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'barstock_api.urls'
@@ -178,7 +182,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -259,6 +263,7 @@ CORS_EXPOSE_HEADERS = [
     'cache-control',
     'expires',
     'last-modified',
+    'etag',
 ]
 
 # Méthodes CORS autorisées
@@ -277,6 +282,10 @@ TIME_ZONE = 'Africa/Bujumbura'
 USE_I18N = True
 USE_TZ = True
 
+# Heure locale de bascule de la journée commerciale (0 = minuit).
+# Ex: 4 pour un bar qui ferme à 3h : les ventes de 1h comptent pour la veille.
+BUSINESS_DAY_CUTOFF_HOUR = config('BUSINESS_DAY_CUTOFF_HOUR', default=0, cast=int)
+
 # ===== WEBSOCKETS CONFIGURATION =====
 # Note: ASGI_APPLICATION déjà défini ligne 99
 # Utilise InMemoryChannelLayer pour Render (plan gratuit sans Redis)
@@ -392,6 +401,57 @@ if IS_RENDER or os.environ.get('DATABASE_URL'):
     )
     print("✅ Configuration PostgreSQL Render activée")
 
+# Base de lecture pour les rapports / analytics (réplica PostgreSQL, ou seconde
+# base SQLite/PostgreSQL en local). Sans REPORTS_DATABASE_URL, tout lit sur default.
+REPORTS_DATABASE_URL = config('REPORTS_DATABASE_URL', default='')
+if REPORTS_DATABASE_URL:
+    DATABASES['reports'] = dj_database_url.parse(
+        REPORTS_DATABASE_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    # Les tests utilisent la base default comme réplica
+    DATABASES['reports']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['barstock_api.db_router.ReportsRouter']
+
+# Retard de réplication toléré (secondes) avant repli des lectures sur default
+REPORTS_DATABASE_MAX_LAG = config('REPORTS_DATABASE_MAX_LAG', default=30, cast=int)
+
+# Synchronisation mobile (api/sync/)
+# Délai avant qu'une écriture soit envoyée, et durée de conservation des suppressions
+SYNC_SETTLE_SECONDS = config('SYNC_SETTLE_SECONDS', default=2, cast=int)
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+# Rétention de la télémétrie (python manage.py purge_telemetry)
+# Logs de performance et métriques bruts, activités / vues / alertes résolues, agrégats
+TELEMETRY_RETENTION_DAYS = config('TELEMETRY_RETENTION_DAYS', default=7, cast=int)
+ACTIVITY_RETENTION_DAYS = config('ACTIVITY_RETENTION_DAYS', default=90, cast=int)
+ROLLUP_RETENTION_DAYS = config('ROLLUP_RETENTION_DAYS', default=400, cast=int)
+
+# Journal d'activité différé (accounts/audit.py) : taille du tampon, délai max d'écriture (s)
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', default=100, cast=int)
+AUDIT_FLUSH_INTERVAL = config('AUDIT_FLUSH_INTERVAL', default=2.0, cast=float)
+
+# Traçage SQL par requête (monitoring/sql_tracing.py) : en-tête X-SQL-Trace, échantillonnage
+SQL_TRACE_ALLOW_HEADER = config('SQL_TRACE_ALLOW_HEADER', default=DEBUG, cast=bool)
+SQL_TRACE_SAMPLE_RATE = config('SQL_TRACE_SAMPLE_RATE', default=0.0, cast=float)
+SQL_TRACE_N_PLUS_ONE_THRESHOLD = config('SQL_TRACE_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+
+# Profilage à la demande (monitoring/profiling.py) : intervalle d'échantillonnage (s)
+PROFILING_INTERVAL = config('PROFILING_INTERVAL', default=0.005, cast=float)
+
+# Mesure des receivers de signaux (monitoring/signal_timing.py) : budget par appel
+SIGNAL_TIMING_ENABLED = config('SIGNAL_TIMING_ENABLED', default=True, cast=bool)
+SIGNAL_RECEIVER_BUDGET_MS = config('SIGNAL_RECEIVER_BUDGET_MS', default=50, cast=int)
+SIGNAL_RECEIVER_QUERY_BUDGET = config('SIGNAL_RECEIVER_QUERY_BUDGET', default=10, cast=int)
+
+# Journal d'événements (barstock_api/events.py) : niveau retenu, taille de la file d'écriture,
+# taux d'échantillonnage par événement ({'sales.create.request': 0.1})
+EVENT_LOG_LEVEL = config('EVENT_LOG_LEVEL', default='INFO')
+EVENT_LOG_QUEUE_SIZE = config('EVENT_LOG_QUEUE_SIZE', default=10000, cast=int)
+EVENT_LOG_SAMPLING = {}
+
 # Log de la configuration CORS active
 if not DEBUG:
     print(f"✅ CORS configuré pour production: {CORS_ALLOWED_ORIGINS}")
@@ -438,6 +498,9 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
+        'events': {
+            'class': 'barstock_api.events.EventQueueHandler',
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -449,6 +512,11 @@ LOGGING = {
             'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
             'propagate': False,
         },
+        'events': {
+            'handlers': ['events'],
+            'level': EVENT_LOG_LEVEL,
+            'propagate': False,
+        },
     },
 }
 
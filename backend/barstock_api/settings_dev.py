@@ -24,6 +24,9 @@ LOGGING = {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        'events': {
+            'class': 'barstock_api.events.EventQueueHandler',
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -40,6 +43,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'events': {
+            'handlers': ['events'],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
     },
 }
 
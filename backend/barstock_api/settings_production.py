@@ -49,6 +49,9 @@ LOGGING = {
             'class': 'logging.FileHandler',
             'filename': 'django.log',
         },
+        'events': {
+            'class': 'barstock_api.events.EventQueueHandler',
+        },
     },
     'loggers': {
         'django': {
@@ -56,5 +59,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'events': {
+            'handlers': ['events'],
+            'level': EVENT_LOG_LEVEL,
+            'propagate': False,
+        },
     },
 }
@@ -22,6 +22,8 @@ from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 
+from .batch import batch_view
+
 def home_view(request):
     """Vue pour la page d'accueil"""
     # Si l'utilisateur est connecté, le rediriger vers l'admin
@@ -56,6 +58,8 @@ def api_root(request):
             'alerts': '/api/alerts/',
             'monitoring': '/api/monitoring/',
             'dashboard': '/api/dashboard/',
+            'sync': '/api/sync/',
+            'batch': '/api/batch/',
             'help': '/api/help/',
         }
     })
@@ -88,6 +92,8 @@ urlpatterns = [
     path('api/dashboard/', include('dashboard.urls')),  # Ajout du dashboard
     path('api/help/', include('help.urls')),  # Ajout du système d'aide
     path('api/credits/', include('credits.urls')),  # Gestion de crédit
+    path('api/sync/', include('sync.urls')),  # Synchronisation mobile / hors ligne
+    path('api/batch/', batch_view, name='api_batch'),  # Appels groupés (mobile)
 ]
 
 # Servir les fichiers media et static en développement
@@ -62,13 +62,20 @@ class CreditAccountSerializer(serializers.ModelSerializer):
 
 class CreditAccountDetailSerializer(CreditAccountSerializer):
     """
-    Serializer détaillé avec les transactions
+    Serializer détaillé avec l'historique complet des transactions
+    (transactions archivées comprises)
     """
-    transactions = CreditTransactionSerializer(many=True, read_only=True)
+    transactions = serializers.SerializerMethodField()
     
     class Meta(CreditAccountSerializer.Meta):
         fields = CreditAccountSerializer.Meta.fields + ['transactions']
 
+    def get_transactions(self, obj):
+        from archive.services import with_archive
+
+        transactions = with_archive(obj.transactions.all(), 'transaction_date')
+        return CreditTransactionSerializer(transactions, many=True, context=self.context).data
+
 
 class CreditReminderSerializer(serializers.ModelSerializer):
     """
@@ -1,23 +1,19 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from barstock_api.events import get_event_logger
 from sales.models import Sale
 from .models import CreditTransaction
 
+events = get_event_logger(__name__)
+
 
 @receiver(post_save, sender=Sale)
 def create_credit_transaction_on_sale(sender, instance, created, **kwargs):
     """
     Créer automatiquement une transaction de crédit quand une vente à crédit est créée
     """
-    print(f"🔔 Signal déclenché pour vente #{instance.id}")
-    print(f"   - created: {created}")
-    print(f"   - payment_method: {instance.payment_method}")
-    print(f"   - has credit_account: {hasattr(instance, 'credit_account')}")
-    print(f"   - credit_account value: {instance.credit_account if hasattr(instance, 'credit_account') else 'N/A'}")
-    
     # Vérifier si c'est une nouvelle vente à crédit
     if created and instance.payment_method == 'credit' and hasattr(instance, 'credit_account') and instance.credit_account:
-        print(f"✅ Création de la transaction...")
         # Créer la transaction de dette
         CreditTransaction.objects.create(
             credit_account=instance.credit_account,
@@ -28,6 +24,7 @@ def create_credit_transaction_on_sale(sender, instance, created, **kwargs):
             created_by=instance.created_by if hasattr(instance, 'created_by') else None
         )
         
-        print(f"✅ Transaction crédit créée pour vente #{instance.id} - {instance.total_amount} FBu")
-    else:
-        print(f"❌ Conditions non remplies pour créer la transaction")
+        events.info(
+            'credits.transaction.created', sale=instance.id,
+            credit_account=instance.credit_account_id, amount=instance.total_amount
+        )
@@ -7,32 +7,37 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import timedelta
 from decimal import Decimal
 
 from products.models import Product
 from sales.models import Sale, SaleItem
 from inventory.models import StockMovement
+from barstock_api.business_day import (
+    business_day_bounds, business_day_filter, current_business_day
+)
+from barstock_api.db_router import use_reports_database
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
     """Statistiques principales du dashboard"""
     
-    today = timezone.now().date()
+    today = current_business_day()
     yesterday = today - timedelta(days=1)
     
     # Ventes du jour
     today_sales = Sale.objects.filter(
-        created_at__date=today,
-        status='completed'
+        status='completed',
+        **business_day_filter(today)
     ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
     
     # Ventes d'hier pour comparaison
     yesterday_sales = Sale.objects.filter(
-        created_at__date=yesterday,
-        status='completed'
+        status='completed',
+        **business_day_filter(yesterday)
     ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
     
     # Calcul du changement
@@ -60,7 +65,7 @@ def dashboard_stats(request):
     total_tables = 20  # À remplacer par votre logique
     occupied_tables = Sale.objects.filter(
         status='pending',
-        created_at__date=today
+        **business_day_filter(today)
     ).count()
     
     occupancy_rate = f"{(occupied_tables/total_tables*100):.0f}%" if total_tables > 0 else "0%"
@@ -84,21 +89,24 @@ def dashboard_stats(request):
     })
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def sales_stats(request):
     """Statistiques de ventes détaillées"""
     
-    today = timezone.now().date()
+    today = current_business_day()
+    day_start, _ = business_day_bounds(today)
     
-    # Ventes par heure aujourd'hui
+    # Ventes par heure aujourd'hui (créneaux d'une heure depuis le début de journée)
     hourly_sales = []
     for hour in range(24):
-        start_time = datetime.combine(today, datetime.min.time().replace(hour=hour))
+        start_time = day_start + timedelta(hours=hour)
         end_time = start_time + timedelta(hours=1)
         
         sales = Sale.objects.filter(
-            created_at__range=[start_time, end_time],
+            created_at__gte=start_time,
+            created_at__lt=end_time,
             status='completed'
         ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
         
@@ -109,8 +117,8 @@ def sales_stats(request):
     
     # Produits les plus vendus aujourd'hui
     top_products = SaleItem.objects.filter(
-        sale__created_at__date=today,
-        sale__status='completed'
+        sale__status='completed',
+        **business_day_filter(today, field='sale__created_at')
     ).values(
         'product__name'
     ).annotate(
@@ -133,6 +141,7 @@ def sales_stats(request):
     })
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def low_stock_products(request):
@@ -150,6 +159,7 @@ def low_stock_products(request):
     return Response(list(low_stock))
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unresolved_alerts(request):
@@ -176,6 +186,7 @@ def unresolved_alerts(request):
     return Response(alerts)
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def alerts_count(request):
@@ -199,6 +210,7 @@ def alerts_count(request):
     })
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def monitoring_dashboard(request):
@@ -214,6 +226,6 @@ def monitoring_dashboard(request):
         },
         'active_sessions': Sale.objects.filter(
             status='pending',
-            created_at__date=timezone.now().date()
+            **business_day_filter()
         ).count()
     })
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 
 from .models import ExpenseCategory, Expense, ExpenseBudget
+from barstock_api.conditional import ConditionalGetMixin, ConditionalResource
 from .serializers import (
     ExpenseCategorySerializer,
     ExpenseSerializer,
@@ -18,7 +19,11 @@ from .serializers import (
 )
 
 
-class ExpenseCategoryViewSet(viewsets.ModelViewSet):
+# Les catégories exposent le nombre et le total de leurs dépenses
+EXPENSE_CATEGORIES_RESOURCE = ConditionalResource('expense_categories', [ExpenseCategory, Expense])
+
+
+class ExpenseCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet pour gérer les catégories de dépenses
     """
@@ -29,6 +34,7 @@ class ExpenseCategoryViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    conditional_resource = EXPENSE_CATEGORIES_RESOURCE
     
     def get_queryset(self):
         """Filtrer les catégories actives par défaut"""
@@ -111,6 +111,10 @@ class StockMovement(models.Model):
         verbose_name = 'Mouvement de stock'
         verbose_name_plural = 'Mouvements de stock'
         ordering = ['-created_at']
+        indexes = [
+            # Mouvements d'un produit sur une journée (filtres created_at__gte/__lt)
+            models.Index(fields=['product', 'created_at'], name='stockmove_product_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.get_movement_type_display()} - {self.quantity}"
@@ -207,71 +211,22 @@ class Purchase(models.Model):
     def mark_as_received(self, user=None):
         """
         Marque l'achat comme reçu et met à jour automatiquement les stocks
-        Similaire à mark_as_paid() pour les ventes
+        Similaire à mark_as_paid() pour les ventes (voir inventory/receiving.py)
         """
-        from django.utils import timezone
-        
+        from .receiving import receive_purchase
+
         if self.status == 'received':
             return  # Déjà reçu
-        
-        print(f"📦 Traitement de la réception pour Achat #{self.id}")
-        
-        # Mettre à jour le stock pour chaque item
-        for item in self.items.all():
-            product = item.product
-            quantity_to_add = item.quantity_received if item.quantity_received > 0 else item.quantity_ordered
-            
-            # Enregistrer le stock avant
-            stock_before = product.current_stock
-            
-            # Ajouter au stock
-            product.current_stock += quantity_to_add
-            product.save()
-            
-            stock_after = product.current_stock
-            
-            # Créer un mouvement de stock pour traçabilité
-            StockMovement.objects.create(
-                product=product,
-                movement_type='in',           # Entrée de stock
-                reason='purchase',            # Raison: achat
-                quantity=quantity_to_add,
-                stock_before=stock_before,
-                stock_after=stock_after,
-                unit_price=item.unit_price,
-                total_amount=item.unit_price * quantity_to_add,
-                supplier=self.supplier,
-                reference=f"PURCHASE-{self.id}",
-                notes=f"Réception achat #{self.id} - {product.name}",
-                user=user if user else self.user
-            )
-            
-            print(f"📦 {product.name}: {stock_before} → {stock_after} (+{quantity_to_add})")
-        
-        # Marquer comme reçu
-        self.status = 'received'
-        self.delivery_date = timezone.now()
-        self.save()
-        
-        print(f"✅ Achat #{self.id} marqué comme reçu et stocks mis à jour")
-    
-    def cancel_purchase(self, reason=None):
+
+        receive_purchase(self, user=user)
+
+    def cancel_purchase(self, reason=None, user=None):
         """
-        Annule l'achat et remet le stock si nécessaire
+        Annule l'achat et retire du stock les quantités reçues
         """
-        if self.status == 'received':
-            # Remettre le stock si l'achat était déjà reçu
-            for item in self.items.all():
-                quantity_to_remove = item.quantity_received if item.quantity_received > 0 else item.quantity_ordered
-                item.product.current_stock -= quantity_to_remove
-                if item.product.current_stock < 0:
-                    item.product.current_stock = 0
-                item.product.save()
-        
-        self.status = 'cancelled'
-        if reason:
-            self.notes = f"{self.notes or ''}\nAnnulé: {reason}".strip()
-        self.save()
+        from .receiving import cancel_purchase
+
+        cancel_purchase(self, user=user, reason=reason)
 
 
 class PurchaseItem(models.Model):
@@ -0,0 +1,242 @@
+"""
+Réception des livraisons fournisseurs
+
+Moteur commun à Purchase.mark_as_received, SupplyViewSet.validate et
+Purchase.cancel_purchase. Quel que soit le nombre de lignes, une réception :
+    - verrouille l'achat, puis les produits concernés (dans l'ordre des id,
+      pour ne pas s'interbloquer avec les ventes) ;
+    - incrémente les stocks et met à jour le coût moyen pondéré en un seul
+      UPDATE (F() + CASE par produit, voir inventory/valuation.py) ;
+    - crée les mouvements de stock en un bulk_create ;
+    - enregistre le statut de l'achat ;
+le tout dans une transaction.
+
+Les mouvements d'entrée enregistrés font foi : une réception déjà appliquée
+n'est pas appliquée une seconde fois (achat reçu puis validé), et
+l'annulation retire exactement les quantités de ces mouvements.
+"""
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Purchase, PurchaseItem, StockMovement
+from .valuation import remove_receipt_cost, weighted_average_cost
+
+RECEIVED_STATUSES = ('received', 'validated')
+
+
+class ReceiptError(Exception):
+    """L'achat n'est pas dans un état qui permet l'opération"""
+
+
+def receipt_quantity(item):
+    """Quantité reçue, ou commandée si la réception n'a pas été saisie"""
+    return item.quantity_received if item.quantity_received > 0 else item.quantity_ordered
+
+
+def _receipt_movements(purchase):
+    # Références utilisées par la réception (PURCHASE-<id>) et la validation (référence d'achat)
+    return StockMovement.objects.filter(
+        movement_type='in',
+        reason='purchase',
+        supplier_id=purchase.supplier_id,
+        reference__in=[f'PURCHASE-{purchase.pk}', purchase.reference],
+    )
+
+
+def _movement_user(purchase, user):
+    return user if user is not None and user.is_authenticated else purchase.user
+
+
+def apply_stock_deltas(deltas, now=None, unit_costs=None):
+    """
+    Ajoute `deltas` ({product_id: quantité signée}) aux stocks, sans
+    descendre sous zéro. Avec `unit_costs` ({product_id: prix}), met aussi
+    à jour le coût moyen pondéré (entrée, ou retour d'une entrée à ce prix).
+    Verrouille les produits et retourne
+    {product_id: (stock avant, stock après, stock minimum)}.
+    """
+    from products.models import Product
+
+    if not deltas:
+        return {}
+    rows = Product.objects.select_for_update().filter(pk__in=deltas).order_by('pk').values_list(
+        'pk', 'current_stock', 'minimum_stock', 'average_cost', 'purchase_price'
+    )
+    levels = {}
+    average_costs = {}
+    for pk, stock, minimum, average_cost, purchase_price in rows:
+        stock_after = max(stock + deltas[pk], 0)
+        levels[pk] = (stock, stock_after, minimum)
+        if unit_costs and unit_costs.get(pk) is not None:
+            average_cost = average_cost or purchase_price
+            if stock_after >= stock:
+                average_costs[pk] = weighted_average_cost(stock, average_cost, stock_after - stock, unit_costs[pk])
+            else:
+                average_costs[pk] = remove_receipt_cost(stock, average_cost, stock - stock_after, unit_costs[pk])
+
+    delta = Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in deltas.items()],
+        output_field=IntegerField()
+    )
+    changes = {'current_stock': Greatest(F('current_stock') + delta, Value(0))}
+    if average_costs:
+        changes['average_cost'] = Case(
+            *[When(pk=pk, then=Value(cost)) for pk, cost in average_costs.items()],
+            default=F('average_cost'),
+            output_field=DecimalField(max_digits=12, decimal_places=4)
+        )
+    Product.objects.filter(pk__in=levels).update(updated_at=now or timezone.now(), **changes)
+    return levels
+
+
+def _resolve_recovered_alerts(levels, now):
+    """Résout en une requête les alertes des produits revenus au-dessus du minimum"""
+    from reports.models import StockAlert
+
+    recovered = [pk for pk, (_before, after, minimum) in levels.items() if after > minimum]
+    if recovered:
+        StockAlert.objects.filter(product_id__in=recovered, status='active').update(
+            status='resolved', resolved_at=now
+        )
+
+
+def _check_low_stock(product_ids):
+    """Alertes de stock faible / rupture après une sortie (après commit)"""
+    from products.models import Product
+    from reports.signals import check_stock_level
+
+    for product in Product.objects.filter(pk__in=product_ids, current_stock__lte=F('minimum_stock')):
+        check_stock_level(Product, product, created=False)
+
+
+def receive_purchase(purchase, user=None, status='received', reference=None, label=None,
+                     fill_received=False):
+    """
+    Entre en stock les articles de `purchase` et lui donne le statut
+    `status`. `fill_received` reporte la quantité commandée sur les lignes
+    sans quantité reçue. Retourne les mouvements créés (aucun si la
+    réception était déjà appliquée).
+    """
+    from barstock_api.conditional import invalidate_model
+    from products.models import Product
+
+    now = timezone.now()
+    with transaction.atomic():
+        locked = Purchase.objects.select_for_update().get(pk=purchase.pk)
+        if locked.status == 'cancelled':
+            raise ReceiptError('Impossible de recevoir un achat annulé.')
+
+        items = list(locked.items.select_related('product'))
+        reference = reference or f'PURCHASE-{locked.pk}'
+        label = label or f'Réception achat #{locked.pk}'
+
+        movements = []
+        if not _receipt_movements(locked).exists():
+            deltas = {item.product_id: receipt_quantity(item) for item in items}
+            unit_costs = {item.product_id: item.unit_price for item in items}
+            levels = apply_stock_deltas(deltas, now, unit_costs)
+            movement_user = _movement_user(locked, user)
+            for item in items:
+                quantity = deltas[item.product_id]
+                stock_before, stock_after, _minimum = levels[item.product_id]
+                movements.append(StockMovement(
+                    product_id=item.product_id,
+                    movement_type='in',
+                    reason='purchase',
+                    quantity=quantity,
+                    stock_before=stock_before,
+                    stock_after=stock_after,
+                    unit_price=item.unit_price,
+                    total_amount=item.unit_price * quantity,
+                    supplier_id=locked.supplier_id,
+                    reference=reference,
+                    notes=f'{label} - {item.product.name}',
+                    user=movement_user,
+                ))
+            StockMovement.objects.bulk_create(movements)
+            _resolve_recovered_alerts(levels, now)
+            locked.delivery_date = now
+            invalidate_model(Product)
+
+        if fill_received:
+            unfilled = [item for item in items if item.quantity_received == 0]
+            for item in unfilled:
+                item.quantity_received = item.quantity_ordered
+            PurchaseItem.objects.bulk_update(unfilled, ['quantity_received'])
+
+        locked.status = status
+        locked.save(update_fields=['status', 'delivery_date', 'updated_at'])
+
+    purchase.status, purchase.delivery_date, purchase.updated_at = (
+        locked.status, locked.delivery_date, locked.updated_at
+    )
+    return movements
+
+
+def cancel_purchase(purchase, user=None, reason=None):
+    """
+    Annule `purchase`. Si la marchandise était entrée en stock, retire
+    exactement les quantités reçues (mouvements de retour). Retourne les
+    mouvements créés.
+    """
+    from barstock_api.conditional import invalidate_model
+    from products.models import Product
+
+    now = timezone.now()
+    with transaction.atomic():
+        locked = Purchase.objects.select_for_update().get(pk=purchase.pk)
+        if locked.status == 'cancelled':
+            return []
+
+        receipts = list(_receipt_movements(locked).order_by('pk'))
+        if not receipts and locked.status in RECEIVED_STATUSES:
+            # Réception antérieure au journal des mouvements : quantités des lignes
+            receipts = [
+                StockMovement(product_id=item.product_id, quantity=receipt_quantity(item),
+                              unit_price=item.unit_price, reference=f'PURCHASE-{locked.pk}')
+                for item in locked.items.all()
+            ]
+
+        movements = []
+        if receipts:
+            deltas, unit_costs = {}, {}
+            for receipt in receipts:
+                deltas[receipt.product_id] = deltas.get(receipt.product_id, 0) - receipt.quantity
+                unit_costs[receipt.product_id] = receipt.unit_price
+            levels = apply_stock_deltas(deltas, now, unit_costs)
+            movement_user = _movement_user(locked, user)
+            for product_id, (stock_before, stock_after, _minimum) in levels.items():
+                unit_price = unit_costs[product_id]
+                quantity = stock_before - stock_after
+                if not quantity:
+                    continue
+                movements.append(StockMovement(
+                    product_id=product_id,
+                    movement_type='return',
+                    reason='purchase',
+                    quantity=quantity,
+                    stock_before=stock_before,
+                    stock_after=stock_after,
+                    unit_price=unit_price,
+                    total_amount=unit_price * quantity if unit_price is not None else None,
+                    supplier_id=locked.supplier_id,
+                    reference=receipts[0].reference,
+                    notes=f'Annulation achat #{locked.pk}' + (f' : {reason}' if reason else ''),
+                    user=movement_user,
+                ))
+            StockMovement.objects.bulk_create(movements)
+            invalidate_model(Product)
+            low = [pk for pk, (_before, after, minimum) in levels.items() if after <= minimum]
+            if low:
+                transaction.on_commit(lambda: _check_low_stock(low))
+
+        locked.status = 'cancelled'
+        if reason:
+            locked.notes = f"{locked.notes or ''}\nAnnulé: {reason}".strip()
+        locked.save(update_fields=['status', 'notes', 'updated_at'])
+
+    purchase.status, purchase.notes, purchase.updated_at = locked.status, locked.notes, locked.updated_at
+    return movements
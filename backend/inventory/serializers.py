@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import StockMovement, Purchase, PurchaseItem
+from .valuation import weighted_average_cost
 from products.models import Product
 from suppliers.models import Supplier
 from accounts.models import User
@@ -110,6 +111,12 @@ class StockMovementSerializer(serializers.ModelSerializer):
         validated_data['stock_before'] = stock_before
         validated_data['stock_after'] = stock_after
 
+        # Entrée valorisée : nouveau coût moyen pondéré
+        if movement_type == 'in' and validated_data.get('unit_price'):
+            product.average_cost = weighted_average_cost(
+                stock_before, product.unit_cost, quantity, validated_data['unit_price']
+            )
+
         # Mettre à jour le stock du produit AVANT de créer le mouvement
         product.current_stock = stock_after
         product.save()
@@ -1,3 +1,94 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Category, Product
+from suppliers.models import Supplier
+
+from .models import Purchase, PurchaseItem, StockMovement
+
+User = get_user_model()
+
+
+class PurchaseReceivingTest(TestCase):
+    """Tests du moteur de réception des achats"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gerant', password='x', role='manager')
+        category = Category.objects.create(name='Boissons', type='boissons')
+        self.products = [
+            Product.objects.create(
+                name=f'Bière {i}', category=category, purchase_price=Decimal('1500.00'),
+                selling_price=Decimal('2500.00'), current_stock=10
+            )
+            for i in range(5)
+        ]
+        self.purchase = Purchase.objects.create(
+            reference='ACH-001', supplier=Supplier.objects.create(name='Brarudi'), user=self.user
+        )
+        for i, product in enumerate(self.products):
+            PurchaseItem.objects.create(
+                purchase=self.purchase, product=product, quantity_ordered=24,
+                quantity_received=20 if i == 0 else 0, unit_price=Decimal('1500.00')
+            )
+
+    def stocks(self):
+        return list(
+            Product.objects.filter(pk__in=[p.pk for p in self.products]).order_by('pk')
+            .values_list('current_stock', flat=True)
+        )
+
+    def test_receipt_is_bulk_and_cancel_is_exact_inverse(self):
+        # Nombre de requêtes indépendant du nombre de lignes
+        with self.assertNumQueries(10):
+            self.purchase.mark_as_received(self.user)
+
+        self.assertEqual(self.stocks(), [30, 34, 34, 34, 34])
+        self.assertEqual(StockMovement.objects.filter(movement_type='in').count(), 5)
+        self.assertEqual(self.purchase.status, 'received')
+
+        self.purchase.cancel_purchase('Erreur de saisie', user=self.user)
+
+        self.assertEqual(self.stocks(), [10] * 5)
+        self.assertEqual(StockMovement.objects.filter(movement_type='return').count(), 5)
+        self.purchase.refresh_from_db()
+        self.assertEqual(self.purchase.status, 'cancelled')
+
+    def test_validate_after_receipt_does_not_add_stock_twice(self):
+        from .receiving import receive_purchase
+
+        self.purchase.mark_as_received(self.user)
+        receive_purchase(self.purchase, user=self.user, status='validated', fill_received=True)
+
+        self.assertEqual(self.stocks(), [30, 34, 34, 34, 34])
+        self.assertEqual(self.purchase.status, 'validated')
+        self.assertFalse(PurchaseItem.objects.filter(quantity_received=0).exists())
+
+    def test_weighted_average_cost_follows_receipts(self):
+        from .valuation import product_stock_totals
+
+        product = self.products[1]
+        PurchaseItem.objects.filter(purchase=self.purchase, product=product).update(
+            unit_price=Decimal('2000.00')
+        )
+
+        self.purchase.mark_as_received(self.user)
+        product.refresh_from_db()
+        # (10 x 1500 + 24 x 2000) / 34
+        self.assertEqual(product.average_cost, Decimal('1852.9412'))
+
+        with self.assertNumQueries(1):
+            totals = product_stock_totals()
+        self.assertEqual(totals['value'], Decimal('30') * 1500 + Decimal('34') * 1500 * 3 + Decimal('63000.00'))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        data = client.get('/api/inventory/valuation/').json()
+        self.assertEqual(data['products']['value'], float(totals['value']))
 
-# Create your tests here.
+        self.purchase.cancel_purchase(user=self.user)
+        product.refresh_from_db()
+        # Inverse au 1/10 000 près (coût moyen stocké sur 4 décimales)
+        self.assertAlmostEqual(product.average_cost, Decimal('1500'), delta=Decimal('0.001'))
@@ -11,6 +11,7 @@ router.register(r'supplies', views.SupplyViewSet, basename='supply')
 urlpatterns = [
     path('', include(router.urls)),
     path('stock-summary/', views.StockSummaryView.as_view(), name='stock-summary'),
+    path('valuation/', views.StockValuationView.as_view(), name='stock-valuation'),
     path('low-stock/', views.LowStockView.as_view(), name='low-stock'),
     path('movements/by-product/<int:product_id>/', views.ProductMovementsView.as_view(), name='product-movements'),
 ]
@@ -0,0 +1,104 @@
+"""
+Valorisation des stocks au coût moyen pondéré (inventaire permanent)
+
+Chaque produit (Product.average_cost) et chaque ingrédient
+(Ingredient.cout_moyen) porte son coût moyen pondéré, mis à jour à chaque
+entrée en stock :
+
+    nouveau coût = (stock x coût moyen + quantité reçue x prix d'achat)
+                   / (stock + quantité reçue)
+
+Les sorties (ventes, consommations) ne changent pas le coût moyen : elles
+sont valorisées à ce coût, figé sur la ligne de vente (SaleItem.unit_cost).
+Le retour d'une réception au fournisseur applique l'inverse (au 1/10 000
+près : le coût moyen est stocké sur 4 décimales).
+
+La valeur du stock est donc un seul agrégat sur la table des produits (ou
+des ingrédients), et le coût des ventes un agrégat sur les lignes de vente,
+sans relire l'historique des mouvements.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+
+COST_PLACES = Decimal('0.0001')
+ZERO = Decimal('0')
+
+
+def _quantize(value):
+    return Decimal(value).quantize(COST_PLACES, rounding=ROUND_HALF_UP)
+
+
+def weighted_average_cost(stock, average_cost, quantity, unit_cost):
+    """Coût moyen après l'entrée de `quantity` unités à `unit_cost`"""
+    stock, quantity = Decimal(max(stock, 0)), Decimal(quantity)
+    if stock + quantity <= 0:
+        return _quantize(unit_cost)
+    return _quantize((stock * Decimal(average_cost) + quantity * Decimal(unit_cost)) / (stock + quantity))
+
+
+def remove_receipt_cost(stock, average_cost, quantity, unit_cost):
+    """
+    Inverse de weighted_average_cost : coût moyen après le retour de
+    `quantity` unités reçues à `unit_cost`
+    """
+    stock, quantity = Decimal(stock), Decimal(quantity)
+    remaining = stock - quantity
+    if remaining <= 0:
+        return _quantize(average_cost)
+    value = stock * Decimal(average_cost) - quantity * Decimal(unit_cost)
+    # Stock vendu entre-temps : la valeur restante ne peut devenir négative
+    return _quantize(max(value, ZERO) / remaining)
+
+
+def stock_value_expression(quantity_field, cost_field, fallback_field):
+    """
+    Expression SQL quantité x coût moyen (prix de `fallback_field` si le
+    coût moyen est nul), à agréger avec Sum(...)
+    """
+    return ExpressionWrapper(
+        F(quantity_field) * Coalesce(NullIf(cost_field, Value(0)), fallback_field),
+        output_field=DecimalField(max_digits=20, decimal_places=4)
+    )
+
+
+def _total(queryset, quantity_field, cost_field, fallback_field, low_field):
+    value = stock_value_expression(quantity_field, cost_field, fallback_field)
+    totals = queryset.aggregate(
+        value=Coalesce(Sum(value), ZERO, output_field=value.output_field),
+        count=Count('pk'),
+        low_stock=Count('pk', filter=Q(**{f'{quantity_field}__lte': F(low_field)})),
+        out_of_stock=Count('pk', filter=Q(**{f'{quantity_field}__lte': 0})),
+    )
+    totals['value'] = totals['value'].quantize(Decimal('0.01'))
+    return totals
+
+
+def product_stock_totals(queryset=None):
+    """Valeur du stock produits (une requête)"""
+    from products.models import Product
+
+    queryset = Product.objects.filter(is_active=True) if queryset is None else queryset
+    return _total(queryset, 'current_stock', 'average_cost', 'purchase_price', 'minimum_stock')
+
+
+def ingredient_stock_totals(queryset=None):
+    """Valeur du stock ingrédients (une requête)"""
+    from kitchen.models import Ingredient
+
+    queryset = Ingredient.objects.filter(is_active=True) if queryset is None else queryset
+    return _total(queryset, 'quantite_restante', 'cout_moyen', 'prix_unitaire', 'seuil_alerte')
+
+
+def cost_of_goods_sold(start, end):
+    """Coût des ventes payées entre `start` et `end` (coûts figés sur les lignes)"""
+    from sales.models import SaleItem
+
+    cost = SaleItem.cost_expression()
+    return SaleItem.objects.filter(
+        sale__status='paid', sale__created_at__gte=start, sale__created_at__lt=end
+    ).aggregate(
+        cost=Coalesce(Sum(cost), ZERO, output_field=DecimalField(max_digits=20, decimal_places=2))
+    )['cost']
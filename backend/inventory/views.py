@@ -4,11 +4,14 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Sum, F, Q
+from django.db.models import Sum, F, Max
 from django.utils import timezone
+from datetime import date
 from decimal import Decimal
 
 from .models import StockMovement, Purchase, PurchaseItem
+from .receiving import ReceiptError, receive_purchase
+from .valuation import cost_of_goods_sold, ingredient_stock_totals, product_stock_totals, stock_value_expression
 from rest_framework import permissions
 from .serializers import (
     StockMovementSerializer, PurchaseSerializer, PurchaseItemSerializer,
@@ -112,41 +115,15 @@ class SupplyViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Mettre à jour le stock pour chaque produit
-        for item in supply.items.all():
-            # Si quantity_received est 0, utiliser quantity_ordered (validation automatique)
-            quantity_to_receive = item.quantity_received if item.quantity_received > 0 else item.quantity_ordered
-            
-            # Mettre à jour quantity_received si elle était à 0
-            if item.quantity_received == 0:
-                item.quantity_received = item.quantity_ordered
-                item.save()
-            
-            product = item.product
-            old_stock = product.current_stock
-            product.current_stock += quantity_to_receive
-            product.save()
-            
-            # Créer un mouvement de stock
-            StockMovement.objects.create(
-                product=product,
-                movement_type='in',
-                reason='purchase',
-                quantity=quantity_to_receive,
-                unit_price=item.unit_price,
-                total_amount=quantity_to_receive * item.unit_price,
-                stock_before=old_stock,
-                stock_after=product.current_stock,
-                supplier=supply.supplier,
-                user=request.user,
-                reference=supply.reference,
-                notes=f"Validation approvisionnement {supply.reference}"
+        # Les quantités non saisies sont validées à la quantité commandée
+        try:
+            receive_purchase(
+                supply, user=request.user, status='validated', reference=supply.reference,
+                label=f"Validation approvisionnement {supply.reference}", fill_received=True
             )
-        
-        # Changer le statut à validé
-        supply.status = 'validated'
-        supply.save()
-        
+        except ReceiptError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         return Response({'message': 'Livraison validée et stock mis à jour.'})
     
     @action(detail=True, methods=['patch', 'post'])
@@ -274,6 +251,8 @@ class PurchaseViewSet(viewsets.ModelViewSet):
                 'purchase': serializer.data
             })
         
+        except ReceiptError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': f'Erreur lors de la réception: {str(e)}'},
@@ -294,7 +273,7 @@ class PurchaseViewSet(viewsets.ModelViewSet):
         reason = request.data.get('reason', 'Annulation manuelle')
         
         try:
-            purchase.cancel_purchase(reason)
+            purchase.cancel_purchase(reason, user=request.user)
             
             return Response({
                 'message': 'Achat annulé avec succès',
@@ -355,32 +334,57 @@ class StockSummaryView(APIView):
 
     def get(self, request):
         """Résumé complet du stock"""
+        # Valeur au coût moyen pondéré, dernier mouvement par agrégat (pas de requête par produit)
         products = Product.objects.select_related('category').annotate(
-            stock_value=F('current_stock') * F('purchase_price'),
-            needs_restock=Q(current_stock__lte=F('minimum_stock'))
+            valuation=stock_value_expression('current_stock', 'average_cost', 'purchase_price'),
+            last_movement_date=Max('stock_movements__created_at'),
         )
 
         summary_data = []
         for product in products:
-            # Dernier mouvement
-            last_movement = StockMovement.objects.filter(
-                product=product
-            ).order_by('-created_at').first()
-
             summary_data.append({
                 'product_id': product.id,
                 'product_name': product.name,
                 'category_name': product.category.name,
                 'current_stock': product.current_stock,
                 'minimum_stock': product.minimum_stock,
-                'stock_value': product.stock_value,
-                'last_movement_date': last_movement.created_at if last_movement else None,
+                'stock_value': product.valuation,
+                'last_movement_date': product.last_movement_date,
                 'needs_restock': product.current_stock <= product.minimum_stock
             })
 
         serializer = StockSummarySerializer(summary_data, many=True)
         return Response(serializer.data)
 
+class StockValuationView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Valeur du stock (produits et ingrédients) au coût moyen pondéré et
+        coût des ventes de la journée commerciale (?date=AAAA-MM-JJ)
+        """
+        from barstock_api.business_day import business_day_bounds, current_business_day
+
+        day = current_business_day()
+        if request.query_params.get('date'):
+            try:
+                day = date.fromisoformat(request.query_params['date'])
+            except ValueError:
+                return Response({'error': 'Date invalide (AAAA-MM-JJ)'}, status=status.HTTP_400_BAD_REQUEST)
+
+        products = product_stock_totals()
+        ingredients = ingredient_stock_totals()
+        return Response({
+            'products': products,
+            'ingredients': ingredients,
+            'total_value': products['value'] + ingredients['value'],
+            'business_day': day.isoformat(),
+            'cost_of_goods_sold': cost_of_goods_sold(*business_day_bounds(day)),
+            'valuation': 'weighted_average',
+            'currency': 'BIF'
+        })
+
 class LowStockView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -416,10 +420,17 @@ class ProductMovementsView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+        from archive.services import opening_balance, with_archive
+
         movements = StockMovement.objects.filter(
             product=product
-        ).order_by('-created_at')
+        ).select_related('product', 'user').order_by('-created_at')
+
+        # Historique complet à la demande : lignes chaudes + archives
+        if request.query_params.get('include_archive', '').lower() in ('1', 'true'):
+            movements = with_archive(movements, 'created_at')
 
+        opening = opening_balance('product', product.id)
         serializer = StockMovementSerializer(movements, many=True)
         return Response({
             'product': {
@@ -427,6 +438,10 @@ class ProductMovementsView(APIView):
                 'name': product.name,
                 'current_stock': product.current_stock
             },
+            'opening_balance': {
+                'date': opening.cutoff,
+                'quantity': opening.quantity,
+            } if opening else None,
             'movements': serializer.data
         })
 
@@ -0,0 +1,191 @@
+"""
+Propagation du coût des ingrédients vers le prix d'achat des plats
+
+Index inverse ingrédient -> recettes, gardé en mémoire du process :
+    - construit en une requête au premier usage ;
+    - tenu à jour par les signaux de RecipeIngredient (kitchen/signals.py) ;
+    - une version dans le cache partagé indique aux autres process de le
+      reconstruire.
+
+Un changement de coût d'ingrédient (prix unitaire ou coût moyen pondéré), de quantité dans une recette ou de
+recette est mis en attente avec `schedule_cost_update()`. Les demandes
+d'une même transaction sont regroupées et traitées une seule fois après
+commit : une livraison qui change 40 prix recalcule chaque plat concerné
+une fois. Le recalcul lit les nomenclatures des recettes concernées en une
+requête et écrit les prix d'achat avec un seul `bulk_update`.
+"""
+
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+
+INDEX_VERSION_KEY = 'kitchen:recipe_index:version'
+
+_pending = threading.local()
+
+
+def _new_version():
+    # Basée sur l'heure : reste croissante même si la clé a été évincée
+    return int(time.time() * 1000)
+
+
+def _get_index_version():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        cache.add(INDEX_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(INDEX_VERSION_KEY)
+    return version
+
+
+def _bump_index_version():
+    try:
+        return cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        version = _new_version()
+        cache.set(INDEX_VERSION_KEY, version, timeout=None)
+        return version
+
+
+class RecipeIndex:
+    """Index inverse ingrédient -> ensemble des recettes qui l'utilisent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recipes_by_ingredient = {}
+        self._version = None
+
+    def _ensure_current(self):
+        version = _get_index_version()
+        if self._version == version:
+            return
+        from .models import RecipeIngredient
+
+        index = {}
+        for ingredient_id, recipe_id in RecipeIngredient.objects.values_list('ingredient_id', 'recipe_id'):
+            index.setdefault(ingredient_id, set()).add(recipe_id)
+        with self._lock:
+            self._recipes_by_ingredient = index
+            self._version = version
+
+    def recipes_for(self, ingredient_ids):
+        """Recettes utilisant au moins un des ingrédients"""
+        self._ensure_current()
+        with self._lock:
+            recipe_ids = set()
+            for ingredient_id in ingredient_ids:
+                recipe_ids |= self._recipes_by_ingredient.get(ingredient_id, set())
+        return recipe_ids
+
+    def add(self, ingredient_id, recipe_id):
+        self._change(lambda index: index.setdefault(ingredient_id, set()).add(recipe_id))
+
+    def remove(self, ingredient_id, recipe_id):
+        self._change(lambda index: index.get(ingredient_id, set()).discard(recipe_id))
+
+    def _change(self, apply):
+        with self._lock:
+            apply(self._recipes_by_ingredient)
+            new_version = _bump_index_version()
+            # À jour seulement si aucun autre process n'a modifié l'index entre-temps
+            if self._version is not None and new_version == self._version + 1:
+                self._version = new_version
+            else:
+                self._version = None
+
+
+recipe_index = RecipeIndex()
+
+
+def schedule_cost_update(ingredient_ids=(), recipe_ids=()):
+    """
+    Met en attente le recalcul des plats concernés ; traité une fois
+    après le commit de la transaction en cours (tout de suite hors transaction)
+    """
+    if not hasattr(_pending, 'ingredients'):
+        _pending.ingredients, _pending.recipes = set(), set()
+    _pending.ingredients.update(ingredient_ids)
+    _pending.recipes.update(recipe_ids)
+    # Un rappel par demande : le premier traite tout, les suivants n'ont plus rien
+    transaction.on_commit(flush_cost_updates)
+
+
+def flush_cost_updates():
+    """Traite les recalculs en attente dans ce thread"""
+    ingredient_ids = getattr(_pending, 'ingredients', set())
+    recipe_ids = getattr(_pending, 'recipes', set())
+    if not ingredient_ids and not recipe_ids:
+        return []
+    _pending.ingredients, _pending.recipes = set(), set()
+
+    recipe_ids = set(recipe_ids) | recipe_index.recipes_for(ingredient_ids)
+    return propagate_costs(recipe_ids)
+
+
+def propagate_costs(recipe_ids=None):
+    """
+    Recalcule le prix d'achat des plats des recettes `recipe_ids` (toutes
+    si None). Une requête de lecture, un bulk_update des seuls prix modifiés.
+    Retourne le détail par plat.
+    """
+    from products.models import Product
+    from barstock_api.conditional import invalidate_model
+    from .models import Recipe
+
+    recipes = Recipe.objects.all()
+    if recipe_ids is not None:
+        if not recipe_ids:
+            return []
+        recipes = recipes.filter(id__in=recipe_ids)
+
+    # LEFT JOIN : une recette sans ingrédient donne une ligne vide (coût 0).
+    # Coût de l'ingrédient : Ingredient.unit_cost, calculé en SQL
+    rows = recipes.annotate(
+        ingredient_cost=Coalesce(
+            NullIf('ingredients__ingredient__cout_moyen', 0), 'ingredients__ingredient__prix_unitaire',
+            output_field=DecimalField(max_digits=12, decimal_places=4)
+        )
+    ).values_list(
+        'id', 'nom_recette', 'plat_id', 'plat__name', 'plat__purchase_price',
+        'ingredients__quantite_utilisee_par_plat', 'ingredient_cost'
+    )
+
+    costs = {}
+    for recipe_id, recipe_name, plat_id, plat_name, old_price, quantity, unit_price in rows:
+        entry = costs.setdefault(recipe_id, {
+            'recipe_name': recipe_name,
+            'product_id': plat_id,
+            'product_name': plat_name,
+            'old_price': old_price,
+            'total': Decimal('0.00'),
+            'ingredients_count': 0,
+        })
+        if quantity is not None:
+            entry['total'] += quantity * unit_price
+            entry['ingredients_count'] += 1
+
+    now = timezone.now()
+    changed = []
+    details = []
+    for entry in costs.values():
+        new_price = entry['total'].quantize(Decimal('0.01'))
+        if new_price != entry['old_price']:
+            changed.append(Product(pk=entry['product_id'], purchase_price=new_price, updated_at=now))
+        details.append({
+            'product_name': entry['product_name'],
+            'recipe_name': entry['recipe_name'],
+            'old_purchase_price': float(entry['old_price']),
+            'new_purchase_price': float(new_price),
+            'difference': float(new_price - entry['old_price']),
+            'ingredients_count': entry['ingredients_count'],
+        })
+
+    if changed:
+        Product.objects.bulk_update(changed, ['purchase_price', 'updated_at'])
+        invalidate_model(Product)
+    return details
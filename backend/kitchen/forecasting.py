@@ -0,0 +1,220 @@
+"""
+Prévision de la demande par produit (tout le menu)
+
+Historique : ventes journalières par produit sur HISTORY_DAYS journées
+commerciales, lues en une requête puis rangées dans une matrice NumPy
+(produits x jours).
+
+Modèle : lissage exponentiel avec saisonnalité hebdomadaire additive
+(niveau + effet du jour de la semaine, sans tendance). Les paramètres
+(alpha, gamma) sont choisis par produit dans une petite grille, en
+évaluant toute la grille pour tous les produits à la fois : la seule
+boucle Python porte sur les jours d'historique.
+
+Intervalles de prévision : écart-type des erreurs à un pas, élargi avec
+l'horizon (approximation du lissage simple), loi normale.
+
+Le résultat est mis en cache pour la journée commerciale en cours.
+"""
+
+import math
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import DateTimeField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from barstock_api.business_day import business_day_bounds, current_business_day, get_cutoff_hour
+
+HISTORY_DAYS = 8 * 7
+SEASON_LENGTH = 7
+FORECAST_CACHE_TIMEOUT = 24 * 60 * 60
+
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7)
+GAMMAS = (0.05, 0.1, 0.2, 0.3)
+
+# Quantile de la loi normale pour un intervalle à 80 %
+Z_80 = 1.2816
+
+
+def load_history(end_day, days=HISTORY_DAYS):
+    """
+    Retourne (product_ids, names, matrice produits x jours) des quantités
+    vendues sur les `days` journées commerciales finissant à `end_day`
+    (incluse). Tous les produits actifs sont présents, même sans vente.
+    """
+    import numpy as np
+    from products.models import Product
+    from sales.models import SaleItem
+
+    first_day = end_day - timedelta(days=days - 1)
+    start, _ = business_day_bounds(first_day)
+    _, end = business_day_bounds(end_day)
+
+    products = list(Product.objects.filter(is_active=True).order_by('id').values_list('id', 'name'))
+    product_ids = np.array([pk for pk, _name in products], dtype=np.int64)
+
+    # Journée commerciale = date locale après retrait de l'heure de bascule
+    business_day = TruncDate(
+        ExpressionWrapper(
+            F('sale__created_at') - timedelta(hours=get_cutoff_hour()),
+            output_field=DateTimeField()
+        ),
+        tzinfo=timezone.get_current_timezone()
+    )
+    rows = list(
+        SaleItem.objects.filter(
+            sale__created_at__gte=start,
+            sale__created_at__lt=end,
+            product__is_active=True
+        ).exclude(sale__status='cancelled')
+        .annotate(day=business_day)
+        .values_list('product_id', 'day')
+        .annotate(quantity=Sum('quantity'))
+        .order_by()
+    )
+
+    history = np.zeros((len(products), days))
+    if rows:
+        row_products, row_days, quantities = zip(*rows)
+        index = np.searchsorted(product_ids, np.array(row_products, dtype=np.int64))
+        offsets = np.array([(day - first_day).days for day in row_days])
+        np.add.at(history, (index, offsets), np.array(quantities, dtype=float))
+
+    return product_ids, [name for _pk, name in products], history
+
+
+def fit_seasonal_smoothing(history, season=SEASON_LENGTH):
+    """
+    Ajuste le modèle pour tous les produits (lignes de `history`).
+    Retourne (level, seasonal, alpha, sigma) : niveau final (P,), effets
+    des `season` derniers jours (P, season), alpha retenu (P,) et
+    écart-type des erreurs à un pas (P,).
+    """
+    import numpy as np
+
+    alphas, gammas = np.meshgrid(ALPHAS, GAMMAS, indexing='ij')
+    alphas = alphas.reshape(-1, 1)  # (G, 1) : diffusé sur les produits
+    gammas = gammas.reshape(-1, 1)
+    grid_size = alphas.shape[0]
+    n_products, n_days = history.shape
+
+    # Initialisation sur la première semaine, identique pour toute la grille
+    first_week = history[:, :season]
+    level = np.broadcast_to(first_week.mean(axis=1), (grid_size, n_products)).copy()
+    seasonal = np.broadcast_to(
+        first_week - first_week.mean(axis=1, keepdims=True), (grid_size, n_products, season)
+    ).copy()
+
+    sse = np.zeros((grid_size, n_products))
+    for t in range(season, n_days):
+        y = history[:, t]
+        slot = t % season
+        error = y - (level + seasonal[:, :, slot])
+        sse += error ** 2
+        new_level = alphas * (y - seasonal[:, :, slot]) + (1 - alphas) * level
+        seasonal[:, :, slot] = gammas * (y - new_level) + (1 - gammas) * seasonal[:, :, slot]
+        level = new_level
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_products)
+    steps = max(n_days - season, 1)
+
+    # Saisonnalité réordonnée : colonne k = jour t+1+k modulo la saison
+    next_slot = n_days % season
+    order = (next_slot + np.arange(season)) % season
+    return (
+        level[best, columns],
+        seasonal[best, columns][:, order],
+        alphas[best, 0],
+        np.sqrt(sse[best, columns] / steps),
+    )
+
+
+def forecast(level, seasonal, alpha, sigma, horizon=SEASON_LENGTH):
+    """
+    Prévisions des `horizon` prochains jours : tableaux (P, horizon) de la
+    valeur prévue, de l'écart-type et des bornes 80 %.
+    """
+    import numpy as np
+
+    steps = np.arange(horizon)
+    point = np.maximum(level[:, None] + seasonal[:, steps % seasonal.shape[1]], 0)
+    # Variance à h pas : sigma² (1 + (h-1) alpha²)
+    spread = sigma[:, None] * np.sqrt(1 + steps[None, :] * alpha[:, None] ** 2)
+    return {
+        'point': point,
+        'spread': spread,
+        'lower': np.maximum(point - Z_80 * spread, 0),
+        'upper': point + Z_80 * spread,
+    }
+
+
+def _confidence(point, lower, upper):
+    if point <= 0:
+        return 'low'
+    width = (upper - lower) / point
+    if width < 0.5:
+        return 'high'
+    return 'medium' if width < 1.5 else 'low'
+
+
+def build_forecast(day=None):
+    """Prévisions de tous les produits pour le lendemain et la semaine suivante"""
+    import numpy as np
+
+    day = day or current_business_day()
+    history_end = day - timedelta(days=1)  # dernière journée complète
+    product_ids, names, history = load_history(history_end)
+
+    items = []
+    if len(product_ids):
+        level, seasonal, alpha, sigma = fit_seasonal_smoothing(history)
+        # La journée en cours est prévue aussi : demain est le 2e pas
+        result = forecast(level, seasonal, alpha, sigma, horizon=SEASON_LENGTH + 1)
+        week = slice(1, SEASON_LENGTH + 1)
+        week_point = result['point'][:, week].sum(axis=1)
+        # Erreurs journalières supposées indépendantes
+        week_spread = np.sqrt((result['spread'][:, week] ** 2).sum(axis=1))
+        historical_avg = history[:, -SEASON_LENGTH:].mean(axis=1)
+
+        for i, product_id in enumerate(product_ids.tolist()):
+            point, lower, upper = (float(result[key][i, 1]) for key in ('point', 'lower', 'upper'))
+            items.append({
+                'product_id': product_id,
+                'product_name': names[i],
+                'forecast_quantity': math.ceil(round(point, 6)),
+                'forecast': round(point, 2),
+                'lower': round(lower, 2),
+                'upper': round(upper, 2),
+                'next_week': {
+                    'forecast': round(float(week_point[i]), 2),
+                    'lower': round(max(float(week_point[i] - Z_80 * week_spread[i]), 0), 2),
+                    'upper': round(float(week_point[i] + Z_80 * week_spread[i]), 2),
+                },
+                'historical_avg': round(float(historical_avg[i]), 2),
+                'confidence': _confidence(point, lower, upper),
+            })
+        items.sort(key=lambda item: item['forecast'], reverse=True)
+
+    return {
+        'forecast_date': (day + timedelta(days=1)).isoformat(),
+        'week_start': (day + timedelta(days=1)).isoformat(),
+        'items': items,
+        'total_items': len(items),
+        'based_on_days': HISTORY_DAYS,
+        'interval': 0.8,
+        'model': 'seasonal_exponential_smoothing',
+    }
+
+
+def get_forecast(day=None):
+    """Prévisions mises en cache pour la journée commerciale"""
+    day = day or current_business_day()
+    key = f'kitchen:forecast:{day.isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = build_forecast(day)
+        cache.set(key, data, FORECAST_CACHE_TIMEOUT)
+    return data
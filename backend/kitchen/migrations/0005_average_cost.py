@@ -0,0 +1,27 @@
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_cout_moyen(apps, schema_editor):
+    """Stock existant valorisé à partir du prix unitaire actuel (une requête)"""
+    Ingredient = apps.get_model('kitchen', 'Ingredient')
+    Ingredient.objects.update(cout_moyen=F('prix_unitaire'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0004_alter_ingredient_fournisseur'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='cout_moyen',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.0000'))], verbose_name='Coût moyen pondéré (BIF)'),
+        ),
+        migrations.RunPython(seed_cout_moyen, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,10 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
+
 
 class Ingredient(models.Model):
     """
@@ -58,6 +62,15 @@ class Ingredient(models.Model):
         verbose_name='Prix unitaire (BIF)'
     )
 
+    # Coût moyen pondéré des entrées en stock (inventory/valuation.py)
+    cout_moyen = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        validators=[MinValueValidator(Decimal('0.0000'))],
+        default=Decimal('0.0000'),
+        verbose_name='Coût moyen pondéré (BIF)'
+    )
+
     # Informations supplémentaires
     description = models.TextField(
         blank=True,
@@ -109,8 +122,19 @@ class Ingredient(models.Model):
 
     @property
     def stock_value(self):
-        """Calcule la valeur du stock"""
-        return self.quantite_restante * self.prix_unitaire
+        """Calcule la valeur du stock au coût moyen pondéré"""
+        return (self.quantite_restante * self.unit_cost).quantize(Decimal('0.01'))
+
+    @property
+    def unit_cost(self):
+        """Coût moyen pondéré, ou prix unitaire tant qu'aucune entrée n'est valorisée"""
+        return self.cout_moyen or self.prix_unitaire
+
+    def save(self, *args, **kwargs):
+        # Stock initial valorisé au prix unitaire
+        if self._state.adding and not self.cout_moyen:
+            self.cout_moyen = self.prix_unitaire
+        super().save(*args, **kwargs)
 
     def can_fulfill_quantity(self, quantity_needed):
         """Vérifie si on peut satisfaire une quantité demandée"""
@@ -345,11 +369,11 @@ class Recipe(models.Model):
 
     @property
     def total_cost(self):
-        """Calcule le coût total de la recette"""
+        """Calcule le coût total de la recette (coût moyen pondéré des ingrédients)"""
         total = Decimal('0.00')
         for ingredient_recipe in self.ingredients.all():
             ingredient_cost = (ingredient_recipe.quantite_utilisee_par_plat *
-                             ingredient_recipe.ingredient.prix_unitaire)
+                             ingredient_recipe.ingredient.unit_cost)
             total += ingredient_cost
         return total
 
@@ -492,7 +516,7 @@ class Recipe(models.Model):
 
             # Log détaillé pour debug
             error_msg = f"Erreur lors de la consommation des ingrédients pour {self.nom_recette}: {str(e)}"
-            print(f"🚨 {error_msg}")
+            events.warning('kitchen.recipe.consume_failed', recipe=self.id, error=str(e))
 
             # Re-lever l'exception avec plus de contexte
             raise ValidationError({
@@ -614,7 +638,9 @@ class Recipe(models.Model):
     def update_product_purchase_price(self):
         """
         Met à jour automatiquement le prix d'achat du produit lié
-        basé sur le coût total des ingrédients de la recette
+        basé sur le coût total des ingrédients de la recette.
+        Les changements de prix et de composition passent par
+        kitchen/costing.py (regroupés, après commit).
 
         Exemple: Riz au Poulet
         - Riz: 300 FBU + Poulet: 2000 FBU + Huile: 200 FBU + Épices: 500 FBU = 3000 FBU
@@ -633,22 +659,14 @@ class Recipe(models.Model):
                     {
                         'ingredient': ing.ingredient.nom,
                         'quantity': ing.quantite_utilisee_par_plat,
-                        'unit_price': ing.ingredient.prix_unitaire,
-                        'total_cost': ing.quantite_utilisee_par_plat * ing.ingredient.prix_unitaire
+                        'unit_price': ing.ingredient.unit_cost,
+                        'total_cost': ing.quantite_utilisee_par_plat * ing.ingredient.unit_cost
                     }
                     for ing in self.ingredients.all()
                 ]
             }
         return None
 
-    def save(self, *args, **kwargs):
-        """
-        Surcharge save pour mettre à jour automatiquement le prix d'achat du produit
-        """
-        super().save(*args, **kwargs)
-        # Mettre à jour le prix d'achat du produit après sauvegarde
-        self.update_product_purchase_price()
-
 
 class RecipeIngredient(models.Model):
     """
@@ -711,7 +729,7 @@ class RecipeIngredient(models.Model):
     @property
     def cost_per_portion(self):
         """Calcule le coût de cet ingrédient pour une portion"""
-        return self.quantite_utilisee_par_plat * self.ingredient.prix_unitaire
+        return self.quantite_utilisee_par_plat * self.ingredient.unit_cost
 
     @property
     def is_available(self):
@@ -731,24 +749,9 @@ class RecipeIngredient(models.Model):
     def save(self, *args, **kwargs):
         # Validation avant sauvegarde
         self.clean()
+        # Le prix d'achat du plat est recalculé après commit (kitchen/costing.py)
         super().save(*args, **kwargs)
 
-        # Mettre à jour automatiquement le prix d'achat du produit lié
-        # après modification des ingrédients
-        if self.recipe:
-            self.recipe.update_product_purchase_price()
-
-    def delete(self, *args, **kwargs):
-        """
-        Surcharge delete pour mettre à jour le prix d'achat après suppression
-        """
-        recipe = self.recipe
-        super().delete(*args, **kwargs)
-
-        # Mettre à jour le prix d'achat après suppression de l'ingrédient
-        if recipe:
-            recipe.update_product_purchase_price()
-
 
 class IngredientSubstitution(models.Model):
     """
@@ -953,11 +956,10 @@ class RecipePreparationBatch(models.Model):
             self.status = 'rolled_back'
             self.save()
 
-            print(f"✅ Rollback réussi pour lot #{self.id}")
-            print(f"   📋 {len(rollback_movements)} mouvements de compensation créés")
+            events.info('kitchen.batch.rolled_back', batch=self.id, movements=len(rollback_movements))
 
-        except Exception as e:
-            print(f"❌ Erreur lors du rollback: {e}")
+        except Exception:
+            events.exception('kitchen.batch.rollback_failed', batch=self.id)
             raise
 
         return rollback_movements
@@ -0,0 +1,192 @@
+"""
+Besoins en ingrédients et liste d'achats à partir d'une demande par produit
+
+La nomenclature (RecipeIngredient des recettes actives) est lue en une
+requête et rangée en matrice creuse produits x ingrédients (triplets
+ligne / colonne / quantité, convertie dans l'unité de stock de
+l'ingrédient). Les besoins sont le produit de cette matrice par le vecteur
+de demande, calculé en une opération NumPy (`bincount` pondéré).
+
+    à acheter = max(besoin + seuil_alerte - quantite_restante, 0)
+
+La demande vient des prévisions (kitchen/forecasting.py) ou d'un plan
+explicite (ex: un événement : {produit: quantité}).
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from .models import Ingredient, RecipeIngredient
+
+# Conversion d'une unité de recette vers l'unité de stock de l'ingrédient
+UNIT_FACTORS = {
+    ('g', 'kg'): 0.001,
+    ('kg', 'g'): 1000,
+    ('ml', 'L'): 0.001,
+    ('L', 'ml'): 1000,
+}
+
+NO_SUPPLIER = 'Non défini'
+
+
+class InvalidPlan(ValueError):
+    """Plan de production illisible"""
+
+
+def unit_factor(from_unit, to_unit):
+    """Facteur de conversion, ou None si les unités sont incompatibles"""
+    if from_unit == to_unit:
+        return 1
+    return UNIT_FACTORS.get((from_unit, to_unit))
+
+
+def forecast_demand(horizon='day', basis='forecast'):
+    """
+    Demande par produit tirée des prévisions : lendemain (`day`) ou semaine
+    suivante (`week`), valeur prévue (`forecast`) ou borne haute (`upper`)
+    """
+    from .forecasting import get_forecast
+
+    demand = {}
+    for item in get_forecast()['items']:
+        values = item['next_week'] if horizon == 'week' else item
+        demand[item['product_id']] = values['upper' if basis == 'upper' else 'forecast']
+    return demand
+
+
+def parse_plan(plan):
+    """[{"product": id, "quantity": n}, ...] -> {id: n} (quantités cumulées)"""
+    if not isinstance(plan, list) or not plan:
+        raise InvalidPlan('Le plan doit être une liste non vide de {product, quantity}')
+
+    demand = {}
+    for line in plan:
+        try:
+            product_id = int(line['product'])
+            quantity = float(Decimal(str(line['quantity'])))
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            raise InvalidPlan(f'Ligne de plan invalide: {line}')
+        if quantity < 0:
+            raise InvalidPlan(f'Quantité négative pour le produit {product_id}')
+        demand[product_id] = demand.get(product_id, 0) + quantity
+    return demand
+
+
+def build_purchase_plan(demand, safety_stock=True):
+    """
+    Liste d'achats pour couvrir `demand` ({product_id: quantité}).
+    Retourne {'items', 'by_supplier', 'summary', 'warnings'}.
+    """
+    import numpy as np
+
+    ingredients = list(
+        Ingredient.objects.filter(is_active=True).select_related('fournisseur').order_by('nom')
+    )
+    ingredient_index = {ingredient.pk: i for i, ingredient in enumerate(ingredients)}
+
+    bom = RecipeIngredient.objects.filter(
+        recipe__is_active=True, is_optional=False, ingredient__is_active=True
+    ).values_list('recipe__plat_id', 'ingredient_id', 'quantite_utilisee_par_plat', 'unite', 'ingredient__unite')
+
+    product_index = {}
+    rows, cols, quantities = [], [], []
+    warnings = []
+    for product_id, ingredient_id, quantity, unit, stock_unit in bom:
+        factor = unit_factor(unit, stock_unit)
+        if factor is None:
+            warnings.append(
+                f"Unité {unit} incompatible avec {stock_unit} (ingrédient {ingredient_id}, produit {product_id})"
+            )
+            continue
+        rows.append(product_index.setdefault(product_id, len(product_index)))
+        cols.append(ingredient_index[ingredient_id])
+        quantities.append(float(quantity) * factor)
+
+    demand_vector = np.zeros(len(product_index))
+    for product_id, quantity in demand.items():
+        if product_id in product_index:
+            demand_vector[product_index[product_id]] = quantity
+    without_recipe = sorted(pk for pk, quantity in demand.items() if quantity and pk not in product_index)
+
+    # Besoins = nomenclatureᵀ x demande
+    required = np.bincount(
+        np.array(cols, dtype=np.int64),
+        weights=np.array(quantities) * demand_vector[np.array(rows, dtype=np.int64)],
+        minlength=len(ingredients)
+    )
+    stock = np.array([float(ingredient.quantite_restante) for ingredient in ingredients])
+    threshold = np.array([float(ingredient.seuil_alerte) for ingredient in ingredients])
+    unit_price = np.array([float(ingredient.prix_unitaire) for ingredient in ingredients])
+
+    to_buy = np.maximum(required + (threshold if safety_stock else 0) - stock, 0)
+    to_buy = np.round(to_buy, 3)
+    cost = to_buy * unit_price
+    critical = (stock < required) | (stock <= threshold * 0.3)
+
+    items = []
+    by_supplier = {}
+    # Les plus urgents d'abord, puis par coût
+    for i in sorted(np.flatnonzero(to_buy > 0), key=lambda i: (not critical[i], -cost[i])):
+        ingredient = ingredients[i]
+        supplier = ingredient.fournisseur
+        item = {
+            'ingredient_id': ingredient.pk,
+            'name': ingredient.nom,
+            'current_stock': float(stock[i]),
+            'alert_threshold': float(threshold[i]),
+            'required_quantity': round(float(required[i]), 3),
+            'recommended_quantity': float(to_buy[i]),
+            'unit': ingredient.unite,
+            'unit_price': float(unit_price[i]),
+            'estimated_cost': round(float(cost[i]), 2),
+            'supplier_id': supplier.pk if supplier else None,
+            'supplier': supplier.name if supplier else NO_SUPPLIER,
+            'urgency': 'critical' if critical[i] else 'normal',
+        }
+        items.append(item)
+
+        group = by_supplier.setdefault(item['supplier_id'], {
+            'supplier_id': item['supplier_id'],
+            'supplier_name': item['supplier'],
+            'items': [],
+            'total_cost': 0,
+        })
+        group['items'].append(item)
+        group['total_cost'] = round(group['total_cost'] + item['estimated_cost'], 2)
+
+    return {
+        'items': items,
+        'by_supplier': list(by_supplier.values()),
+        'summary': {
+            'total_items': len(items),
+            'estimated_total_cost': round(float(cost.sum()), 2),
+            'critical_items': sum(1 for item in items if item['urgency'] == 'critical'),
+            'suppliers_count': len(by_supplier),
+            'products_planned': sum(1 for quantity in demand.values() if quantity),
+            'products_without_recipe': without_recipe,
+            'currency': 'BIF',
+        },
+        'warnings': warnings,
+    }
+
+
+def purchase_plan_for_request(request):
+    """
+    Liste d'achats selon la requête :
+        GET  ?horizon=day|week&basis=forecast|upper  -> prévisions
+        POST {"plan": [{"product": id, "quantity": n}, ...]} -> plan explicite
+    `safety_stock=false` pour ne pas viser le seuil d'alerte.
+    """
+    params = request.query_params
+    safety_stock = params.get('safety_stock', 'true').lower() != 'false'
+
+    if request.method == 'POST':
+        demand = parse_plan(request.data.get('plan'))
+        source = 'plan'
+    else:
+        horizon = 'week' if params.get('horizon') == 'week' else 'day'
+        demand = forecast_demand(horizon, params.get('basis', 'forecast'))
+        source = f'forecast_{horizon}'
+
+    result = build_purchase_plan(demand, safety_stock=safety_stock)
+    result['source'] = source
+    return result
@@ -3,6 +3,9 @@ from decimal import Decimal
 from .models import Ingredient, IngredientMovement, Recipe, RecipeIngredient
 from products.models import Product
 from suppliers.serializers import SupplierSerializer
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -18,11 +21,11 @@ class IngredientSerializer(serializers.ModelSerializer):
         model = Ingredient
         fields = [
             'id', 'nom', 'quantite_restante', 'unite', 'unite_display',
-            'seuil_alerte', 'prix_unitaire', 'description', 'fournisseur',
+            'seuil_alerte', 'prix_unitaire', 'cout_moyen', 'description', 'fournisseur',
             'fournisseur_name', 'is_active', 'is_low_stock', 'is_out_of_stock',
             'stock_value', 'date_maj', 'created_at'
         ]
-        read_only_fields = ['date_maj', 'created_at']
+        read_only_fields = ['cout_moyen', 'date_maj', 'created_at']
 
     def to_representation(self, instance):
         """Personnaliser la représentation pour formater les nombres"""
@@ -209,37 +212,33 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
-        
-        print(f"🔧 CREATE RECIPE - Recipe data: {validated_data}")
-        print(f"🔧 CREATE RECIPE - Ingredients data: {ingredients_data}")
+
 
         # Créer la recette (created_by sera ajouté par perform_create)
         recipe = Recipe.objects.create(**validated_data)
-        print(f"🔧 CREATE RECIPE - Recipe created: {recipe.id} - {recipe.nom_recette}")
         
         # Créer les ingrédients de la recette
         created_ingredients = []
         for ingredient_data in ingredients_data:
-            print(f"🔧 CREATE RECIPE - Creating ingredient: {ingredient_data}")
             recipe_ingredient = RecipeIngredient.objects.create(
                 recipe=recipe,
                 **ingredient_data
             )
             created_ingredients.append(recipe_ingredient)
-            print(f"🔧 CREATE RECIPE - Ingredient created: {recipe_ingredient}")
-        
-        print(f"🔧 CREATE RECIPE - Total ingredients created: {len(created_ingredients)}")
+
+        events.info(
+            'kitchen.recipe.created', recipe=recipe.id, name=recipe.nom_recette,
+            ingredients=len(created_ingredients)
+        )
         
         # Optionnel : Consommer les ingrédients si demandé
         consume_ingredients = self.context.get('request') and self.context['request'].data.get('consume_ingredients', False)
         if consume_ingredients:
             try:
-                print(f"🔧 CREATE RECIPE - Consuming ingredients for recipe preparation")
                 user = self.context['request'].user if self.context.get('request') else None
                 recipe.consume_ingredients(quantity=1, user=user)
-                print(f"🔧 CREATE RECIPE - Ingredients consumed successfully")
-            except Exception as e:
-                print(f"❌ CREATE RECIPE - Error consuming ingredients: {e}")
+            except Exception:
+                events.exception('kitchen.recipe.consume_failed', recipe=recipe.id)
                 # Ne pas bloquer la création de la recette si la consommation échoue
         
         return recipe
@@ -259,45 +258,35 @@ class RecipeUpdateSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         from django.db import transaction
-        
-        print(f"🔧 UPDATE RECIPE - Starting update for recipe {instance.id}: {instance.nom_recette}")
-        print(f"🔧 UPDATE RECIPE - Validated data: {validated_data}")
-        
+
         ingredients_data = validated_data.pop('ingredients', [])
-        print(f"🔧 UPDATE RECIPE - Ingredients data: {ingredients_data}")
+        events.debug(
+            'kitchen.recipe.update_request', recipe=instance.id, fields=lambda: sorted(validated_data),
+            ingredients=len(ingredients_data)
+        )
         
         try:
             with transaction.atomic():
                 # Mettre à jour les champs de la recette
                 for attr, value in validated_data.items():
-                    print(f"🔧 UPDATE RECIPE - Setting {attr} = {value}")
                     setattr(instance, attr, value)
                 instance.save()
-                print(f"🔧 UPDATE RECIPE - Recipe fields updated successfully")
                 
                 # Si des ingrédients sont fournis, les mettre à jour
                 if ingredients_data:
                     # Supprimer tous les anciens ingrédients
-                    old_ingredients_count = instance.ingredients.count()
-                    print(f"🔧 UPDATE RECIPE - Found {old_ingredients_count} existing ingredients")
-                    
                     # Méthode alternative : utiliser bulk_delete pour éviter les problèmes de contraintes
                     try:
                         instance.ingredients.all().delete()
-                        print(f"🔧 UPDATE RECIPE - All old ingredients deleted with bulk_delete")
-                    except Exception as delete_error:
-                        print(f"❌ UPDATE RECIPE - Bulk delete failed: {delete_error}")
+                    except Exception:
+                        events.exception('kitchen.recipe.bulk_delete_failed', recipe=instance.id)
                         # Fallback: supprimer un par un
                         for old_ingredient in instance.ingredients.all():
-                            print(f"🔧 UPDATE RECIPE - Deleting ingredient individually: {old_ingredient}")
                             old_ingredient.delete()
-                        print(f"🔧 UPDATE RECIPE - All old ingredients deleted individually")
                     
                     # Créer les nouveaux ingrédients
                     created_ingredients = []
                     for i, ingredient_data in enumerate(ingredients_data):
-                        print(f"🔧 UPDATE RECIPE - Creating ingredient {i+1}/{len(ingredients_data)}: {ingredient_data}")
-                        
                         # Validation des données avant création
                         if not ingredient_data.get('ingredient'):
                             raise ValueError(f"Ingredient ID manquant pour l'ingrédient {i+1}")
@@ -310,7 +299,6 @@ class RecipeUpdateSerializer(serializers.ModelSerializer):
                         try:
                             from .models import Ingredient
                             ingredient_obj = Ingredient.objects.get(id=ingredient_data['ingredient'])
-                            print(f"🔧 UPDATE RECIPE - Ingredient found: {ingredient_obj}")
                         except Ingredient.DoesNotExist:
                             raise ValueError(f"Ingrédient avec ID {ingredient_data['ingredient']} n'existe pas")
                         
@@ -323,18 +311,12 @@ class RecipeUpdateSerializer(serializers.ModelSerializer):
                             notes=ingredient_data.get('notes', '')
                         )
                         created_ingredients.append(recipe_ingredient)
-                        print(f"🔧 UPDATE RECIPE - Ingredient created: {recipe_ingredient}")
-                    
-                    print(f"🔧 UPDATE RECIPE - Total new ingredients created: {len(created_ingredients)}")
-                
-                print(f"🔧 UPDATE RECIPE - Recipe update completed successfully")
-            
-        except Exception as e:
-            print(f"❌ UPDATE RECIPE - Error during update: {e}")
-            print(f"❌ UPDATE RECIPE - Error type: {type(e).__name__}")
-            import traceback
-            print(f"❌ UPDATE RECIPE - Traceback: {traceback.format_exc()}")
-            raise e
+
+            events.info('kitchen.recipe.updated', recipe=instance.id, ingredients=len(ingredients_data))
+
+        except Exception:
+            events.exception('kitchen.recipe.update_failed', recipe=instance.id)
+            raise
         
         return instance
 
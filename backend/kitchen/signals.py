@@ -2,16 +2,21 @@
 Signaux pour le système d'alertes automatiques des ingrédients
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from .models import Ingredient, IngredientMovement
+from barstock_api.events import get_event_logger
+
+from .costing import recipe_index, schedule_cost_update
+from .models import Ingredient, IngredientMovement, Recipe, RecipeIngredient
 from reports.models import StockAlert
 
+events = get_event_logger(__name__)
+
 
 @receiver(pre_save, sender=Ingredient)
 def check_ingredient_stock_before_save(sender, instance, **kwargs):
@@ -24,14 +29,17 @@ def check_ingredient_stock_before_save(sender, instance, **kwargs):
             instance._old_quantite = old_instance.quantite_restante
             instance._was_low_stock = old_instance.is_low_stock
             instance._was_out_of_stock = old_instance.is_out_of_stock
+            instance._old_unit_cost = old_instance.unit_cost
         except Ingredient.DoesNotExist:
             instance._old_quantite = None
             instance._was_low_stock = False
             instance._was_out_of_stock = False
+            instance._old_unit_cost = None
     else:
         instance._old_quantite = None
         instance._was_low_stock = False
         instance._was_out_of_stock = False
+        instance._old_unit_cost = None
 
 
 @receiver(post_save, sender=Ingredient)
@@ -61,7 +69,7 @@ def check_ingredient_stock_alerts(sender, instance, created, **kwargs):
             message=f"RUPTURE DE STOCK: {instance.nom} (0 {instance.unite})"
         )
         alert_created = True
-        print(f"🔴 ALERTE RUPTURE: {instance.nom}")
+        events.warning('kitchen.stock.out_of_stock', ingredient=instance.nom)
     
     # Alerte de stock faible
     elif current_is_low_stock and not was_low_stock and not current_is_out_of_stock:
@@ -71,7 +79,10 @@ def check_ingredient_stock_alerts(sender, instance, created, **kwargs):
             message=f"STOCK FAIBLE: {instance.nom} ({instance.quantite_restante} {instance.unite}, seuil: {instance.seuil_alerte})"
         )
         alert_created = True
-        print(f"🟡 ALERTE STOCK FAIBLE: {instance.nom}")
+        events.warning(
+            'kitchen.stock.low', ingredient=instance.nom, stock=instance.quantite_restante,
+            threshold=instance.seuil_alerte, unit=instance.unite
+        )
     
     # Envoyer les notifications si une alerte a été créée
     if alert_created:
@@ -101,8 +112,8 @@ def create_stock_alert(ingredient, alert_type, message):
                 message=message,
                 is_resolved=False
             )
-    except Exception as e:
-        print(f"Erreur lors de la création de l'alerte: {e}")
+    except Exception:
+        events.exception('kitchen.alert.create_failed', ingredient=ingredient.nom, alert_type=alert_type)
 
 
 def send_stock_alert_notifications(ingredient):
@@ -137,8 +148,8 @@ def send_stock_alert_notifications(ingredient):
         # Notification WebSocket en temps réel
         send_websocket_alert(context)
         
-    except Exception as e:
-        print(f"Erreur lors de l'envoi des notifications: {e}")
+    except Exception:
+        events.exception('kitchen.alert.notify_failed', ingredient=ingredient.nom)
 
 
 def send_email_alert(context):
@@ -168,10 +179,10 @@ def send_email_alert(context):
             fail_silently=True
         )
         
-        print(f"📧 Email d'alerte envoyé pour {context['ingredient'].nom}")
-        
-    except Exception as e:
-        print(f"Erreur envoi email: {e}")
+        events.info('kitchen.alert.email_sent', ingredient=context['ingredient'].nom)
+
+    except Exception:
+        events.exception('kitchen.alert.email_failed', ingredient=context['ingredient'].nom)
 
 
 def send_sms_alert(context):
@@ -197,14 +208,14 @@ def send_sms_alert(context):
                     message=sms_message
                 )
                 if result.get('success'):
-                    print(f"📱 SMS d'alerte envoyé à {phone_number}")
+                    events.info('kitchen.alert.sms_sent', phone=phone_number)
                 else:
-                    print(f"❌ Échec SMS à {phone_number}: {result.get('error')}")
-            except Exception as e:
-                print(f"Erreur SMS pour {phone_number}: {e}")
-                
-    except Exception as e:
-        print(f"Erreur service SMS: {e}")
+                    events.warning('kitchen.alert.sms_failed', phone=phone_number, error=result.get('error'))
+            except Exception:
+                events.exception('kitchen.alert.sms_failed', phone=phone_number)
+
+    except Exception:
+        events.exception('kitchen.alert.sms_service_failed')
 
 
 def send_websocket_alert(context):
@@ -242,10 +253,44 @@ def send_websocket_alert(context):
                 }
             )
             
-            print(f"🔔 Alerte WebSocket envoyée pour {context['ingredient'].nom}")
-            
-    except Exception as e:
-        print(f"Erreur WebSocket: {e}")
+            events.info('kitchen.alert.websocket_sent', ingredient=context['ingredient'].nom)
+
+    except Exception:
+        events.exception('kitchen.alert.websocket_failed')
+
+
+@receiver(post_save, sender=Ingredient)
+def propagate_ingredient_price(sender, instance, created, **kwargs):
+    """
+    Changement de coût (coût moyen pondéré après un réapprovisionnement,
+    ou prix unitaire tant qu'il n'y en a pas) : recalcul des plats qui
+    utilisent l'ingrédient (regroupé après commit)
+    """
+    if created:
+        return
+    if instance.unit_cost != getattr(instance, '_old_unit_cost', None):
+        schedule_cost_update(ingredient_ids=[instance.pk])
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved(sender, instance, **kwargs):
+    """Composition modifiée : index inverse et coût de la recette"""
+    # Un ancien couple laissé dans l'index ne coûte qu'un recalcul inutile
+    recipe_index.add(instance.ingredient_id, instance.recipe_id)
+    schedule_cost_update(recipe_ids=[instance.recipe_id])
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted(sender, instance, **kwargs):
+    """Ingrédient retiré d'une recette"""
+    recipe_index.remove(instance.ingredient_id, instance.recipe_id)
+    schedule_cost_update(recipe_ids=[instance.recipe_id])
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    """Nouvelle recette ou plat changé : coût de la recette"""
+    schedule_cost_update(recipe_ids=[instance.pk])
 
 
 @receiver(post_save, sender=IngredientMovement)
@@ -254,8 +299,14 @@ def log_ingredient_movement(sender, instance, created, **kwargs):
     Log les mouvements d'ingrédients pour audit
     """
     if created:
-        print(f"📋 Mouvement enregistré: {instance.ingredient.nom} - {instance.get_movement_type_display()} - {instance.quantity} {instance.ingredient.unite}")
-        
+        events.debug(
+            'kitchen.movement.created', ingredient=instance.ingredient_id,
+            movement_type=instance.movement_type, quantity=instance.quantity
+        )
+
         # Si c'est une sortie importante, vérifier les alertes
         if instance.movement_type == 'out' and instance.quantity >= instance.ingredient.seuil_alerte:
-            print(f"⚠️ Sortie importante détectée pour {instance.ingredient.nom}")
+            events.warning(
+                'kitchen.movement.large_exit', ingredient=instance.ingredient.nom,
+                quantity=instance.quantity, unit=instance.ingredient.unite
+            )
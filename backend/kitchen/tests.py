@@ -0,0 +1,190 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import skipUnless
+import importlib.util
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from barstock_api.business_day import business_day_bounds, current_business_day
+from products.models import Category, Product
+from sales.models import Sale, SaleItem
+
+User = get_user_model()
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+
+@skipUnless(HAS_NUMPY, 'numpy non installé')
+class DemandForecastTest(TestCase):
+    """Tests de la prévision de la demande"""
+
+    def test_weekly_pattern_is_learned(self):
+        import numpy as np
+        from .forecasting import fit_seasonal_smoothing, forecast
+
+        # Produit 0 : 10 par jour, 30 le samedi (6e jour) ; produit 1 : rien
+        week = np.array([10, 10, 10, 10, 10, 30, 10], dtype=float)
+        history = np.vstack([np.tile(week, 8), np.zeros(56)])
+
+        result = forecast(*fit_seasonal_smoothing(history))
+
+        np.testing.assert_allclose(result['point'][0], week, atol=0.5)
+        np.testing.assert_allclose(result['point'][1], 0)
+
+    def test_endpoint_covers_whole_menu(self):
+        cache.clear()
+        user = User.objects.create_user(username='chef', password='x', role='manager')
+        client = APIClient()
+        client.force_authenticate(user)
+        category = Category.objects.create(name='Plats', type='plats')
+        sold, unsold = [
+            Product.objects.create(
+                name=name, category=category, purchase_price=Decimal('1000.00'),
+                selling_price=Decimal('3000.00'), current_stock=100
+            )
+            for name in ('Brochette', 'Salade')
+        ]
+        today = current_business_day()
+        for days_ago in range(1, 15):
+            sale = Sale.objects.create(server=user, created_by=user, status='paid')
+            start, _end = business_day_bounds(today - timedelta(days=days_ago))
+            Sale.objects.filter(pk=sale.pk).update(created_at=start + timedelta(hours=12))
+            SaleItem.objects.create(sale=sale, product=sold, quantity=4, unit_price=Decimal('3000.00'))
+
+        data = client.get('/api/kitchen/forecast/').json()
+
+        by_product = {item['product_id']: item for item in data['items']}
+        self.assertEqual(set(by_product), {sold.pk, unsold.pk})
+        self.assertAlmostEqual(by_product[sold.pk]['forecast'], 4, delta=0.5)
+        self.assertEqual(by_product[unsold.pk]['forecast'], 0)
+        self.assertAlmostEqual(by_product[sold.pk]['next_week']['forecast'], 28, delta=3)
+
+
+@skipUnless(HAS_NUMPY, 'numpy non installé')
+class PurchasePlanTest(TestCase):
+    """Tests de la liste d'achats par nomenclature x demande"""
+
+    def setUp(self):
+        from suppliers.models import Supplier
+        from .models import Ingredient, Recipe, RecipeIngredient
+
+        user = User.objects.create_user(username='chef', password='x', role='manager')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        category = Category.objects.create(name='Plats', type='plats')
+        self.brochette = Product.objects.create(
+            name='Brochette', category=category, purchase_price=Decimal('0.00'),
+            selling_price=Decimal('5000.00'), current_stock=0
+        )
+        butcher = Supplier.objects.create(name='Boucherie')
+        self.viande = Ingredient.objects.create(
+            nom='Viande', unite='kg', quantite_restante=Decimal('1.000'),
+            seuil_alerte=Decimal('0.500'), prix_unitaire=Decimal('12000.00'), fournisseur=butcher
+        )
+        self.sel = Ingredient.objects.create(
+            nom='Sel', unite='kg', quantite_restante=Decimal('5.000'), seuil_alerte=Decimal('0.100')
+        )
+        recipe = Recipe.objects.create(plat=self.brochette, nom_recette='Brochette', created_by=user)
+        # Quantités en grammes pour un stock en kg : conversion par le planificateur
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=self.viande,
+                             quantite_utilisee_par_plat=Decimal('200'), unite='g'),
+            RecipeIngredient(recipe=recipe, ingredient=self.sel,
+                             quantite_utilisee_par_plat=Decimal('5'), unite='g'),
+        ])
+
+    def test_event_plan(self):
+        response = self.client.post('/api/kitchen/shopping-list/', {
+            'plan': [{'product': self.brochette.pk, 'quantity': 30}]
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        items = response.data['shopping_list']
+        # 30 x 200 g = 6 kg ; stock 1 kg ; seuil 0,5 kg => 5,5 kg
+        self.assertEqual([item['ingredient_id'] for item in items], [self.viande.pk])
+        self.assertEqual(items[0]['required_quantity'], 6.0)
+        self.assertEqual(items[0]['recommended_quantity'], 5.5)
+        self.assertEqual(items[0]['urgency'], 'critical')
+        self.assertEqual([group['supplier_name'] for group in response.data['by_supplier']], ['Boucherie'])
+
+    def test_invalid_plan(self):
+        response = self.client.post('/api/kitchen/shopping-list/', {'plan': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class CostPropagationTest(TestCase):
+    """Tests de la propagation du coût des ingrédients vers les plats"""
+
+    def setUp(self):
+        from .models import Ingredient, Recipe, RecipeIngredient
+
+        user = User.objects.create_user(username='chef', password='x', role='manager')
+        category = Category.objects.create(name='Plats', type='plats')
+        self.riz = Ingredient.objects.create(
+            nom='Riz', unite='kg', quantite_restante=Decimal('10.000'),
+            seuil_alerte=Decimal('1.000'), prix_unitaire=Decimal('2000.00')
+        )
+        self.poulet = Ingredient.objects.create(
+            nom='Poulet', unite='kg', quantite_restante=Decimal('10.000'),
+            seuil_alerte=Decimal('1.000'), prix_unitaire=Decimal('8000.00')
+        )
+        self.plats = []
+        for name in ('Riz au poulet', 'Poulet grillé'):
+            plat = Product.objects.create(
+                name=name, category=category, purchase_price=Decimal('0.00'),
+                selling_price=Decimal('9000.00'), current_stock=0
+            )
+            recipe = Recipe.objects.create(plat=plat, nom_recette=name, created_by=user)
+            with self.captureOnCommitCallbacks(execute=True):
+                if name == 'Riz au poulet':
+                    RecipeIngredient.objects.create(
+                        recipe=recipe, ingredient=self.riz,
+                        quantite_utilisee_par_plat=Decimal('0.150'), unite='kg'
+                    )
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=self.poulet,
+                    quantite_utilisee_par_plat=Decimal('0.250'), unite='kg'
+                )
+            self.plats.append(plat)
+
+    def test_recipe_change_updates_purchase_price(self):
+        riz_au_poulet, poulet_grille = self.plats
+        riz_au_poulet.refresh_from_db()
+        poulet_grille.refresh_from_db()
+
+        self.assertEqual(riz_au_poulet.purchase_price, Decimal('2300.00'))
+        self.assertEqual(poulet_grille.purchase_price, Decimal('2000.00'))
+
+    def test_price_changes_are_coalesced(self):
+        riz_au_poulet, poulet_grille = self.plats
+
+        # Deux changements de coût moyen (réapprovisionnements) dans la même
+        # transaction : une lecture, une écriture
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.riz.cout_moyen = Decimal('2400.00')
+            self.riz.save()
+            self.poulet.cout_moyen = Decimal('10000.00')
+            self.poulet.save()
+        with self.assertNumQueries(2):
+            for callback in callbacks:
+                callback()
+
+        riz_au_poulet.refresh_from_db()
+        poulet_grille.refresh_from_db()
+        self.assertEqual(riz_au_poulet.purchase_price, Decimal('2860.00'))
+        self.assertEqual(poulet_grille.purchase_price, Decimal('2500.00'))
+
+    def test_supplier_price_alone_does_not_move_dish_cost(self):
+        """Le plat est valorisé au coût moyen, pas au dernier prix fournisseur"""
+        riz_au_poulet, _poulet_grille = self.plats
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.riz.prix_unitaire = Decimal('5000.00')
+            self.riz.save()
+
+        riz_au_poulet.refresh_from_db()
+        self.assertEqual(riz_au_poulet.purchase_price, Decimal('2300.00'))
+        self.assertEqual(riz_au_poulet.recipe.total_cost, Decimal('2300.00'))
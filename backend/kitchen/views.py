@@ -15,6 +15,11 @@ from .serializers import (
     RecipeSerializer, RecipeListSerializer, RecipeCreateSerializer, RecipeUpdateSerializer,
     IngredientStockUpdateSerializer
 )
+from inventory.valuation import ingredient_stock_totals, weighted_average_cost
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -37,8 +42,8 @@ def kitchen_dashboard(request):
                 'supplier': ing.fournisseur.name if ing.fournisseur else None,
                 'urgency': 'critical' if ing.quantite_restante <= ing.seuil_alerte * 0.5 else 'warning'
             } for ing in low_stock_ingredients]
-        except Exception as e:
-            print(f"Erreur ingrédients: {e}")
+        except Exception:
+            events.exception('kitchen.dashboard.ingredients_failed')
         
         # Commandes en cours
         try:
@@ -61,12 +66,12 @@ def kitchen_dashboard(request):
             today_sales = 0
             today_revenue = 0
         
-        # Produits populaires du jour
+        # Produits populaires du jour (lignes de commande = articles de vente)
         try:
-            from orders.models import OrderItem
-            popular_products = OrderItem.objects.filter(
-                order__created_at__date=today
-            ).values('product__name').annotate(
+            from sales.models import SaleItem
+            popular_products = SaleItem.objects.filter(
+                sale__created_at__date=today
+            ).exclude(sale__status='cancelled').values('product__name').annotate(
                 total_quantity=Sum('quantity')
             ).order_by('-total_quantity')[:5]
         except:
@@ -102,104 +107,49 @@ def kitchen_dashboard(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def production_forecast(request):
-    """Prévisions de production"""
+    """
+    Prévisions de production pour tout le menu : lendemain et semaine
+    suivante, avec intervalles (voir kitchen/forecasting.py).
+    ?limit=N pour ne garder que les N produits les plus demandés.
+    """
     try:
-        from orders.models import Order, OrderItem
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Analyser les commandes des 7 derniers jours
-        week_ago = timezone.now().date() - timedelta(days=7)
-        
-        # Produits les plus commandés
-        popular_items = OrderItem.objects.filter(
-            order__created_at__date__gte=week_ago
-        ).values('product__name', 'product__id').annotate(
-            total_quantity=Sum('quantity'),
-            avg_daily=Sum('quantity') / 7
-        ).order_by('-total_quantity')[:10]
-        
-        # Prévisions pour demain
-        tomorrow_forecast = []
-        for item in popular_items:
-            forecast_quantity = int(item['avg_daily'] * 1.2)  # +20% de marge
-            tomorrow_forecast.append({
-                'product_name': item['product__name'],
-                'product_id': item['product__id'],
-                'forecast_quantity': forecast_quantity,
-                'historical_avg': float(item['avg_daily']),
-                'confidence': 'high' if item['total_quantity'] > 10 else 'medium'
-            })
-        
-        return Response({
-            'forecast_date': (timezone.now().date() + timedelta(days=1)).isoformat(),
-            'items': tomorrow_forecast,
-            'total_items': len(tomorrow_forecast),
-            'based_on_days': 7
-        })
+        from .forecasting import get_forecast
+
+        data = get_forecast()
+
+        limit = request.query_params.get('limit')
+        if limit and limit.isdigit():
+            data = {**data, 'items': data['items'][:int(limit)]}
+            data['total_items'] = len(data['items'])
+
+        return Response(data)
         
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
-@api_view(['GET'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def shopping_list_generator(request):
-    """Générateur de liste de courses intelligent"""
+    """
+    Générateur de liste de courses : besoins des prévisions (GET) ou d'un
+    plan de production (POST), moins le stock (voir kitchen/planning.py)
+    """
     try:
-        shopping_list = []
-        total_cost = 0
-        
-        # Ingrédients en stock bas
+        from .planning import InvalidPlan, purchase_plan_for_request
+
         try:
-            low_stock_ingredients = Ingredient.objects.filter(
-                quantite_restante__lte=F('seuil_alerte'),
-                is_active=True
-            ).order_by('quantite_restante')
-
-            for ingredient in low_stock_ingredients:
-                # Calculer la quantité recommandée
-                current_stock = float(ingredient.quantite_restante)
-                alert_threshold = float(ingredient.seuil_alerte)
-
-                # Recommander 3x le seuil d'alerte
-                recommended_quantity = alert_threshold * 3 - current_stock
-                estimated_cost = recommended_quantity * float(ingredient.prix_unitaire)
-
-                shopping_list.append({
-                    'ingredient_id': ingredient.id,
-                    'name': ingredient.nom,
-                    'current_stock': current_stock,
-                    'alert_threshold': alert_threshold,
-                    'recommended_quantity': round(recommended_quantity, 2),
-                    'unit': ingredient.unite,
-                    'unit_price': float(ingredient.prix_unitaire),
-                    'estimated_cost': round(estimated_cost, 2),
-                    'supplier': (ingredient.fournisseur.name if hasattr(ingredient.fournisseur, 'name') else ingredient.fournisseur.nom) if ingredient.fournisseur else 'Non défini',
-                    'urgency': 'critical' if current_stock <= alert_threshold * 0.3 else 'normal'
-                })
-
-                total_cost += estimated_cost
+            plan = purchase_plan_for_request(request)
+        except InvalidPlan as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        except Exception as e:
-            print(f"Erreur génération liste: {e}")
-        
-        # Grouper par fournisseur
-        suppliers = {}
-        for item in shopping_list:
-            supplier = item['supplier']
-            if supplier not in suppliers:
-                suppliers[supplier] = []
-            suppliers[supplier].append(item)
-        
+        # Groupes par fournisseur du planificateur (par id : deux homonymes
+        # restent séparés), comme IngredientViewSet.shopping_list
         return Response({
-            'shopping_list': shopping_list,
-            'by_supplier': suppliers,
-            'summary': {
-                'total_items': len(shopping_list),
-                'estimated_total_cost': round(total_cost, 2),
-                'critical_items': len([i for i in shopping_list if i['urgency'] == 'critical']),
-                'suppliers_count': len(suppliers)
-            },
+            'shopping_list': plan['items'],
+            'by_supplier': plan['by_supplier'],
+            'summary': plan['summary'],
+            'source': plan['source'],
+            'warnings': plan['warnings'],
             'generated_at': timezone.now().isoformat()
         })
         
@@ -214,35 +164,11 @@ def recalculate_purchase_prices(request):
     Recalcule automatiquement les prix d'achat des produits basés sur leurs recettes
     """
     try:
-        from .models import Recipe
-        from django.db import transaction
-
-        updated_products = []
-        total_recipes_processed = 0
-
-        with transaction.atomic():
-            # Récupérer toutes les recettes
-            recipes = Recipe.objects.select_related('plat').prefetch_related('ingredients__ingredient').all()
-
-            for recipe in recipes:
-                if recipe.plat:  # S'assurer qu'il y a un produit lié
-                    old_price = recipe.plat.purchase_price
-                    new_price = recipe.total_cost
-
-                    # Mettre à jour le prix d'achat
-                    recipe.plat.purchase_price = new_price
-                    recipe.plat.save(update_fields=['purchase_price'])
-
-                    updated_products.append({
-                        'product_name': recipe.plat.name,
-                        'recipe_name': recipe.nom_recette,
-                        'old_purchase_price': float(old_price),
-                        'new_purchase_price': float(new_price),
-                        'difference': float(new_price - old_price),
-                        'ingredients_count': recipe.ingredients.count()
-                    })
+        from .costing import propagate_costs
 
-                    total_recipes_processed += 1
+        # Une lecture des nomenclatures, un bulk_update des prix modifiés
+        updated_products = propagate_costs()
+        total_recipes_processed = len(updated_products)
 
         return Response({
             'success': True,
@@ -312,86 +238,34 @@ class IngredientViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def stock_value(self, request):
-        """Calculer la valeur totale du stock"""
-        ingredients = self.get_queryset().filter(is_active=True)
-
-        total_value = 0
-        low_stock_count = 0
-        out_of_stock_count = 0
-
-        for ingredient in ingredients:
-            total_value += ingredient.stock_value
-            if ingredient.is_low_stock:
-                low_stock_count += 1
-            if ingredient.is_out_of_stock:
-                out_of_stock_count += 1
+        """Calculer la valeur totale du stock (coût moyen pondéré, une requête)"""
+        totals = ingredient_stock_totals(self.get_queryset().filter(is_active=True))
 
         return Response({
-            'total_value': total_value,
-            'ingredients_count': ingredients.count(),
-            'low_stock_count': low_stock_count,
-            'out_of_stock_count': out_of_stock_count,
+            'total_value': totals['value'],
+            'ingredients_count': totals['count'],
+            'low_stock_count': totals['low_stock'],
+            'out_of_stock_count': totals['out_of_stock'],
+            'valuation': 'weighted_average',
             'currency': 'BIF'
         })
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get', 'post'])
     def shopping_list(self, request):
-        """Générer une liste de courses intelligente"""
-        low_stock_ingredients = self.get_queryset().filter(
-            quantite_restante__lte=F('seuil_alerte'),
-            is_active=True
-        ).order_by('quantite_restante')
+        """Générer une liste de courses à partir des prévisions ou d'un plan (POST)"""
+        from .planning import InvalidPlan, purchase_plan_for_request
 
-        shopping_list = []
-        total_cost = 0
-
-        for ingredient in low_stock_ingredients:
-            # Calculer la quantité recommandée (3x le seuil d'alerte)
-            current_stock = ingredient.quantite_restante
-            alert_threshold = ingredient.seuil_alerte
-            recommended_quantity = alert_threshold * 3 - current_stock
-
-            if recommended_quantity > 0:
-                estimated_cost = recommended_quantity * ingredient.prix_unitaire
-
-                shopping_list.append({
-                    'ingredient_id': ingredient.id,
-                    'name': ingredient.nom,
-                    'current_stock': float(current_stock),
-                    'alert_threshold': float(alert_threshold),
-                    'recommended_quantity': float(recommended_quantity),
-                    'unit': ingredient.unite,
-                    'unit_price': float(ingredient.prix_unitaire),
-                    'estimated_cost': float(estimated_cost),
-                    'supplier': ingredient.fournisseur.name if ingredient.fournisseur else 'Non défini',
-                    'urgency': 'critical' if current_stock <= alert_threshold * 0.3 else 'normal'
-                })
-
-                total_cost += estimated_cost
-
-        # Grouper par fournisseur
-        suppliers = {}
-        for item in shopping_list:
-            supplier = item['supplier']
-            if supplier not in suppliers:
-                suppliers[supplier] = {
-                    'supplier_name': supplier,
-                    'items': [],
-                    'total_cost': 0
-                }
-            suppliers[supplier]['items'].append(item)
-            suppliers[supplier]['total_cost'] += item['estimated_cost']
+        try:
+            plan = purchase_plan_for_request(request)
+        except InvalidPlan as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
-            'shopping_list': shopping_list,
-            'by_supplier': list(suppliers.values()),
-            'summary': {
-                'total_items': len(shopping_list),
-                'estimated_total_cost': float(total_cost),
-                'critical_items': len([i for i in shopping_list if i['urgency'] == 'critical']),
-                'suppliers_count': len(suppliers),
-                'currency': 'BIF'
-            },
+            'shopping_list': plan['items'],
+            'by_supplier': plan['by_supplier'],
+            'summary': plan['summary'],
+            'source': plan['source'],
+            'warnings': plan['warnings'],
             'generated_at': timezone.now().isoformat()
         })
 
@@ -426,6 +300,12 @@ class IngredientViewSet(viewsets.ModelViewSet):
 
                     # Mettre à jour le stock
                     if movement_data['movement_type'] == 'in':
+                        if movement_data.get('unit_price'):
+                            # Entrée valorisée : nouveau coût moyen pondéré
+                            ingredient.cout_moyen = weighted_average_cost(
+                                ingredient.quantite_restante, ingredient.unit_cost,
+                                movement_data['quantity'], movement_data['unit_price']
+                            )
                         ingredient.quantite_restante += movement_data['quantity']
                     else:  # out
                         ingredient.quantite_restante -= movement_data['quantity']
@@ -491,18 +371,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Assigner l'utilisateur créateur"""
-        print(f"🔧 CREATE RECIPE - Data received: {self.request.data}")
-        print(f"🔧 CREATE RECIPE - Serializer valid: {serializer.is_valid()}")
-        if not serializer.is_valid():
-            print(f"❌ CREATE RECIPE - Validation errors: {serializer.errors}")
+        events.debug('kitchen.recipe.create_request', user=self.request.user.username, data=lambda: self.request.data)
         serializer.save(created_by=self.request.user)
 
     def perform_update(self, serializer):
-        """Logs pour la modification de recette"""
-        print(f"🔧 UPDATE RECIPE - Data received: {self.request.data}")
-        print(f"🔧 UPDATE RECIPE - Serializer valid: {serializer.is_valid()}")
-        if not serializer.is_valid():
-            print(f"❌ UPDATE RECIPE - Validation errors: {serializer.errors}")
+        """Journalise la modification de recette"""
+        events.debug('kitchen.recipe.update_request', user=self.request.user.username, data=lambda: self.request.data)
         serializer.save()
 
     @action(detail=True, methods=['post'])
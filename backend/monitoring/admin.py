@@ -0,0 +1,96 @@
+from django.contrib import admin
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+
+from .models import ProfilingRule, RequestProfile, SQLTrace, SQLTraceFinding
+
+
+class SQLTraceFindingInline(admin.TabularInline):
+    model = SQLTraceFinding
+    extra = 0
+    can_delete = False
+    fields = ['count', 'total_time', 'is_n_plus_one', 'location', 'fingerprint']
+    readonly_fields = fields
+
+
+@admin.register(SQLTrace)
+class SQLTraceAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'method', 'endpoint', 'status_code', 'query_count',
+                    'query_time', 'duration', 'n_plus_one_count']
+    list_filter = ['method', 'status_code']
+    search_fields = ['endpoint']
+    date_hierarchy = 'timestamp'
+    readonly_fields = ['endpoint', 'method', 'status_code', 'user', 'duration', 'query_count',
+                       'query_time', 'n_plus_one_count', 'timestamp']
+    inlines = [SQLTraceFindingInline]
+
+
+@admin.register(SQLTraceFinding)
+class SQLTraceFindingAdmin(admin.ModelAdmin):
+    """Une ligne par empreinte (la plus récente), avec les totaux de toutes les traces"""
+    list_display = ['fingerprint_short', 'location', 'traces', 'executions', 'max_per_request', 'time_total']
+    list_filter = ['is_n_plus_one']
+    search_fields = ['fingerprint', 'location']
+    readonly_fields = ['trace', 'fingerprint', 'fingerprint_hash', 'count', 'total_time', 'location', 'is_n_plus_one']
+
+    def get_queryset(self, request):
+        same = SQLTraceFinding.objects.filter(
+            fingerprint_hash=OuterRef('fingerprint_hash')
+        ).order_by().values('fingerprint_hash')
+
+        def total(aggregate):
+            return Subquery(same.annotate(total=aggregate).values('total'))
+
+        return super().get_queryset(request).filter(
+            pk=Subquery(same.order_by('-pk').values('pk')[:1])
+        ).annotate(
+            traces=total(Count('trace', distinct=True)),
+            executions=total(Sum('count')),
+            max_per_request=total(Max('count')),
+            time_total=total(Sum('total_time')),
+        )
+
+    @admin.display(description='Requête')
+    def fingerprint_short(self, obj):
+        return obj.fingerprint[:120]
+
+    @admin.display(description='Traces', ordering='traces')
+    def traces(self, obj):
+        return obj.traces
+
+    @admin.display(description='Exécutions', ordering='executions')
+    def executions(self, obj):
+        return obj.executions
+
+    @admin.display(description='Max par requête', ordering='max_per_request')
+    def max_per_request(self, obj):
+        return obj.max_per_request
+
+    @admin.display(description='Temps total (ms)', ordering='time_total')
+    def time_total(self, obj):
+        return round(obj.time_total or 0, 3)
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    list_display = ['path', 'user', 'remaining', 'expires_at', 'created_by', 'created_at']
+    readonly_fields = ['created_by', 'created_at']
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['timestamp', 'method', 'endpoint', 'wall_time', 'cpu_time', 'python_time',
+                    'db_time', 'serialization_time', 'query_count']
+    list_filter = ['method']
+    search_fields = ['endpoint']
+    exclude = ['data']
+    readonly_fields = ['rule', 'endpoint', 'method', 'status_code', 'user', 'wall_time', 'cpu_time',
+                       'python_time', 'db_time', 'serialization_time', 'query_count', 'sample_count',
+                       'timestamp']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('data')
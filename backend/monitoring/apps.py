@@ -3,3 +3,9 @@ from django.apps import AppConfig
 class MonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'monitoring'
+
+    def ready(self):
+        """Import signals when app is ready"""
+        import monitoring.signals  # noqa
+        from .signal_timing import install
+        install()
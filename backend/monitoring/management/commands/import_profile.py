@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Exécuté dans un process neuf, comme un worker : setup, application WSGI, URLconf
+BOOT_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+from importlib import import_module
+get_wsgi_application()
+get_resolver().url_patterns
+for module in {modules!r}:
+    import_module(module)
+print('BOOT ' + json.dumps({{
+    'boot_ms': (time.perf_counter() - start) * 1000,
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(output):
+    """Lignes de `-X importtime` : [(module, propre µs, cumulé µs, profondeur)]"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        if not own.strip().isdigit():
+            continue  # en-tête
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(own), int(cumulative), depth))
+    return imports
+
+
+def _is_project_module(name):
+    root = name.split('.')[0]
+    return os.path.isdir(os.path.join(settings.BASE_DIR, root))
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût des imports au démarrage d'un worker (python -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help="Nombre de lignes par tableau (défaut : 20)")
+        parser.add_argument(
+            '--module', action='append', default=[], metavar='MODULE',
+            help="Module à importer en plus de l'URLconf (répétable)"
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT.format(modules=options['module'])],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, env=os.environ.copy(),
+        )
+        boot = next((line[5:] for line in result.stdout.splitlines() if line.startswith('BOOT ')), None)
+        if result.returncode or boot is None:
+            raise CommandError(f"Échec du démarrage :\n{result.stderr[-2000:]}")
+        boot = json.loads(boot)
+        imports = parse_importtime(result.stderr)
+
+        top = options['top']
+        total = sum(cumulative for _name, _own, cumulative, depth in imports if depth == 0)
+        self.stdout.write(
+            f"Démarrage : {boot['boot_ms']:.0f} ms, dont imports {total / 1000:.0f} ms ; "
+            f"{boot['modules']} modules ; mémoire max {boot['rss_kb'] / 1024:.1f} Mo"
+        )
+
+        packages = defaultdict(lambda: [0, 0])
+        for name, own, _cumulative, _depth in imports:
+            package = packages[name.split('.')[0]]
+            package[0] += own
+            package[1] += 1
+        self.stdout.write("\nPaquets les plus coûteux (temps propre cumulé) :")
+        for package, (own, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:top]:
+            self.stdout.write(f"  {own / 1000:8.1f} ms  {package} ({count} modules)")
+
+        self.stdout.write("\nModules du projet les plus coûteux (dépendances comprises) :")
+        project = [(name, cumulative) for name, _own, cumulative, _depth in imports if _is_project_module(name)]
+        for name, cumulative in sorted(project, key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {name}")
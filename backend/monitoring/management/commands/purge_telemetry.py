@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.retention import apply_retention, get_policies
+
+
+class Command(BaseCommand):
+    help = "Agrège et purge les tables de télémétrie selon leurs politiques de rétention"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only', action='append', metavar='POLITIQUE',
+            help="Politique à appliquer (répétable ; défaut : toutes)"
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Affiche le nombre de lignes expirées sans rien modifier"
+        )
+
+    def handle(self, *args, **options):
+        policies = {policy.name: policy for policy in get_policies()}
+        unknown = set(options['only'] or []) - set(policies)
+        if unknown:
+            raise CommandError(f"Politique inconnue : {', '.join(sorted(unknown))} "
+                               f"(disponibles : {', '.join(policies)})")
+
+        if options['dry_run']:
+            for name, policy in policies.items():
+                if not options['only'] or name in options['only']:
+                    self.stdout.write(
+                        f"  {name}: {policy.expired().count()} ligne(s) avant le {policy.cutoff():%d/%m/%Y %H:%M}"
+                    )
+            return
+
+        for name, counts in apply_retention(options['only']).items():
+            self.stdout.write(f"  {name}: {counts['rolled_up']} agrégat(s), {counts['deleted']} supprimée(s)")
+        self.stdout.write(self.style.SUCCESS('Rétention appliquée'))
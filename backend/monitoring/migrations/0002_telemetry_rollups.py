@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Heure'), ('day', 'Jour')], max_length=10, verbose_name='Période')),
+                ('bucket', models.DateTimeField(verbose_name='Début du créneau')),
+                ('action', models.CharField(max_length=20, verbose_name='Action')),
+                ('count', models.PositiveIntegerField(verbose_name='Nombre')),
+            ],
+            options={
+                'verbose_name': "Agrégat d'activité",
+                'verbose_name_plural': "Agrégats d'activité",
+                'ordering': ['-bucket', 'user', 'action'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Heure'), ('day', 'Jour')], max_length=10, verbose_name='Période')),
+                ('bucket', models.DateTimeField(verbose_name='Début du créneau')),
+                ('metric_type', models.CharField(choices=[('cpu', 'CPU'), ('memory', 'Mémoire'), ('disk', 'Disque'), ('network', 'Réseau'), ('database', 'Base de données'), ('api_response_time', 'Temps de réponse API'), ('active_users', 'Utilisateurs actifs'), ('sales_per_hour', 'Ventes par heure')], max_length=50, verbose_name='Type de métrique')),
+                ('unit', models.CharField(max_length=20, verbose_name='Unité')),
+                ('sample_count', models.PositiveIntegerField(verbose_name='Nombre de mesures')),
+                ('avg_value', models.FloatField(verbose_name='Valeur moyenne')),
+                ('min_value', models.FloatField(verbose_name='Valeur minimum')),
+                ('max_value', models.FloatField(verbose_name='Valeur maximum')),
+            ],
+            options={
+                'verbose_name': 'Agrégat de métrique',
+                'verbose_name_plural': 'Agrégats de métriques',
+                'ordering': ['-bucket', 'metric_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PerformanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Heure'), ('day', 'Jour')], max_length=10, verbose_name='Période')),
+                ('bucket', models.DateTimeField(verbose_name='Début du créneau')),
+                ('endpoint', models.CharField(max_length=200, verbose_name='Endpoint')),
+                ('method', models.CharField(max_length=10, verbose_name='Méthode HTTP')),
+                ('request_count', models.PositiveIntegerField(verbose_name='Nombre de requêtes')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name="Nombre d'erreurs (>= 400)")),
+                ('avg_response_time', models.FloatField(verbose_name='Temps moyen (ms)')),
+                ('p50_response_time', models.FloatField(verbose_name='Médiane (ms)')),
+                ('p95_response_time', models.FloatField(verbose_name='95e centile (ms)')),
+                ('max_response_time', models.FloatField(verbose_name='Temps maximum (ms)')),
+            ],
+            options={
+                'verbose_name': 'Agrégat de performance',
+                'verbose_name_plural': 'Agrégats de performance',
+                'ordering': ['-bucket', 'endpoint'],
+                'indexes': [models.Index(fields=['endpoint', '-bucket'], name='perf_rollup_endpoint_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='performancerollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'endpoint', 'method'), name='performance_rollup_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='metricrollup',
+            index=models.Index(fields=['metric_type', '-bucket'], name='metric_rollup_type_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='metricrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'metric_type', 'unit'), name='metric_rollup_unique'),
+        ),
+        migrations.AddField(
+            model_name='activityrollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur'),
+        ),
+        migrations.AddConstraint(
+            model_name='activityrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'user', 'action'), name='activity_rollup_unique'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('monitoring', '0002_telemetry_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SQLTrace',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200, verbose_name='Endpoint')),
+                ('method', models.CharField(max_length=10, verbose_name='Méthode HTTP')),
+                ('status_code', models.IntegerField(verbose_name='Code de statut')),
+                ('duration', models.FloatField(verbose_name='Durée de la requête (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Nombre de requêtes SQL')),
+                ('query_time', models.FloatField(verbose_name='Temps SQL (ms)')),
+                ('n_plus_one_count', models.PositiveIntegerField(default=0, verbose_name='Suspicions N+1')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Horodatage')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Trace SQL',
+                'verbose_name_plural': 'Traces SQL',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SQLTraceFinding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.TextField(verbose_name='Requête normalisée')),
+                ('fingerprint_hash', models.CharField(db_index=True, max_length=40, verbose_name='Empreinte')),
+                ('count', models.PositiveIntegerField(verbose_name='Exécutions')),
+                ('total_time', models.FloatField(verbose_name='Temps total (ms)')),
+                ('location', models.CharField(blank=True, max_length=300, verbose_name='Origine dans le code')),
+                ('is_n_plus_one', models.BooleanField(default=False, verbose_name='Suspicion N+1')),
+                ('trace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='findings', to='monitoring.sqltrace', verbose_name='Trace')),
+            ],
+            options={
+                'verbose_name': 'Requête SQL tracée',
+                'verbose_name_plural': 'Requêtes SQL tracées',
+                'ordering': ['-count'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sqltrace',
+            index=models.Index(fields=['endpoint', '-timestamp'], name='sql_trace_endpoint_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('monitoring', '0003_sql_traces'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(blank=True, help_text='Ex: /api/reports/daily-detailed/ (vide : tous les chemins)', max_length=200, verbose_name='Préfixe de chemin')),
+                ('remaining', models.PositiveIntegerField(default=10, verbose_name='Requêtes restantes')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Expire le')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date de création')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Créée par')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='profiling_rules', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur ciblé')),
+            ],
+            options={
+                'verbose_name': 'Règle de profilage',
+                'verbose_name_plural': 'Règles de profilage',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200, verbose_name='Endpoint')),
+                ('method', models.CharField(max_length=10, verbose_name='Méthode HTTP')),
+                ('status_code', models.IntegerField(verbose_name='Code de statut')),
+                ('wall_time', models.FloatField(verbose_name='Durée réelle (ms)')),
+                ('cpu_time', models.FloatField(verbose_name='Temps CPU (ms)')),
+                ('python_time', models.FloatField(verbose_name='Temps Python (ms)')),
+                ('db_time', models.FloatField(verbose_name='Temps base de données (ms)')),
+                ('serialization_time', models.FloatField(verbose_name='Temps de sérialisation (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Nombre de requêtes SQL')),
+                ('sample_count', models.PositiveIntegerField(verbose_name='Échantillons')),
+                ('data', models.BinaryField(verbose_name='Piles échantillonnées (zlib)')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Horodatage')),
+                ('rule', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='profiles', to='monitoring.profilingrule', verbose_name='Règle')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Profil de requête',
+                'verbose_name_plural': 'Profils de requêtes',
+                'ordering': ['-timestamp'],
+            },
+        ),
+    ]
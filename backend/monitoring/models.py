@@ -192,3 +192,439 @@ class PerformanceLog(models.Model):
     
     def __str__(self):
         return f"{self.method} {self.endpoint} - {self.response_time}ms"
+
+
+ROLLUP_PERIODS = [
+    ('hour', 'Heure'),
+    ('day', 'Jour'),
+]
+
+
+class PerformanceRollup(models.Model):
+    """
+    Agrégat des logs de performance par endpoint et par créneau
+    (voir monitoring/retention.py)
+    """
+
+    period = models.CharField(
+        max_length=10,
+        choices=ROLLUP_PERIODS,
+        verbose_name='Période'
+    )
+
+    bucket = models.DateTimeField(
+        verbose_name='Début du créneau'
+    )
+
+    endpoint = models.CharField(
+        max_length=200,
+        verbose_name='Endpoint'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Méthode HTTP'
+    )
+
+    request_count = models.PositiveIntegerField(
+        verbose_name='Nombre de requêtes'
+    )
+
+    error_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Nombre d\'erreurs (>= 400)'
+    )
+
+    avg_response_time = models.FloatField(
+        verbose_name='Temps moyen (ms)'
+    )
+
+    p50_response_time = models.FloatField(
+        verbose_name='Médiane (ms)'
+    )
+
+    p95_response_time = models.FloatField(
+        verbose_name='95e centile (ms)'
+    )
+
+    max_response_time = models.FloatField(
+        verbose_name='Temps maximum (ms)'
+    )
+
+    class Meta:
+        verbose_name = 'Agrégat de performance'
+        verbose_name_plural = 'Agrégats de performance'
+        ordering = ['-bucket', 'endpoint']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'endpoint', 'method'],
+                name='performance_rollup_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['endpoint', '-bucket'], name='perf_rollup_endpoint_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} @ {self.bucket:%d/%m/%Y %H:%M} ({self.request_count})"
+
+
+class MetricRollup(models.Model):
+    """
+    Agrégat des métriques système par type et par créneau
+    """
+
+    period = models.CharField(
+        max_length=10,
+        choices=ROLLUP_PERIODS,
+        verbose_name='Période'
+    )
+
+    bucket = models.DateTimeField(
+        verbose_name='Début du créneau'
+    )
+
+    metric_type = models.CharField(
+        max_length=50,
+        choices=SystemMetric.METRIC_TYPES,
+        verbose_name='Type de métrique'
+    )
+
+    unit = models.CharField(
+        max_length=20,
+        verbose_name='Unité'
+    )
+
+    sample_count = models.PositiveIntegerField(
+        verbose_name='Nombre de mesures'
+    )
+
+    avg_value = models.FloatField(
+        verbose_name='Valeur moyenne'
+    )
+
+    min_value = models.FloatField(
+        verbose_name='Valeur minimum'
+    )
+
+    max_value = models.FloatField(
+        verbose_name='Valeur maximum'
+    )
+
+    class Meta:
+        verbose_name = 'Agrégat de métrique'
+        verbose_name_plural = 'Agrégats de métriques'
+        ordering = ['-bucket', 'metric_type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'metric_type', 'unit'],
+                name='metric_rollup_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['metric_type', '-bucket'], name='metric_rollup_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric_type} @ {self.bucket:%d/%m/%Y %H:%M}: {self.avg_value}{self.unit}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Nombre d'activités utilisateur (accounts.UserActivity) par utilisateur,
+    action et créneau
+    """
+
+    period = models.CharField(
+        max_length=10,
+        choices=ROLLUP_PERIODS,
+        verbose_name='Période'
+    )
+
+    bucket = models.DateTimeField(
+        verbose_name='Début du créneau'
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='activity_rollups',
+        verbose_name='Utilisateur'
+    )
+
+    action = models.CharField(
+        max_length=20,
+        verbose_name='Action'
+    )
+
+    count = models.PositiveIntegerField(
+        verbose_name='Nombre'
+    )
+
+    class Meta:
+        verbose_name = 'Agrégat d\'activité'
+        verbose_name_plural = 'Agrégats d\'activité'
+        ordering = ['-bucket', 'user', 'action']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket', 'user', 'action'],
+                name='activity_rollup_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.action} @ {self.bucket:%d/%m/%Y}: {self.count}"
+
+
+class SQLTrace(models.Model):
+    """
+    Requêtes SQL d'une requête HTTP tracée (voir monitoring/sql_tracing.py)
+    """
+
+    endpoint = models.CharField(
+        max_length=200,
+        verbose_name='Endpoint'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Méthode HTTP'
+    )
+
+    status_code = models.IntegerField(
+        verbose_name='Code de statut'
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Utilisateur'
+    )
+
+    duration = models.FloatField(
+        verbose_name='Durée de la requête (ms)'
+    )
+
+    query_count = models.PositiveIntegerField(
+        verbose_name='Nombre de requêtes SQL'
+    )
+
+    query_time = models.FloatField(
+        verbose_name='Temps SQL (ms)'
+    )
+
+    n_plus_one_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Suspicions N+1'
+    )
+
+    timestamp = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Horodatage'
+    )
+
+    class Meta:
+        verbose_name = 'Trace SQL'
+        verbose_name_plural = 'Traces SQL'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['endpoint', '-timestamp'], name='sql_trace_endpoint_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} - {self.query_count} requêtes SQL"
+
+
+class SQLTraceFinding(models.Model):
+    """
+    Une forme de requête SQL (empreinte normalisée) dans une trace
+    """
+
+    trace = models.ForeignKey(
+        SQLTrace,
+        on_delete=models.CASCADE,
+        related_name='findings',
+        verbose_name='Trace'
+    )
+
+    fingerprint = models.TextField(
+        verbose_name='Requête normalisée'
+    )
+
+    fingerprint_hash = models.CharField(
+        max_length=40,
+        db_index=True,
+        verbose_name='Empreinte'
+    )
+
+    count = models.PositiveIntegerField(
+        verbose_name='Exécutions'
+    )
+
+    total_time = models.FloatField(
+        verbose_name='Temps total (ms)'
+    )
+
+    location = models.CharField(
+        max_length=300,
+        blank=True,
+        verbose_name='Origine dans le code'
+    )
+
+    is_n_plus_one = models.BooleanField(
+        default=False,
+        verbose_name='Suspicion N+1'
+    )
+
+    class Meta:
+        verbose_name = 'Requête SQL tracée'
+        verbose_name_plural = 'Requêtes SQL tracées'
+        ordering = ['-count']
+
+    def __str__(self):
+        return f"{self.count}x {self.fingerprint[:80]}"
+
+
+class ProfilingRule(models.Model):
+    """
+    Profilage à la demande : les `remaining` prochaines requêtes qui
+    correspondent (chemin et/ou utilisateur) sont profilées
+    (voir monitoring/profiling.py)
+    """
+
+    path = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Préfixe de chemin',
+        help_text='Ex: /api/reports/daily-detailed/ (vide : tous les chemins)'
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='profiling_rules',
+        verbose_name='Utilisateur ciblé'
+    )
+
+    remaining = models.PositiveIntegerField(
+        default=10,
+        verbose_name='Requêtes restantes'
+    )
+
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Expire le'
+    )
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Créée par'
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Date de création'
+    )
+
+    class Meta:
+        verbose_name = 'Règle de profilage'
+        verbose_name_plural = 'Règles de profilage'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        target = self.path or 'tous les chemins'
+        if self.user_id:
+            target += f' (utilisateur {self.user_id})'
+        return f"{target} - {self.remaining} restante(s)"
+
+
+class RequestProfile(models.Model):
+    """
+    Profil échantillonné d'une requête : piles d'appels agrégées
+    (format « collapsed stacks »), compressées
+    """
+
+    rule = models.ForeignKey(
+        ProfilingRule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='profiles',
+        verbose_name='Règle'
+    )
+
+    endpoint = models.CharField(
+        max_length=200,
+        verbose_name='Endpoint'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Méthode HTTP'
+    )
+
+    status_code = models.IntegerField(
+        verbose_name='Code de statut'
+    )
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Utilisateur'
+    )
+
+    wall_time = models.FloatField(
+        verbose_name='Durée réelle (ms)'
+    )
+
+    cpu_time = models.FloatField(
+        verbose_name='Temps CPU (ms)'
+    )
+
+    python_time = models.FloatField(
+        verbose_name='Temps Python (ms)'
+    )
+
+    db_time = models.FloatField(
+        verbose_name='Temps base de données (ms)'
+    )
+
+    serialization_time = models.FloatField(
+        verbose_name='Temps de sérialisation (ms)'
+    )
+
+    query_count = models.PositiveIntegerField(
+        verbose_name='Nombre de requêtes SQL'
+    )
+
+    sample_count = models.PositiveIntegerField(
+        verbose_name='Échantillons'
+    )
+
+    data = models.BinaryField(
+        verbose_name='Piles échantillonnées (zlib)'
+    )
+
+    timestamp = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Horodatage'
+    )
+
+    class Meta:
+        verbose_name = 'Profil de requête'
+        verbose_name_plural = 'Profils de requêtes'
+        ordering = ['-timestamp']
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} - {self.wall_time:.0f}ms"
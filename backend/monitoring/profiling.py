@@ -0,0 +1,312 @@
+"""
+Profilage à la demande des requêtes lentes
+
+Un admin crée une règle (ProfilingRule : préfixe de chemin et/ou
+utilisateur, nombre de requêtes, expiration éventuelle). Les requêtes qui
+correspondent sont profilées jusqu'à épuisement de la règle :
+    - un thread échantillonne la pile de la requête toutes les
+      PROFILING_INTERVAL secondes (5 ms par défaut) ;
+    - les requêtes SQL sont chronométrées (execute_wrapper, voir
+      monitoring/sql_tracing.py) ;
+    - temps réel et temps CPU du thread sont relevés.
+
+Le temps réel est réparti entre base de données (mesuré), sérialisation
+(part des échantillons dans les serializers / renderers DRF, hors SQL) et
+Python (le reste). Les piles échantillonnées sont enregistrées agrégées,
+au format « collapsed stacks » (une ligne `a;b;c nombre`, lisible par
+speedscope ou flamegraph.pl), compressées avec zlib (RequestProfile).
+
+Sans règle active, le coût par requête est la lecture d'une version dans
+le cache : les règles sont gardées en mémoire du process et rechargées
+quand la version change (création, modification, règle épuisée).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .sql_tracing import QueryTracer
+
+logger = logging.getLogger(__name__)
+
+PROFILING_INTERVAL = getattr(settings, 'PROFILING_INTERVAL', 0.005)
+MAX_STACK_DEPTH = 100
+
+RULES_VERSION_KEY = 'monitoring:profiling_rules:version'
+
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+_SITE_PACKAGES = 'site-packages' + os.sep
+
+DB_FRAMES = ('django/db/backends/',)
+SERIALIZATION_FRAMES = (
+    'rest_framework/serializers.py', 'rest_framework/fields.py',
+    'rest_framework/relations.py', 'rest_framework/renderers.py',
+)
+
+
+def _new_version():
+    # Basée sur l'heure : reste croissante même si la clé a été évincée
+    return int(time.time() * 1000)
+
+
+def _get_rules_version():
+    version = cache.get(RULES_VERSION_KEY)
+    if version is None:
+        cache.add(RULES_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(RULES_VERSION_KEY)
+    return version
+
+
+def bump_rules_version():
+    try:
+        return cache.incr(RULES_VERSION_KEY)
+    except ValueError:
+        version = _new_version()
+        cache.set(RULES_VERSION_KEY, version, timeout=None)
+        return version
+
+
+# ---------------------------------------------------------------------------
+# Règles actives
+# ---------------------------------------------------------------------------
+
+class ProfilingRules:
+    """Règles actives, gardées en mémoire du process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rules = []
+        self._version = None
+
+    def _ensure_current(self):
+        version = _get_rules_version()
+        if self._version == version:
+            return
+        from .models import ProfilingRule
+
+        rules = list(ProfilingRule.objects.filter(remaining__gt=0).values('pk', 'path', 'user_id', 'expires_at'))
+        with self._lock:
+            self._rules, self._version = rules, version
+
+    def match(self, request):
+        """Règle qui s'applique à `request`, ou None"""
+        self._ensure_current()
+        rules = self._rules
+        if not rules:
+            return None
+
+        now = timezone.now()
+        user_id = None
+        if any(rule['user_id'] for rule in rules):
+            user_id = _token_user_id(request)
+        for rule in rules:
+            if rule['expires_at'] is not None and rule['expires_at'] <= now:
+                continue
+            if rule['path'] and not request.path.startswith(rule['path']):
+                continue
+            if rule['user_id'] and rule['user_id'] != user_id:
+                continue
+            return rule
+        return None
+
+
+profiling_rules = ProfilingRules()
+
+
+def _token_user_id(request):
+    """Utilisateur du token JWT, lu dans les claims (aucune requête)"""
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework_simplejwt.settings import api_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError):
+        return None
+
+
+def claim_slot(rule):
+    """Décompte une requête de la règle. False si elle est déjà épuisée."""
+    from .models import ProfilingRule
+
+    claimed = ProfilingRule.objects.filter(pk=rule['pk'], remaining__gt=0).update(remaining=F('remaining') - 1)
+    if not claimed or not ProfilingRule.objects.filter(pk=rule['pk'], remaining__gt=0).exists():
+        # Règle épuisée : les autres process la retirent
+        bump_rules_version()
+    return bool(claimed)
+
+
+# ---------------------------------------------------------------------------
+# Échantillonnage
+# ---------------------------------------------------------------------------
+
+_labels = {}
+
+
+def _label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_PROJECT_ROOT):
+            path = filename[len(_PROJECT_ROOT):]
+        elif _SITE_PACKAGES in filename:
+            path = filename.split(_SITE_PACKAGES, 1)[1]
+        else:
+            path = os.path.basename(filename)
+        label = _labels[code] = f"{path.replace(os.sep, '/')}:{code.co_name}"
+    return label
+
+
+class StackSampler:
+    """Relève la pile d'un thread à intervalle régulier (depuis un autre thread)"""
+
+    def __init__(self, thread_id, interval=PROFILING_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                stack.append(_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+
+def _is_serialization(stack):
+    # Le SQL lancé depuis un serializer compte en base de données
+    return (any(frame in stack for frame in SERIALIZATION_FRAMES)
+            and not any(frame in stack for frame in DB_FRAMES))
+
+
+class RequestProfiler:
+    """Profil d'une requête : piles échantillonnées, SQL, temps réel et CPU"""
+
+    def __enter__(self):
+        self.tracer = QueryTracer()
+        self._trace = self.tracer.trace()
+        self._trace.__enter__()
+        self.sampler = StackSampler(threading.get_ident())
+        self._wall, self._cpu = time.perf_counter(), time.thread_time()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.sampler.stop()
+        self.wall_time = (time.perf_counter() - self._wall) * 1000
+        self.cpu_time = (time.thread_time() - self._cpu) * 1000
+        self._trace.__exit__(*exc_info)
+        return False
+
+    def breakdown(self):
+        """Répartition du temps réel (ms) : python, db, serialization"""
+        db_time = sum(duration for _sql, duration, _location in self.tracer.queries)
+        total = sum(self.sampler.samples.values())
+        serialization = sum(count for stack, count in self.sampler.samples.items() if _is_serialization(stack))
+        serialization_time = self.wall_time * serialization / total if total else 0.0
+        return {
+            'db_time': round(db_time, 3),
+            'serialization_time': round(serialization_time, 3),
+            'python_time': round(max(self.wall_time - db_time - serialization_time, 0.0), 3),
+        }
+
+    def collapsed(self):
+        return '\n'.join(f'{stack} {count}' for stack, count in self.sampler.samples.most_common())
+
+
+def save_profile(request, response, profiler, rule):
+    from .models import RequestProfile
+
+    user = getattr(request, 'user', None)
+    return RequestProfile.objects.create(
+        rule_id=rule['pk'],
+        endpoint=request.path[:200],
+        method=request.method,
+        status_code=response.status_code,
+        user=user if user is not None and user.is_authenticated else None,
+        wall_time=round(profiler.wall_time, 3),
+        cpu_time=round(profiler.cpu_time, 3),
+        query_count=len(profiler.tracer.queries),
+        sample_count=sum(profiler.sampler.samples.values()),
+        data=zlib.compress(profiler.collapsed().encode(), 6),
+        **profiler.breakdown()
+    )
+
+
+def load_stacks(profile):
+    """Piles d'un profil : {pile: nombre d'échantillons}"""
+    stacks = {}
+    for line in zlib.decompress(bytes(profile.data)).decode().splitlines():
+        stack, _space, count = line.rpartition(' ')
+        stacks[stack] = int(count)
+    return stacks
+
+
+def top_functions(profile, limit=25):
+    """Fonctions les plus présentes : échantillons propres et cumulés"""
+    stacks = load_stacks(profile)
+    total = sum(stacks.values())
+    own, cumulated = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            cumulated[frame] += count
+    return [
+        {
+            'function': function,
+            'own_samples': own[function],
+            'cumulated_samples': count,
+            'own_percent': round(own[function] * 100 / total, 1),
+            'cumulated_percent': round(count * 100 / total, 1),
+        }
+        for function, count in sorted(cumulated.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+    ]
+
+
+class ProfilingMiddleware:
+    """Profile les requêtes visées par une règle de profilage active"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rule = profiling_rules.match(request)
+        if rule is None or not claim_slot(rule):
+            return self.get_response(request)
+
+        with RequestProfiler() as profiler:
+            response = self.get_response(request)
+        try:
+            profile = save_profile(request, response, profiler, rule)
+        except Exception:
+            logger.exception('Profil non enregistré pour %s', request.path)
+            return response
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
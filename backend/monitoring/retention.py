@@ -0,0 +1,227 @@
+"""
+Rétention des tables de télémétrie
+
+Chaque table a sa politique (get_policies()) : durée de conservation
+des lignes brutes et, pour les tables utiles dans la durée, un agrégat
+écrit avant la suppression :
+
+    performance_logs   PerformanceLog -> PerformanceRollup (par heure :
+                       nombre, erreurs, moyenne, p50, p95, max par endpoint)
+    system_metrics     SystemMetric   -> MetricRollup (par heure)
+    user_activities    UserActivity   -> ActivityRollup (par jour commercial,
+                       par utilisateur et action)
+    system_alerts      alertes résolues, supprimées
+    view_tracking      vues FAQ / tutoriels, supprimées (les totaux restent
+                       sur FAQ.views et Tutorial.views)
+    sql_traces         traces SQL (monitoring/sql_tracing.py), supprimées
+    request_profiles   profils de requêtes (monitoring/profiling.py), supprimés
+
+Les agrégats eux-mêmes sont gardés ROLLUP_RETENTION_DAYS jours.
+
+Seuls des créneaux complets sont traités. L'agrégat d'un créneau est écrit
+dans une transaction ; les lignes brutes sont ensuite supprimées par lots
+de BATCH_SIZE (une requête courte chacun). Un créneau déjà agrégé n'est
+plus que purgé : un passage interrompu reprend sans compter deux fois.
+
+Les durées se règlent dans les settings (TELEMETRY_RETENTION_DAYS,
+ACTIVITY_RETENTION_DAYS, ROLLUP_RETENTION_DAYS) ; la purge se lance avec
+`python manage.py purge_telemetry`.
+"""
+
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.utils import timezone
+
+from barstock_api.business_day import business_day_bounds, current_business_day
+
+from .models import (
+    ActivityRollup, MetricRollup, PerformanceLog, PerformanceRollup, RequestProfile, SQLTrace, SystemAlert,
+    SystemMetric
+)
+
+TELEMETRY_RETENTION_DAYS = getattr(settings, 'TELEMETRY_RETENTION_DAYS', 7)
+ACTIVITY_RETENTION_DAYS = getattr(settings, 'ACTIVITY_RETENTION_DAYS', 90)
+ROLLUP_RETENTION_DAYS = getattr(settings, 'ROLLUP_RETENTION_DAYS', 400)
+BATCH_SIZE = 1000
+
+
+# ---------------------------------------------------------------------------
+# Créneaux
+# ---------------------------------------------------------------------------
+
+def bucket_bounds(moment, period):
+    """(début, fin) du créneau horaire ou du jour commercial contenant `moment`"""
+    if period == 'day':
+        return business_day_bounds(current_business_day(moment))
+    start = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    return start, start + timedelta(hours=1)
+
+
+def percentile(values, fraction):
+    """Centile au rang le plus proche d'une liste triée"""
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+# ---------------------------------------------------------------------------
+# Agrégats
+# ---------------------------------------------------------------------------
+
+def rollup_performance(rows, bucket, period):
+    samples = {}
+    for endpoint, method, response_time, status_code in rows.values_list(
+        'endpoint', 'method', 'response_time', 'status_code'
+    ):
+        times, errors = samples.setdefault((endpoint, method), ([], [0]))
+        times.append(response_time)
+        errors[0] += status_code >= 400
+
+    rollups = []
+    for (endpoint, method), (times, errors) in samples.items():
+        times.sort()
+        rollups.append(PerformanceRollup(
+            period=period,
+            bucket=bucket,
+            endpoint=endpoint,
+            method=method,
+            request_count=len(times),
+            error_count=errors[0],
+            avg_response_time=round(sum(times) / len(times), 2),
+            p50_response_time=percentile(times, 0.5),
+            p95_response_time=percentile(times, 0.95),
+            max_response_time=times[-1],
+        ))
+    PerformanceRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def rollup_metrics(rows, bucket, period):
+    rollups = [
+        MetricRollup(period=period, bucket=bucket, **values)
+        for values in rows.order_by().values('metric_type', 'unit').annotate(
+            sample_count=Count('pk'), avg_value=Avg('value'), min_value=Min('value'), max_value=Max('value')
+        )
+    ]
+    MetricRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def rollup_activities(rows, bucket, period):
+    rollups = [
+        ActivityRollup(period=period, bucket=bucket, **values)
+        for values in rows.order_by().values('user_id', 'action').annotate(count=Count('pk'))
+    ]
+    ActivityRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+# ---------------------------------------------------------------------------
+# Politiques
+# ---------------------------------------------------------------------------
+
+class RetentionPolicy:
+    """
+    Conservation de `keep_days` jours de lignes brutes de `model`.
+    `rollup(lignes, début, période)` écrit l'agrégat d'un créneau dans
+    `rollup_model` ; `filters` restreint les lignes concernées ; les lignes
+    correspondant à `protect` sont agrégées mais pas supprimées.
+    """
+
+    def __init__(self, name, model, date_field, keep_days, rollup=None, rollup_model=None,
+                 period='hour', filters=None, protect=None):
+        self.name = name
+        self.model = model
+        self.date_field = date_field
+        self.keep_days = keep_days
+        self.rollup = rollup
+        self.rollup_model = rollup_model
+        self.period = period
+        self.filters = filters or Q()
+        self.protect = protect
+
+    def cutoff(self, now=None):
+        """Début du créneau qui contient la limite : seuls des créneaux complets sont traités"""
+        return bucket_bounds((now or timezone.now()) - timedelta(days=self.keep_days), self.period)[0]
+
+    def expired(self, now=None):
+        return self.model.objects.filter(self.filters, **{f'{self.date_field}__lt': self.cutoff(now)})
+
+    def deletable(self, queryset):
+        return queryset.exclude(self.protect) if self.protect is not None else queryset
+
+
+def _delete_in_batches(queryset):
+    label = queryset.model._meta.label
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return deleted
+        _total, per_model = queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += per_model.get(label, 0)
+
+
+def apply_policy(policy, now=None):
+    """Agrège puis purge les lignes expirées de la politique. Retourne les compteurs."""
+    expired = policy.expired(now)
+    if policy.rollup is None:
+        return {'rolled_up': 0, 'deleted': _delete_in_batches(policy.deletable(expired))}
+
+    date_field = policy.date_field
+    rolled_up = deleted = 0
+    moment = expired.order_by(date_field).values_list(date_field, flat=True).first()
+    while moment is not None:
+        start, end = bucket_bounds(moment, policy.period)
+        rows = expired.filter(**{f'{date_field}__gte': start, f'{date_field}__lt': end})
+        with transaction.atomic():
+            if not policy.rollup_model.objects.filter(period=policy.period, bucket=start).exists():
+                rolled_up += policy.rollup(rows, start, policy.period)
+        deleted += _delete_in_batches(policy.deletable(rows))
+        moment = expired.filter(**{f'{date_field}__gte': end}).order_by(
+            date_field
+        ).values_list(date_field, flat=True).first()
+    return {'rolled_up': rolled_up, 'deleted': deleted}
+
+
+def get_policies():
+    from accounts.models import UserActivity
+    from help.models import ViewTracking
+
+    return [
+        RetentionPolicy(
+            'performance_logs', PerformanceLog, 'timestamp', TELEMETRY_RETENTION_DAYS,
+            rollup=rollup_performance, rollup_model=PerformanceRollup
+        ),
+        # Une métrique citée par une alerte reste tant que l'alerte existe
+        RetentionPolicy(
+            'system_metrics', SystemMetric, 'timestamp', TELEMETRY_RETENTION_DAYS,
+            rollup=rollup_metrics, rollup_model=MetricRollup, protect=Q(systemalert__isnull=False)
+        ),
+        RetentionPolicy(
+            'user_activities', UserActivity, 'timestamp', ACTIVITY_RETENTION_DAYS,
+            rollup=rollup_activities, rollup_model=ActivityRollup, period='day'
+        ),
+        RetentionPolicy(
+            'system_alerts', SystemAlert, 'created_at', ACTIVITY_RETENTION_DAYS,
+            filters=Q(status='resolved')
+        ),
+        RetentionPolicy('view_tracking', ViewTracking, 'created_at', ACTIVITY_RETENTION_DAYS),
+        RetentionPolicy('sql_traces', SQLTrace, 'timestamp', TELEMETRY_RETENTION_DAYS),
+        RetentionPolicy('request_profiles', RequestProfile, 'timestamp', ACTIVITY_RETENTION_DAYS),
+        RetentionPolicy('performance_rollups', PerformanceRollup, 'bucket', ROLLUP_RETENTION_DAYS),
+        RetentionPolicy('metric_rollups', MetricRollup, 'bucket', ROLLUP_RETENTION_DAYS),
+        RetentionPolicy('activity_rollups', ActivityRollup, 'bucket', ROLLUP_RETENTION_DAYS, period='day'),
+    ]
+
+
+def apply_retention(names=None, now=None):
+    """Applique les politiques (toutes, ou celles de `names`). Retourne {politique: compteurs}."""
+    now = now or timezone.now()
+    return {
+        policy.name: apply_policy(policy, now)
+        for policy in get_policies()
+        if names is None or policy.name in names
+    }
@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import SystemMetric, SystemAlert, PerformanceLog
+from .models import (
+    SystemMetric, SystemAlert, PerformanceLog, PerformanceRollup, MetricRollup, ActivityRollup,
+    SQLTrace, SQLTraceFinding, ProfilingRule, RequestProfile
+)
 from accounts.serializers import UserSerializer
 
 class SystemMetricSerializer(serializers.ModelSerializer):
@@ -32,6 +35,78 @@ class PerformanceLogSerializer(serializers.ModelSerializer):
             'status_code', 'user', 'timestamp'
         ]
 
+class PerformanceRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PerformanceRollup
+        fields = [
+            'id', 'period', 'bucket', 'endpoint', 'method', 'request_count',
+            'error_count', 'avg_response_time', 'p50_response_time',
+            'p95_response_time', 'max_response_time'
+        ]
+
+class MetricRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MetricRollup
+        fields = [
+            'id', 'period', 'bucket', 'metric_type', 'unit',
+            'sample_count', 'avg_value', 'min_value', 'max_value'
+        ]
+
+class ActivityRollupSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = ActivityRollup
+        fields = ['id', 'period', 'bucket', 'user', 'username', 'action', 'count']
+
+class SQLTraceFindingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SQLTraceFinding
+        fields = [
+            'id', 'fingerprint', 'fingerprint_hash', 'count',
+            'total_time', 'location', 'is_n_plus_one'
+        ]
+
+class SQLTraceSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True, default=None)
+
+    class Meta:
+        model = SQLTrace
+        fields = [
+            'id', 'endpoint', 'method', 'status_code', 'user', 'username',
+            'duration', 'query_count', 'query_time', 'n_plus_one_count', 'timestamp'
+        ]
+
+class SQLTraceDetailSerializer(SQLTraceSerializer):
+    findings = SQLTraceFindingSerializer(many=True, read_only=True)
+
+    class Meta(SQLTraceSerializer.Meta):
+        fields = SQLTraceSerializer.Meta.fields + ['findings']
+
+class ProfilingRuleSerializer(serializers.ModelSerializer):
+    created_by = serializers.CharField(source='created_by.username', read_only=True, default=None)
+
+    class Meta:
+        model = ProfilingRule
+        fields = ['id', 'path', 'user', 'remaining', 'expires_at', 'created_by', 'created_at']
+        read_only_fields = ['created_at']
+
+    def validate(self, data):
+        path = data.get('path', getattr(self.instance, 'path', ''))
+        user = data.get('user', getattr(self.instance, 'user', None))
+        if not path and user is None:
+            raise serializers.ValidationError("Indiquez un chemin ou un utilisateur à profiler.")
+        return data
+
+class RequestProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RequestProfile
+        fields = [
+            'id', 'rule', 'endpoint', 'method', 'status_code', 'user',
+            'wall_time', 'cpu_time', 'python_time', 'db_time', 'serialization_time',
+            'query_count', 'sample_count', 'timestamp'
+        ]
+
 class SystemStatsSerializer(serializers.Serializer):
     """Serializer pour les statistiques système agrégées"""
     cpu_usage = serializers.FloatField()
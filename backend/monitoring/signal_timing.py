@@ -0,0 +1,163 @@
+"""
+Mesure des receivers de signaux de modèle
+
+`install()` (appelé par MonitoringConfig.ready) remplace `send()` des
+signaux de modèle (pre/post_save, pre/post_delete, m2m_changed) par une
+version qui appelle les mêmes receivers, dans le même ordre, en relevant
+pour chacun :
+    - le nombre d'appels ;
+    - le temps réel (total, maximum) ;
+    - le nombre de requêtes SQL émises (base default, signaux imbriqués
+      compris).
+
+Tous les receivers sont couverts, y compris ceux connectés après
+l'installation. Les statistiques sont gardées en mémoire du process et
+exposées sous /api/monitoring/signals/.
+
+Budget : un receiver qui dépasse SIGNAL_RECEIVER_BUDGET_MS millisecondes
+ou SIGNAL_RECEIVER_QUERY_BUDGET requêtes en un appel est journalisé en
+avertissement (SIGNAL_RECEIVER_BUDGETS fixe un budget par receiver :
+{'app.signals.fonction': (ms, requêtes)}). Dans un test,
+`enforce_signal_budgets()` transforme le dépassement en erreur.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import signals
+from django.dispatch.dispatcher import NO_RECEIVERS
+
+logger = logging.getLogger(__name__)
+
+SIGNAL_TIMING_ENABLED = getattr(settings, 'SIGNAL_TIMING_ENABLED', True)
+SIGNAL_RECEIVER_BUDGET_MS = getattr(settings, 'SIGNAL_RECEIVER_BUDGET_MS', 50)
+SIGNAL_RECEIVER_QUERY_BUDGET = getattr(settings, 'SIGNAL_RECEIVER_QUERY_BUDGET', 10)
+SIGNAL_RECEIVER_BUDGETS = getattr(settings, 'SIGNAL_RECEIVER_BUDGETS', {})
+
+INSTRUMENTED_SIGNALS = {
+    'pre_save': signals.pre_save,
+    'post_save': signals.post_save,
+    'pre_delete': signals.pre_delete,
+    'post_delete': signals.post_delete,
+    'm2m_changed': signals.m2m_changed,
+}
+
+
+class SignalBudgetExceeded(AssertionError):
+    """Receiver hors budget (levée seulement sous enforce_signal_budgets())"""
+
+
+_strict = threading.local()
+
+
+@contextmanager
+def enforce_signal_budgets():
+    """Dans ce bloc, un receiver hors budget lève SignalBudgetExceeded"""
+    previous = getattr(_strict, 'enabled', False)
+    _strict.enabled = True
+    try:
+        yield
+    finally:
+        _strict.enabled = previous
+
+
+def receiver_label(receiver):
+    return f"{getattr(receiver, '__module__', '?')}.{getattr(receiver, '__qualname__', repr(receiver))}"
+
+
+class ReceiverStats:
+    """Statistiques par (signal, receiver), en mémoire du process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, signal_name, label, sender, duration, queries, over_budget):
+        with self._lock:
+            stats = self._stats.get((signal_name, label))
+            if stats is None:
+                stats = self._stats[(signal_name, label)] = {
+                    'signal': signal_name, 'receiver': label, 'senders': set(),
+                    'calls': 0, 'total_time': 0.0, 'max_time': 0.0, 'queries': 0,
+                    'max_queries': 0, 'over_budget': 0,
+                }
+            stats['senders'].add(getattr(sender, '__name__', str(sender)))
+            stats['calls'] += 1
+            stats['total_time'] += duration
+            stats['max_time'] = max(stats['max_time'], duration)
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['over_budget'] += over_budget
+
+    def snapshot(self):
+        """Statistiques par receiver, les plus coûteux d'abord"""
+        with self._lock:
+            rows = [dict(stats, senders=sorted(stats['senders'])) for stats in self._stats.values()]
+        for row in rows:
+            row['avg_time'] = round(row['total_time'] / row['calls'], 3)
+            row['avg_queries'] = round(row['queries'] / row['calls'], 2)
+            row['total_time'] = round(row['total_time'], 3)
+            row['max_time'] = round(row['max_time'], 3)
+        return sorted(rows, key=lambda row: -row['total_time'])
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+receiver_stats = ReceiverStats()
+
+
+def budget_for(label):
+    """(millisecondes, requêtes) autorisées par appel du receiver"""
+    return SIGNAL_RECEIVER_BUDGETS.get(label, (SIGNAL_RECEIVER_BUDGET_MS, SIGNAL_RECEIVER_QUERY_BUDGET))
+
+
+def _timed_call(signal_name, signal, receiver, sender, named):
+    queries = [0]
+
+    def count(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    with connection.execute_wrapper(count):
+        response = receiver(signal=signal, sender=sender, **named)
+    duration = (time.perf_counter() - start) * 1000
+
+    label = receiver_label(receiver)
+    max_time, max_queries = budget_for(label)
+    over_budget = duration > max_time or queries[0] > max_queries
+    receiver_stats.record(signal_name, label, sender, duration, queries[0], over_budget)
+    if over_budget:
+        message = (f"Receiver {label} ({signal_name}, {getattr(sender, '__name__', sender)}) hors budget : "
+                   f"{duration:.1f} ms / {max_time} ms, {queries[0]} / {max_queries} requêtes")
+        if getattr(_strict, 'enabled', False):
+            raise SignalBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
+
+def _instrumented_send(signal_name, signal):
+    def send(sender, **named):
+        # Même déroulement que Signal.send (Django 4.2), receiver par receiver
+        if not signal.receivers or signal.sender_receivers_cache.get(sender) is NO_RECEIVERS:
+            return []
+        return [
+            (receiver, _timed_call(signal_name, signal, receiver, sender, named))
+            for receiver in signal._live_receivers(sender)
+        ]
+    return send
+
+
+def install():
+    """Instrumente les signaux de modèle (une fois par process)"""
+    if not SIGNAL_TIMING_ENABLED:
+        return
+    for name, signal in INSTRUMENTED_SIGNALS.items():
+        if 'send' not in vars(signal):
+            signal.send = _instrumented_send(name, signal)
@@ -0,0 +1,16 @@
+"""
+Signaux du monitoring : les règles de profilage gardées en mémoire des
+process sont rechargées après chaque modification
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ProfilingRule
+from .profiling import bump_rules_version
+
+
+@receiver(post_save, sender=ProfilingRule)
+@receiver(post_delete, sender=ProfilingRule)
+def reload_profiling_rules(sender, instance, **kwargs):
+    transaction.on_commit(bump_rules_version)
@@ -0,0 +1,173 @@
+"""
+Traçage SQL par requête et détection des N+1
+
+Une requête HTTP est tracée si elle porte l'en-tête `X-SQL-Trace: 1`
+(accepté si SQL_TRACE_ALLOW_HEADER, par défaut en DEBUG) ou si elle est
+tirée au sort (SQL_TRACE_SAMPLE_RATE, entre 0 et 1, 0 par défaut).
+
+Pendant une requête tracée, chaque requête SQL (toutes les bases) passe
+par un `execute_wrapper` qui relève :
+    - sa durée ;
+    - son empreinte : le SQL sans valeurs littérales, listes IN réduites,
+      espaces normalisés ;
+    - la ligne du code de l'application qui l'a déclenchée (premier cadre
+      de la pile hors Django / bibliothèques).
+
+À la fin de la requête, les exécutions sont regroupées par empreinte. Une
+empreinte exécutée au moins SQL_TRACE_N_PLUS_ONE_THRESHOLD fois est une
+suspicion de N+1 (requête dans une boucle : serializer, propriété...).
+La trace (SQLTrace) et ses empreintes (SQLTraceFinding) sont enregistrées
+et consultables dans l'admin et sous /api/monitoring/sql-traces/ ;
+/api/monitoring/sql-traces/n-plus-one/ agrège les suspicions par empreinte.
+
+La réponse d'une requête tracée porte `X-SQL-Queries` et `X-SQL-Trace-Id`.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SQL_TRACE_HEADER = 'HTTP_X_SQL_TRACE'
+SQL_TRACE_ALLOW_HEADER = getattr(settings, 'SQL_TRACE_ALLOW_HEADER', settings.DEBUG)
+SQL_TRACE_SAMPLE_RATE = getattr(settings, 'SQL_TRACE_SAMPLE_RATE', 0.0)
+SQL_TRACE_N_PLUS_ONE_THRESHOLD = getattr(settings, 'SQL_TRACE_N_PLUS_ONE_THRESHOLD', 5)
+
+# Les requêtes de ces chemins ne sont jamais tracées (lecture des traces, fichiers)
+UNTRACED_PREFIXES = ('/api/monitoring/sql-traces/', '/static/', '/media/')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\$\d+)\s*,?)+\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def fingerprint(sql):
+    """SQL normalisé : même empreinte pour la même requête avec d'autres valeurs"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def _code_location():
+    """'app/module.py:ligne in fonction' du premier cadre de l'application"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(_PROJECT_ROOT) and filename != _THIS_FILE
+                and 'site-packages' not in filename):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ''
+
+
+class QueryTracer:
+    """execute_wrapper qui relève chaque requête SQL exécutée"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000, _code_location()))
+
+    def trace(self):
+        """Active le traçage sur toutes les bases (gestionnaire de contexte)"""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+    def findings(self, threshold=None):
+        """Exécutions regroupées par empreinte, les plus fréquentes d'abord"""
+        threshold = threshold or SQL_TRACE_N_PLUS_ONE_THRESHOLD
+        groups = {}
+        for sql, duration, location in self.queries:
+            normalized = fingerprint(sql)
+            group = groups.setdefault(normalized, {'count': 0, 'total_time': 0.0, 'locations': {}})
+            group['count'] += 1
+            group['total_time'] += duration
+            group['locations'][location] = group['locations'].get(location, 0) + 1
+
+        findings = []
+        for normalized, group in groups.items():
+            findings.append({
+                'fingerprint': normalized,
+                'fingerprint_hash': hashlib.sha1(normalized.encode()).hexdigest(),
+                'count': group['count'],
+                'total_time': round(group['total_time'], 3),
+                'location': max(group['locations'], key=group['locations'].get)[:300],
+                'is_n_plus_one': group['count'] >= threshold,
+            })
+        findings.sort(key=lambda finding: (-finding['count'], -finding['total_time']))
+        return findings
+
+
+def should_trace(request):
+    if request.path.startswith(UNTRACED_PREFIXES):
+        return False
+    if SQL_TRACE_ALLOW_HEADER and request.META.get(SQL_TRACE_HEADER) in ('1', 'true'):
+        return True
+    return SQL_TRACE_SAMPLE_RATE > 0 and random.random() < SQL_TRACE_SAMPLE_RATE
+
+
+def save_trace(request, response, tracer, duration):
+    """Enregistre la trace et ses empreintes (hors traçage). Retourne la trace."""
+    from .models import SQLTrace, SQLTraceFinding
+
+    findings = tracer.findings()
+    user = getattr(request, 'user', None)
+    trace = SQLTrace.objects.create(
+        endpoint=request.path[:200],
+        method=request.method,
+        status_code=response.status_code,
+        user=user if user is not None and user.is_authenticated else None,
+        duration=round(duration, 3),
+        query_count=len(tracer.queries),
+        query_time=round(sum(finding['total_time'] for finding in findings), 3),
+        n_plus_one_count=sum(1 for finding in findings if finding['is_n_plus_one']),
+    )
+    SQLTraceFinding.objects.bulk_create([SQLTraceFinding(trace=trace, **finding) for finding in findings])
+    return trace
+
+
+class SQLTracingMiddleware:
+    """Trace les requêtes SQL des requêtes HTTP choisies (en-tête ou échantillon)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_trace(request):
+            return self.get_response(request)
+
+        tracer = QueryTracer()
+        start = time.perf_counter()
+        with tracer.trace():
+            response = self.get_response(request)
+        duration = (time.perf_counter() - start) * 1000
+
+        try:
+            trace = save_trace(request, response, tracer, duration)
+        except Exception:
+            logger.exception('Trace SQL non enregistrée pour %s', request.path)
+            return response
+        response['X-SQL-Queries'] = str(trace.query_count)
+        response['X-SQL-Trace-Id'] = str(trace.pk)
+        return response
@@ -0,0 +1,188 @@
+import time
+import zlib
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.authentication import ClaimsRefreshToken
+from accounts.models import UserActivity
+from products.models import Category, Product
+
+from .models import (
+    ActivityRollup, PerformanceLog, PerformanceRollup, RequestProfile, SQLTrace, SystemAlert, SystemMetric
+)
+from .profiling import RequestProfiler, top_functions
+from .signal_timing import SignalBudgetExceeded, enforce_signal_budgets, receiver_stats
+from .retention import apply_retention
+from .sql_tracing import QueryTracer, fingerprint
+
+User = get_user_model()
+
+
+class TelemetryRetentionTest(TestCase):
+    """Tests de l'agrégation et de la purge de la télémétrie"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gerant', password='x', role='manager')
+        self.old = timezone.now() - timedelta(days=30)
+
+    def test_performance_logs_rolled_up_then_deleted(self):
+        moment = self.old.replace(minute=10)
+        PerformanceLog.objects.bulk_create([
+            PerformanceLog(endpoint='/api/sales/', method='GET', response_time=float(ms),
+                           status_code=500 if ms == 100 else 200, timestamp=moment)
+            for ms in range(1, 101)
+        ])
+        PerformanceLog.objects.create(endpoint='/api/sales/', method='GET', response_time=5, status_code=200)
+
+        counts = apply_retention(['performance_logs'])
+
+        self.assertEqual(counts['performance_logs'], {'rolled_up': 1, 'deleted': 100})
+        self.assertEqual(PerformanceLog.objects.count(), 1)
+        rollup = PerformanceRollup.objects.get()
+        self.assertEqual((rollup.request_count, rollup.error_count), (100, 1))
+        self.assertEqual((rollup.p50_response_time, rollup.p95_response_time, rollup.max_response_time),
+                         (50.0, 95.0, 100.0))
+        self.assertEqual(rollup.bucket, timezone.localtime(moment).replace(minute=0, second=0, microsecond=0))
+
+        # Second passage : rien à recompter
+        self.assertEqual(apply_retention(['performance_logs'])['performance_logs'], {'rolled_up': 0, 'deleted': 0})
+
+    def test_activities_and_protected_metrics(self):
+        for action in ('login', 'login', 'logout'):
+            activity = UserActivity.objects.create(user=self.user, action=action, description=action)
+            UserActivity.objects.filter(pk=activity.pk).update(timestamp=self.old - timedelta(days=90))
+        metric = SystemMetric.objects.create(metric_type='cpu', value=95, unit='%', timestamp=self.old)
+        SystemMetric.objects.create(metric_type='cpu', value=15, unit='%', timestamp=self.old)
+        SystemAlert.objects.create(title='CPU', message='CPU élevé', metric=metric)
+
+        apply_retention()
+
+        self.assertFalse(UserActivity.objects.exists())
+        self.assertEqual(
+            dict(ActivityRollup.objects.values_list('action', 'count')), {'login': 2, 'logout': 1}
+        )
+        # La métrique citée par une alerte active est agrégée mais conservée
+        self.assertEqual(list(SystemMetric.objects.values_list('pk', flat=True)), [metric.pk])
+
+
+class SQLTracingTest(TestCase):
+    """Tests du traçage SQL et de la détection des N+1"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='x', role='admin')
+        self.auth = f'Bearer {ClaimsRefreshToken.for_user(self.admin).access_token}'
+
+    def test_repeated_fingerprint_flagged_with_location(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'a''b' AND x IN (%s, %s, %s)"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...)'
+        )
+        tracer = QueryTracer()
+        with tracer.trace():
+            for pk in range(6):
+                User.objects.filter(pk=pk).first()
+            User.objects.count()
+
+        loop, single = tracer.findings()
+        self.assertEqual((loop['count'], loop['is_n_plus_one']), (6, True))
+        self.assertFalse(single['is_n_plus_one'])
+        self.assertTrue(loop['location'].startswith('monitoring/tests.py:'))
+
+    @mock.patch('monitoring.sql_tracing.SQL_TRACE_ALLOW_HEADER', True)
+    def test_header_traces_request_and_aggregates_findings(self):
+        category = Category.objects.create(name='Boissons', type='boissons')
+        for i in range(3):
+            Product.objects.create(name=f'Produit {i}', category=category, purchase_price=1000, selling_price=1500)
+
+        response = self.client.get('/api/products/', HTTP_AUTHORIZATION=self.auth, HTTP_X_SQL_TRACE='1')
+        self.assertEqual(response.status_code, 200)
+        trace = SQLTrace.objects.get(pk=response['X-SQL-Trace-Id'])
+        self.assertEqual(trace.query_count, int(response['X-SQL-Queries']))
+        self.assertTrue(trace.findings.exists())
+
+        # Sans l'en-tête : pas de trace
+        self.client.get('/api/products/', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(SQLTrace.objects.count(), 1)
+
+        response = self.client.get('/api/monitoring/sql-traces/n-plus-one/', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [group['executions'] for group in response.json()],
+            list(trace.findings.filter(is_n_plus_one=True).values_list('count', flat=True))
+        )
+
+
+class ProfilingTest(TestCase):
+    """Tests du profilage à la demande"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='x', role='admin')
+        self.auth = f'Bearer {ClaimsRefreshToken.for_user(self.admin).access_token}'
+
+    def test_rule_profiles_n_matching_requests(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/monitoring/profiling-rules/', {
+                'path': '/api/products/', 'user': self.admin.pk, 'remaining': 1
+            }, HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response.status_code, 201, response.content)
+
+        self.client.get('/api/sales/', HTTP_AUTHORIZATION=self.auth)
+        first = self.client.get('/api/products/', HTTP_AUTHORIZATION=self.auth)
+        second = self.client.get('/api/products/', HTTP_AUTHORIZATION=self.auth)
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(first['X-Profile-Id'], str(profile.pk))
+        self.assertNotIn('X-Profile-Id', second)
+        self.assertGreater(profile.query_count, 0)
+        self.assertAlmostEqual(
+            profile.python_time + profile.db_time + profile.serialization_time, profile.wall_time, delta=0.01
+        )
+
+        response = self.client.get(f'/api/monitoring/profiles/{profile.pk}/download/', HTTP_AUTHORIZATION=self.auth)
+        self.assertEqual(response['Content-Type'], 'text/plain; charset=utf-8')
+
+    def test_sampled_stacks_summarized(self):
+        with RequestProfiler() as profiler:
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+        profile = RequestProfile(data=zlib.compress(profiler.collapsed().encode()))
+
+        busy = top_functions(profile)[0]
+        self.assertEqual(busy['function'], 'monitoring/tests.py:test_sampled_stacks_summarized')
+        self.assertGreater(busy['own_percent'], 50)
+
+
+class SignalTimingTest(TestCase):
+    """Tests de la mesure des receivers de signaux"""
+
+    def setUp(self):
+        receiver_stats.reset()
+        self.admin = User.objects.create_user(username='admin', password='x', role='admin')
+        self.auth = f'Bearer {ClaimsRefreshToken.for_user(self.admin).access_token}'
+        self.category = Category.objects.create(name='Boissons', type='boissons')
+
+    def _product(self):
+        return Product.objects.create(name='Primus', category=self.category, purchase_price=1000, selling_price=1500)
+
+    def test_receivers_timed_and_exposed(self):
+        self._product()
+
+        response = self.client.get('/api/monitoring/signals/', HTTP_AUTHORIZATION=self.auth)
+        rows = {(row['signal'], row['receiver']): row for row in response.json()['receivers']}
+        self.assertIn('reports.signals.check_stock_level', {receiver for _signal, receiver in rows})
+        row = rows[('post_save', 'reports.signals.check_stock_level')]
+        self.assertEqual((row['calls'], row['senders']), (1, ['Product']))
+        self.assertEqual(row['budget_queries'], 10)
+
+    def test_budget_enforced_in_tests(self):
+        budgets = {'reports.signals.check_stock_level': (0, 100)}
+        with mock.patch('monitoring.signal_timing.SIGNAL_RECEIVER_BUDGETS', budgets):
+            with self.assertLogs('monitoring.signal_timing', 'WARNING'):
+                product = self._product()
+            with enforce_signal_budgets(), self.assertRaises(SignalBudgetExceeded):
+                product.save()
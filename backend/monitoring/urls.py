@@ -6,8 +6,15 @@ router = DefaultRouter()
 router.register(r'metrics', views.SystemMetricViewSet)
 router.register(r'alerts', views.SystemAlertViewSet)
 router.register(r'performance', views.PerformanceLogViewSet)
+router.register(r'performance-rollups', views.PerformanceRollupViewSet)
+router.register(r'metric-rollups', views.MetricRollupViewSet)
+router.register(r'activity-rollups', views.ActivityRollupViewSet)
+router.register(r'sql-traces', views.SQLTraceViewSet)
+router.register(r'profiling-rules', views.ProfilingRuleViewSet)
+router.register(r'profiles', views.RequestProfileViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('stats/', views.system_stats, name='system_stats'),
+    path('signals/', views.signal_stats, name='signal_stats'),
 ]
@@ -5,16 +5,30 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework import permissions
 from django.utils import timezone
-from django.db.models import Avg, Count
+from django.db.models import Avg, Count, Max, Sum
 from datetime import timedelta
-import psutil
+import os
 import platform
 
-from .models import SystemMetric, SystemAlert, PerformanceLog
+from django.http import HttpResponse
+from accounts.permissions import IsAdmin
+from barstock_api.lazy import lazy_import
+from .models import (
+    SystemMetric, SystemAlert, PerformanceLog, PerformanceRollup, MetricRollup, ActivityRollup,
+    SQLTrace, SQLTraceFinding, ProfilingRule, RequestProfile
+)
 from .serializers import (
     SystemMetricSerializer, SystemAlertSerializer, 
-    PerformanceLogSerializer, SystemStatsSerializer
+    PerformanceLogSerializer, SystemStatsSerializer,
+    PerformanceRollupSerializer, MetricRollupSerializer, ActivityRollupSerializer,
+    SQLTraceSerializer, SQLTraceDetailSerializer,
+    ProfilingRuleSerializer, RequestProfileSerializer
 )
+from .profiling import load_stacks, top_functions
+from .signal_timing import SIGNAL_RECEIVER_BUDGET_MS, SIGNAL_RECEIVER_QUERY_BUDGET, budget_for, receiver_stats
+
+# Chargé au premier appel de system_stats, pas au démarrage du worker
+psutil = lazy_import('psutil')
 
 class SystemMetricViewSet(viewsets.ModelViewSet):
     """ViewSet pour les métriques système"""
@@ -54,6 +68,150 @@ class PerformanceLogViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['endpoint', 'method', 'status_code']
     ordering = ['-timestamp']
 
+class RollupFilterMixin:
+    """Filtre ?start= / ?end= (ISO 8601) sur le début du créneau"""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        start = self.request.query_params.get('start')
+        end = self.request.query_params.get('end')
+        if start:
+            queryset = queryset.filter(bucket__gte=start)
+        if end:
+            queryset = queryset.filter(bucket__lt=end)
+        return queryset
+
+class PerformanceRollupViewSet(RollupFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Historique agrégé des performances (au-delà de la rétention des logs bruts)"""
+    queryset = PerformanceRollup.objects.all()
+    serializer_class = PerformanceRollupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['period', 'endpoint', 'method']
+    ordering = ['-bucket']
+
+class MetricRollupViewSet(RollupFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Historique agrégé des métriques système"""
+    queryset = MetricRollup.objects.all()
+    serializer_class = MetricRollupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['period', 'metric_type']
+    ordering = ['-bucket']
+
+class ActivityRollupViewSet(RollupFilterMixin, viewsets.ReadOnlyModelViewSet):
+    """Activité agrégée par utilisateur et action"""
+    queryset = ActivityRollup.objects.select_related('user')
+    serializer_class = ActivityRollupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['period', 'user', 'action']
+    ordering = ['-bucket']
+
+class SQLTraceViewSet(viewsets.ReadOnlyModelViewSet):
+    """Traces SQL des requêtes tracées (voir monitoring/sql_tracing.py)"""
+    queryset = SQLTrace.objects.select_related('user')
+    permission_classes = [IsAdmin]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['endpoint', 'method', 'status_code']
+    ordering_fields = ['timestamp', 'query_count', 'query_time', 'duration', 'n_plus_one_count']
+    ordering = ['-timestamp']
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return SQLTraceDetailSerializer
+        return SQLTraceSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('findings')
+        return queryset
+
+    @action(detail=False, methods=['get'], url_path='n-plus-one')
+    def n_plus_one(self, request):
+        """Suspicions N+1 regroupées par empreinte, les plus coûteuses d'abord"""
+        findings = SQLTraceFinding.objects.filter(is_n_plus_one=True)
+        endpoint = request.query_params.get('endpoint')
+        if endpoint:
+            findings = findings.filter(trace__endpoint=endpoint)
+
+        groups = findings.values('fingerprint_hash').annotate(
+            traces=Count('trace', distinct=True),
+            executions=Sum('count'),
+            max_per_request=Max('count'),
+            total_time=Sum('total_time'),
+            last_seen=Max('trace__timestamp'),
+        ).order_by('-total_time')[:50]
+
+        # Texte, origine et endpoints de chaque empreinte (une requête)
+        details = {}
+        for fingerprint_hash, fingerprint, location, trace_endpoint in findings.filter(
+            fingerprint_hash__in=[group['fingerprint_hash'] for group in groups]
+        ).order_by('-trace__timestamp').values_list('fingerprint_hash', 'fingerprint', 'location', 'trace__endpoint'):
+            detail = details.setdefault(fingerprint_hash, {
+                'fingerprint': fingerprint, 'location': location, 'endpoints': []
+            })
+            if trace_endpoint not in detail['endpoints']:
+                detail['endpoints'].append(trace_endpoint)
+
+        return Response([
+            {**group, 'total_time': round(group['total_time'], 3), **details[group['fingerprint_hash']]}
+            for group in groups
+        ])
+
+class ProfilingRuleViewSet(viewsets.ModelViewSet):
+    """Règles de profilage à la demande (voir monitoring/profiling.py)"""
+    queryset = ProfilingRule.objects.select_related('created_by')
+    serializer_class = ProfilingRuleSerializer
+    permission_classes = [IsAdmin]
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+class RequestProfileViewSet(viewsets.ReadOnlyModelViewSet):
+    """Profils de requêtes enregistrés"""
+    queryset = RequestProfile.objects.defer('data')
+    serializer_class = RequestProfileSerializer
+    permission_classes = [IsAdmin]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['rule', 'endpoint', 'method']
+    ordering_fields = ['timestamp', 'wall_time', 'cpu_time', 'db_time']
+    ordering = ['-timestamp']
+
+    def retrieve(self, request, pk=None):
+        """Profil avec les fonctions les plus présentes"""
+        profile = self.get_object()
+        data = self.get_serializer(profile).data
+        data['top_functions'] = top_functions(profile)
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Piles échantillonnées au format collapsed (speedscope, flamegraph.pl)"""
+        profile = self.get_object()
+        content = '\n'.join(f'{stack} {count}' for stack, count in load_stacks(profile).items())
+        response = HttpResponse(content, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.collapsed"'
+        return response
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdmin])
+def signal_stats(request):
+    """Coût des receivers de signaux de modèle dans ce process (DELETE : remise à zéro)"""
+    if request.method == 'DELETE':
+        receiver_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    receivers = receiver_stats.snapshot()
+    for row in receivers:
+        row['budget_time'], row['budget_queries'] = budget_for(row['receiver'])
+    return Response({
+        'pid': os.getpid(),
+        'default_budget': {'time': SIGNAL_RECEIVER_BUDGET_MS, 'queries': SIGNAL_RECEIVER_QUERY_BUDGET},
+        'receivers': receivers,
+    })
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def system_stats(request):
@@ -0,0 +1,48 @@
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .kitchen_queue import KITCHEN_GROUP, kitchen_queue
+
+
+class KitchenQueueConsumer(AsyncWebsocketConsumer):
+    """
+    Écrans cuisine : la file complète à la connexion, puis uniquement
+    les changements (enqueue / dequeue / status / update)
+    """
+
+    async def connect(self):
+        await self.channel_layer.group_add(KITCHEN_GROUP, self.channel_name)
+        await self.accept()
+
+        tickets = await database_sync_to_async(kitchen_queue.tickets)()
+        await self.send(text_data=json.dumps({
+            'type': 'snapshot',
+            'orders': tickets
+        }))
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(KITCHEN_GROUP, self.channel_name)
+
+    async def receive(self, text_data):
+        """Le client peut redemander la file complète (ex: après reconnexion)"""
+        try:
+            message_type = json.loads(text_data).get('type', 'ping')
+        except json.JSONDecodeError:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': 'Format JSON invalide'}))
+            return
+
+        if message_type == 'snapshot':
+            tickets = await database_sync_to_async(kitchen_queue.tickets)()
+            await self.send(text_data=json.dumps({'type': 'snapshot', 'orders': tickets}))
+        elif message_type == 'ping':
+            await self.send(text_data=json.dumps({'type': 'pong'}))
+
+    async def queue_event(self, event):
+        await self.send(text_data=json.dumps({
+            'type': event['event'],
+            'order_id': event['order_id'],
+            'order': event['order'],
+            'position': event['position']
+        }))
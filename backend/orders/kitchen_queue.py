@@ -0,0 +1,238 @@
+"""
+File d'attente cuisine en mémoire
+
+Les tickets ouverts (pending, confirmed, preparing, ready) sont gardés,
+déjà sérialisés, dans une liste triée par (priorité, created_at) :
+    - chargée depuis la base au premier accès du process ;
+    - mise à jour ticket par ticket par les signaux de orders/signals.py,
+      après commit (`schedule_refresh()` : un rafraîchissement par ticket
+      et par transaction, même si plusieurs articles changent) ;
+    - chaque changement est poussé aux écrans cuisine via le groupe
+      WebSocket KITCHEN_GROUP (enqueue / dequeue / status / update).
+
+Les écrans lisent donc la file sans requête ni sérialisation.
+
+Plusieurs process : chaque changement incrémente une version dans le cache
+partagé. Un process qui voit une version qu'il n'a pas appliquée lui-même
+recharge sa copie depuis la base.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('pending', 'confirmed', 'preparing', 'ready')
+PRIORITY_RANK = {'urgent': 0, 'high': 1, 'normal': 2, 'low': 3}
+
+QUEUE_VERSION_KEY = 'orders:kitchen_queue:version'
+KITCHEN_GROUP = 'kitchen_queue'
+
+
+def _new_version():
+    # Basée sur l'heure : reste croissante même si la clé a été évincée
+    return int(time.time() * 1000)
+
+
+def get_queue_version():
+    version = cache.get(QUEUE_VERSION_KEY)
+    if version is None:
+        cache.add(QUEUE_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(QUEUE_VERSION_KEY)
+    return version
+
+
+def _bump_queue_version():
+    try:
+        return cache.incr(QUEUE_VERSION_KEY)
+    except ValueError:
+        version = _new_version()
+        cache.set(QUEUE_VERSION_KEY, version, timeout=None)
+        return version
+
+
+def _orders_queryset():
+    from .models import Order
+
+    return Order.objects.select_related('table', 'server', 'sale').prefetch_related(
+        'items__product', 'sale__items__product'
+    )
+
+
+def _sort_key(order):
+    return (PRIORITY_RANK.get(order.priority, len(PRIORITY_RANK)), order.created_at, order.pk)
+
+
+def _serialize(order):
+    from .serializers import OrderSerializer
+
+    # Données JSON pures : réutilisables telles quelles par les vues et le channel layer
+    return json.loads(JSONRenderer().render(OrderSerializer(order).data))
+
+
+def publish_queue_event(event, order_id, ticket=None, position=None):
+    """Envoie un événement de file aux écrans cuisine (si Channels est actif)"""
+    try:
+        from channels.layers import get_channel_layer
+        from asgiref.sync import async_to_sync
+    except ImportError:
+        return  # Channels non disponible
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(KITCHEN_GROUP, {
+            'type': 'queue_event',
+            'event': event,
+            'order_id': order_id,
+            'order': ticket,
+            'position': position,
+        })
+    except Exception as e:
+        logger.warning("Événement file cuisine non diffusé (%s #%s): %s", event, order_id, e)
+
+
+class KitchenQueue:
+    """Tickets ouverts triés par (priorité, created_at)"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []       # clés triées
+        self._tickets = {}    # id -> (clé, ticket sérialisé)
+        self._by_sale = {}    # sale_id -> id du ticket
+        self._version = None  # version partagée reflétée par cette copie
+
+    def _insert(self, key, order_id, sale_id, ticket):
+        bisect.insort(self._keys, key)
+        self._tickets[order_id] = (key, ticket)
+        if sale_id:
+            self._by_sale[sale_id] = order_id
+
+    def _remove(self, order_id):
+        key, ticket = self._tickets.pop(order_id)
+        del self._keys[bisect.bisect_left(self._keys, key)]
+        if ticket.get('sale'):
+            self._by_sale.pop(ticket['sale'], None)
+        return ticket
+
+    def rebuild(self):
+        """Recharge tous les tickets ouverts depuis la base"""
+        version = get_queue_version()
+        orders = list(_orders_queryset().filter(status__in=OPEN_STATUSES))
+        with self._lock:
+            self._keys, self._tickets, self._by_sale = [], {}, {}
+            for order in orders:
+                self._insert(_sort_key(order), order.pk, order.sale_id, _serialize(order))
+            self._version = version
+
+    def _ensure_current(self):
+        if self._version != get_queue_version():
+            self.rebuild()
+
+    def tickets(self, statuses=None):
+        """Tickets dans l'ordre de la file, filtrés par statut"""
+        self._ensure_current()
+        with self._lock:
+            tickets = [self._tickets[key[2]][1] for key in self._keys]
+        if statuses:
+            tickets = [ticket for ticket in tickets if ticket['status'] in statuses]
+        return tickets
+
+    def refresh(self, order_id):
+        """Applique l'état en base d'un ticket (appelé après commit)"""
+        order = _orders_queryset().filter(pk=order_id).first()
+        if order is None or order.status not in OPEN_STATUSES:
+            self.discard(order_id)
+            return
+
+        ticket = _serialize(order)
+        key = _sort_key(order)
+        with self._lock:
+            previous = self._tickets.get(order_id)
+            if previous:
+                self._remove(order_id)
+            self._insert(key, order_id, order.sale_id, ticket)
+            position = bisect.bisect_left(self._keys, key)
+            self._applied(_bump_queue_version())
+
+        if previous is None:
+            event = 'enqueue'
+        elif previous[1]['status'] != ticket['status']:
+            event = 'status'
+        else:
+            event = 'update'
+        publish_queue_event(event, order_id, ticket, position)
+
+    def order_for_sale(self, sale_id):
+        """Ticket cuisine ouvert d'une vente, ou None"""
+        with self._lock:
+            order_id = self._by_sale.get(sale_id) if self._version is not None else None
+        if order_id is None and self._version is None:
+            # File pas encore chargée dans ce process : la base fait foi
+            from .models import Order
+            order_id = Order.objects.filter(
+                sale_id=sale_id, status__in=OPEN_STATUSES
+            ).values_list('id', flat=True).first()
+        return order_id
+
+    def discard(self, order_id):
+        """Retire un ticket servi, annulé ou supprimé"""
+        with self._lock:
+            loaded = self._version is not None
+            removed = order_id in self._tickets
+            if removed:
+                self._remove(order_id)
+            self._applied(_bump_queue_version())
+        # Copie non chargée : on ne sait pas si le ticket était affiché
+        if removed or not loaded:
+            publish_queue_event('dequeue', order_id)
+
+    def _applied(self, new_version):
+        # Copie à jour seulement si aucun autre process n'a changé la file entre-temps
+        if self._version is not None and new_version == self._version + 1:
+            self._version = new_version
+        else:
+            self._version = None
+
+
+kitchen_queue = KitchenQueue()
+
+_pending = threading.local()
+
+
+def schedule_refresh(order_ids=(), sale_ids=()):
+    """
+    Met en attente le rafraîchissement des tickets (ou des tickets des
+    ventes) ; traité une fois après le commit de la transaction en cours
+    (tout de suite hors transaction)
+    """
+    if not hasattr(_pending, 'orders'):
+        _pending.orders, _pending.sales = set(), set()
+    _pending.orders.update(order_ids)
+    _pending.sales.update(sale_ids)
+    # Un rappel par demande : le premier traite tout, les suivants n'ont plus rien
+    transaction.on_commit(flush_refreshes)
+
+
+def flush_refreshes():
+    """Rafraîchit les tickets en attente dans ce thread"""
+    order_ids = getattr(_pending, 'orders', set())
+    sale_ids = getattr(_pending, 'sales', set())
+    if not order_ids and not sale_ids:
+        return
+    _pending.orders, _pending.sales = set(), set()
+
+    for sale_id in sale_ids:
+        order_id = kitchen_queue.order_for_sale(sale_id)
+        if order_id is not None:
+            order_ids.add(order_id)
+    for order_id in sorted(order_ids):
+        kitchen_queue.refresh(order_id)
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_sale_sale_status_created_idx'),
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='sale',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='kitchen_order', to='sales.sale', verbose_name='Vente'),
+        ),
+    ]
@@ -29,6 +29,17 @@ class Order(models.Model):
         unique=True,
         verbose_name='Numéro de commande'
     )
+
+    # Ticket cuisine d'une vente : ses lignes sont les SaleItem de la vente
+    # (source unique), aucun OrderItem n'est écrit dans ce cas
+    sale = models.OneToOneField(
+        'sales.Sale',
+        on_delete=models.CASCADE,
+        related_name='kitchen_order',
+        null=True,
+        blank=True,
+        verbose_name='Vente'
+    )
     
     table = models.ForeignKey(
         'sales.Table',
@@ -117,6 +128,15 @@ class Order(models.Model):
             self.order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
         super().save(*args, **kwargs)
 
+    def get_lines(self):
+        """
+        Lignes de la commande : articles de la vente liée,
+        ou OrderItem pour une commande saisie directement en cuisine
+        """
+        if self.sale_id:
+            return self.sale.items.all()
+        return self.items.all()
+
 class OrderItem(models.Model):
     """
     Articles dans une commande
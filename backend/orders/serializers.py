@@ -13,20 +13,46 @@ class OrderItemSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['total_price']
 
+class OrderLineSerializer(serializers.Serializer):
+    """
+    Ligne de commande en lecture : OrderItem, ou SaleItem pour le ticket
+    cuisine d'une vente (le statut est alors celui de la commande)
+    """
+    # Une commande annulée n'a plus rien à préparer : ses lignes sont annulées
+    LINE_STATUS = {'confirmed': 'pending'}
+
+    id = serializers.IntegerField(read_only=True)
+    product = serializers.IntegerField(source='product_id', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    quantity = serializers.IntegerField(read_only=True)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    notes = serializers.CharField(read_only=True)
+    status = serializers.SerializerMethodField()
+
+    def get_status(self, obj):
+        if isinstance(obj, OrderItem):
+            return obj.status
+        order_status = self.context['order'].status
+        return self.LINE_STATUS.get(order_status, order_status)
+
 class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True)
+    items = serializers.SerializerMethodField()
     server = UserSerializer(read_only=True)
     table_number = serializers.CharField(source='table.number', read_only=True)
     
     class Meta:
         model = Order
         fields = [
-            'id', 'order_number', 'table', 'table_number', 'server', 
+            'id', 'order_number', 'sale', 'table', 'table_number', 'server', 
             'status', 'priority', 'total_amount', 'notes', 
             'estimated_time', 'created_at', 'confirmed_at', 
             'ready_at', 'served_at', 'items'
         ]
-        read_only_fields = ['order_number', 'created_at', 'total_amount']
+        read_only_fields = ['order_number', 'sale', 'created_at', 'total_amount']
+
+    def get_items(self, obj):
+        return OrderLineSerializer(obj.get_lines(), many=True, context={'order': obj}).data
 
 class OrderCreateSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
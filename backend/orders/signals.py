@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from sales.models import SaleItem
+
+from .kitchen_queue import kitchen_queue, schedule_refresh
+from .models import Order, OrderItem
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, **kwargs):
+    """Met à jour la file cuisine après une transition de statut"""
+    schedule_refresh(order_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    order_id = instance.pk
+    transaction.on_commit(lambda: kitchen_queue.discard(order_id))
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def order_item_changed(sender, instance, **kwargs):
+    schedule_refresh(order_ids=[instance.order_id])
+
+
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+def sale_item_changed(sender, instance, **kwargs):
+    """Articles ajoutés à une vente : son ticket cuisine change aussi"""
+    schedule_refresh(sale_ids=[instance.sale_id])
@@ -0,0 +1,112 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Category, Product
+from sales.models import Sale, SaleItem
+
+from .kitchen_queue import kitchen_queue
+from .models import Order
+from .serializers import OrderSerializer
+
+User = get_user_model()
+
+
+class KitchenQueueTest(TestCase):
+    """Tests de la file cuisine en mémoire"""
+
+    url = '/api/orders/orders/kitchen_queue/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='cuisinier', password='x', role='server')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _order(self, priority, status='confirmed'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Order.objects.create(server=self.user, priority=priority, status=status)
+
+    def test_priority_then_age_without_query(self):
+        normal = self._order('normal')
+        urgent = self._order('urgent')
+        low = self._order('low')
+        kitchen_queue.tickets()  # chargement initial
+        self.client.get(self.url)  # règles de profilage rechargées après cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual([t['id'] for t in response.json()], [urgent.pk, normal.pk, low.pk])
+
+    def test_transitions_move_tickets(self):
+        order = self._order('normal')
+        self.assertEqual([t['id'] for t in kitchen_queue.tickets()], [order.pk])
+
+        order.status = 'ready'
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(kitchen_queue.tickets(statuses=('confirmed', 'preparing')), [])
+        self.assertEqual([t['id'] for t in kitchen_queue.tickets(statuses=('ready',))], [order.pk])
+
+        order.status = 'served'
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertEqual(kitchen_queue.tickets(), [])
+
+
+class OrderLinesTest(TestCase):
+    """Lignes d'un ticket cuisine lues depuis la vente"""
+
+    def test_cancelled_order_lines_are_cancelled(self):
+        user = User.objects.create_user(username='serveur', password='x', role='server')
+        category = Category.objects.create(name='Boissons', type='boissons')
+        product = Product.objects.create(
+            name='Primus', category=category, purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'), current_stock=10
+        )
+        sale = Sale.objects.create(server=user, created_by=user, status='pending')
+        SaleItem.objects.create(sale=sale, product=product, quantity=2, unit_price=Decimal('2500.00'))
+        order = Order.objects.create(sale=sale, server=user, status='confirmed')
+
+        self.assertEqual([line['status'] for line in OrderSerializer(order).data['items']], ['pending'])
+        order.status = 'cancelled'
+        self.assertEqual([line['status'] for line in OrderSerializer(order).data['items']], ['cancelled'])
+
+
+class AddItemsRefreshTest(TestCase):
+    """Ajout d'articles à une vente : ticket cuisine rafraîchi une fois, total à jour"""
+
+    def test_add_items_refreshes_ticket_once(self):
+        user = User.objects.create_user(username='caissier', password='x', role='server')
+        category = Category.objects.create(name='Boissons', type='boissons')
+        primus = Product.objects.create(
+            name='Primus', category=category, purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'), current_stock=10
+        )
+        fanta = Product.objects.create(
+            name='Fanta', category=category, purchase_price=Decimal('800.00'),
+            selling_price=Decimal('1500.00'), current_stock=10
+        )
+        sale = Sale.objects.create(server=user, created_by=user, status='pending')
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(sale=sale, server=user, status='confirmed')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with mock.patch.object(kitchen_queue, 'refresh', wraps=kitchen_queue.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(
+                    f'/api/sales/{sale.pk}/add-items/',
+                    {'items': [{'product': primus.pk, 'quantity': 2}, {'product': fanta.pk, 'quantity': 1}]},
+                    format='json'
+                )
+
+        self.assertEqual(response.status_code, 200)
+        refresh.assert_called_once_with(order.pk)
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('6500.00'))
@@ -6,6 +6,7 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework import permissions
 from django.utils import timezone
 
+from .kitchen_queue import kitchen_queue
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, OrderCreateSerializer, OrderUpdateSerializer
 from accounts.permissions import IsAuthenticated
@@ -28,7 +29,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderSerializer
     
     def get_queryset(self):
-        return Order.objects.select_related('table', 'server').prefetch_related('items__product')
+        return Order.objects.select_related('table', 'server', 'sale').prefetch_related(
+            'items__product', 'sale__items__product'
+        )
     
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -115,17 +118,10 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def kitchen_queue(self, request):
-        """Récupérer la file d'attente de la cuisine"""
-        kitchen_orders = self.get_queryset().filter(
-            status__in=['confirmed', 'preparing']
-        ).order_by('priority', 'created_at')
-        
-        serializer = self.get_serializer(kitchen_orders, many=True)
-        return Response(serializer.data)
+        """Récupérer la file d'attente de la cuisine (urgent d'abord, puis par ancienneté)"""
+        return Response(kitchen_queue.tickets(statuses=('confirmed', 'preparing')))
     
     @action(detail=False, methods=['get'])
     def ready_orders(self, request):
         """Récupérer les commandes prêtes"""
-        ready_orders = self.get_queryset().filter(status='ready')
-        serializer = self.get_serializer(ready_orders, many=True)
-        return Response(serializer.data)
+        return Response(kitchen_queue.tickets(statuses=('ready',)))
@@ -7,8 +7,13 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.db import transaction
-from .models_enhanced import MenuItem, Recipe, Ingredient, MenuCategory, IngredientCategory
-from .services import StockService, MenuService, KitchenService, AnalyticsService
+from django.http import HttpResponse, HttpResponseNotModified
+from .models_enhanced import Recipe, Ingredient, MenuCategory, IngredientCategory
+from .services import StockService, KitchenService, AnalyticsService
+from .menu_snapshot import get_menu_snapshot, get_menu_version, menu_etag
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
 
 
 # ==================== SALES API (Niveau Commercial) ====================
@@ -18,28 +23,22 @@ from .services import StockService, MenuService, KitchenService, AnalyticsServic
 def sales_menu(request):
     """
     API pour la page Sales - Menu commercial simplifié
+    Servi depuis un snapshot versionné : If-None-Match à jour => 304 sans requête SQL
     """
     try:
-        # Menu organisé par catégories avec disponibilités
-        categorized_menu = MenuService.get_menu_by_category()
-        
-        # Statistiques rapides
-        total_items = MenuItem.objects.filter(is_available=True).count()
-        available_items = sum(
-            1 for items in categorized_menu.values() 
-            for item in items 
-            if item['availability']['available_quantity'] > 0
-        )
-        
-        return Response({
-            'success': True,
-            'menu': categorized_menu,
-            'stats': {
-                'total_items': total_items,
-                'available_items': available_items,
-                'unavailable_items': total_items - available_items
-            }
-        })
+        version = get_menu_version()
+        etag = menu_etag(version)
+
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            # Menu organisé par catégories avec disponibilités (JSON en cache)
+            version, content = get_menu_snapshot(version)
+            response = HttpResponse(content, content_type='application/json')
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return Response({
@@ -103,8 +102,8 @@ def process_sale(request):
                     table.status = 'cleaning'  # Marquer pour nettoyage avant libération
                     table.save()
                     table_freed = True
-                except Exception as e:
-                    print(f"Erreur libération table: {e}")
+                except Exception:
+                    events.exception('products.order.table_release_failed', table=table_id)
 
             return Response({
                 'success': True,
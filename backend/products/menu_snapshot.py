@@ -0,0 +1,86 @@
+"""
+Snapshot versionné du menu commercial (api_enhanced.sales_menu)
+
+Le menu catégorisé et les disponibilités sont calculés en lot
+(MenuService.get_menu_by_category, requêtes préchargées), puis le JSON
+rendu est gardé en cache sous le numéro de version courant.
+
+La version ne fait qu'augmenter : elle est incrémentée par les signaux de
+products/signals.py dès qu'un prix, un stock ou une recette change. Elle
+sert d'ETag : un client à jour reçoit un 304 sans aucune requête SQL.
+"""
+
+import time
+
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .services import MenuService
+
+MENU_VERSION_KEY = 'products:menu:version'
+MENU_SNAPSHOT_TIMEOUT = 60 * 60  # 1 heure
+
+
+def _new_version():
+    # Basée sur l'heure : reste croissante même si la clé a été évincée
+    return int(time.time() * 1000)
+
+
+def get_menu_version():
+    """Version courante du menu"""
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        cache.add(MENU_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+def bump_menu_version():
+    """Invalide le snapshot : le prochain appel reconstruit le menu"""
+    try:
+        cache.incr(MENU_VERSION_KEY)
+    except ValueError:
+        cache.set(MENU_VERSION_KEY, _new_version(), timeout=None)
+
+
+def menu_etag(version):
+    return f'"menu-{version}"'
+
+
+def build_menu_payload():
+    """Menu catégorisé + statistiques, calculés en lot"""
+    categorized_menu = MenuService.get_menu_by_category()
+
+    # Le menu ne contient que les articles disponibles à la vente
+    total_items = sum(len(items) for items in categorized_menu.values())
+    available_items = sum(
+        1 for items in categorized_menu.values()
+        for item in items
+        if item['availability']['available_quantity'] > 0
+    )
+
+    return {
+        'success': True,
+        'menu': categorized_menu,
+        'stats': {
+            'total_items': total_items,
+            'available_items': available_items,
+            'unavailable_items': total_items - available_items
+        }
+    }
+
+
+def get_menu_snapshot(version=None):
+    """
+    Retourne (version, json) du menu. Le JSON rendu est mis en cache pour
+    la version donnée.
+    """
+    if version is None:
+        version = get_menu_version()
+
+    key = f'products:menu:snapshot:v{version}'
+    content = cache.get(key)
+    if content is None:
+        content = JSONRenderer().render(build_menu_payload())
+        cache.set(key, content, MENU_SNAPSHOT_TIMEOUT)
+    return version, content
@@ -0,0 +1,27 @@
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import F
+
+
+def seed_average_cost(apps, schema_editor):
+    """Stock existant valorisé à partir du prix d'achat actuel (une requête)"""
+    Product = apps.get_model('products', 'Product')
+    Product.objects.update(average_cost=F('purchase_price'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_alter_ingredient_supplier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='average_cost',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=12, validators=[django.core.validators.MinValueValidator(Decimal('0.0000'))], verbose_name='Coût moyen pondéré (BIF)'),
+        ),
+        migrations.RunPython(seed_average_cost, migrations.RunPython.noop),
+    ]
@@ -110,6 +110,15 @@ class Product(models.Model):
         verbose_name='Prix d\'achat (BIF)'
     )
 
+    # Coût moyen pondéré des entrées en stock (inventory/valuation.py)
+    average_cost = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        validators=[MinValueValidator(Decimal('0.0000'))],
+        default=Decimal('0.0000'),
+        verbose_name='Coût moyen pondéré (BIF)'
+    )
+
     selling_price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -204,11 +213,23 @@ class Product(models.Model):
 
     @property
     def recipe_cost(self):
-        """Coût basé sur la recette si elle existe"""
+        """Coût basé sur la recette si elle existe, sinon coût moyen pondéré du stock"""
         if hasattr(self, 'recipe') and self.recipe:
             return self.recipe.total_cost
+        return self.unit_cost
+
+    @property
+    def unit_cost(self):
+        """Coût moyen pondéré, ou prix d'achat tant qu'aucune entrée n'est valorisée"""
+        if self.average_cost:
+            return self.average_cost.quantize(Decimal('0.01'))
         return self.purchase_price
 
+    @property
+    def stock_value(self):
+        """Valeur du stock au coût moyen pondéré"""
+        return (self.current_stock * self.unit_cost).quantize(Decimal('0.01'))
+
     @property
     def profit_margin(self):
         """Calcule la marge bénéficiaire basée sur le coût réel"""
@@ -253,6 +274,10 @@ class Product(models.Model):
         return self.current_stock == 0
 
     def save(self, *args, **kwargs):
+        # Stock initial valorisé au prix d'achat
+        if self._state.adding and not self.average_cost:
+            self.average_cost = self.purchase_price or Decimal('0.0000')
+
         # Générer un code automatique si pas fourni
         if not self.code:
             import random
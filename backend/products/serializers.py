@@ -43,7 +43,7 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'category', 'category_name', 'category_type',
             'code', 'description', 'unit', 'unit_display',
-            'purchase_price', 'selling_price', 'profit_margin', 'profit_percentage',
+            'purchase_price', 'average_cost', 'selling_price', 'profit_margin', 'profit_percentage',
             'initial_stock', 'current_stock', 'minimum_stock',
             'is_low_stock', 'is_out_of_stock', 'available_quantity', 'is_available_for_sale',
             'has_recipe', 'recipe_cost',
@@ -51,7 +51,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'is_active', 'is_available',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'profit_margin', 'profit_percentage']
+        read_only_fields = ['created_at', 'updated_at', 'average_cost', 'profit_margin', 'profit_percentage']
     
     def validate(self, data):
         # Validation des prix
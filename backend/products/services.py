@@ -34,40 +34,48 @@ class StockService:
     def get_availability_info(menu_item_id):
         """Retourne les informations détaillées de disponibilité"""
         try:
-            menu_item = MenuItem.objects.get(id=menu_item_id)
-            
-            info = {
-                'item_name': menu_item.name,
-                'type': menu_item.type,
-                'is_available': menu_item.is_available,
-                'available_quantity': 0,
-                'limiting_factors': []
-            }
-            
-            if menu_item.type == 'simple':
-                info['available_quantity'] = int(menu_item.direct_stock)
-                if menu_item.direct_stock <= 0:
-                    info['limiting_factors'].append('Stock épuisé')
-            
-            elif menu_item.recipe:
-                max_portions = menu_item.recipe.max_portions_possible()
-                info['available_quantity'] = max_portions
-                
-                # Identifier les ingrédients limitants
-                for recipe_ingredient in menu_item.recipe.recipe_ingredients.all():
-                    ingredient = recipe_ingredient.ingredient
-                    required = recipe_ingredient.quantity
-                    available = ingredient.current_stock
-                    
-                    if available < required:
-                        info['limiting_factors'].append(
-                            f"Manque {ingredient.name}: {available}/{required} {ingredient.unit}"
-                        )
-            
-            return info
-            
+            menu_item = MenuItem.objects.select_related('recipe').prefetch_related(
+                'recipe__recipe_ingredients__ingredient'
+            ).get(id=menu_item_id)
         except MenuItem.DoesNotExist:
             return None
+        return StockService.build_availability_info(menu_item)
+
+    @staticmethod
+    def build_availability_info(menu_item):
+        """
+        Disponibilité d'un article déjà chargé. Ne fait aucune requête si
+        `recipe__recipe_ingredients__ingredient` a été préchargé.
+        """
+        info = {
+            'item_name': menu_item.name,
+            'type': menu_item.type,
+            'is_available': menu_item.is_available,
+            'available_quantity': 0,
+            'limiting_factors': []
+        }
+
+        if menu_item.type == 'simple':
+            info['available_quantity'] = int(menu_item.direct_stock)
+            if menu_item.direct_stock <= 0:
+                info['limiting_factors'].append('Stock épuisé')
+
+        elif menu_item.recipe:
+            max_portions = menu_item.recipe.max_portions_possible()
+            info['available_quantity'] = max_portions
+
+            # Identifier les ingrédients limitants
+            for recipe_ingredient in menu_item.recipe.recipe_ingredients.all():
+                ingredient = recipe_ingredient.ingredient
+                required = recipe_ingredient.quantity
+                available = ingredient.current_stock
+
+                if available < required:
+                    info['limiting_factors'].append(
+                        f"Manque {ingredient.name}: {available}/{required} {ingredient.unit}"
+                    )
+
+        return info
     
     @staticmethod
     @transaction.atomic
@@ -117,7 +125,8 @@ class MenuService:
         
         menu_data = []
         for item in menu_items:
-            availability_info = StockService.get_availability_info(item.id)
+            # Calcul en mémoire sur les données préchargées
+            availability_info = StockService.build_availability_info(item)
             
             item_data = {
                 'id': item.id,
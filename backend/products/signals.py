@@ -0,0 +1,25 @@
+"""
+Signaux d'invalidation du snapshot de menu (voir menu_snapshot.py)
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .menu_snapshot import bump_menu_version
+from .models_enhanced import Ingredient, MenuCategory, MenuItem, Recipe, RecipeIngredient
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=MenuCategory)
+@receiver(post_delete, sender=MenuCategory)
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_menu_snapshot(sender, **kwargs):
+    """Prix, stock, recette ou ingrédient modifié : nouvelle version du menu"""
+    # Après commit : un snapshot reconstruit entre-temps verrait l'ancien état
+    transaction.on_commit(bump_menu_version)
@@ -1,3 +1,88 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from .menu_snapshot import get_menu_version
+from .models import Category
+from .models_enhanced import MenuCategory, MenuItem
+
+
+class MenuSnapshotTest(TestCase):
+    """Tests du snapshot versionné du menu"""
+
+    url = '/api/products-enhanced/sales/menu/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = MenuCategory.objects.create(name='Boissons', type='beverages')
+        self.item = MenuItem.objects.create(
+            name='Fanta',
+            category=category,
+            type='simple',
+            selling_price=Decimal('1500.00'),
+            direct_stock=Decimal('12')
+        )
+
+    def test_menu_content(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['stats']['available_items'], 1)
+        self.assertEqual(data['menu']['Boissons'][0]['availability']['available_quantity'], 12)
+
+    def test_unchanged_menu_is_not_modified_without_query(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_price_change_bumps_version(self):
+        version = get_menu_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.selling_price = Decimal('2000.00')
+            self.item.save()
+
+        self.assertGreater(get_menu_version(), version)
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['menu']['Boissons'][0]['price'], 2000.0)
+
+
+class ConditionalCategoryListTest(TestCase):
+    """Tests des réponses conditionnelles (ETag) de la liste des catégories"""
+
+    url = '/api/products/categories/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='gerant', password='x', role='manager')
+        )
+        Category.objects.create(name='Bières', type='boissons')
+
+    def test_unchanged_list_is_not_modified_without_query(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_category_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Plats du jour', type='plats')
 
-# Create your tests here.
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
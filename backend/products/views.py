@@ -11,8 +11,13 @@ from .serializers import (
     ProductStockUpdateSerializer, ProductBulkUpdateSerializer
 )
 from accounts.permissions import IsAuthenticated, IsAdminOrGerant
+from barstock_api.conditional import ConditionalGetMixin, ConditionalResource
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+# Validateurs HTTP des listes de référence (voir barstock_api/conditional.py)
+CATEGORIES_RESOURCE = ConditionalResource('categories', [Category, Product])
+PRODUCTS_RESOURCE = ConditionalResource('products', [Product, Category])
+
+class CategoryListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Vue pour lister et créer des catégories
     """
@@ -24,6 +29,7 @@ class CategoryListCreateView(generics.ListCreateAPIView):
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
+    conditional_resource = CATEGORIES_RESOURCE
 
     def perform_create(self, serializer):
         # Seuls les admins et gérants peuvent créer des catégories
@@ -51,7 +57,7 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
+class ProductListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Vue pour lister et créer des produits
     """
@@ -62,6 +68,7 @@ class ProductListCreateView(generics.ListCreateAPIView):
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['name', 'selling_price', 'current_stock', 'created_at']
     ordering = ['name']
+    conditional_resource = PRODUCTS_RESOURCE
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
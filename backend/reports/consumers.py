@@ -191,13 +191,15 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         from sales.models import Sale
         from products.models import Product
         
-        today = timezone.now().date()
+        from barstock_api.business_day import business_day_filter
+
+        today_filter = business_day_filter()
         
         # Statistiques du jour
-        today_sales = Sale.objects.filter(created_at__date=today).count()
+        today_sales = Sale.objects.filter(**today_filter).count()
         today_revenue = Sale.objects.filter(
-            created_at__date=today, 
-            status='completed'
+            status='completed',
+            **today_filter
         ).aggregate(
             total=models.Sum('total_amount')
         )['total'] or 0
@@ -152,7 +152,7 @@ class ExcelReportGenerator:
         ws.merge_cells('A1:G1')
         
         # En-têtes
-        headers = ['Produit', 'Catégorie', 'Stock Actuel', 'Stock Minimum', 'Prix d\'Achat (BIF)', 'Valeur Stock (BIF)', 'Statut']
+        headers = ['Produit', 'Catégorie', 'Stock Actuel', 'Stock Minimum', 'Coût Moyen (BIF)', 'Valeur Stock (BIF)', 'Statut']
         for col_idx, header in enumerate(headers, start=1):
             ws.cell(row=3, column=col_idx, value=header)
         
@@ -161,7 +161,7 @@ class ExcelReportGenerator:
         low_stock_count = 0
         
         for row_idx, product in enumerate(products, start=4):
-            stock_value = product.current_stock * product.purchase_price
+            stock_value = product.stock_value
             total_value += stock_value
             
             status = "⚠️ Stock Faible" if product.current_stock <= product.minimum_stock else "✅ OK"
@@ -172,7 +172,7 @@ class ExcelReportGenerator:
             ws.cell(row=row_idx, column=2, value=product.category.name)
             ws.cell(row=row_idx, column=3, value=product.current_stock)
             ws.cell(row=row_idx, column=4, value=product.minimum_stock)
-            ws.cell(row=row_idx, column=5, value=float(product.purchase_price))
+            ws.cell(row=row_idx, column=5, value=float(product.unit_cost))
             ws.cell(row=row_idx, column=6, value=float(stock_value))
             ws.cell(row=row_idx, column=7, value=status)
         
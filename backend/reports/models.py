@@ -97,9 +97,10 @@ class DailyReport(models.Model):
         """Générer automatiquement les données du rapport"""
         from sales.models import Sale
         from django.db.models import Sum, Count
+        from barstock_api.business_day import business_day_filter
 
         # Ventes du jour
-        daily_sales = Sale.objects.filter(created_at__date=self.date)
+        daily_sales = Sale.objects.filter(**business_day_filter(self.date))
 
         # Calculs
         self.total_sales = daily_sales.count()
@@ -115,9 +116,14 @@ class DailyReport(models.Model):
 
         # Produits vendus
         from sales.models import SaleItem
-        self.products_sold = SaleItem.objects.filter(
+        items_totals = SaleItem.objects.filter(
             sale__in=paid_sales
-        ).aggregate(total=Sum('quantity'))['total'] or 0
+        ).aggregate(
+            quantity=Sum('quantity'),
+            profit=Sum(SaleItem.profit_expression())
+        )
+        self.products_sold = items_totals['quantity'] or 0
+        self.total_profit = items_totals['profit'] or Decimal('0.00')
 
         # Alertes de stock
         from products.models import Product
@@ -49,7 +49,6 @@ class NotificationService:
             import logging
             logger = logging.getLogger(__name__)
             logger.warning(f"Erreur lors de l'envoi de notification système: {str(e)}")
-            print(f"Erreur lors de l'envoi de notification système: {str(e)}")
         
         # Envoyer aux admins et gérants
         from accounts.models import User
@@ -163,14 +162,15 @@ class NotificationService:
             from sales.models import Sale
             from products.models import Product
             from django.db.models import Sum
+            from barstock_api.business_day import business_day_filter
             
-            today = timezone.now().date()
+            today_filter = business_day_filter()
             
             # Calculer les statistiques
-            today_sales = Sale.objects.filter(created_at__date=today).count()
+            today_sales = Sale.objects.filter(**today_filter).count()
             today_revenue = Sale.objects.filter(
-                created_at__date=today, 
-                status='completed'
+                status='completed',
+                **today_filter
             ).aggregate(total=Sum('total_amount'))['total'] or 0
             
             active_alerts = StockAlert.objects.filter(status='active').count()
@@ -154,7 +154,7 @@ class PDFReportGenerator:
         stock_data = [['Produit', 'Catégorie', 'Stock Actuel', 'Stock Min.', 'Valeur (BIF)', 'Statut']]
         
         for product in products:
-            stock_value = product.current_stock * product.purchase_price
+            stock_value = product.stock_value
             status = "⚠️ Faible" if product.current_stock <= product.minimum_stock else "✅ OK"
             
             stock_data.append([
@@ -7,6 +7,8 @@ from products.models import Product
 from sales.models import Sale, SaleItem
 from django.db.models import Sum, Count, Avg
 from decimal import Decimal
+from barstock_api.business_day import business_day_filter, current_business_day
+from barstock_api.db_router import reports_database
 
 @shared_task
 def check_stock_levels():
@@ -22,7 +24,7 @@ def check_stock_levels():
 def generate_daily_report():
     """Générer automatiquement le rapport quotidien"""
     try:
-        today = timezone.now().date()
+        today = current_business_day()
         
         # Vérifier si le rapport existe déjà
         existing_report = DailyReport.objects.filter(date=today).first()
@@ -31,8 +33,8 @@ def generate_daily_report():
         
         # Calculer les statistiques du jour
         today_sales = Sale.objects.filter(
-            created_at__date=today,
-            status='completed'
+            status='completed',
+            **business_day_filter(today)
         )
         
         total_sales_count = today_sales.count()
@@ -40,12 +42,12 @@ def generate_daily_report():
             total=Sum('total_amount')
         )['total'] or Decimal('0.00')
         
-        # Calculer le bénéfice (approximatif basé sur les prix d'achat)
-        total_profit = Decimal('0.00')
-        for sale in today_sales:
-            for item in sale.items.all():
-                profit_per_item = (item.unit_price - item.product.purchase_price) * item.quantity
-                total_profit += profit_per_item
+        # Calculer le bénéfice sur les coûts figés au moment de la vente
+        total_profit = SaleItem.objects.filter(
+            sale__in=today_sales
+        ).aggregate(
+            total=Sum(SaleItem.profit_expression())
+        )['total'] or Decimal('0.00')
         
         # Ticket moyen
         average_sale = total_sales / total_sales_count if total_sales_count > 0 else Decimal('0.00')
@@ -110,33 +112,34 @@ def cleanup_old_alerts():
 def send_daily_summary():
     """Envoyer un résumé quotidien aux gestionnaires"""
     try:
-        today = timezone.now().date()
-        yesterday = today - timedelta(days=1)
-        
-        # Statistiques d'hier
-        yesterday_sales = Sale.objects.filter(
-            created_at__date=yesterday,
-            status='completed'
-        )
-        
-        sales_count = yesterday_sales.count()
-        total_revenue = yesterday_sales.aggregate(
-            total=Sum('total_amount')
-        )['total'] or Decimal('0.00')
-        
-        # Produits les plus vendus
-        top_products = SaleItem.objects.filter(
-            sale__created_at__date=yesterday
-        ).values(
-            'product__name'
-        ).annotate(
-            total_quantity=Sum('quantity'),
-            total_revenue=Sum('total_price')
-        ).order_by('-total_quantity')[:5]
-        
-        # Alertes actives
-        active_alerts = StockAlert.objects.filter(status='active').count()
-        
+        yesterday = current_business_day() - timedelta(days=1)
+        
+        # Lectures sur la base de rapports (repli automatique sur default)
+        with reports_database():
+            # Statistiques d'hier
+            yesterday_sales = Sale.objects.filter(
+                status='completed',
+                **business_day_filter(yesterday)
+            )
+            
+            sales_count = yesterday_sales.count()
+            total_revenue = yesterday_sales.aggregate(
+                total=Sum('total_amount')
+            )['total'] or Decimal('0.00')
+            
+            # Produits les plus vendus
+            top_products = list(SaleItem.objects.filter(
+                **business_day_filter(yesterday, field='sale__created_at')
+            ).values(
+                'product__name'
+            ).annotate(
+                total_quantity=Sum('quantity'),
+                total_revenue=Sum('total_price')
+            ).order_by('-total_quantity')[:5])
+            
+            # Alertes actives
+            active_alerts = StockAlert.objects.filter(status='active').count()
+
         # Composer le message
         message = f"""
         Résumé quotidien - {yesterday.strftime('%d/%m/%Y')}:
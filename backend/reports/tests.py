@@ -1,3 +1,153 @@
-from django.test import TestCase
+import io
+import logging
+import subprocess
+import sys
+from datetime import date, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from barstock_api.business_day import (
+    business_day_bounds, business_day_filter, current_business_day
+)
+from barstock_api import events as events_module
+from barstock_api.events import EventQueueHandler, get_event_logger
+from barstock_api import db_router
+from barstock_api.db_router import (
+    ReportsRouter, mark_reports_database_unhealthy, reports_database
+)
+
+from .models import StockAlert
+
+
+class BusinessDayTest(TestCase):
+    """Tests des bornes de journée commerciale"""
+
+    def test_bounds_cover_one_local_day(self):
+        """La journée va de minuit local à minuit local (fin exclusive)"""
+        start, end = business_day_bounds(date(2025, 11, 5))
+
+        self.assertEqual(end - start, timedelta(days=1))
+        local_start = timezone.localtime(start)
+        self.assertEqual((local_start.date(), local_start.hour), (date(2025, 11, 5), 0))
+
+    @override_settings(BUSINESS_DAY_CUTOFF_HOUR=4)
+    def test_cutoff_hour_moves_late_sales_to_previous_day(self):
+        """Avec bascule à 4h, une vente à 1h du matin compte pour la veille"""
+        tz = timezone.get_current_timezone()
+        late_night = timezone.make_aware(datetime(2025, 11, 6, 1, 30), tz)
+
+        self.assertEqual(current_business_day(late_night), date(2025, 11, 5))
+
+        start, end = business_day_bounds(date(2025, 11, 5))
+        self.assertTrue(start <= late_night < end)
+
+    def test_filter_kwargs(self):
+        """Les filtres produits sont des bornes gte/lt sur le champ demandé"""
+        filters = business_day_filter(date(2025, 11, 5), field='sale__created_at')
+
+        self.assertEqual(set(filters), {'sale__created_at__gte', 'sale__created_at__lt'})
+
+
+class ReportsRouterTest(TestCase):
+    """Tests du routage des lectures de rapports"""
+
+    def test_reads_stay_on_default_outside_reports_context(self):
+        router = ReportsRouter()
+        self.assertIsNone(router.db_for_read(StockAlert))
+        self.assertEqual(router.db_for_write(StockAlert), 'default')
+
+    def test_reports_context_falls_back_when_unhealthy(self):
+        """Un réplica signalé en panne renvoie les lectures sur default"""
+        router = ReportsRouter()
+        mark_reports_database_unhealthy()
+        with reports_database():
+            self.assertIsNone(router.db_for_read(StockAlert))
+            self.assertEqual(router.db_for_write(StockAlert), 'default')
+
+    def test_replica_failure_inside_view_replays_on_default(self):
+        """Une panne du réplica dans le try/except d'une vue remonte au décorateur, qui rejoue sur default"""
+        def read_on_replica(router, model, **hints):
+            if db_router._use_reports_db.get():
+                raise OperationalError('réplica injoignable')
+            return None
+
+        with mock.patch.object(db_router, 'reports_database_available', return_value=True), \
+                mock.patch.object(ReportsRouter, 'db_for_read', read_on_replica), \
+                self.assertLogs('barstock_api.db_router', 'WARNING'):
+            response = self.client.get('/api/reports/daily-detailed/2025-11-05/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['date'], '2025-11-05')
+
+    def test_replica_failure_after_health_cache_expiry_replays_on_default(self):
+        """Diagnostic expiré au moment de l'erreur : le nouveau voit le réplica tombé, la vue est quand même rejouée"""
+        replica = {'up': True}
+
+        def read_on_replica(router, model, **hints):
+            if db_router._use_reports_db.get():
+                replica['up'] = False
+                raise OperationalError('réplica injoignable')
+            return None
+
+        with mock.patch.object(db_router, 'reports_database_available', side_effect=lambda: replica['up']), \
+                mock.patch.object(ReportsRouter, 'db_for_read', read_on_replica), \
+                self.assertLogs('barstock_api.db_router', 'WARNING'):
+            response = self.client.get('/api/reports/daily-detailed/2025-11-05/')
+
+        self.assertEqual(response.status_code, 200)
+
+
+class LazyReportImportsTest(TestCase):
+    """Les bibliothèques d'export ne sont pas chargées au démarrage"""
+
+    def test_urlconf_does_not_load_report_libraries(self):
+        script = (
+            "import sys, django; django.setup()\n"
+            "from django.urls import get_resolver; get_resolver().url_patterns\n"
+            "print(sorted(m for m in ('reportlab', 'openpyxl', 'psutil') if m in sys.modules))\n"
+            "from reports.views import PDFReportGenerator; PDFReportGenerator.__name__\n"
+            "print('reportlab' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.splitlines()[-2:], ['[]', 'True'])
+
+
+class EventLoggerTest(TestCase):
+    """Journal d'événements : niveau, échantillonnage, écriture différée"""
+
+    def test_fields_are_only_computed_for_kept_events(self):
+        events = get_event_logger('reports.tests')
+        expensive = mock.Mock(return_value=42)
+        with self.assertLogs('events.reports.tests', level='INFO') as logs:
+            events.debug('reports.test.hidden', value=expensive)
+            events.info('reports.test.kept', sample=0, value=expensive)
+            events.info('reports.test.shown', value=expensive, label='deux mots')
+        expensive.assert_called_once_with()
+        self.assertEqual(logs.records[0].getMessage(), 'reports.test.shown value=42 label="deux mots"')
+        self.assertEqual(logs.records[0].fields, {'value': 42, 'label': 'deux mots'})
+
+    def test_sampling_setting_overrides_call_site(self):
+        events = get_event_logger('reports.tests')
+        with mock.patch.dict(events_module.EVENT_LOG_SAMPLING, {'reports.test.muted': 0}):
+            with self.assertLogs('events.reports.tests', level='INFO') as logs:
+                events.info('reports.test.muted')
+                events.info('reports.test.other')
+        self.assertEqual([record.event for record in logs.records], ['reports.test.other'])
+
+    def test_queue_handler_writes_from_its_thread(self):
+        stream = io.StringIO()
+        handler = EventQueueHandler(stream=stream)
+        logger = logging.getLogger('events.reports.tests.queue')
+        logger.addHandler(handler)
+        logger.propagate = False
+        try:
+            get_event_logger('reports.tests.queue').warning('reports.test.queued', sale=7)
+        finally:
+            logger.removeHandler(handler)
+            handler.flush_and_stop()
+        self.assertIn('WARNING', stream.getvalue())
+        self.assertIn('reports.test.queued sale=7', stream.getvalue())
@@ -6,7 +6,8 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Sum, Count, Avg, Max, F, Q
+from django.db import OperationalError
+from django.db.models import Sum, Count, Avg, Max, F, Q, prefetch_related_objects
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -16,12 +17,23 @@ from .serializers import (
     StockAlertSerializer, StockAlertCreateSerializer,
     ReportSummarySerializer
 )
-from .pdf_generator import PDFReportGenerator
-from .excel_generator import ExcelReportGenerator
 from products.models import Product
 from sales.models import Sale, SaleItem
 from inventory.models import StockMovement
 from accounts.permissions import IsAdminOrGerant, IsAuthenticated
+from archive.services import archived_period_response, with_archive
+from barstock_api.business_day import (
+    business_day_bounds, business_day_filter, business_period_filter, current_business_day
+)
+from barstock_api.db_router import ReportsDatabaseMixin, use_reports_database
+from barstock_api.events import get_event_logger
+from barstock_api.lazy import lazy_import
+
+# reportlab / openpyxl : chargés au premier export, pas au démarrage du worker
+PDFReportGenerator = lazy_import('reports.pdf_generator', 'PDFReportGenerator')
+ExcelReportGenerator = lazy_import('reports.excel_generator', 'ExcelReportGenerator')
+
+events = get_event_logger(__name__)
 
 class DailyReportListCreateView(generics.ListCreateAPIView):
     """
@@ -221,20 +233,20 @@ def generate_stock_alerts(request):
     })
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def cashier_stats(request):
     """
     Vue pour les statistiques du caissier connecté
     """
-    from datetime import date
-    today = date.today()
+    today = current_business_day()
     
     # Récupérer les ventes du caissier connecté pour aujourd'hui
     cashier_sales = Sale.objects.filter(
         server=request.user,
-        created_at__date=today,
-        status='paid'
+        status='paid',
+        **business_day_filter(today)
     )
     
     # Calculer les statistiques
@@ -264,6 +276,7 @@ def cashier_stats(request):
         'date': today.isoformat(),
     })
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Temporairement public pour debug
 def dashboard_stats(request):
@@ -279,9 +292,8 @@ def dashboard_stats(request):
     #         status=status.HTTP_403_FORBIDDEN
     #     )
 
-    # Utiliser la date actuelle
-    from datetime import date
-    today = date.today()  # Date actuelle
+    # Journée commerciale en cours (heure locale)
+    today = current_business_day()
 
     # Rapport du jour
     today_report = DailyReport.objects.filter(date=today).first()
@@ -304,38 +316,27 @@ def dashboard_stats(request):
     ).count()
 
     # Ventes en attente (si module sales disponible)
-    print(f"DEBUG: Début de l'API dashboard pour la date: {today}")
     try:
         from sales.models import Sale, SaleItem
-        print("DEBUG: Import des modèles Sale et SaleItem réussi")
 
         pending_sales = Sale.objects.filter(status='pending').count()
-        print(f"DEBUG: Ventes en attente: {pending_sales}")
 
         # Données réelles des ventes du jour
-        daily_sales = Sale.objects.filter(created_at__date=today)
+        daily_sales = Sale.objects.filter(**business_day_filter(today))
         completed_sales = daily_sales.filter(status='paid')
         completed_sales_count = completed_sales.count()
 
         # Données des commandes en cours (utilise le manager Sale.orders)
         # Sale.orders filtre automatiquement les statuts: pending, preparing, ready
-        daily_orders = Sale.orders.filter(created_at__date=today)
+        daily_orders = Sale.orders.filter(**business_day_filter(today))
         total_orders_count = daily_orders.count()
         pending_orders_count = daily_orders.filter(status='pending').count()
 
-        # Debug: Afficher les informations
-        print(f"DEBUG: Ventes complétées trouvées: {completed_sales_count}")
-        print(f"DEBUG: Ventes du jour: {daily_sales.count()}")
-        print(f"DEBUG: Commandes en cours (pending/preparing/ready): {total_orders_count}")
-        print(f"DEBUG: Commandes en attente (pending): {pending_orders_count}")
-
         # Calcul des revenus du jour
         daily_revenue = completed_sales.aggregate(
             total=Sum('total_amount')
         )['total'] or 0
 
-        print(f"DEBUG: Revenus calculés: {daily_revenue}")
-
         # Tables occupées (tables avec des ventes en cours)
         try:
             from sales.models import Table
@@ -347,7 +348,12 @@ def dashboard_stats(request):
             occupied_tables = 0
             total_tables = 10  # Valeur par défaut
 
-        print(f"DEBUG: Tables occupées: {occupied_tables}/{total_tables}")
+        events.debug(
+            'reports.dashboard.stats', date=today, pending_sales=pending_sales,
+            completed_sales=completed_sales_count, daily_sales=daily_sales.count,
+            orders=total_orders_count, pending_orders=pending_orders_count,
+            revenue=daily_revenue, occupied_tables=occupied_tables, total_tables=total_tables
+        )
 
         # Produits vendus aujourd'hui avec détails
         products_sold_today = SaleItem.objects.filter(
@@ -360,14 +366,17 @@ def dashboard_stats(request):
             revenue=Sum('total_price')
         ).order_by('-quantity_sold')
 
-    except ImportError as e:
-        print(f"DEBUG: Erreur d'import: {e}")
+    except ImportError:
+        events.exception('reports.dashboard.import_failed', date=today)
         pending_sales = 0
         completed_sales_count = 0
         daily_revenue = 0
         products_sold_today = []
-    except Exception as e:
-        print(f"DEBUG: Erreur inattendue: {e}")
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
+    except Exception:
+        events.exception('reports.dashboard.failed', date=today)
         pending_sales = 0
         completed_sales_count = 0
         daily_revenue = 0
@@ -380,8 +389,8 @@ def dashboard_stats(request):
     from datetime import timedelta
     yesterday = today - timedelta(days=1)
     yesterday_sales = Sale.objects.filter(
-        created_at__date=yesterday,
-        status='paid'
+        status='paid',
+        **business_day_filter(yesterday)
     ).aggregate(total=Sum('total_amount'))['total'] or 0
     
     if yesterday_sales > 0:
@@ -433,6 +442,7 @@ def dashboard_stats(request):
         }
     })
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Temporairement public pour debug
 def unresolved_alerts(request):
@@ -451,12 +461,16 @@ def unresolved_alerts(request):
             'results': serializer.data
         })
         
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
         return Response(
             {'error': f'Erreur lors de la récupération des alertes: {str(e)}'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def reports_summary(request):
@@ -516,8 +530,7 @@ def reports_summary(request):
 
     # Alertes
     alerts = StockAlert.objects.filter(
-        created_at__date__gte=period_start,
-        created_at__date__lte=period_end
+        **business_period_filter(period_start, period_end)
     )
 
     total_alerts = alerts.count()
@@ -542,6 +555,7 @@ def reports_summary(request):
     return Response(serializer.data)
 
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def daily_detailed_report(request, date):
@@ -554,27 +568,38 @@ def daily_detailed_report(request, date):
 
         # Parser la date
         report_date = datetime.strptime(date, '%Y-%m-%d').date()
+        archived = archived_period_response(report_date)
+        if archived:
+            return archived
 
         # Récupérer les ventes du jour
-        daily_sales = Sale.objects.filter(created_at__date=report_date)
+        daily_sales = Sale.objects.filter(**business_day_filter(report_date))
         completed_sales = daily_sales.filter(status='paid')
 
         # Statistiques générales
         total_sales_count = daily_sales.count()
         total_revenue = completed_sales.aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
 
-        # Calculer les bénéfices
-        total_cost = Decimal('0')
-        total_profit = Decimal('0')
-        products_sold = 0
-
-        for sale in completed_sales:
-            for item in sale.items.all():
-                item_cost = item.product.purchase_price * item.quantity
-                item_profit = (item.unit_price - item.product.purchase_price) * item.quantity
-                total_cost += item_cost
-                total_profit += item_profit
-                products_sold += item.quantity
+        # Calculer les bénéfices sur les coûts figés au moment de la vente
+        paid_items = SaleItem.objects.filter(sale__in=completed_sales)
+        totals = paid_items.aggregate(
+            total_cost=Sum(SaleItem.cost_expression()),
+            total_profit=Sum(SaleItem.profit_expression()),
+            products_sold=Sum('quantity')
+        )
+        total_cost = totals['total_cost'] or Decimal('0')
+        total_profit = totals['total_profit'] or Decimal('0')
+        products_sold = totals['products_sold'] or 0
+
+        # Ventes du jour par produit (une seule requête groupée)
+        sales_by_product = {
+            row['product']: row
+            for row in paid_items.values('product').annotate(
+                quantity_sold=Sum('quantity'),
+                revenue=Sum(F('quantity') * F('unit_price')),
+                profit=Sum(SaleItem.profit_expression())
+            )
+        }
 
         # Données par catégorie
         categories_data = {}
@@ -593,23 +618,17 @@ def daily_detailed_report(request, date):
                     'total_sold': 0
                 }
 
-            # Calculer les ventes pour ce produit aujourd'hui
-            product_sales = SaleItem.objects.filter(
-                sale__created_at__date=report_date,
-                sale__status='paid',
-                product=product
-            )
-
-            quantity_sold = product_sales.aggregate(total=Sum('quantity'))['total'] or 0
-            revenue = product_sales.aggregate(total=Sum(F('quantity') * F('unit_price')))['total'] or Decimal('0')
-            cost = (product.purchase_price or Decimal('0')) * quantity_sold
-            profit = revenue - cost
+            # Ventes de ce produit aujourd'hui
+            product_sales = sales_by_product.get(product.id, {})
+            quantity_sold = product_sales.get('quantity_sold') or 0
+            revenue = product_sales.get('revenue') or Decimal('0')
+            profit = product_sales.get('profit') or Decimal('0')
 
             # Calculer le stock initial réel en utilisant les mouvements de stock
             # Stock au début de la journée = stock actuel + sorties du jour - entrées du jour
             movements_today = StockMovement.objects.filter(
                 product=product,
-                created_at__date=report_date
+                **business_day_filter(report_date)
             )
             
             entries_today = movements_today.filter(movement_type='in').aggregate(
@@ -631,15 +650,13 @@ def daily_detailed_report(request, date):
             if movements_today.count() == 0:
                 initial_stock = product.current_stock + quantity_sold
             
-            # Debug logs pour diagnostiquer les problèmes de stock
-            print(f"📦 STOCK DEBUG - {product.name}:")
-            print(f"  - Stock actuel: {product.current_stock}")
-            print(f"  - Entrées aujourd'hui: {entries_today}")
-            print(f"  - Sorties aujourd'hui: {exits_today}")
-            print(f"  - Ajustements aujourd'hui: {adjustments_today}")
-            print(f"  - Quantité vendue aujourd'hui: {quantity_sold}")
-            print(f"  - Stock initial calculé: {initial_stock}")
-            print(f"  - Mouvements trouvés: {movements_today.count()}")
+            # Pour diagnostiquer les écarts de stock (EVENT_LOG_LEVEL=DEBUG)
+            events.debug(
+                'reports.daily_detailed.stock', date=report_date, product=product.name,
+                current_stock=product.current_stock, entries=entries_today, exits=exits_today,
+                adjustments=adjustments_today, sold=quantity_sold, initial_stock=initial_stock,
+                movements=movements_today.count
+            )
 
             product_data = {
                 'name': product.name,
@@ -684,6 +701,9 @@ def daily_detailed_report(request, date):
             }
         })
 
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
         return Response({
             'error': str(e),
@@ -693,35 +713,35 @@ def daily_detailed_report(request, date):
 
 
 # Classes de vues pour l'export (stubs)
-class ExportDailyReportPDFView(APIView):
+class ExportDailyReportPDFView(ReportsDatabaseMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, date_str):
         return Response({'message': 'Export PDF - En développement'})
 
 
-class ExportDailyReportExcelView(APIView):
+class ExportDailyReportExcelView(ReportsDatabaseMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, date_str):
         return Response({'message': 'Export Excel - En développement'})
 
 
-class ExportStockReportPDFView(APIView):
+class ExportStockReportPDFView(ReportsDatabaseMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
         return Response({'message': 'Export Stock PDF - En développement'})
 
 
-class ExportStockReportExcelView(APIView):
+class ExportStockReportExcelView(ReportsDatabaseMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
         return Response({'message': 'Export Stock Excel - En développement'})
 
 
-class ExportSalesReportPDFView(APIView):
+class ExportSalesReportPDFView(ReportsDatabaseMixin, APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
@@ -751,6 +771,7 @@ class SendTestNotificationView(APIView):
 
 # ==================== RAPPORTS DÉPENSES ====================
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def expenses_report(request):
@@ -863,6 +884,9 @@ def expenses_report(request):
             'expenses': expenses_list
         })
         
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -872,6 +896,7 @@ def expenses_report(request):
 
 # ==================== RAPPORTS CRÉDITS ====================
 
+@use_reports_database
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def credits_report(request):
@@ -914,38 +939,49 @@ def credits_report(request):
         else:
             start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
             end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-        
-        # Filtrer les transactions
-        transactions = CreditTransaction.objects.filter(
-            transaction_date__gte=start_date,
-            transaction_date__lte=end_date
-        ).select_related('credit_account', 'created_by', 'sale')
-        
-        if transaction_type:
-            transactions = transactions.filter(transaction_type=transaction_type)
+
+        # Transactions de la période, archivées comprises
+        start, _end = business_day_bounds(start_date)
+        _start, end = business_day_bounds(end_date)
+        filters = {'transaction_type': transaction_type} if transaction_type else {}
+        transactions = with_archive(
+            CreditTransaction.objects.select_related('credit_account', 'created_by'),
+            'transaction_date', start, end, **filters
+        )
+        prefetch_related_objects(
+            [t for t in transactions if getattr(t, 'is_archived', False)], 'credit_account', 'created_by'
+        )
         
         if account_status:
-            transactions = transactions.filter(credit_account__status=account_status)
+            transactions = [t for t in transactions if t.credit_account.status == account_status]
         
         # Statistiques globales
-        total_stats = transactions.aggregate(
-            total_amount=Sum('amount'),
-            count=Count('id')
-        )
+        total_stats = {
+            'total_amount': sum(t.amount for t in transactions),
+            'count': len(transactions)
+        }
         
         # Par type de transaction
-        by_type = transactions.values('transaction_type').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('transaction_type')
+        by_type = {}
+        for t in transactions:
+            row = by_type.setdefault(
+                t.transaction_type, {'transaction_type': t.transaction_type, 'total': 0, 'count': 0}
+            )
+            row['total'] += t.amount
+            row['count'] += 1
+        by_type = [by_type[key] for key in sorted(by_type)]
         
         # Par mode de paiement (pour les paiements uniquement)
-        by_payment_method = transactions.filter(
-            transaction_type='payment'
-        ).values('payment_method').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('-total')
+        by_payment_method = {}
+        for t in transactions:
+            if t.transaction_type != 'payment':
+                continue
+            row = by_payment_method.setdefault(
+                t.payment_method, {'payment_method': t.payment_method, 'total': 0, 'count': 0}
+            )
+            row['total'] += t.amount
+            row['count'] += 1
+        by_payment_method = sorted(by_payment_method.values(), key=lambda row: -row['total'])
         
         # Statistiques des comptes
         accounts = CreditAccount.objects.all()
@@ -987,7 +1023,7 @@ def credits_report(request):
                 'amount': float(transaction.amount),
                 'payment_method': transaction.payment_method,
                 'payment_method_display': transaction.get_payment_method_display() if transaction.payment_method else None,
-                'sale_id': transaction.sale.id if transaction.sale else None,
+                'sale_id': transaction.sale_id,
                 'notes': transaction.notes,
                 'created_by': transaction.created_by.get_full_name() if transaction.created_by else None,
             })
@@ -1000,8 +1036,8 @@ def credits_report(request):
                 'transactions': {
                     'total_amount': float(total_stats['total_amount'] or 0),
                     'total_count': total_stats['count'],
-                    'by_type': list(by_type),
-                    'by_payment_method': list(by_payment_method),
+                    'by_type': by_type,
+                    'by_payment_method': by_payment_method,
                 },
                 'accounts': {
                     'total_accounts': accounts_stats['total_accounts'],
@@ -1014,6 +1050,9 @@ def credits_report(request):
             'transactions': transactions_list
         })
         
+    except OperationalError:
+        # Panne du réplica : @use_reports_database rejoue la vue sur default
+        raise
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -137,7 +137,7 @@ class SaleItemInline(admin.TabularInline):
     """Inline pour les articles de vente"""
     model = SaleItem
     extra = 0
-    readonly_fields = ('total_price', 'profit_display')
+    readonly_fields = ('total_price', 'unit_cost', 'profit_display')
 
     def profit_display(self, obj):
         """Affiche le profit pour cet article"""
@@ -386,12 +386,12 @@ class TableReservationAdmin(admin.ModelAdmin):
 class SaleItemAdmin(admin.ModelAdmin):
     """Administration des articles de vente"""
 
-    list_display = ('sale', 'product', 'quantity', 'unit_price', 'total_price', 'profit_display')
+    list_display = ('sale', 'product', 'quantity', 'unit_price', 'unit_cost', 'total_price', 'profit_display')
     list_filter = ('product__category', 'sale__status', 'created_at')
     search_fields = ('sale__reference', 'product__name')
     ordering = ('-created_at',)
 
-    readonly_fields = ('total_price', 'profit_display', 'created_at')
+    readonly_fields = ('total_price', 'unit_cost', 'profit_display', 'created_at')
 
     def profit_display(self, obj):
         """Affiche le profit pour cet article"""
@@ -9,6 +9,10 @@ from django.conf import settings
 from decimal import Decimal
 import json
 
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
+
 
 class InvoiceService:
     """Service pour générer des factures automatiquement"""
@@ -304,13 +308,14 @@ class InvoiceService:
             # Ici, on pourrait sauvegarder la facture en base de données
             # ou l'envoyer par email, etc.
             
-            print(f"📄 Facture générée automatiquement pour la vente {sale.reference}")
-            print(f"   Client: {invoice_data['customer']['name']}")
-            print(f"   Total: {invoice_data['summary']['total_amount']:,.0f} FBu")
-            print(f"   Articles: {len(invoice_data['items'])}")
+            events.info(
+                'sales.invoice.generated', reference=sale.reference,
+                customer=invoice_data['customer']['name'], total=invoice_data['summary']['total_amount'],
+                items=len(invoice_data['items'])
+            )
             
             return invoice_data
             
-        except Exception as e:
-            print(f"❌ Erreur génération facture pour {sale.reference}: {e}")
+        except Exception:
+            events.exception('sales.invoice.failed', reference=sale.reference)
             return None
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import F, Sum
+
+
+def backfill_unit_cost(apps, schema_editor):
+    """
+    Renseigne le coût unitaire des articles existants avec le coût actuel
+    du produit (coût recette pour les plats, prix d'achat sinon).
+    Une seule requête UPDATE par produit vendu.
+    """
+    SaleItem = apps.get_model('sales', 'SaleItem')
+    Product = apps.get_model('products', 'Product')
+    RecipeIngredient = apps.get_model('kitchen', 'RecipeIngredient')
+
+    recipe_costs = dict(
+        RecipeIngredient.objects.values('recipe__plat_id').annotate(
+            cost=Sum(F('quantite_utilisee_par_plat') * F('ingredient__prix_unitaire'))
+        ).values_list('recipe__plat_id', 'cost')
+    )
+
+    sold_product_ids = SaleItem.objects.values_list('product_id', flat=True).distinct()
+    for product_id, purchase_price in Product.objects.filter(
+        id__in=sold_product_ids
+    ).values_list('id', 'purchase_price'):
+        cost = recipe_costs.get(product_id, purchase_price) or Decimal('0.00')
+        SaleItem.objects.filter(product_id=product_id).update(
+            unit_cost=Decimal(cost).quantize(Decimal('0.01'))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kitchen', '0004_alter_ingredient_fournisseur'),
+        ('products', '0004_alter_ingredient_supplier'),
+        ('sales', '0006_sale_credit_account'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saleitem',
+            name='unit_cost',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Coût unitaire (BIF)'),
+        ),
+        migrations.RunPython(backfill_unit_cost, migrations.RunPython.noop),
+    ]
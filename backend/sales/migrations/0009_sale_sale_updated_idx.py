@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0008_sale_sale_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['updated_at', 'id'], name='sale_updated_idx'),
+        ),
+    ]
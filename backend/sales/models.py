@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from django.conf import settings
@@ -6,6 +7,9 @@ from decimal import Decimal
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from products.models import Product
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
 
 class Table(models.Model):
     """
@@ -487,6 +491,12 @@ class Sale(models.Model):
         verbose_name = 'Vente'
         verbose_name_plural = 'Ventes'
         ordering = ['-created_at']
+        indexes = [
+            # Ventes d'une journée par statut (filtres created_at__gte/__lt)
+            models.Index(fields=['status', 'created_at'], name='sale_status_created_idx'),
+            # Synchronisation incrémentale (api/sync/)
+            models.Index(fields=['updated_at', 'id'], name='sale_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Vente {self.reference} - {self.total_amount} BIF"
@@ -596,9 +606,8 @@ class Sale(models.Model):
                     notes=f"Vente #{self.id} - {item.product.name}",
                     user=user if user else self.created_by
                 )
-                print(f" Mouvement de stock créé: {item.product.name} - {item.quantity} sortie(s)")
-            except Exception as e:
-                print(f" Erreur création mouvement de stock: {e}")
+            except Exception:
+                events.exception('sales.payment.stock_movement_failed', sale=self.id, product=item.product_id)
                 # Ne pas bloquer la vente si le mouvement échoue
 
         # Marquer comme payé
@@ -662,6 +671,17 @@ class SaleItem(models.Model):
         verbose_name='Prix total (BIF)'
     )
 
+    # Coût unitaire figé au moment de la vente (coût recette pour les plats,
+    # prix d'achat pour les boissons) : le bénéfice historique ne bouge plus
+    # quand le prix d'achat du produit change.
+    unit_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        validators=[MinValueValidator(Decimal('0.00'))],
+        default=Decimal('0.00'),
+        verbose_name='Coût unitaire (BIF)'
+    )
+
     notes = models.TextField(
         blank=True,
         null=True,
@@ -684,9 +704,26 @@ class SaleItem(models.Model):
     @property
     def profit(self):
         """Calcule le bénéfice pour cet article"""
-        return (self.unit_price - self.product.purchase_price) * self.quantity
+        return (self.unit_price - self.unit_cost) * self.quantity
+
+    @staticmethod
+    def profit_expression():
+        """
+        Expression SQL du bénéfice d'une ligne, à utiliser dans
+        Sum(...) sur un queryset de SaleItem (aucune jointure sur Product)
+        """
+        return F('quantity') * (F('unit_price') - F('unit_cost'))
+
+    @staticmethod
+    def cost_expression():
+        """Expression SQL du coût d'une ligne (quantité x coût figé)"""
+        return F('quantity') * F('unit_cost')
 
     def save(self, *args, **kwargs):
+        # Figer le coût unitaire à la création de l'article
+        if self._state.adding and not self.unit_cost:
+            self.unit_cost = self.product.recipe_cost or Decimal('0.00')
+
         # Calculer le prix total
         self.total_price = self.unit_price * self.quantity
         super().save(*args, **kwargs)
@@ -5,12 +5,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
 from django.utils import timezone
 from datetime import timedelta
+from barstock_api.business_day import business_day_filter
+from barstock_api.events import get_event_logger
 
 from .models import Sale
 from .serializers import SaleListSerializer
 
+events = get_event_logger(__name__)
+
 
 class OrderViewSet(viewsets.ModelViewSet):
     """
@@ -76,7 +81,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         order.status = 'preparing'
         order.save()
         
-        print(f"🔥 Commande #{order.id} ({order.reference}) en préparation")
+        events.info('sales.order.preparing', order=order.id, reference=order.reference)
         
         # TODO: Envoyer notification au serveur
         # notify_server(order.server, f"Commande {order.reference} en préparation")
@@ -113,7 +118,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         prep_time = order.get_preparation_time()
         prep_minutes = int(prep_time.total_seconds() / 60) if prep_time else 0
         
-        print(f"✅ Commande #{order.id} ({order.reference}) prête (préparée en {prep_minutes} min)")
+        events.info('sales.order.ready', order=order.id, reference=order.reference, prep_minutes=prep_minutes)
         
         # TODO: Envoyer notification au serveur
         # notify_server(order.server, f"Commande {order.reference} prête !")
@@ -147,7 +152,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         order.status = 'served'
         order.save()
         
-        print(f"🍽️ Commande #{order.id} ({order.reference}) servie")
+        events.info('sales.order.served', order=order.id, reference=order.reference)
         
         return Response({
             'message': 'Commande servie',
@@ -185,7 +190,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             order.notes = f"Annulée: {reason}"
         order.save()
         
-        print(f"❌ Commande #{order.id} ({order.reference}) annulée: {reason}")
+        events.info('sales.order.cancelled', order=order.id, reference=order.reference, reason=reason)
         
         return Response({
             'message': 'Commande annulée',
@@ -201,23 +206,25 @@ class OrderViewSet(viewsets.ModelViewSet):
         Endpoint: GET /api/orders/stats/
         """
         now = timezone.now()
-        today = now.date()
         
         # Commandes du jour
-        today_orders = Sale.orders.filter(created_at__date=today)
-        
-        # Statistiques par statut
-        stats = {
-            'total': today_orders.count(),
-            'pending': today_orders.filter(status='pending').count(),
-            'preparing': today_orders.filter(status='preparing').count(),
-            'ready': today_orders.filter(status='ready').count(),
-            
+        today_orders = Sale.orders.filter(**business_day_filter())
+        
+        # Statistiques par statut, en une seule requête
+        counts = today_orders.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            preparing=Count('id', filter=Q(status='preparing')),
+            ready=Count('id', filter=Q(status='ready')),
             # Commandes en retard (> 30 min)
-            'late_orders': today_orders.filter(
+            late_orders=Count('id', filter=Q(
                 status__in=['pending', 'preparing'],
                 created_at__lt=now - timedelta(minutes=30)
-            ).count(),
+            )),
+        )
+
+        stats = {
+            **counts,
             
             # Temps moyen de préparation (approximatif)
             'avg_preparation_time_minutes': self._calculate_avg_prep_time(today_orders),
@@ -232,19 +239,14 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response(stats)
     
     def _calculate_avg_prep_time(self, queryset):
-        """Calcule le temps moyen de préparation"""
-        completed_orders = queryset.filter(status__in=['ready', 'served', 'paid'])
-        
-        if not completed_orders.exists():
-            return 0
-        
-        total_minutes = 0
-        count = 0
-        
-        for order in completed_orders:
-            prep_time = order.get_preparation_time()
-            if prep_time:
-                total_minutes += prep_time.total_seconds() / 60
-                count += 1
-        
-        return int(total_minutes / count) if count > 0 else 0
+        """
+        Calcule le temps moyen de préparation (minutes) par agrégat en base,
+        avec la même définition que Sale.get_preparation_time
+        """
+        average = queryset.filter(status__in=['ready', 'served', 'paid']).aggregate(
+            average=Avg(ExpressionWrapper(
+                F('updated_at') - F('created_at'), output_field=DurationField()
+            ))
+        )['average']
+
+        return int(average.total_seconds() / 60) if average else 0
@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from django.db import transaction
 from decimal import Decimal
 from .models import Table, TableReservation, Sale, SaleItem
 from products.models import Product
 from products.serializers import ProductListSerializer
+from barstock_api.events import get_event_logger
+
+events = get_event_logger(__name__)
 
 class TableSerializer(serializers.ModelSerializer):
     """Serializer pour les tables"""
@@ -166,49 +170,18 @@ class SaleItemSerializer(serializers.ModelSerializer):
         return obj.quantity * obj.unit_price
 
 class SaleItemCreateSerializer(serializers.ModelSerializer):
-    """Serializer pour créer des articles de vente"""
-    
+    """
+    Serializer pour créer des articles de vente.
+    Le produit reste un identifiant : SaleCreateSerializer charge tous les
+    produits du ticket en une seule requête et valide le stock.
+    """
+
+    product = serializers.IntegerField(min_value=1)
     unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
-    
+
     class Meta:
         model = SaleItem
         fields = ['product', 'quantity', 'unit_price', 'notes']
-    
-    def validate(self, data):
-        product = data['product']
-        quantity = data['quantity']
-
-        # Vérifier le stock disponible du produit fini
-        if product.current_stock < quantity:
-            raise serializers.ValidationError(
-                f"Stock insuffisant pour {product.name}. "
-                f"Stock disponible: {product.current_stock}, demandé: {quantity}"
-            )
-
-        # Si c'est un plat avec une recette, vérifier les ingrédients
-        if hasattr(product, 'recipe') and product.recipe:
-            recipe = product.recipe
-            missing_ingredients = []
-
-            for recipe_ingredient in recipe.ingredients.all():
-                ingredient = recipe_ingredient.ingredient
-                needed_quantity = recipe_ingredient.quantite_utilisee_par_plat * quantity
-
-                if not ingredient.can_fulfill_quantity(needed_quantity):
-                    missing_ingredients.append({
-                        'ingredient': ingredient.nom,
-                        'needed': needed_quantity,
-                        'available': ingredient.quantite_restante,
-                        'unit': ingredient.unite
-                    })
-
-            if missing_ingredients:
-                error_msg = f"Ingrédients insuffisants pour préparer {quantity}x {product.name}:\n"
-                for missing in missing_ingredients:
-                    error_msg += f"- {missing['ingredient']}: besoin de {missing['needed']} {missing['unit']}, disponible: {missing['available']} {missing['unit']}\n"
-                raise serializers.ValidationError(error_msg)
-
-        return data
 
 class SaleSerializer(serializers.ModelSerializer):
     """Serializer pour les ventes"""
@@ -233,10 +206,7 @@ class SaleSerializer(serializers.ModelSerializer):
         return obj.items.count()
     
     def get_profit(self, obj):
-        return sum(
-            (item.unit_price - item.product.purchase_price) * item.quantity
-            for item in obj.items.all()
-        )
+        return sum(item.profit for item in obj.items.all())
 
 class SaleCreateSerializer(serializers.ModelSerializer):
     """Serializer pour créer une vente"""
@@ -251,6 +221,76 @@ class SaleCreateSerializer(serializers.ModelSerializer):
             'table', 'customer_name', 'server', 'payment_method', 'credit_account', 'discount_amount', 'notes', 'items'
         ]
     
+    def validate_items(self, items):
+        """
+        Charge les produits du ticket en lot et vérifie stocks et ingrédients
+        avant toute écriture. Les quantités d'un même produit sont cumulées.
+        """
+        if not items:
+            raise serializers.ValidationError("Aucun article dans la vente")
+
+        products = Product.objects.select_related('recipe').prefetch_related(
+            'recipe__ingredients__ingredient'
+        ).in_bulk({item['product'] for item in items})
+
+        errors = [{} for _ in items]
+        quantities = {}
+        first_line = {}
+        for index, item in enumerate(items):
+            product = products.get(item['product'])
+            if product is None:
+                errors[index] = {'product': [
+                    serializers.PrimaryKeyRelatedField.default_error_messages[
+                        'does_not_exist'
+                    ].format(pk_value=item['product'])
+                ]}
+                continue
+            item['product'] = product
+            quantities[product.pk] = quantities.get(product.pk, 0) + item['quantity']
+            first_line.setdefault(product.pk, index)
+
+        for product_id, quantity in quantities.items():
+            error = self._check_availability(products[product_id], quantity)
+            if error:
+                errors[first_line[product_id]] = {'non_field_errors': [error]}
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    @staticmethod
+    def _check_availability(product, quantity):
+        """Message d'erreur si le produit ne peut pas être servi, sinon None"""
+        # Vérifier le stock disponible du produit fini
+        if product.current_stock < quantity:
+            return (
+                f"Stock insuffisant pour {product.name}. "
+                f"Stock disponible: {product.current_stock}, demandé: {quantity}"
+            )
+
+        # Si c'est un plat avec une recette, vérifier les ingrédients
+        if hasattr(product, 'recipe') and product.recipe:
+            missing_ingredients = []
+            for recipe_ingredient in product.recipe.ingredients.all():
+                ingredient = recipe_ingredient.ingredient
+                needed_quantity = recipe_ingredient.quantite_utilisee_par_plat * quantity
+
+                if not ingredient.can_fulfill_quantity(needed_quantity):
+                    missing_ingredients.append({
+                        'ingredient': ingredient.nom,
+                        'needed': needed_quantity,
+                        'available': ingredient.quantite_restante,
+                        'unit': ingredient.unite
+                    })
+
+            if missing_ingredients:
+                error_msg = f"Ingrédients insuffisants pour préparer {quantity}x {product.name}:\n"
+                for missing in missing_ingredients:
+                    error_msg += f"- {missing['ingredient']}: besoin de {missing['needed']} {missing['unit']}, disponible: {missing['available']} {missing['unit']}\n"
+                return error_msg
+
+        return None
+
     def create(self, validated_data):
         items_data = validated_data.pop('items')
 
@@ -296,89 +336,55 @@ class SaleCreateSerializer(serializers.ModelSerializer):
                     last_name='Par défaut'
                 )
 
-        # ✅ PRÉ-CALCULER le total AVANT de créer la vente
+        # Lignes déjà validées (produits chargés par validate_items)
+        lines = []
         total_amount = Decimal('0.00')
         for item_data in items_data:
             product = item_data['product']
-            quantity = item_data['quantity']
             unit_price = item_data.get('unit_price', product.selling_price)
-            total_amount += quantity * unit_price
-        
-        # Ajouter le total_amount aux données validées
+            lines.append((product, item_data['quantity'], unit_price, item_data.get('notes', '')))
+            total_amount += item_data['quantity'] * unit_price
+
         validated_data['subtotal'] = total_amount
         validated_data['tax_amount'] = Decimal('0.00')
         validated_data['total_amount'] = total_amount
         validated_data['status'] = 'pending'
-        
-        # Créer la vente AVEC le total_amount
-        sale = Sale.objects.create(**validated_data)
-        
-        # Créer les articles de vente
-        for item_data in items_data:
-            product = item_data['product']
-            quantity = item_data['quantity']
-            
-            # Vérifier le stock disponible (mais ne pas le décompter encore)
-            if product.current_stock < quantity:
-                sale.delete()  # Annuler la vente
-                raise serializers.ValidationError(
-                    f"Stock insuffisant pour {product.name}. Stock disponible: {product.current_stock}"
+
+        # Vente, articles et ticket cuisine : tout ou rien, en nombre de
+        # requêtes constant quel que soit le nombre de lignes.
+        # bulk_create n'appelle pas save() : total_price et unit_cost sont
+        # calculés ici comme dans SaleItem.save
+        from orders.models import Order
+
+        with transaction.atomic():
+            sale = Sale.objects.create(**validated_data)
+
+            SaleItem.objects.bulk_create([
+                SaleItem(
+                    sale=sale,
+                    product=product,
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    unit_cost=product.recipe_cost or Decimal('0.00'),
+                    total_price=unit_price * quantity,
+                    notes=notes
                 )
+                for product, quantity, unit_price, notes in lines
+            ])
 
-            # Utiliser le unit_price fourni ou le prix du produit par défaut
-            unit_price = item_data.get('unit_price', product.selling_price)
-            
-            # Créer l'article
-            sale_item = SaleItem.objects.create(
+            # Le ticket cuisine ne duplique pas les lignes : il lit sale.items
+            order = Order.objects.create(
                 sale=sale,
-                product=product,
-                quantity=quantity,
-                unit_price=unit_price,
-                notes=item_data.get('notes', '')
+                table=sale.table,
+                server=sale.server,
+                status='pending',
+                priority='normal',
+                total_amount=sale.total_amount,
+                notes=sale.notes or ''
             )
 
-            # NE PAS mettre à jour le stock maintenant - sera fait lors du paiement
-
-            # Les ingrédients seront décomptés lors du paiement
-            # if hasattr(product, 'recipe') and product.recipe:
-            #     try:
-            #         recipe = product.recipe
-            #         consumed_ingredients = recipe.consume_ingredients(
-            #             quantity=quantity,
-            #             user=self.context['request'].user
-            #         )
-
-            #         # Ajouter une note sur les ingrédients consommés
-            #         ingredients_note = "Ingrédients consommés: " + ", ".join([
-            #             f"{ci['ingredient'].nom}: {ci['quantity_consumed']} {ci['ingredient'].unite}"
-            #             for ci in consumed_ingredients
-            #         ])
-
-            #         if sale_item.notes:
-            #             sale_item.notes += f"\n{ingredients_note}"
-            #         else:
-            #             sale_item.notes = ingredients_note
-            #         sale_item.save()
-
-            #     except Exception as e:
-            #         # En cas d'erreur, annuler la vente
-            #         sale.delete()
-            #         raise serializers.ValidationError(
-            #             f"Erreur lors de la consommation des ingrédients: {str(e)}"
-            #         )
-
-            # Le total a déjà été calculé avant la création de la vente
-        
-        # ✅ MODIFIÉ: NE PAS mettre à jour le stock maintenant
-        # Le stock sera mis à jour lors du paiement via mark-as-paid
-        print(f"✅ Commande créée: {sale.reference} - Statut: {sale.status}")
-
-        # Générer automatiquement la facture
-        try:
-            from .invoice_service import InvoiceService
-            InvoiceService.auto_generate_invoice(sale)
-        except Exception as e:
-            print(f"⚠️ Erreur génération facture: {e}")
+        # ✅ Le stock sera mis à jour lors du paiement via mark-as-paid
+        events.info('sales.order.created', reference=sale.reference, status=sale.status, order=order.order_number)
 
         return sale
 
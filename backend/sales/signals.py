@@ -6,8 +6,11 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from decimal import Decimal
+from barstock_api.events import get_event_logger
 from .models import Sale, Table
 
+events = get_event_logger(__name__)
+
 
 @receiver(pre_save, sender=Sale)
 def update_table_status_on_sale_change(sender, instance, **kwargs):
@@ -139,14 +142,11 @@ def deduct_ingredients_on_payment(sender, instance, created, **kwargs):
                     # Sauvegarder l'ingrédient
                     ingredient.save()
                     
-                    # Log pour debug
-                    print(f"✅ Déduit {quantity_to_deduct} {ingredient.unite} de {ingredient.nom} (Vente #{instance.id})")
-                    
-                    # Vérifier si alerte nécessaire
-                    if ingredient.quantite_restante <= 0:
-                        print(f"🚨 RUPTURE: {ingredient.nom} épuisé!")
-                    elif ingredient.quantite_restante <= ingredient.seuil_alerte:
-                        print(f"⚠️ ALERTE: {ingredient.nom} stock faible ({ingredient.quantite_restante} {ingredient.unite})")
+                    events.debug(
+                        'sales.ingredient.deducted', sale=instance.id, ingredient=ingredient.nom,
+                        quantity=quantity_to_deduct, unit=ingredient.unite
+                    )
+                    # Les alertes de stock sont levées par kitchen/signals.py
 
 
 @receiver(post_save, sender=Sale)
@@ -1,3 +1,222 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderItem
+from products.models import Category, Product
+from .models import Sale, SaleItem
+from .views import SaleDetailView
+
+User = get_user_model()
+
+
+class SaleItemUnitCostTest(TestCase):
+    """Tests du coût unitaire figé sur les articles de vente"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='caissier',
+            password='testpass123',
+            role='cashier'
+        )
+        category = Category.objects.create(name='Bières', type='boissons')
+        self.product = Product.objects.create(
+            name='Primus',
+            category=category,
+            purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'),
+            current_stock=50
+        )
+        self.sale = Sale.objects.create(server=self.user, created_by=self.user)
+
+    def test_unit_cost_captured_at_creation(self):
+        """Le coût est figé à la création et ne suit plus le prix d'achat"""
+        item = SaleItem.objects.create(
+            sale=self.sale,
+            product=self.product,
+            quantity=2,
+            unit_price=self.product.selling_price
+        )
+        self.assertEqual(item.unit_cost, Decimal('1500.00'))
+
+        self.product.purchase_price = Decimal('2000.00')
+        self.product.save()
+        item.refresh_from_db()
+
+        self.assertEqual(item.unit_cost, Decimal('1500.00'))
+        self.assertEqual(item.profit, Decimal('2000.00'))
+
+    def test_profit_aggregate(self):
+        """Le bénéfice agrégé correspond à la somme des bénéfices par ligne"""
+        SaleItem.objects.create(
+            sale=self.sale,
+            product=self.product,
+            quantity=3,
+            unit_price=Decimal('2500.00')
+        )
+        total = SaleItem.objects.aggregate(
+            total=Sum(SaleItem.profit_expression())
+        )['total']
+
+        self.assertEqual(total, Decimal('3000.00'))
+        self.assertEqual(self.sale.profit, Decimal('3000.00'))
+
+
+class SaleCreationPipelineTest(TestCase):
+    """Tests de la création de vente en lot"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='serveur',
+            password='testpass123',
+            role='server'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Bières', type='boissons')
+        self.products = [
+            Product.objects.create(
+                name=f'Bière {i}',
+                category=category,
+                purchase_price=Decimal('1000.00'),
+                selling_price=Decimal('2000.00'),
+                current_stock=100
+            )
+            for i in range(15)
+        ]
+
+    def _post(self, products, quantity=1):
+        return self.client.post('/api/sales/', {
+            'payment_method': 'cash',
+            'items': [{'product': p.id, 'quantity': quantity} for p in products]
+        }, format='json')
+
+    def _count_queries(self, products):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self._post(products)
+        self.assertEqual(response.status_code, 201, response.data)
+        return len(ctx)
+
+    def test_query_count_independent_of_line_count(self):
+        self.assertEqual(
+            self._count_queries(self.products[:2]),
+            self._count_queries(self.products)
+        )
+
+    def test_sale_items_and_kitchen_ticket_created(self):
+        response = self._post(self.products[:3], quantity=2)
+
+        sale = Sale.objects.get(pk=response.data['id'])
+        self.assertEqual(sale.total_amount, Decimal('12000.00'))
+        self.assertEqual(
+            list(sale.items.values_list('total_price', 'unit_cost').distinct()),
+            [(Decimal('4000.00'), Decimal('1000.00'))]
+        )
+
+        # Le ticket cuisine lit les articles de la vente, sans les recopier
+        order = Order.objects.get(sale=sale)
+        self.assertEqual(order.get_lines().count(), 3)
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_shortage_writes_nothing(self):
+        """Un article en rupture rejette tout le ticket avant écriture"""
+        response = self._post(self.products[:2], quantity=150)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('non_field_errors', response.data['items'][0])
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(Order.objects.exists())
+
+
+class BatchApiTest(TestCase):
+    """Tests de l'endpoint groupé /api/batch/ sur le parcours d'une vente"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='serveur',
+            password='testpass123',
+            role='server'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Bières', type='boissons')
+        self.product = Product.objects.create(
+            name='Primus',
+            category=category,
+            purchase_price=Decimal('1000.00'),
+            selling_price=Decimal('2000.00'),
+            current_stock=100
+        )
+
+    def _batch(self, add_product_id, atomic=True):
+        return self.client.post('/api/batch/', {
+            'atomic': atomic,
+            'operations': [
+                {'id': 'sale', 'method': 'POST', 'path': '/api/sales/', 'body': {
+                    'payment_method': 'cash',
+                    'items': [{'product': self.product.id, 'quantity': 1}]
+                }},
+                {'method': 'POST', 'path': '/api/sales/${sale.id}/add-items/', 'body': {
+                    'items': [{'product': add_product_id, 'quantity': 2}]
+                }},
+                {'method': 'GET', 'path': '/api/sales/${sale.id}/'},
+            ]
+        }, format='json')
+
+    def test_references_between_operations(self):
+        response = self._batch(self.product.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.data['results']], [201, 200, 200])
+        sale = Sale.objects.get()
+        self.assertEqual(response.data['results'][2]['body']['id'], sale.id)
+        self.assertEqual(sale.total_amount, Decimal('6000.00'))
+
+    def test_atomic_failure_rolls_back(self):
+        response = self._batch(999999)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['committed'])
+        self.assertEqual([r['status'] for r in response.data['results']], [201, 404, 424])
+        self.assertFalse(Sale.objects.exists())
+
+    def test_view_exception_fails_only_its_operation(self):
+        """Une exception non gérée dans une vue : 500 pour cette opération, les autres gardent leur résultat"""
+        with mock.patch.object(SaleDetailView, 'retrieve', side_effect=RuntimeError('panne')):
+            response = self._batch(self.product.id, atomic=False)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.data['results']], [201, 200, 500])
+        self.assertEqual(response.data['results'][2]['body'], {'error': 'panne'})
+        self.assertTrue(Sale.objects.exists())
+
+
+class OrdersStatsTest(TestCase):
+    """Tests des statistiques des commandes en cours"""
+
+    def test_avg_preparation_time_aggregate(self):
+        user = User.objects.create_user(username='caissier', password='x', role='cashier')
+        client = APIClient()
+        client.force_authenticate(user)
+        now = timezone.now()
+        for minutes in (10, 20):
+            sale = Sale.objects.create(server=user, created_by=user, status='ready')
+            Sale.objects.filter(pk=sale.pk).update(
+                created_at=now - timedelta(minutes=minutes), updated_at=now
+            )
+        Sale.objects.create(server=user, created_by=user, status='pending')
+
+        with self.assertNumQueries(4):
+            response = client.get('/api/sales/orders/stats/')
 
-# Create your tests here.
+        self.assertEqual(response.data['avg_preparation_time_minutes'], 15)
+        self.assertEqual(response.data['ready'], 2)
+        self.assertEqual(response.data['pending'], 1)
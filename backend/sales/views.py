@@ -5,7 +5,9 @@ from rest_framework import viewsets
 from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Sum, Count, Q, Avg
+from django.db import transaction
+from django.contrib.auth import get_user_model
+from django.db.models import Sum, Count, Q, Avg, prefetch_related_objects
 from django.utils import timezone
 from django.http import HttpResponse
 from datetime import datetime, timedelta
@@ -17,6 +19,21 @@ from .serializers import (
     SaleSerializer, SaleListSerializer, SaleCreateSerializer, SaleUpdateStatusSerializer
 )
 from accounts.permissions import IsAuthenticated, IsAdminOrGerant, CanViewSales, CanCreateSales
+from archive.services import (
+    HotThenArchived, archived, archived_period_response, archived_records,
+    attach_archived_children, reaches_archive, with_archive
+)
+from barstock_api.business_day import (
+    business_day_bounds, business_period_filter, current_business_day, parse_date
+)
+from barstock_api.conditional import ConditionalGetMixin, ConditionalResource
+from barstock_api.events import get_event_logger, request_headers
+
+events = get_event_logger(__name__)
+User = get_user_model()
+
+# La liste des tables affiche la vente en cours et la prochaine réservation
+TABLES_RESOURCE = ConditionalResource('tables', [Table, TableReservation, Sale])
 
 class TableListCreateView(generics.ListCreateAPIView):
     """
@@ -87,13 +104,11 @@ class SaleListCreateView(generics.ListCreateAPIView):
             
             # 👨‍💼 ADMIN : Voit TOUTES les ventes
             if user_role == 'admin':
-                print(f"🔓 Admin {self.request.user.username} - Accès total à toutes les ventes")
-                # Pas de filtre, voit tout
+                pass  # Pas de filtre, voit tout
             
             # 👔 MANAGER : Voit TOUTES les ventes
             elif user_role == 'manager':
-                print(f"🔓 Manager {self.request.user.username} - Accès total à toutes les ventes")
-                # Pas de filtre, voit tout
+                pass  # Pas de filtre, voit tout
             
             # 💰 CAISSIER : Voit UNIQUEMENT ses propres ventes
             elif user_role == 'cashier':
@@ -101,19 +116,21 @@ class SaleListCreateView(generics.ListCreateAPIView):
                 queryset = queryset.filter(
                     Q(created_by=self.request.user) | Q(server=self.request.user)
                 )
-                print(f"🔒 Caissier {self.request.user.username} - Ventes filtrées: {queryset.count()}")
             
             # 🍽️ SERVEUR : Voit UNIQUEMENT ses propres ventes
             elif user_role == 'server':
                 queryset = queryset.filter(server=self.request.user)
-                print(f"🔒 Serveur {self.request.user.username} - Ventes filtrées: {queryset.count()}")
+
+            events.debug(
+                'sales.list.scope', user=self.request.user.username, role=user_role,
+                count=queryset.count
+            )
 
         # Filtre par statuts multiples (status__in)
         status_in = self.request.query_params.get('status__in')
         if status_in:
             statuses = [s.strip() for s in status_in.split(',')]
             queryset = queryset.filter(status__in=statuses)
-            print(f"📊 Filtrage par statuts: {statuses}")
 
         # Filtres par date
         date_from = self.request.query_params.get('date_from')
@@ -122,19 +139,89 @@ class SaleListCreateView(generics.ListCreateAPIView):
         if date_from:
             try:
                 date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__gte=date_from)
+                queryset = queryset.filter(**business_period_filter(date_from=date_from))
             except ValueError:
                 pass
 
         if date_to:
             try:
                 date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
-                queryset = queryset.filter(created_at__date__lte=date_to)
+                queryset = queryset.filter(**business_period_filter(date_to=date_to))
             except ValueError:
                 pass
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        date_from = parse_date(request.query_params.get('date_from'))
+        date_to = parse_date(request.query_params.get('date_to'))
+        start = business_day_bounds(date_from)[0] if date_from else None
+        end = business_day_bounds(date_to)[1] if date_to else None
+
+        ordering = request.query_params.get('ordering') or '-created_at'
+        if reaches_archive(start):
+            # Période antérieure à la bascule : les ventes archivées suivent les ventes chaudes
+            conditions = self._archive_conditions()
+            if ordering == '-created_at':
+                queryset = HotThenArchived(queryset, archived_records(Sale, start, end, *conditions))
+            else:
+                # Autre tri (montant...) : fusion et tri en mémoire
+                queryset = list(queryset) + archived(Sale, start, end, *conditions)
+                self._sort_rows(queryset, ordering)
+
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset) if page is None else page
+
+        archived_sales = [sale for sale in rows if getattr(sale, 'is_archived', False)]
+        if archived_sales:
+            prefetch_related_objects(archived_sales, 'table', 'server', 'created_by')
+            items = attach_archived_children(archived_sales, SaleItem, 'sale_id', 'items')
+            prefetch_related_objects(items, 'product')
+
+        serializer = self.get_serializer(rows, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def _archive_conditions(self):
+        """Filtres de get_queryset() et des filtres DRF, exprimés sur les colonnes archivées"""
+        params = self.request.query_params
+        user = self.request.user
+        conditions = []
+
+        role = getattr(user, 'role', None)
+        if role == 'cashier':
+            conditions.append(Q(created_by_id=user.pk) | Q(server_id=user.pk))
+        elif role == 'server':
+            conditions.append(Q(server_id=user.pk))
+
+        if params.get('status__in'):
+            conditions.append(Q(status__in=[s.strip() for s in params['status__in'].split(',')]))
+        for field in self.filterset_fields:
+            value = params.get(field)
+            if value:
+                column = Sale._meta.get_field(field).attname
+                conditions.append(Q(**{column: int(value) if value.isdigit() else value}))
+
+        # Recherche : mêmes champs que search_fields, via les ids des tables et serveurs
+        for term in params.get('search', '').replace(',', ' ').split():
+            servers = User.objects.filter(
+                Q(username__icontains=term) | Q(first_name__icontains=term) | Q(last_name__icontains=term)
+            ).values_list('pk', flat=True)
+            tables = Table.objects.filter(number__icontains=term).values_list('pk', flat=True)
+            conditions.append(
+                Q(notes__icontains=term) | Q(server_id__in=list(servers)) | Q(table_id__in=list(tables))
+            )
+        return conditions
+
+    def _sort_rows(self, rows, ordering):
+        # Tri stable : du critère secondaire au critère principal
+        for field in reversed([field.strip() for field in ordering.split(',')]):
+            name = field.lstrip('-')
+            if name in self.ordering_fields:
+                rows.sort(key=lambda row: getattr(row, name), reverse=field.startswith('-'))
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return SaleCreateSerializer
@@ -151,9 +238,10 @@ class SaleListCreateView(generics.ListCreateAPIView):
 
     def create(self, request, *args, **kwargs):
         """Override create pour retourner les données complètes"""
-        print(f"🔍 Données reçues pour création de vente: {request.data}")
-        print(f"🔍 User authentifié: {request.user}")
-        print(f"🔍 Headers: {dict(request.headers)}")
+        events.debug(
+            'sales.create.request', user=request.user.username, data=lambda: request.data,
+            headers=lambda: request_headers(request)
+        )
         
         # Validation manuelle des données requises (seulement payment_method et items)
         required_fields = ['payment_method', 'items']
@@ -161,7 +249,7 @@ class SaleListCreateView(generics.ListCreateAPIView):
         
         if missing_fields:
             error_msg = f"Champs manquants: {', '.join(missing_fields)}"
-            print(f"❌ {error_msg}")
+            events.info('sales.create.rejected', reason=error_msg)
             return Response({'error': error_msg}, status=status.HTTP_400_BAD_REQUEST)
         
         # table, customer_name et server sont optionnels
@@ -170,58 +258,33 @@ class SaleListCreateView(generics.ListCreateAPIView):
         # Vérifier que les items ne sont pas vides
         if not request.data.get('items') or len(request.data.get('items', [])) == 0:
             error_msg = "Aucun article dans la vente"
-            print(f"❌ {error_msg}")
+            events.info('sales.create.rejected', reason=error_msg)
             return Response({'error': error_msg}, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            print(f"❌ Erreurs de validation: {serializer.errors}")
+            events.info('sales.create.invalid', errors=serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             sale = serializer.save()
-            print(f"✅ Vente créée avec succès: {sale.reference}")
+            events.info('sales.created', reference=sale.reference, total=sale.total_amount)
         except Exception as e:
-            print(f"❌ Erreur lors de la création: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            events.exception('sales.create.failed')
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Créer automatiquement un Order pour la cuisine
-        try:
-            from orders.models import Order, OrderItem
-            
-            order = Order.objects.create(
-                table=sale.table,
-                server=sale.server or request.user,
-                status='pending',
-                priority='normal',
-                total_amount=sale.total_amount,
-                notes=sale.notes or ''
-            )
-            
-            # Créer les OrderItems à partir des SaleItems
-            for sale_item in sale.items.all():
-                OrderItem.objects.create(
-                    order=order,
-                    product=sale_item.product,
-                    quantity=sale_item.quantity,
-                    unit_price=sale_item.unit_price,
-                    notes=sale_item.notes or '',
-                    status='pending'
-                )
-            
-            print(f"✅ Order {order.order_number} créé automatiquement pour la vente {sale.reference}")
-        except Exception as e:
-            print(f"⚠️  Erreur création Order pour {sale.reference}: {e}")
-            # Ne pas bloquer la vente si l'Order échoue
+        # Le ticket cuisine (Order) est créé avec la vente par le serializer
+
+        # Recharger la vente avec ses relations pour la facture et la réponse
+        sale = Sale.objects.select_related('table', 'server').prefetch_related(
+            'items__product__category'
+        ).get(pk=sale.pk)
 
         # Générer automatiquement la facture après la création de la vente
         try:
             invoice_data = InvoiceService.auto_generate_invoice(sale)
-            print(f"✅ Facture générée automatiquement pour la vente {sale.reference}")
-        except Exception as e:
-            print(f"⚠️  Erreur génération facture pour {sale.reference}: {e}")
+        except Exception:
+            events.exception('sales.invoice.failed', reference=sale.reference)
 
         # Utiliser SaleSerializer pour retourner les données complètes avec l'URL de la facture
         response_serializer = SaleSerializer(sale)
@@ -474,8 +537,8 @@ def approve_sale_credit(request, pk):
                     notes=f"Vente à crédit approuvée #{sale.id} - {item.product.name}",
                     user=request.user if request.user.is_authenticated else None
                 )
-            except Exception as e:
-                print(f"⚠️ Erreur création mouvement de stock: {e}")
+            except Exception:
+                events.exception('sales.credit_approval.stock_movement_failed', sale=sale.id, product=item.product_id)
                 # Ne pas bloquer l'approbation si le mouvement échoue
         
         # Changer le statut à completed (approuvé)
@@ -521,7 +584,7 @@ def sales_statistics(request):
         )
 
     # Période par défaut: aujourd'hui
-    today = timezone.now().date()
+    today = current_business_day()
     date_from = request.query_params.get('date_from', today)
     date_to = request.query_params.get('date_to', today)
 
@@ -537,11 +600,12 @@ def sales_statistics(request):
         except ValueError:
             date_to = today
 
+    archived = archived_period_response(date_from)
+    if archived:
+        return archived
+
     # Requête de base
-    queryset = Sale.objects.filter(
-        created_at__date__gte=date_from,
-        created_at__date__lte=date_to
-    )
+    queryset = Sale.objects.filter(**business_period_filter(date_from, date_to))
 
     # Filtrage par rôle utilisateur pour les statistiques
     if hasattr(request.user, 'role'):
@@ -563,6 +627,14 @@ def sales_statistics(request):
         total=Sum('discount_amount')
     )['total'] or 0
 
+    # Bénéfice sur les coûts figés au moment de la vente
+    total_profit = SaleItem.objects.filter(
+        sale__in=queryset,
+        sale__status='paid'
+    ).aggregate(
+        total=Sum(SaleItem.profit_expression())
+    )['total'] or 0
+
     # Ventes par méthode de paiement
     payment_methods = queryset.filter(status='paid').values('payment_method').annotate(
         count=Count('id'),
@@ -591,6 +663,7 @@ def sales_statistics(request):
             'pending_sales': pending_sales,
             'total_revenue': total_revenue,
             'total_discount': total_discount,
+            'total_profit': total_profit,
             'average_sale': round(total_revenue / paid_sales, 2) if paid_sales > 0 else 0
         },
         'payment_methods': list(payment_methods),
@@ -611,7 +684,7 @@ def daily_sales_report(request):
         )
 
     # Date par défaut: aujourd'hui
-    today = timezone.now().date()
+    today = current_business_day()
     report_date = request.query_params.get('date', today)
 
     if isinstance(report_date, str):
@@ -620,60 +693,71 @@ def daily_sales_report(request):
         except ValueError:
             report_date = today
 
-    # Ventes du jour
-    daily_sales = Sale.objects.filter(created_at__date=report_date)
+    # Ventes du jour, archivées comprises : une journée compte peu de ventes,
+    # les totaux sont calculés sur une seule lecture
+    start, end = business_day_bounds(report_date)
+    daily_sales = with_archive(Sale.objects.select_related('server'), 'created_at', start, end)
+    prefetch_related_objects(
+        [sale for sale in daily_sales if getattr(sale, 'is_archived', False)], 'server'
+    )
+    paid_sales = [sale for sale in daily_sales if sale.status == 'paid']
 
     # Statistiques générales
     stats = {
         'date': report_date,
-        'total_sales': daily_sales.count(),
-        'paid_sales': daily_sales.filter(status='paid').count(),
-        'pending_sales': daily_sales.filter(status='pending').count(),
-        'total_revenue': daily_sales.filter(status='paid').aggregate(
-            total=Sum('total_amount')
-        )['total'] or 0,
-        'total_discount': daily_sales.aggregate(
-            total=Sum('discount_amount')
-        )['total'] or 0
+        'total_sales': len(daily_sales),
+        'paid_sales': len(paid_sales),
+        'pending_sales': sum(1 for sale in daily_sales if sale.status == 'pending'),
+        'total_revenue': sum(sale.total_amount for sale in paid_sales),
+        'total_discount': sum(sale.discount_amount for sale in daily_sales)
     }
 
     # Ventes par serveur
-    sales_by_server = daily_sales.values(
-        'server__username',
-        'server__first_name',
-        'server__last_name'
-    ).annotate(
-        sales_count=Count('id'),
-        revenue=Sum('total_amount', filter=Q(status='paid'))
-    ).order_by('-revenue')
+    servers = {}
+    for sale in daily_sales:
+        server = sale.server
+        key = sale.server_id
+        if key not in servers:
+            servers[key] = {
+                'server__username': server.username if server else None,
+                'server__first_name': server.first_name if server else None,
+                'server__last_name': server.last_name if server else None,
+                'sales_count': 0,
+                'revenue': None
+            }
+        servers[key]['sales_count'] += 1
+        if sale.status == 'paid':
+            servers[key]['revenue'] = (servers[key]['revenue'] or 0) + sale.total_amount
+    sales_by_server = sorted(
+        servers.values(), key=lambda row: (row['revenue'] is None, -(row['revenue'] or 0))
+    )
+
+    # Ventes par heure (heure locale)
+    hourly_totals = {}
+    for sale in paid_sales:
+        hour = timezone.localtime(sale.created_at).hour
+        count, revenue = hourly_totals.get(hour, (0, 0))
+        hourly_totals[hour] = (count + 1, revenue + sale.total_amount)
 
-    # Ventes par heure
     sales_by_hour = []
     for hour in range(24):
-        hour_sales = daily_sales.filter(
-            created_at__hour=hour,
-            status='paid'
-        ).aggregate(
-            count=Count('id'),
-            revenue=Sum('total_amount')
-        )
-
+        count, revenue = hourly_totals.get(hour, (0, 0))
         sales_by_hour.append({
             'hour': f"{hour:02d}:00",
-            'sales_count': hour_sales['count'] or 0,
-            'revenue': hour_sales['revenue'] or 0
+            'sales_count': count,
+            'revenue': revenue
         })
 
     return Response({
         'stats': stats,
-        'sales_by_server': list(sales_by_server),
+        'sales_by_server': sales_by_server,
         'sales_by_hour': sales_by_hour
     })
 
 
 # ===== NOUVELLES VUES POUR TABLES ET RÉSERVATIONS =====
 
-class TableListView(generics.ListAPIView):
+class TableListView(ConditionalGetMixin, generics.ListAPIView):
     """Vue pour lister les tables avec informations détaillées"""
     queryset = Table.objects.filter(is_active=True)
     serializer_class = TableListSerializer
@@ -683,6 +767,7 @@ class TableListView(generics.ListAPIView):
     search_fields = ['number', 'location']
     ordering_fields = ['number', 'capacity']
     ordering = ['number']
+    conditional_resource = TABLES_RESOURCE
 
 
 @api_view(['POST'])
@@ -826,25 +911,22 @@ def sales_stats(request):
     period = request.GET.get('period', 'today')
     
     # Définir la période
-    now = timezone.now()
+    today = current_business_day()
     if period == 'today':
-        start_date = now.date()
+        start_date = today
         end_date = start_date
     elif period == 'week':
-        start_date = now.date() - timedelta(days=7)
-        end_date = now.date()
+        start_date = today - timedelta(days=7)
+        end_date = today
     elif period == 'month':
-        start_date = now.date() - timedelta(days=30)
-        end_date = now.date()
+        start_date = today - timedelta(days=30)
+        end_date = today
     else:
-        start_date = now.date()
+        start_date = today
         end_date = start_date
     
     # Requête des ventes pour la période
-    sales = Sale.objects.filter(
-        created_at__date__gte=start_date,
-        created_at__date__lte=end_date
-    )
+    sales = Sale.objects.filter(**business_period_filter(start_date, end_date))
     
     # Calculer les statistiques
     stats = {
@@ -954,125 +1036,87 @@ def add_items_to_sale(request, sale_id):
         
         from products.models import Product
         from decimal import Decimal
-        
+        from orders.kitchen_queue import schedule_refresh
+        from orders.models import Order
+
         added_items = []
-        
-        # Ajouter chaque item
-        for item_data in items_data:
-            product_id = item_data.get('product')
-            quantity = item_data.get('quantity', 1)
-            notes = item_data.get('notes', '')
-            
-            try:
-                product = Product.objects.get(id=product_id)
-                
-                # Vérifier le stock disponible
-                if product.current_stock < quantity:
-                    return Response(
-                        {'error': f'Stock insuffisant pour {product.name}. Disponible: {product.current_stock}'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-                # Vérifier si le produit existe déjà dans la vente
-                existing_item = SaleItem.objects.filter(sale=sale, product=product).first()
-                
-                if existing_item:
-                    # Mettre à jour la quantité existante
-                    existing_item.quantity += quantity
-                    if notes:
-                        existing_item.notes = f"{existing_item.notes or ''}\n{notes}".strip()
-                    existing_item.save()
-                    
-                    added_items.append({
-                        'product': product.name,
-                        'quantity': quantity,
-                        'price': product.selling_price,
-                        'action': 'updated'
-                    })
-                else:
-                    # Créer un nouvel item
-                    sale_item = SaleItem.objects.create(
-                        sale=sale,
-                        product=product,
-                        quantity=quantity,
-                        unit_price=product.selling_price,
-                        notes=notes
-                    )
-                    
-                    added_items.append({
-                        'product': product.name,
-                        'quantity': quantity,
-                        'price': product.selling_price,
-                        'action': 'added'
-                    })
-                
-            except Product.DoesNotExist:
-                return Response(
-                    {'error': f'Produit avec ID {product_id} introuvable.'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        
-        # Recalculer les totaux de la vente
-        sale.subtotal = sum(item.quantity * item.unit_price for item in sale.items.all())
-        sale.total_amount = sale.subtotal
-        sale.save()
-        
-        # Ajouter les items au Order correspondant (si existe)
-        try:
-            from orders.models import Order, OrderItem as OrderItemModel
-            
-            # Trouver l'Order correspondant à cette Sale (même table, même serveur, status != served)
-            order = Order.objects.filter(
-                table=sale.table,
-                server=sale.server,
-                status__in=['pending', 'confirmed', 'preparing', 'ready']
-            ).order_by('-created_at').first()
-            
-            if order:
-                # Ajouter les nouveaux items à l'Order
-                for item_data in items_data:
-                    product_id = item_data.get('product')
-                    quantity = item_data.get('quantity', 1)
-                    notes = item_data.get('notes', '')
-                    
+
+        # Une transaction : tout ou rien, et un seul rafraîchissement du ticket
+        # cuisine après commit quel que soit le nombre d'articles
+        with transaction.atomic():
+
+            # Ajouter chaque item
+            for item_data in items_data:
+                product_id = item_data.get('product')
+                quantity = item_data.get('quantity', 1)
+                notes = item_data.get('notes', '')
+
+                try:
                     product = Product.objects.get(id=product_id)
-                    
-                    # Vérifier si le produit existe déjà dans l'Order
-                    existing_order_item = OrderItemModel.objects.filter(order=order, product=product).first()
-                    
-                    if existing_order_item:
-                        # Mettre à jour la quantité
-                        existing_order_item.quantity += quantity
+
+                    # Vérifier le stock disponible
+                    if product.current_stock < quantity:
+                        transaction.set_rollback(True)
+                        return Response(
+                            {'error': f'Stock insuffisant pour {product.name}. Disponible: {product.current_stock}'},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+
+                    # Vérifier si le produit existe déjà dans la vente
+                    existing_item = SaleItem.objects.filter(sale=sale, product=product).first()
+
+                    if existing_item:
+                        # Mettre à jour la quantité existante
+                        existing_item.quantity += quantity
                         if notes:
-                            existing_order_item.notes = f"{existing_order_item.notes or ''}\n{notes}".strip()
-                        existing_order_item.save()
+                            existing_item.notes = f"{existing_item.notes or ''}\n{notes}".strip()
+                        existing_item.save()
+
+                        added_items.append({
+                            'product': product.name,
+                            'quantity': quantity,
+                            'price': product.selling_price,
+                            'action': 'updated'
+                        })
                     else:
-                        # Créer un nouvel OrderItem
-                        OrderItemModel.objects.create(
-                            order=order,
+                        # Créer un nouvel item
+                        sale_item = SaleItem.objects.create(
+                            sale=sale,
                             product=product,
                             quantity=quantity,
                             unit_price=product.selling_price,
-                            notes=notes,
-                            status='pending'
+                            notes=notes
                         )
-                
-                # Recalculer le total de l'Order
-                order.total_amount = sum(item.quantity * item.unit_price for item in order.items.all())
-                order.save()
-                
-                print(f"✅ Order {order.order_number} mis à jour avec les nouveaux items")
-            else:
-                print(f"⚠️  Aucun Order trouvé pour la vente {sale.reference}")
-        except Exception as e:
-            print(f"⚠️  Erreur mise à jour Order: {e}")
-            # Ne pas bloquer l'ajout si l'Order échoue
-        
+
+                        added_items.append({
+                            'product': product.name,
+                            'quantity': quantity,
+                            'price': product.selling_price,
+                            'action': 'added'
+                        })
+
+                except Product.DoesNotExist:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'error': f'Produit avec ID {product_id} introuvable.'},
+                        status=status.HTTP_404_NOT_FOUND
+                    )
+
+            # Recalculer les totaux de la vente
+            sale.subtotal = sum(item.quantity * item.unit_price for item in sale.items.all())
+            sale.total_amount = sale.subtotal
+            sale.save()
+
+            # Le ticket cuisine lit les articles de la vente : seul son total est à jour
+            # (update() ne passe pas par les signaux : rafraîchissement demandé ici)
+            Order.objects.filter(sale=sale).update(total_amount=sale.total_amount)
+            schedule_refresh(sale_ids=[sale.pk])
+
         # Régénérer la facture
         try:
             InvoiceService.auto_generate_invoice(sale)
-        except Exception as e:
-            print(f"⚠️ Erreur régénération facture: {e}")
+        except Exception:
+            events.exception('sales.invoice.regeneration_failed', reference=sale.reference)
         
         return Response({
             'message': f'{len(added_items)} article(s) ajouté(s) avec succès',
@@ -1239,10 +1283,10 @@ def test_sales_endpoint(request):
     """
     Endpoint de test pour diagnostiquer les problèmes de création de vente
     """
-    print(f"🧪 TEST ENDPOINT - Méthode: {request.method}")
-    print(f"🧪 Données reçues: {request.data}")
-    print(f"🧪 User: {request.user}")
-    print(f"🧪 Headers: {dict(request.headers)}")
+    events.debug(
+        'sales.test_endpoint', method=request.method, user=request.user,
+        data=lambda: request.data, headers=lambda: request_headers(request)
+    )
     
     if request.method == 'GET':
         return Response({
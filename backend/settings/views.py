@@ -12,6 +12,7 @@ from django.http import JsonResponse
 import json
 
 from .models import SystemSettings, UserPreferences, SystemInfo
+from barstock_api.conditional import ConditionalResource, conditional_get
 from .serializers import (
     SystemSettingsSerializer, 
     UserPreferencesSerializer, 
@@ -21,8 +22,12 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_SETTINGS_RESOURCE = ConditionalResource('system_settings', [SystemSettings])
+
+
 @api_view(['GET', 'PUT', 'PATCH'])
 @permission_classes([AllowAny])  # Temporairement public pour debug
+@conditional_get(SYSTEM_SETTINGS_RESOURCE)
 def system_settings_view(request):
     """
     API pour gérer les paramètres système
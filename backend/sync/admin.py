@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import OfflineSale, Tombstone
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ['entity', 'object_id', 'deleted_at']
+    list_filter = ['entity']
+    readonly_fields = ['entity', 'object_id', 'deleted_at']
+
+
+@admin.register(OfflineSale)
+class OfflineSaleAdmin(admin.ModelAdmin):
+    list_display = ['idempotency_key', 'user', 'sale', 'captured_at', 'created_at']
+    search_fields = ['idempotency_key', 'sale__reference']
+    raw_id_fields = ['user', 'sale']
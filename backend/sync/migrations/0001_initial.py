@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('sales', '0009_sale_sale_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=50, verbose_name='Entité')),
+                ('object_id', models.BigIntegerField(verbose_name='Identifiant supprimé')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de suppression')),
+            ],
+            options={
+                'verbose_name': 'Suppression synchronisée',
+                'verbose_name_plural': 'Suppressions synchronisées',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['entity', 'id'], name='tombstone_entity_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OfflineSale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64, verbose_name="Clé d'idempotence")),
+                ('captured_at', models.DateTimeField(blank=True, null=True, verbose_name="Date de saisie sur l'appareil")),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de réception')),
+                ('sale', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='offline_upload', to='sales.sale', verbose_name='Vente')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_sales', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Vente hors ligne',
+                'verbose_name_plural': 'Ventes hors ligne',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='offlinesale',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='offline_sale_unique_key'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'une suppression, pour que les clients synchronisés retirent
+    la ligne de leur copie locale (voir sync/services.py)
+    """
+
+    entity = models.CharField(
+        max_length=50,
+        verbose_name='Entité'
+    )
+
+    object_id = models.BigIntegerField(
+        verbose_name='Identifiant supprimé'
+    )
+
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Date de suppression'
+    )
+
+    class Meta:
+        verbose_name = 'Suppression synchronisée'
+        verbose_name_plural = 'Suppressions synchronisées'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['entity', 'id'], name='tombstone_entity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} #{self.object_id}"
+
+
+class OfflineSale(models.Model):
+    """
+    Vente saisie hors ligne et envoyée par lot : la clé d'idempotence
+    générée par l'appareil garantit qu'un renvoi ne crée pas de doublon
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='offline_sales',
+        verbose_name='Utilisateur'
+    )
+
+    idempotency_key = models.CharField(
+        max_length=64,
+        verbose_name="Clé d'idempotence"
+    )
+
+    # SET_NULL : la clé reste connue même si la vente est supprimée
+    sale = models.OneToOneField(
+        'sales.Sale',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='offline_upload',
+        verbose_name='Vente'
+    )
+
+    captured_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Date de saisie sur l'appareil"
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Date de réception'
+    )
+
+    class Meta:
+        verbose_name = 'Vente hors ligne'
+        verbose_name_plural = 'Ventes hors ligne'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                name='offline_sale_unique_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.user_id})"
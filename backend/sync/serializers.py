@@ -0,0 +1,8 @@
+from rest_framework import serializers
+
+
+class OfflineSaleUploadSerializer(serializers.Serializer):
+    """Enveloppe d'une vente hors ligne (le reste suit SaleCreateSerializer)"""
+
+    idempotency_key = serializers.CharField(max_length=64)
+    captured_at = serializers.DateTimeField(required=False, allow_null=True)
@@ -0,0 +1,264 @@
+"""
+Synchronisation incrémentale pour l'application mobile et le frontend
+
+Chaque entité synchronisée a son propre curseur opaque
+`<updated_at en µs>-<id>-<dernier tombstone>` :
+    - les lignes modifiées depuis le curseur sont lues dans l'ordre
+      (updated_at, id), par pages de `limit` ;
+    - les suppressions viennent des `Tombstone` (voir sync/signals.py) ;
+    - une ligne qui sort du périmètre (vente payée, alerte résolue...) est
+      renvoyée dans `deleted` comme une suppression.
+
+Sans curseur, l'entité est envoyée en entier (synchronisation initiale).
+Un curseur plus ancien que SYNC_TOMBSTONE_RETENTION_DAYS ne peut plus voir
+toutes les suppressions : la réponse porte alors `reset: true` et le client
+repart d'une copie vide.
+
+Le client applique `upserts` puis `deleted`, et renvoie `cursor` tant que
+`has_more` est vrai.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Max, Q
+from django.utils import timezone
+
+from alerts.models import Alert
+from barstock_api.events import get_event_logger
+from products.models import Category, Product
+from sales.models import Sale, SaleItem, Table
+from sales.serializers import SaleCreateSerializer
+
+from .models import OfflineSale, Tombstone
+
+events = get_event_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+MAX_UPLOAD_BATCH = 100
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible envoyé par le client"""
+
+
+def encode_cursor(updated_at, pk, tombstone_id):
+    delta = updated_at - _EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return f'{micros}-{pk}-{tombstone_id}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk, tombstone_id = (int(part) for part in cursor.split('-'))
+    except (AttributeError, ValueError):
+        raise InvalidCursor(cursor)
+    return _EPOCH + datetime.timedelta(microseconds=micros), pk, tombstone_id
+
+
+def _attach_sale_items(rows):
+    """Ajoute les articles aux ventes envoyées (une requête)"""
+    by_sale = {row['id']: row for row in rows}
+    for row in rows:
+        row['items'] = []
+    items = SaleItem.objects.filter(sale_id__in=by_sale).order_by('id').values(
+        'id', 'sale_id', 'product_id', 'quantity', 'unit_price', 'total_price', 'notes'
+    )
+    for item in items:
+        by_sale[item.pop('sale_id')]['items'].append(item)
+
+
+class SyncEntity:
+    """Entité synchronisable : modèle, champs envoyés et périmètre"""
+
+    def __init__(self, name, model, fields, scope=None, attach=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.scope = scope
+        self.attach = attach
+
+
+ENTITIES = {
+    entity.name: entity for entity in [
+        SyncEntity('categories', Category, [
+            'id', 'name', 'type', 'is_active', 'updated_at',
+        ]),
+        SyncEntity('products', Product, [
+            'id', 'name', 'category_id', 'code', 'unit', 'selling_price',
+            'current_stock', 'minimum_stock', 'is_active', 'is_available', 'updated_at',
+        ]),
+        SyncEntity('tables', Table, [
+            'id', 'number', 'capacity', 'status', 'location', 'is_active',
+            'occupied_since', 'server', 'customer', 'updated_at',
+        ]),
+        SyncEntity('sales', Sale, [
+            'id', 'reference', 'table_id', 'server_id', 'customer_name', 'status',
+            'payment_method', 'subtotal', 'discount_amount', 'total_amount',
+            'notes', 'created_at', 'updated_at',
+        ], scope=~Q(status__in=['paid', 'cancelled']), attach=_attach_sale_items),
+        SyncEntity('alerts', Alert, [
+            'id', 'type', 'priority', 'status', 'title', 'message',
+            'related_product_id', 'related_sale_id', 'created_at', 'updated_at',
+        ], scope=Q(status='active')),
+    ]
+}
+
+ENTITY_BY_MODEL = {entity.model: entity.name for entity in ENTITIES.values()}
+
+
+class SyncService:
+    """Lecture des changements et envoi des ventes hors ligne"""
+
+    @staticmethod
+    def pull_entity(entity, cursor, limit, now=None):
+        """Changements d'une entité depuis `cursor` (None = tout)"""
+        now = now or timezone.now()
+        # Les écritures des dernières secondes peuvent encore être dans une
+        # transaction non validée : elles partent à la synchro suivante
+        until = now - datetime.timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 2))
+        retention = datetime.timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+        reset = False
+        if cursor is not None:
+            since, since_pk, tombstone_id = decode_cursor(cursor)
+            if since < now - retention:
+                cursor, reset = None, True
+
+        tombstones = Tombstone.objects.filter(entity=entity.name)
+        queryset = entity.model._default_manager.filter(updated_at__lte=until)
+
+        if cursor is None:
+            # Copie complète : les suppressions passées ne concernent pas le client
+            tombstone_id = tombstones.aggregate(last=Max('id'))['last'] or 0
+            if entity.scope is not None:
+                queryset = queryset.filter(entity.scope)
+            since = since_pk = None
+            changes = queryset
+        else:
+            changes = queryset.filter(
+                Q(updated_at__gt=since) | Q(updated_at=since, id__gt=since_pk)
+            )
+
+        fields = list(entity.fields)
+        if cursor is not None and entity.scope is not None:
+            changes = changes.annotate(
+                sync_in_scope=ExpressionWrapper(entity.scope, output_field=BooleanField())
+            )
+            fields.append('sync_in_scope')
+
+        rows = list(changes.order_by('updated_at', 'id').values(*fields)[:limit + 1])
+        rows_more = len(rows) > limit
+        rows = rows[:limit]
+
+        upserts, deleted = [], []
+        for row in rows:
+            if row.pop('sync_in_scope', True):
+                upserts.append(row)
+            else:
+                deleted.append(row['id'])
+
+        deleted_rows = []
+        if cursor is not None:
+            deleted_rows = list(
+                tombstones.filter(id__gt=tombstone_id).order_by('id').values_list('id', 'object_id')[:limit + 1]
+            )
+        tombstones_more = len(deleted_rows) > limit
+        deleted_rows = deleted_rows[:limit]
+        deleted.extend(object_id for _id, object_id in deleted_rows)
+        if deleted_rows:
+            tombstone_id = deleted_rows[-1][0]
+
+        if entity.attach and upserts:
+            entity.attach(upserts)
+
+        if rows_more:
+            next_cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id'], tombstone_id)
+        else:
+            # Tout ce qui est antérieur à `until` a été envoyé : le curseur
+            # avance même sans changement (et ne tombe pas hors rétention)
+            next_cursor = encode_cursor(until, 0, tombstone_id)
+
+        return {
+            'upserts': upserts,
+            'deleted': deleted,
+            'cursor': next_cursor,
+            'has_more': rows_more or tombstones_more,
+            'reset': reset,
+        }
+
+    @staticmethod
+    def pull(cursors, limit=DEFAULT_PAGE_SIZE):
+        """`cursors` : {nom d'entité: curseur ou None}"""
+        now = timezone.now()
+        return {
+            'server_time': now,
+            'entities': {
+                name: SyncService.pull_entity(ENTITIES[name], cursor, limit, now=now)
+                for name, cursor in cursors.items()
+            }
+        }
+
+    @staticmethod
+    def push_sales(request, uploads):
+        """
+        Crée les ventes saisies hors ligne. `uploads` : liste de
+        (idempotency_key, captured_at, données de SaleCreateSerializer).
+        Une clé déjà reçue renvoie la vente existante sans rien recréer.
+        """
+        user_id = request.user.pk
+        known = {
+            upload.idempotency_key: upload
+            for upload in OfflineSale.objects.filter(
+                user_id=user_id,
+                idempotency_key__in=[key for key, _captured_at, _data in uploads]
+            ).select_related('sale')
+        }
+
+        results = []
+        for key, captured_at, data in uploads:
+            if key in known:
+                results.append(SyncService._result(key, 'duplicate', known[key]))
+                continue
+
+            serializer = SaleCreateSerializer(data=data, context={'request': request})
+            if not serializer.is_valid():
+                results.append({'idempotency_key': key, 'status': 'invalid', 'errors': serializer.errors})
+                continue
+
+            try:
+                with transaction.atomic():
+                    sale = serializer.save()
+                    upload = OfflineSale.objects.create(
+                        user_id=user_id, idempotency_key=key, sale=sale, captured_at=captured_at
+                    )
+                status = 'created'
+            except IntegrityError:
+                # Même clé envoyée en parallèle : la vente créée ici est annulée
+                upload = OfflineSale.objects.select_related('sale').filter(
+                    user_id=user_id, idempotency_key=key
+                ).first()
+                if upload is None:
+                    # Autre contrainte violée : seule cette vente est en erreur
+                    events.exception('sync.push.sale_failed', user=user_id, idempotency_key=key)
+                    results.append({'idempotency_key': key, 'status': 'error'})
+                    continue
+                status = 'duplicate'
+
+            known[key] = upload
+            results.append(SyncService._result(key, status, upload))
+
+        return results
+
+    @staticmethod
+    def _result(key, status, upload):
+        return {
+            'idempotency_key': key,
+            'status': status,
+            'sale_id': upload.sale_id,
+            'reference': upload.sale.reference if upload.sale else None,
+        }
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from alerts.models import Alert
+from products.models import Category, Product
+from sales.models import Sale, Table
+
+from .models import Tombstone
+from .services import ENTITY_BY_MODEL
+
+
+@receiver(post_delete, sender=Alert)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=Table)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+def record_tombstone(sender, instance, **kwargs):
+    """Enregistre la suppression pour les clients synchronisés"""
+    Tombstone.objects.create(entity=ENTITY_BY_MODEL[sender], object_id=instance.pk)
@@ -0,0 +1,139 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from products.models import Category, Product
+from sales.models import Sale
+from sales.serializers import SaleCreateSerializer
+
+User = get_user_model()
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncPullTest(TestCase):
+    """Tests de la synchronisation incrémentale"""
+
+    url = '/api/sync/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='serveur', password='x', role='server')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Bières', type='boissons')
+        self.product = Product.objects.create(
+            name='Primus',
+            category=self.category,
+            purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'),
+            current_stock=50
+        )
+
+    def pull(self, entity, cursor=''):
+        response = self.client.get(self.url, {'entities': entity, entity: cursor})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['entities'][entity]
+
+    def test_initial_then_delta(self):
+        first = self.pull('products')
+        self.assertEqual([row['id'] for row in first['upserts']], [self.product.pk])
+
+        unchanged = self.pull('products', first['cursor'])
+        self.assertEqual(unchanged['upserts'], [])
+        self.assertEqual(unchanged['deleted'], [])
+
+        self.product.selling_price = Decimal('3000.00')
+        self.product.save()
+        changed = self.pull('products', unchanged['cursor'])
+        self.assertEqual(changed['upserts'][0]['selling_price'], 3000)
+
+        product_id = self.product.pk
+        self.product.delete()
+        deleted = self.pull('products', changed['cursor'])
+        self.assertEqual(deleted['deleted'], [product_id])
+
+    def test_closed_sale_leaves_open_sales(self):
+        sale = Sale.objects.create(server=self.user, created_by=self.user)
+        first = self.pull('sales')
+        self.assertEqual([row['id'] for row in first['upserts']], [sale.pk])
+
+        sale.status = 'paid'
+        sale.save()
+        delta = self.pull('sales', first['cursor'])
+        self.assertEqual(delta['upserts'], [])
+        self.assertEqual(delta['deleted'], [sale.pk])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'entities': 'products', 'products': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SyncPushSalesTest(TestCase):
+    """Tests de l'envoi des ventes hors ligne"""
+
+    url = '/api/sync/sales/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='serveur', password='x', role='server')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name='Bières', type='boissons')
+        self.product = Product.objects.create(
+            name='Primus',
+            category=category,
+            purchase_price=Decimal('1500.00'),
+            selling_price=Decimal('2500.00'),
+            current_stock=50
+        )
+
+    def test_retry_does_not_duplicate(self):
+        payload = {'sales': [{
+            'idempotency_key': 'tablette-1-0001',
+            'payment_method': 'cash',
+            'items': [{'product': self.product.pk, 'quantity': 2}]
+        }]}
+
+        first = self.client.post(self.url, payload, format='json').json()
+        retry = self.client.post(self.url, payload, format='json').json()
+
+        self.assertEqual(first['results'][0]['status'], 'created')
+        self.assertEqual(retry['results'][0]['status'], 'duplicate')
+        self.assertEqual(retry['results'][0]['sale_id'], first['results'][0]['sale_id'])
+        self.assertEqual(Sale.objects.count(), 1)
+
+    def test_invalid_sale_is_reported(self):
+        payload = {'sales': [{
+            'idempotency_key': 'tablette-1-0002',
+            'payment_method': 'cash',
+            'items': [{'product': self.product.pk, 'quantity': 500}]
+        }]}
+
+        result = self.client.post(self.url, payload, format='json').json()
+
+        self.assertEqual(result['results'][0]['status'], 'invalid')
+        self.assertEqual(Sale.objects.count(), 0)
+
+    def test_integrity_error_fails_only_its_sale(self):
+        """Une contrainte violée autre que la clé d'idempotence : erreur pour cette vente, les autres passent"""
+        payload = {'sales': [
+            {'idempotency_key': key, 'payment_method': 'cash', 'items': [{'product': self.product.pk, 'quantity': 1}]}
+            for key in ('tablette-1-0003', 'tablette-1-0004')
+        ]}
+        save = SaleCreateSerializer.save
+        calls = []
+
+        def failing_first_save(serializer, **kwargs):
+            calls.append(serializer)
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed: sales_sale.reference')
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(SaleCreateSerializer, 'save', failing_first_save):
+            result = self.client.post(self.url, payload, format='json').json()
+
+        self.assertEqual([r['status'] for r in result['results']], ['error', 'created'])
+        self.assertEqual((result['created'], result['errors']), (1, 1))
+        self.assertEqual(Sale.objects.count(), 1)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('', views.sync_pull, name='sync_pull'),
+    path('sales/', views.sync_push_sales, name='sync_push_sales'),
+]
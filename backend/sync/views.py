@@ -0,0 +1,92 @@
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .serializers import OfflineSaleUploadSerializer
+from .services import (
+    DEFAULT_PAGE_SIZE, ENTITIES, MAX_PAGE_SIZE, MAX_UPLOAD_BATCH,
+    InvalidCursor, SyncService
+)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_pull(request):
+    """
+    Changements depuis la dernière synchronisation.
+
+    GET /api/sync/?entities=products,tables&products=<curseur>&tables=<curseur>
+    Un curseur absent ou vide déclenche une copie complète de l'entité.
+    """
+    names = request.query_params.get('entities')
+    names = [name.strip() for name in names.split(',') if name.strip()] if names else list(ENTITIES)
+
+    unknown = [name for name in names if name not in ENTITIES]
+    if unknown:
+        return Response(
+            {'error': f"Entités inconnues: {', '.join(unknown)}", 'available': list(ENTITIES)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        limit = min(int(request.query_params.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(limit, 1)
+
+    cursors = {name: request.query_params.get(name) or None for name in names}
+    try:
+        data = SyncService.pull(cursors, limit=limit)
+    except InvalidCursor as e:
+        return Response({'error': f'Curseur invalide: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_push_sales(request):
+    """
+    Envoi groupé des ventes saisies hors ligne.
+
+    POST /api/sync/sales/ {"sales": [{"idempotency_key": "...", "captured_at": "...",
+                                      "payment_method": "cash", "items": [...]}, ...]}
+    Chaque vente est créée dans sa propre transaction ; le résultat est donné
+    vente par vente (created / duplicate / invalid). Renvoyer un lot déjà
+    reçu ne crée aucun doublon.
+    """
+    sales = request.data.get('sales')
+    if not isinstance(sales, list) or not sales:
+        return Response({'error': 'Aucune vente à synchroniser'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(sales) > MAX_UPLOAD_BATCH:
+        return Response(
+            {'error': f'Maximum {MAX_UPLOAD_BATCH} ventes par envoi'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    uploads, errors = [], {}
+    for index, payload in enumerate(sales):
+        envelope = OfflineSaleUploadSerializer(data=payload if isinstance(payload, dict) else {})
+        if not envelope.is_valid():
+            errors[index] = envelope.errors
+            continue
+        data = {k: v for k, v in payload.items() if k not in ('idempotency_key', 'captured_at')}
+        uploads.append((
+            envelope.validated_data['idempotency_key'],
+            envelope.validated_data.get('captured_at'),
+            data
+        ))
+
+    if errors:
+        # Sans clé valide, un renvoi ne pourrait pas être dédoublonné
+        return Response({'error': 'Clés de synchronisation invalides', 'details': errors},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = SyncService.push_sales(request, uploads)
+    return Response({
+        'results': results,
+        'created': sum(1 for result in results if result['status'] == 'created'),
+        'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+        'invalid': sum(1 for result in results if result['status'] == 'invalid'),
+        'errors': sum(1 for result in results if result['status'] == 'error'),
+    })